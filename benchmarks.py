@@ -0,0 +1,1225 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Bancs d'essai de performance du système Universités/Facultés
+
+Chaque banc d'essai travaille dans une base synthétique copiée d'un gabarit
+(gabarits.py) dans un dossier temporaire : universites_facultes.db n'est jamais modifiée.
+
+Exemples :
+    python benchmarks.py replique --universites 2000 --facultes 20 --ecritures 50
+    python benchmarks.py requetes --appels 10000
+    python benchmarks.py historique --universites 50000 --facultes 20 --annees 10
+    python benchmarks.py doublons --universites 1000000 --facultes 0
+    python benchmarks.py sync --universites 50000 --facultes 20 --changements 5
+    python benchmarks.py plans --universites 20000  # code de sortie 1 si parcours complet
+    python benchmarks.py memoire --actions 10000    # code de sortie 1 si la mémoire croît
+    python benchmarks.py interface --universites 20000 --facultes 20 --sequences 10
+    python benchmarks.py graphe --universites 20000 --facultes 20
+    python benchmarks.py depot --universites 20000 --facultes 20  # code de sortie 1 si non conforme
+    python benchmarks.py lots --universites 20000 --facultes 20 --lignes 500
+    python benchmarks.py federation --fichiers 8 --universites 5000 --facultes 20
+    python benchmarks.py classements --universites 50000 --facultes 20 --limite 100
+    python benchmarks.py sauvegarde --universites 50000 --facultes 20 --intervalle-ms 200
+    python benchmarks.py ecritures --universites 20000 --facultes 20  # code de sortie 1 si reprise incorrecte
+    python benchmarks.py partage --universites 20000 --facultes 20 --processus 8  # code de sortie 1 si écart
+    python benchmarks.py rejeu --universites 20000 --facultes 20 --clients 4  # code de sortie 1 si écart
+"""
+
+import argparse
+import contextlib
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("BANQUE_ECHO_SQL", "0")
+
+
+def preparer_base_temporaire(nb_universites, facultes_par_universite):
+    """
+    Se place dans un dossier temporaire et y copie une base synthétique
+
+    La base par défaut de database est "universites_facultes.db" dans le dossier courant
+    (ouverte à la première connexion) : changer de dossier garde celle de l'application
+    à l'abri, y compris dans les processus lancés par les bancs. La base est la copie d'un gabarit
+    (gabarits.py), construit seulement au premier banc d'essai de cette taille.
+    """
+    dossier = tempfile.mkdtemp(prefix="banque_bench_")
+    os.chdir(dossier)
+
+    import database
+    import gabarits
+
+    debut = time.perf_counter()
+    database.engine.dispose()
+    database.utiliser_engine(
+        gabarits.cloner((nb_universites, facultes_par_universite, False), en_memoire=False, dossier=dossier),
+        preparer=False)
+    print(f"Base synthétique : {nb_universites} universités, {nb_universites * facultes_par_universite} facultés "
+          f"({time.perf_counter() - debut:.1f} s) dans {dossier}")
+    return database
+
+
+def mesurer(fonction, repetitions):
+    """Exécute fonction plusieurs fois et retourne les durées en millisecondes"""
+    durees = []
+    for _ in range(repetitions):
+        debut = time.perf_counter()
+        fonction()
+        durees.append((time.perf_counter() - debut) * 1000)
+    return durees
+
+
+def afficher_mesures(libelle, durees):
+    durees_triees = sorted(durees)
+    p95 = durees_triees[min(len(durees_triees) - 1, int(len(durees_triees) * 0.95))]
+    print(f"   {libelle:<45} médiane {statistics.median(durees):8.3f} ms   "
+          f"p95 {p95:8.3f} ms   moyenne {statistics.mean(durees):8.3f} ms")
+
+
+def banc_replique(args):
+    """Latence de rafraîchissement des listes : fichier sur disque vs réplique en mémoire"""
+    database = preparer_base_temporaire(args.universites, args.facultes)
+    ids = [u.id for u in database.obtenir_universites()]
+    echantillon = random.Random(0).sample(ids, min(len(ids), args.repetitions))
+
+    def charger_universites():
+        database.obtenir_universites()
+
+    selections = iter(echantillon * 2)
+
+    def changer_universite():
+        database.obtenir_facultes_par_universite(next(selections))
+
+    for mode in ("fichier", "mémoire"):
+        if mode == "mémoire":
+            debut = time.perf_counter()
+            database.activer_replique_memoire()
+            print(f"Copie complète de la base dans la réplique : {(time.perf_counter() - debut) * 1000:.1f} ms")
+        print(f"\nMoteur {mode} :")
+        afficher_mesures("liste des universités (charger_universites)", mesurer(charger_universites, args.repetitions))
+        afficher_mesures("facultés d'une université (combo)", mesurer(changer_universite, len(echantillon)))
+    database.desactiver_replique_memoire()
+
+    # Ajout d'une faculté puis rechargement, comme après chaque clic de l'interface
+    modes_ecriture = (
+        ("fichier", None),
+        ("mémoire, recopie à chaque écriture", 0),
+        (f"mémoire, recopie après {database.DELAI_REPLIQUE_S:g} s sans écriture", database.DELAI_REPLIQUE_S),
+    )
+    ajouts = iter(range(len(modes_ecriture) * args.ecritures))
+
+    def ajouter_puis_recharger():
+        numero = next(ajouts)
+        universite_id = echantillon[numero % len(echantillon)]
+        with open(os.devnull, "w") as nulle, contextlib.redirect_stdout(nulle):
+            database.ajouter_faculte(f"Faculté Du Banc {numero}", f"BR{numero}", 100, universite_id)
+        database.obtenir_universites()
+        database.obtenir_facultes_par_universite(universite_id)
+
+    print(f"\n{args.ecritures} ajout(s) d'une faculté, chacun suivi du rechargement des listes :")
+    for libelle, delai in modes_ecriture:
+        if delai is not None:
+            database.activer_replique_memoire(delai)
+        afficher_mesures(libelle, mesurer(ajouter_puis_recharger, args.ecritures))
+        database.desactiver_replique_memoire()
+
+    return 0
+
+
+def banc_requetes(args):
+    """
+    Coût par appel des recherches fréquentes : Query ORM reconstruite à chaque
+    appel (avant) vs requêtes construites une fois et paramétrées (après)
+    """
+    database = preparer_base_temporaire(args.universites, args.facultes)
+    from database import session, Universite, Faculte
+
+    aleatoire = random.Random(0)
+    ids = [u.id for u in database.obtenir_universites()]
+    codes = {u.id: u.code_universite for u in database.obtenir_universites()}
+    appels = [aleatoire.choice(ids) for _ in range(args.appels)]
+
+    def avant_par_universite(universite_id):
+        return session.query(Faculte).filter_by(universite_id=universite_id).order_by(Faculte.nom).all()
+
+    def avant_par_code(universite_id):
+        universite = session.query(Universite).filter_by(code_universite=codes[universite_id]).first()
+        return avant_par_universite(universite.id) if universite else []
+
+    def avant_doublon(universite_id):
+        return session.query(Faculte).filter_by(nom="Faculté de Génie", universite_id=universite_id).first()
+
+    def apres_doublon(universite_id):
+        return session.scalars(database.REQUETE_FACULTE_EXISTANTE,
+                               {"nom": "Faculté de Génie", "universite_id": universite_id}).first()
+
+    comparaisons = [
+        ("obtenir_facultes_par_universite", avant_par_universite, database.obtenir_facultes_par_universite),
+        ("obtenir_facultes_par_code_universite", avant_par_code,
+         lambda universite_id: database.obtenir_facultes_par_code_universite(codes[universite_id])),
+        ("vérification de doublon (ajouter_faculte)", avant_doublon, apres_doublon),
+    ]
+
+    print(f"\n{args.appels} appels par fonction (µs par appel) :")
+    for libelle, avant, apres in comparaisons:
+        resultats = {}
+        for version, fonction in (("avant", avant), ("après", apres)):
+            fonction(appels[0])  # Remplir les caches
+            debut = time.perf_counter()
+            for universite_id in appels:
+                fonction(universite_id)
+            resultats[version] = (time.perf_counter() - debut) / len(appels) * 1e6
+        print(f"   {libelle:<45} avant {resultats['avant']:8.1f} µs   après {resultats['après']:8.1f} µs   "
+              f"({1e6 / resultats['après']:,.0f} appels/s)")
+
+    return 0
+
+
+def banc_historique(args):
+    """Requêtes sur l'historique des effectifs (plage, tendance, croissance)"""
+    database = preparer_base_temporaire(args.universites, args.facultes)
+    import historique
+
+    # Historique synthétique : une photo par année, effectifs qui varient de ±10 %
+    debut = time.perf_counter()
+    premiere_annee = 2025 - args.annees + 1
+    with database.engine.begin() as connexion:
+        for annee in range(premiere_annee, 2026):
+            connexion.execute(database.text("""
+                INSERT INTO historique_effectifs (faculte_id, periode, nombre_etudiants)
+                SELECT id, :annee, MAX(0, nombre_etudiants * (90 + ABS(RANDOM()) % 21) / 100)
+                FROM facultes
+            """), {"annee": annee})
+    nb_lignes = database.session.query(database.HistoriqueEffectif).count()
+    print(f"Historique : {nb_lignes} lignes sur {args.annees} années ({time.perf_counter() - debut:.1f} s)")
+
+    aleatoire = random.Random(0)
+    ids_universites = [id_ for (id_,) in database.session.execute(database.text("SELECT id FROM universites"))]
+    nb_facultes = args.universites * args.facultes
+
+    mesures = [
+        ("plage d'une faculté", lambda: historique.effectifs_plage(
+            2018, 2025, faculte_id=aleatoire.randint(1, nb_facultes))),
+        ("plage d'une université", lambda: historique.effectifs_plage(
+            2018, 2025, universite_id=aleatoire.choice(ids_universites))),
+        ("tendance d'une université", lambda: historique.tendance(
+            universite_id=aleatoire.choice(ids_universites))),
+        ("croissance annuelle d'une ville", lambda: historique.croissance_annuelle(ville="Québec")),
+        ("plage de tout le catalogue", lambda: historique.effectifs_plage(2018, 2025)),
+        ("top 20 des croissances (universités)", lambda: historique.croissances(2025, par="universite")),
+    ]
+
+    print()
+    for libelle, fonction in mesures:
+        repetitions = args.repetitions if "faculté" in libelle or "université" in libelle else 3
+        afficher_mesures(libelle, mesurer(fonction, repetitions))
+
+    return 0
+
+
+def _variante(nom, aleatoire):
+    """Quasi-doublon d'un nom : sans accents et en minuscules, ou avec une lettre doublée"""
+    if aleatoire.random() < 0.5:
+        import doublons
+        return doublons.normaliser(nom)
+    # Jamais un chiffre : « Synthétique 11 » n'est pas un doublon de « Synthétique 1 »
+    position = aleatoire.choice([i for i, caractere in enumerate(nom) if caractere.isalpha()])
+    return nom[:position] + nom[position] + nom[position:]
+
+
+def banc_doublons(args):
+    """Recherche de quasi-doublons à l'ajout et rapport des grappes"""
+    database = preparer_base_temporaire(args.universites, args.facultes)
+    import doublons
+
+    # Quasi-doublons injectés : universités et facultés (dans la même université)
+    aleatoire = random.Random(0)
+    universites = database.session.execute(database.select(database.Universite.id, database.Universite.nom)).all()
+    echantillon = aleatoire.sample(universites, min(args.variantes, len(universites)))
+    with database.engine.begin() as connexion:
+        montreal = database.VILLES.identifiant("Montréal", connexion)
+        connexion.execute(database.Universite.__table__.insert(), [
+            {"nom": _variante(nom, aleatoire), "ville_id": montreal, "code_universite": f"V{numero}"}
+            for numero, (_, nom) in enumerate(echantillon)])
+        if args.facultes:
+            med2 = database.CODES_FACULTES.identifiant("MED2", connexion)
+            connexion.execute(database.Faculte.__table__.insert(), [
+                {"nom_id": database.NOMS_FACULTES.identifiant(_variante("Faculté de Médecine", aleatoire), connexion),
+                 "code_id": med2, "nombre_etudiants": 100, "universite_id": universite_id}
+                for universite_id, _ in echantillon])
+    print(f"{len(echantillon)} quasi-doublon(s) injecté(s)")
+
+    debut = time.perf_counter()
+    doublons.doublons_universite("Université de Montréal")
+    print(f"Construction de l'index des universités : {time.perf_counter() - debut:.2f} s\n")
+
+    noms = [_variante(nom, aleatoire) for _, nom in aleatoire.sample(universites, min(args.recherches, len(universites)))]
+    ids = [universite_id for universite_id, _ in universites]
+    iterateur_noms = iter(noms * 2)
+    afficher_mesures("recherche à l'ajout d'une université",
+                     mesurer(lambda: doublons.doublons_universite(next(iterateur_noms)), len(noms)))
+    if args.facultes:
+        afficher_mesures("recherche à l'ajout d'une faculté", mesurer(
+            lambda: doublons.doublons_faculte("Faculte de Genie", aleatoire.choice(ids)), len(noms)))
+
+    debut = time.perf_counter()
+    grappes = doublons.grappes_universites()
+    print(f"\nRapport des universités : {len(grappes)} grappe(s) en {time.perf_counter() - debut:.2f} s")
+    if args.facultes:
+        debut = time.perf_counter()
+        grappes = doublons.grappes_facultes()
+        print(f"Rapport des facultés : {len(grappes)} grappe(s) en {time.perf_counter() - debut:.2f} s")
+
+    return 0
+
+
+def banc_sync(args):
+    """Synchronisation d'un satellite après quelques changements sur le poste central"""
+    database = preparer_base_temporaire(args.universites, args.facultes)
+    import synchronisation
+    from sqlalchemy import create_engine
+
+    # Le satellite part d'une copie de la base, puis le poste central change quelques universités
+    shutil.copy("universites_facultes.db", "satellite.db")
+    satellite = create_engine("sqlite:///satellite.db")
+    aleatoire = random.Random(0)
+    universites = aleatoire.sample(database.obtenir_universites(), args.changements + 3)
+    for numero, universite in enumerate(universites[3:]):
+        if numero % 3 == 0:
+            database.ajouter_faculte("Faculté de Synchronisation", "SYNC", 42, universite.id)
+        elif numero % 3 == 1:
+            universite.facultes[0].nombre_etudiants += 1
+        else:
+            universite.ville = "Gaspé"
+
+    # Même nom, nouveau code dans un seau traité avant l'ancien : la nouvelle ligne arrive
+    # alors que l'ancienne porte encore le nom
+    recodee = universites[0]
+    recodee.code_universite = next(code for code in (f"SYNC{numero}" for numero in range(1000))
+                                   if synchronisation.seau(code) < synchronisation.seau(recodee.code_universite))
+    # Noms échangés entre deux universités de seaux différents
+    premiere, seconde = universites[1], universites[2]
+    nom_premiere, nom_seconde = premiere.nom, seconde.nom
+    premiere.nom = "Université En Cours D'Échange"
+    database.session.flush()
+    seconde.nom = nom_premiere
+    database.session.flush()
+    premiere.nom = nom_seconde
+    database.session.commit()
+    database.ajouter_universite("Université Nouvelle", "Gaspé", "NOUV")
+
+    debut = time.perf_counter()
+    synchronisation.ecrire_empreintes("empreintes.bin", satellite)
+    duree_empreintes = time.perf_counter() - debut
+
+    debut = time.perf_counter()
+    resume_patch = synchronisation.creer_patch(synchronisation.lire_empreintes("empreintes.bin"), "patch.json.gz")
+    duree_patch = time.perf_counter() - debut
+
+    debut = time.perf_counter()
+    resume = synchronisation.appliquer_patch("patch.json.gz", satellite)
+    duree_application = time.perf_counter() - debut
+
+    identiques = (synchronisation.ArbreEmpreintes.depuis_base(satellite).racine
+                  == synchronisation.ArbreEmpreintes.depuis_base().racine)
+    print(f"\nBase complète : {os.path.getsize('universites_facultes.db'):>12,} octets")
+    print(f"Empreintes    : {os.path.getsize('empreintes.bin'):>12,} octets ({duree_empreintes:.2f} s)")
+    print(f"Patch         : {resume_patch['taille']:>12,} octets ({duree_patch:.2f} s), "
+          f"{resume_patch['universites']} université(s) dans {resume_patch['seaux']} seau(x)")
+    print(f"Application   : {duree_application:.2f} s, {resume['creees']} créée(s), {resume['modifiees']} modifiée(s), "
+          f"{resume['supprimees']} supprimée(s) (dont un changement de code et un échange de noms)")
+    print(f"Satellite identique au poste central : {'oui' if identiques else 'NON'}")
+
+    return 0 if identiques else 1
+
+
+def banc_plans(args):
+    """Plans d'exécution des fonctions de database.py sur une base de grande taille"""
+    database = preparer_base_temporaire(args.universites, args.facultes)
+    import diagnostics
+    import historique
+
+    # Deux périodes d'historique : les requêtes de historique.py portent sur une vraie table
+    with open(os.devnull, "w") as nulle, contextlib.redirect_stdout(nulle):
+        for periode in (2024, 2025):
+            historique.enregistrer_effectifs(periode)
+
+    regressions = dict(diagnostics.verifier_fonctions(database, args.seuil))
+    for nom, _, _ in diagnostics.VERIFICATIONS:
+        print(f"   {nom:<45} {'PARCOURS COMPLET' if nom in regressions else 'OK'}")
+    for nom, message in regressions.items():
+        print(f"\n{nom} :\n{message}")
+
+    return 1 if regressions else 0
+
+
+def banc_memoire(args):
+    """
+    Endurance de l'interface : actions enchaînées dans la fenêtre principale (sans affichage)
+
+    Après une chauffe (caches de requêtes compilées, de noms...), la mémoire allouée
+    par Python ne doit plus croître : au-delà de la tolérance, le code de sortie est 1.
+    """
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    database = preparer_base_temporaire(args.universites, args.facultes)
+    from memoire import SuiviMemoire
+    suivi = SuiviMemoire()
+
+    from PySide6.QtWidgets import QApplication
+    import main
+    application = QApplication.instance() or QApplication([])
+    fenetre = main.Application(suivi)
+    combo = fenetre.ui.comboBox_universites
+    aleatoire = random.Random(0)
+
+    def action(numero):
+        # Surtout des changements d'université, parfois un rechargement complet des listes
+        if numero % 100 == 99:
+            fenetre.charger_universites()
+        else:
+            combo.setCurrentIndex(aleatoire.randrange(combo.count()))
+            fenetre.appliquer_selection_en_attente()
+        application.processEvents()
+
+    chauffe = min(args.chauffe, args.actions)
+    for numero in range(chauffe):
+        action(numero)
+    suivi.definir_reference(f"après {chauffe} actions")
+
+    debut = time.perf_counter()
+    for numero in range(chauffe, args.actions):
+        action(numero)
+        if (numero + 1) % args.intervalle == 0:
+            mesure = suivi.mesurer(f"{numero + 1} actions")
+            objets = sum(mesure["objets"].values())
+            print(f"   {numero + 1:>7} actions : {mesure['actuelle'] / 1024:>8.0f} Ko, "
+                  f"{objets} objet(s) ORM, {mesure['sondes']['resultats_lignes']} ligne(s) de résultats")
+    print(f"{args.actions - chauffe} actions en {time.perf_counter() - debut:.1f} s")
+
+    croissance = suivi.croissance() / 1024
+    chemin = suivi.ecrire_rapport(os.path.join(os.getcwd(), "rapport_memoire.txt"))
+    print(f"Croissance après la chauffe : {croissance:.0f} Ko (tolérance {args.tolerance} Ko), rapport : {chemin}")
+    database.session.close()
+    return 1 if croissance > args.tolerance else 0
+
+
+def banc_graphe(args):
+    """Universités et facultés : une requête par université contre obtenir_catalogue"""
+    database = preparer_base_temporaire(args.universites, args.facultes)
+    from sqlalchemy import event
+
+    nb_requetes = [0]
+    event.listen(database.engine, "before_cursor_execute", lambda *_: nb_requetes.__setitem__(0, nb_requetes[0] + 1))
+
+    def requete_par_universite():
+        return [(universite, database.obtenir_facultes_par_universite(universite.id))
+                for universite in database.obtenir_universites()]
+
+    variantes = [("une requête par université", requete_par_universite)] + [
+        (f"obtenir_catalogue({strategie})", lambda strategie=strategie: database.obtenir_catalogue(strategie))
+        for strategie in database.STRATEGIES_CATALOGUE]
+
+    for libelle, fonction in variantes:
+        durees = []
+        for _ in range(args.repetitions):
+            # Session vide à chaque mesure : tout est relu en base
+            database.session.expunge_all()
+            nb_requetes[0] = 0
+            debut = time.perf_counter()
+            fonction()
+            durees.append((time.perf_counter() - debut) * 1000)
+        print(f"   {libelle:<35} {statistics.median(durees):>9.1f} ms  {nb_requetes[0]:>6} requête(s)")
+    return 0
+
+
+def banc_depot(args):
+    """
+    Conformité des dépôts (depot.CONFORMITE), écriture différée comprise, puis
+    lectures de l'interface sur la base SQLite et sur sa copie en mémoire
+    """
+    database = preparer_base_temporaire(0, 0)
+    import depot
+    import doublons
+    import ecriture_differee
+    from sqlalchemy import delete
+
+    def depot_sqlite_vide():
+        database.session.rollback()
+        database.session.execute(delete(database.Faculte))
+        database.session.execute(delete(database.Universite))
+        database.session.commit()
+        database.session.expunge_all()
+        # Identifiants réutilisés par SQLite une fois la table vidée : index à refaire
+        doublons.reinitialiser_index_universites()
+        return depot.DepotSQLAlchemy()
+
+    differes = []
+
+    def depot_differe_vide():
+        # Le dépôt précédent écrit sa file et s'arrête avant que la base soit vidée
+        if differes:
+            differes.pop().fermer()
+        depot_sqlite_vide()
+        differes.append(ecriture_differee.DepotDiffere(os.path.join(os.getcwd(), "ecritures.jsonl")))
+        return differes[-1]
+
+    echecs = 0
+    with open(os.devnull, "w") as nulle, contextlib.redirect_stdout(nulle):
+        resultats = [(nom, depot.verifier_conformite(fabrique)) for nom, fabrique in
+                     (("DepotSQLAlchemy", depot_sqlite_vide), ("DepotMemoire", depot.DepotMemoire),
+                      ("DepotDiffere", depot_differe_vide))]
+        for differe in differes:
+            differe.fermer()
+    for nom, erreurs in resultats:
+        print(f"{nom} : {len(depot.CONFORMITE) - len(erreurs)}/{len(depot.CONFORMITE)} vérification(s) réussie(s)")
+        for verification, message in erreurs:
+            print(f"   ÉCHEC {verification} : {message}")
+        echecs += len(erreurs)
+
+    depot_sqlite_vide()
+    import synthetique
+    nb_facultes = synthetique.remplir_base(database.engine, args.universites, args.facultes)
+    print(f"\nBase synthétique : {args.universites} universités, {nb_facultes} facultés")
+    debut = time.perf_counter()
+    depots = [("DepotSQLAlchemy", depot.DepotSQLAlchemy()),
+              ("DepotMemoire", depot.DepotMemoire.depuis_catalogue(
+                  database.obtenir_catalogue(database.CHARGEMENT_LIGNES)))]
+    print(f"Copie en mémoire : {time.perf_counter() - debut:.1f} s")
+
+    aleatoire = random.Random(0)
+    codes = [universite.code_universite for universite in depots[0][1].universites()]
+    tirages = [aleatoire.choice(codes) for _ in range(args.repetitions)]
+    for nom, depot_mesure in depots:
+        print(f"\n{nom} :")
+        iterateur = iter(tirages * 2)
+        afficher_mesures("universites()", mesurer(depot_mesure.universites, 3))
+        afficher_mesures("facultes_par_code_universite()",
+                         mesurer(lambda: depot_mesure.facultes_par_code_universite(next(iterateur)), args.repetitions))
+        afficher_mesures("universite_existante()",
+                         mesurer(lambda: depot_mesure.universite_existante("", next(iterateur)), args.repetitions))
+        afficher_mesures("statistiques()", mesurer(depot_mesure.statistiques, args.repetitions))
+    return 1 if echecs else 0
+
+
+def banc_lots(args):
+    """
+    Opérations sur plusieurs facultés : une transaction par ligne (ancienne suppression
+    depuis la fenêtre principale) contre une transaction par lot (fenêtre des lots)
+    """
+    database = preparer_base_temporaire(args.universites, args.facultes)
+    from sqlalchemy import event, select
+    import depot
+
+    nb_requetes = [0]
+    event.listen(database.engine, "before_cursor_execute", lambda *_: nb_requetes.__setitem__(0, nb_requetes[0] + 1))
+    depot_sqlite = depot.DepotSQLAlchemy()
+    aleatoire = random.Random(0)
+    tous = database.session.scalars(select(database.Faculte.id)).all()
+    lots = [aleatoire.sample(tous, args.lignes) for _ in range(3)]
+
+    def par_ligne_effectifs():
+        for identifiant in lots[0]:
+            database.session.get(database.Faculte, identifiant).nombre_etudiants += 1
+            database.session.commit()
+
+    def par_ligne_suppressions():
+        for identifiant in lots[1]:
+            depot_sqlite.supprimer_faculte(identifiant)
+
+    variantes = [
+        ("effectifs, une transaction par ligne", par_ligne_effectifs),
+        ("effectifs, un lot", lambda: depot_sqlite.modifier_nombre_etudiants(lots[0], ecart=1)),
+        ("suppressions, une transaction par ligne", par_ligne_suppressions),
+        ("suppressions, un lot", lambda: depot_sqlite.supprimer_facultes(lots[2])),
+    ]
+    print(f"{args.lignes} faculté(s) par opération :")
+    for libelle, fonction in variantes:
+        database.session.expunge_all()
+        nb_requetes[0] = 0
+        debut = time.perf_counter()
+        fonction()
+        print(f"   {libelle:<42} {(time.perf_counter() - debut) * 1000:>9.1f} ms  {nb_requetes[0]:>6} requête(s)")
+    return 0
+
+
+def banc_classements(args):
+    """
+    Plus grandes facultés : chargement de toutes les facultés université par université
+    (obtenir_facultes_par_universite) contre la lecture de l'index des effectifs
+    """
+    database = preparer_base_temporaire(args.universites, args.facultes)
+    import heapq
+
+    def par_universite():
+        facultes = (faculte for universite in database.obtenir_universites()
+                    for faculte in database.obtenir_facultes_par_universite(universite.id))
+        resultat = heapq.nlargest(args.limite, facultes, key=lambda faculte: (faculte.nombre_etudiants, faculte.id))
+        database.session.expunge_all()
+        return resultat
+
+    attendu = [faculte.id for faculte in par_universite()]
+    identiques = [faculte.id for faculte in database.obtenir_classement_facultes(args.limite)] == attendu
+
+    aleatoire = random.Random(0)
+    ville = aleatoire.choice(database.obtenir_universites()).ville
+    database.session.expunge_all()
+    nb_facultes = database.obtenir_statistiques()["facultes"]
+    print(f"Top {args.limite} parmi {nb_facultes} facultés :")
+    afficher_mesures("chargement université par université", mesurer(par_universite, 1))
+    afficher_mesures("tout le catalogue", mesurer(lambda: database.obtenir_classement_facultes(args.limite),
+                                                  args.repetitions))
+    afficher_mesures("un code de faculté (MED)", mesurer(
+        lambda: database.obtenir_classement_facultes(args.limite, code_faculte="MED"), args.repetitions))
+    afficher_mesures(f"une ville ({ville})", mesurer(
+        lambda: database.obtenir_classement_facultes(args.limite, ville=ville), args.repetitions))
+    afficher_mesures("rang d'une faculté", mesurer(
+        lambda: database.obtenir_rang_faculte(aleatoire.randint(1, nb_facultes)), args.repetitions))
+    afficher_mesures("quartiles des effectifs", mesurer(database.obtenir_tranches_effectifs, 5))
+    print(f"Même classement : {'oui' if identiques else 'NON'}")
+    return 0 if identiques else 1
+
+
+def banc_federation(args):
+    """
+    Statistiques et liste des universités de plusieurs fichiers régionaux : ouverture de
+    chaque fichier et fusion en Python contre une fédération (ATTACH + UNION ALL)
+    """
+    preparer_base_temporaire(0, 0)
+    import heapq
+    import federation
+    import gabarits
+    from sqlalchemy import create_engine, text
+
+    chemins = []
+    for numero in range(args.fichiers):
+        dossier = os.path.join(os.getcwd(), f"region_{numero}")
+        os.makedirs(dossier)
+        engine_region = gabarits.cloner((args.universites, args.facultes, False), en_memoire=False, dossier=dossier)
+        chemins.append(engine_region.url.database)
+        engine_region.dispose()
+    print(f"{args.fichiers} fichier(s) de {args.universites} universités et "
+          f"{args.universites * args.facultes} facultés")
+
+    def statistiques_par_fichier():
+        totaux = {"universites": 0, "facultes": 0, "etudiants": 0}
+        for chemin in chemins:
+            engine_region = create_engine(f"sqlite:///{chemin}")
+            with engine_region.connect() as connexion:
+                totaux["universites"] += connexion.execute(text("SELECT count(*) FROM universites")).scalar()
+                nb_facultes, etudiants = connexion.execute(
+                    text("SELECT count(*), coalesce(sum(nombre_etudiants), 0) FROM facultes")).one()
+                totaux["facultes"] += nb_facultes
+                totaux["etudiants"] += etudiants
+            engine_region.dispose()
+        return totaux
+
+    def universites_par_fichier():
+        listes = []
+        for chemin in chemins:
+            engine_region = create_engine(f"sqlite:///{chemin}")
+            with engine_region.connect() as connexion:
+                listes.append(connexion.execute(text(
+                    "SELECT u.nom, u.id, v.nom FROM universites AS u JOIN villes AS v ON v.id = u.ville_id "
+                    "ORDER BY u.nom")).all())
+            engine_region.dispose()
+        return list(heapq.merge(*listes))
+
+    debut = time.perf_counter()
+    federes = federation.Federation(chemins, preparer=False)
+    print(f"Fédération ouverte en {(time.perf_counter() - debut) * 1000:.1f} ms")
+
+    attendu = statistiques_par_fichier()
+    obtenu = federes.obtenir_statistiques()
+    identiques = all(obtenu[cle] == attendu[cle] for cle in attendu)
+    identiques &= len(federes.obtenir_universites()) == len(universites_par_fichier())
+
+    afficher_mesures("statistiques, fichier par fichier", mesurer(statistiques_par_fichier, args.repetitions))
+    afficher_mesures("statistiques, fédération", mesurer(federes.obtenir_statistiques, args.repetitions))
+    afficher_mesures("universités, fusion en Python", mesurer(universites_par_fichier, 3))
+    afficher_mesures("universités, fédération", mesurer(federes.obtenir_universites, 3))
+    aleatoire = random.Random(0)
+    sources = list(federes.sources)
+    afficher_mesures("facultés d'une université, fédération", mesurer(
+        lambda: federes.obtenir_facultes_par_universite(aleatoire.randint(1, args.universites),
+                                                        aleatoire.choice(sources)), args.repetitions))
+    federes.fermer()
+    print(f"Mêmes résultats : {'oui' if identiques else 'NON'}")
+    return 0 if identiques else 1
+
+
+def banc_sauvegarde(args):
+    """
+    Instantanés à chaud pendant qu'une autre connexion écrit : copie par étapes
+    (sauvegarde.PAGES_PAR_ETAPE) contre copie en une seule étape. Mesure le débit de
+    la copie et l'attente la plus longue d'une écriture (execute + commit).
+    """
+    database = preparer_base_temporaire(args.universites, args.facultes)
+    import sqlite3
+    import threading
+    import sauvegarde
+
+    base = sauvegarde.chemin_base()
+    nb_facultes = database.obtenir_statistiques()["facultes"]
+    database.engine.dispose()
+    print(f"Base : {os.path.getsize(base) / 1e6:.1f} Mo, une écriture toutes les {args.intervalle_ms} ms")
+
+    def ecrire(arret, attentes):
+        """Petites transactions de l'application, chacune chronométrée"""
+        aleatoire = random.Random(0)
+        with contextlib.closing(sqlite3.connect(base, timeout=60)) as connexion:
+            while not arret.is_set():
+                debut = time.perf_counter()
+                connexion.execute("UPDATE facultes SET nombre_etudiants = nombre_etudiants + 1 WHERE id = ?",
+                                  (aleatoire.randint(1, max(nb_facultes, 1)),))
+                connexion.commit()
+                attentes.append((time.perf_counter() - debut) * 1000)
+                time.sleep(args.intervalle_ms / 1000)
+
+    def pendant_les_ecritures(fonction):
+        arret, attentes = threading.Event(), []
+        ecrivain = threading.Thread(target=ecrire, args=(arret, attentes))
+        ecrivain.start()
+        time.sleep(0.2)
+        attentes.clear()
+        try:
+            resultat = fonction()
+        finally:
+            arret.set()
+            ecrivain.join()
+        return resultat, attentes
+
+    def resume_ecritures(attentes):
+        if not attentes:
+            return "aucune écriture"
+        return (f"écritures : médiane {statistics.median(attentes):7.2f} ms   max {max(attentes):8.2f} ms   "
+                f"({len(attentes)})")
+
+    _, attentes = pendant_les_ecritures(lambda: time.sleep(1))
+    print(f"   {'sans sauvegarde':<24} {resume_ecritures(attentes)}")
+
+    echecs = 0
+    copie = os.path.join(os.getcwd(), "instantane.db")
+    for libelle, pages in ((f"par étapes de {sauvegarde.PAGES_PAR_ETAPE} pages", sauvegarde.PAGES_PAR_ETAPE),
+                           ("en une seule étape", -1)):
+        if os.path.exists(copie):
+            os.remove(copie)
+        def copier():
+            debut = time.perf_counter()
+            return sauvegarde.copier_a_chaud(base, copie, pages), time.perf_counter() - debut
+
+        (suivi, duree), attentes = pendant_les_ecritures(copier)
+        try:
+            sauvegarde.verifier_integrite(copie)
+            verification = "intégrité vérifiée"
+        except sauvegarde.SauvegardeInvalide as e:
+            verification = f"INSTANTANÉ INVALIDE : {e}"
+            echecs += 1
+        print(f"   {libelle:<24} {resume_ecritures(attentes)}")
+        print(f"   {'':<24} copie : {os.path.getsize(copie) / 1e6 / duree:6.0f} Mo/s en {duree:.2f} s, "
+              f"{suivi['etapes']} étape(s), {suivi['reprises']} reprise(s)"
+              + (", reste copié d'un coup" if suivi["bloc_final"] else "") + f" ; {verification}")
+    return 1 if echecs else 0
+
+
+def banc_ecritures(args):
+    """
+    Ajouts et suppressions de l'interface : écriture immédiate (DepotSQLAlchemy) contre
+    écriture différée (ecriture_differee.DepotDiffere). Mesure l'attente de chaque clic
+    et le temps d'écriture de la file, compare les états finaux, puis vérifie la reprise
+    du journal après un arrêt brutal (un processus qui s'interrompt avec os._exit).
+    """
+    database = preparer_base_temporaire(args.universites, args.facultes)
+    import subprocess
+    import depot
+    import ecriture_differee
+
+    base = os.path.abspath(database.engine.url.database)
+    journal = os.path.join(os.getcwd(), "ecritures.jsonl")
+    codes_existants = [universite.code_universite for universite in depot.DepotSQLAlchemy().universites()]
+    existantes = random.Random(0).sample(codes_existants, min(args.ajouts, len(codes_existants)))
+
+    def sequence(depot_mesure, prefixe):
+        """Clics d'une session de saisie ; retourne l'attente de chacun en millisecondes"""
+        attentes = []
+
+        def clic(fonction, *arguments):
+            debut = time.perf_counter()
+            resultat = fonction(*arguments)
+            attentes.append((time.perf_counter() - debut) * 1000)
+            return resultat
+
+        ajoutees = []
+        for i in range(args.ajouts):
+            universite = clic(depot_mesure.ajouter_universite, f"{prefixe} Université {i}", "Ville", f"{prefixe}{i}", 2000)
+            facultes = [clic(depot_mesure.ajouter_faculte, f"Faculté {j}", f"F{j}", 100 + j, universite.id)
+                        for j in range(args.facultes_ajoutees)]
+            clic(depot_mesure.supprimer_faculte, facultes[0].id)
+            ajoutees.append(universite)
+        for i, code in enumerate(existantes):
+            universite_id = depot_mesure.universite_existante("", code).id
+            faculte = clic(depot_mesure.ajouter_faculte, f"{prefixe} Faculté {i}", f"{prefixe}F{i}", i, universite_id)
+            if i % 2:
+                clic(depot_mesure.supprimer_faculte, faculte.id)
+        clic(depot_mesure.supprimer_universite, ajoutees[-1].id)
+        return attentes
+
+    def etat(prefixe):
+        """Universités et facultés écrites par une séquence, sans son préfixe"""
+        lecture = depot.DepotSQLAlchemy()
+        database.session.expire_all()
+        universites = [(universite.nom.replace(prefixe, ""), universite.ville, universite.code_universite[len(prefixe):],
+                        universite.annee_fondation, universite.nb_facultes, universite.total_etudiants,
+                        sorted((faculte.nom, faculte.code_faculte, faculte.nombre_etudiants)
+                               for faculte in lecture.facultes_par_universite(universite.id)))
+                       for universite in lecture.universites() if universite.code_universite.startswith(prefixe)]
+        facultes = [(code, faculte.nom.replace(prefixe, ""), faculte.code_faculte.replace(prefixe, ""),
+                     faculte.nombre_etudiants)
+                    for code in existantes for faculte in lecture.facultes_par_code_universite(code)
+                    if faculte.nom.startswith(prefixe)]
+        return sorted(universites), sorted(facultes)
+
+    echecs = 0
+    with open(os.devnull, "w") as nulle, contextlib.redirect_stdout(nulle):
+        attentes_immediates = sequence(depot.DepotSQLAlchemy(), "I")
+        differe = ecriture_differee.DepotDiffere(journal)
+        attentes_differees = sequence(differe, "D")
+        en_attente = differe.en_attente()
+        debut = time.perf_counter()
+        differe.vider()
+        duree_vidage = (time.perf_counter() - debut) * 1000
+        differe.fermer()
+    print(f"{len(attentes_immediates)} clic(s) (ajouts et suppressions) :")
+    afficher_mesures("écriture immédiate, attente par clic", attentes_immediates)
+    afficher_mesures("écriture différée, attente par clic", attentes_differees)
+    print(f"   {en_attente} écriture(s) en file écrite(s) en {duree_vidage:.1f} ms, "
+          f"{differe.lots_ecrits} lot(s), {differe.ecritures_refusees} refusée(s)")
+    if etat("I") == etat("D") and etat("D")[0]:
+        print("   États finaux identiques")
+    else:
+        print("   ÉCHEC : les états finaux diffèrent")
+        echecs += 1
+
+    # Arrêt brutal : les écritures journalisées mais pas encore écrites sont reprises
+    script = (
+        "import os, sys\n"
+        f"sys.path.insert(0, {os.path.dirname(os.path.abspath(__file__))!r})\n"
+        "from sqlalchemy import create_engine\n"
+        "import database, ecriture_differee\n"
+        f"database.utiliser_engine(create_engine({'sqlite:///' + base!r}), preparer=False)\n"
+        f"depot = ecriture_differee.DepotDiffere({journal!r}, delai=3600)\n"
+        f"for i in range({args.ajouts}):\n"
+        "    universite = depot.ajouter_universite(f'A Université {i}', 'Ville', f'A{i}', 2000)\n"
+        f"    for j in range({args.facultes_ajoutees}):\n"
+        "        depot.ajouter_faculte(f'Faculté {j}', f'F{j}', 100 + j, universite.id)\n"
+        "os._exit(0)\n"
+    )
+    database.engine.dispose()
+    subprocess.run([sys.executable, "-c", script], check=True, stdout=subprocess.DEVNULL)
+    # Arrêt pendant l'ajout d'une ligne au journal
+    with open(journal, "a", encoding="utf-8") as fichier:
+        fichier.write('{"operation": "ajouter_univ')
+    copie_journal = journal + ".copie"
+    shutil.copyfile(journal, copie_journal)
+    attendu = (args.ajouts, args.ajouts * args.facultes_ajoutees)
+
+    def compter():
+        universites = [universite for universite in depot.DepotSQLAlchemy().universites()
+                       if universite.code_universite.startswith("A")
+                       and universite.nom.startswith("A Université")]
+        return len(universites), sum(universite.nb_facultes for universite in universites)
+
+    # Deux reprises du même journal : la seconde trouve tout déjà écrit (rejeu idempotent)
+    for libelle in ("reprise du journal", "seconde reprise (déjà écrite)"):
+        with open(os.devnull, "w") as nulle, contextlib.redirect_stdout(nulle):
+            reprise = ecriture_differee.DepotDiffere(journal)
+            reprises = reprise.en_attente()
+            reprise.vider()
+            reprise.fermer()
+        database.session.expire_all()
+        obtenu = compter()
+        conforme = obtenu == attendu and not os.path.exists(journal) and not reprise.ecritures_refusees
+        print(f"   {libelle} : {reprises} écriture(s), {obtenu[0]} université(s) et {obtenu[1]} faculté(s) "
+              f"(attendu {attendu[0]} et {attendu[1]}) {'' if conforme else ' ÉCHEC'}".rstrip())
+        echecs += not conforme
+        shutil.copyfile(copie_journal, journal)
+    os.remove(journal)
+    return 1 if echecs else 0
+
+
+def banc_partage(args):
+    """
+    Processus lecteurs d'un même poste : chacun charge le catalogue dans sa session
+    (DepotSQLAlchemy) contre lecture du catalogue partagé (catalogue_partage.DepotPartage).
+    Mesure le démarrage (liste des universités, puis facultés de quelques universités)
+    et la mémoire propre de chaque processus ; vérifie que les deux dépôts rendent
+    les mêmes données.
+    """
+    database = preparer_base_temporaire(args.universites, args.facultes)
+    import json
+    import subprocess
+    import catalogue_partage
+    import depot
+
+    publication = catalogue_partage.PublicationCatalogue()
+    print(catalogue_partage.resume_publication(publication.publier()))
+
+    # Mêmes données des deux côtés (universités, facultés d'un échantillon, recherches par code)
+    def cle_universite(universite):
+        return (universite.id, universite.nom, universite.ville, universite.code_universite,
+                universite.annee_fondation, universite.nb_facultes, universite.total_etudiants)
+
+    def cle_faculte(faculte):
+        return faculte.id, faculte.nom, faculte.code_faculte, faculte.nombre_etudiants, faculte.universite_id
+
+    partage, base = catalogue_partage.DepotPartage(), depot.DepotSQLAlchemy()
+    universites = base.universites()
+    echantillon = random.Random(0).sample(universites, min(args.lectures, len(universites)))
+    identiques = ([cle_universite(u) for u in partage.universites()] == [cle_universite(u) for u in universites]
+                  and all([cle_faculte(f) for f in partage.facultes_par_universite(u.id)]
+                          == [cle_faculte(f) for f in base.facultes_par_universite(u.id)]
+                          and [cle_faculte(f) for f in partage.facultes_par_code_universite(u.code_universite)]
+                          == [cle_faculte(f) for f in base.facultes_par_code_universite(u.code_universite)]
+                          for u in echantillon))
+    print(f"   Lectures identiques à la base : {'oui' if identiques else 'NON'} "
+          f"({partage.lectures_partagees} lecture(s) partagée(s), {partage.lectures_base} dans la base)")
+    database.session.expunge_all()
+
+    script = (
+        "import json, os, sys, time\n"
+        f"sys.path.insert(0, {os.path.dirname(os.path.abspath(__file__))!r})\n"
+        "os.environ['BANQUE_ECHO_SQL'] = '0'\n"
+        "from sqlalchemy import create_engine\n"
+        "import database, depot, catalogue_partage\n"
+        f"database.utiliser_engine(create_engine({'sqlite:///' + os.path.abspath(database.engine.url.database)!r}),"
+        " preparer=False)\n"
+        "debut = time.perf_counter()\n"
+        "lecteurs = {'base': depot.DepotSQLAlchemy, 'partage': catalogue_partage.DepotPartage}\n"
+        "lecteur = lecteurs[sys.argv[1]]() if sys.argv[1] in lecteurs else depot.DepotMemoire()\n"
+        "universites = lecteur.universites()\n"
+        "noms = [universite.nom for universite in universites]\n"
+        "liste = time.perf_counter() - debut\n"
+        f"for universite in universites[::max(1, len(universites) // {args.lectures})]:\n"
+        "    [faculte.nom for faculte in lecteur.facultes_par_universite(universite.id)]\n"
+        "memoire = {}\n"
+        "if os.path.exists('/proc/self/status'):\n"
+        "    for ligne in open('/proc/self/status'):\n"
+        "        cle, _, valeur = ligne.partition(':')\n"
+        "        if cle in ('VmRSS', 'RssAnon', 'RssShmem'):\n"
+        "            memoire[cle] = int(valeur.split()[0]) / 1024\n"
+        "else:\n"
+        "    import resource\n"
+        "    memoire['VmRSS'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024\n"
+        "print(json.dumps({'liste': liste, 'total': time.perf_counter() - debut, 'memoire': memoire}))\n"
+    )
+    print(f"{args.processus} processus lecteurs simultanés, {args.lectures} universités ouvertes chacun :")
+    for libelle, mode in (("sans catalogue (référence)", "aucun"), ("session de chaque processus", "base"),
+                          ("catalogue partagé", "partage")):
+        processus = [subprocess.Popen([sys.executable, "-c", script, mode], stdout=subprocess.PIPE, text=True)
+                     for _ in range(args.processus)]
+        mesures = [json.loads(p.communicate()[0]) for p in processus]
+        memoires = [mesure["memoire"] for mesure in mesures]
+        privee = [memoire.get("RssAnon", memoire["VmRSS"]) for memoire in memoires]
+        print(f"   {libelle:<28} liste {statistics.median(m['liste'] for m in mesures) * 1000:8.1f} ms   "
+              f"total {statistics.median(m['total'] for m in mesures) * 1000:8.1f} ms   "
+              f"mémoire propre {statistics.median(privee):7.1f} Mo"
+              + (f"   partagée {statistics.median(m.get('RssShmem', 0) for m in memoires):6.1f} Mo"
+                 if "RssShmem" in memoires[0] else ""))
+    publication.fermer()
+    return 0 if identiques else 1
+
+
+def _fenetre_sans_affichage(depot=None):
+    """
+    Fenêtre principale sur la plateforme Qt offscreen (avec ce dépôt, par défaut DepotSQLAlchemy)
+
+    Les boîtes de dialogue modales bloqueraient le script : elles répondent Oui
+    immédiatement.
+    """
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PySide6.QtWidgets import QApplication, QMessageBox
+    import main
+
+    def repondre_oui(*args, **kwargs):
+        return QMessageBox.StandardButton.Yes
+
+    for nom in ("question", "information", "warning", "critical"):
+        setattr(QMessageBox, nom, staticmethod(repondre_oui))
+
+    application = QApplication.instance() or QApplication([])
+    fenetre = main.Application(depot=depot)
+    fenetre.show()
+    application.processEvents()
+    return application, fenetre
+
+
+def banc_interface(args):
+    """
+    Séquences d'actions à la manière de lancer_demonstration, rejouées dans la fenêtre
+    principale sans affichage : statistiques, sélection, ajout puis suppression d'une faculté
+
+    Chaque action est mesurée par instrumentation (traitement, SQL, délai d'affichage).
+    """
+    preparer_base_temporaire(args.universites, args.facultes)
+    from instrumentation import compteur_requetes
+    application, fenetre = _fenetre_sans_affichage()
+    ui = fenetre.ui
+    aleatoire = random.Random(0)
+
+    def selectionner(combo, index):
+        combo.setCurrentIndex(index)
+        fenetre.appliquer_selection_en_attente()
+        application.processEvents()
+
+    def agir(action):
+        # Les impressions (afficher_toutes_les_donnees...) sont calculées mais pas affichées
+        with open(os.devnull, "w") as nulle, contextlib.redirect_stdout(nulle):
+            action()
+        application.processEvents()
+
+    debut = time.perf_counter()
+    for sequence in range(args.sequences):
+        agir(fenetre.voir_statistiques)
+
+        index_universite = aleatoire.randrange(1, ui.comboBox_universites.count())
+        selectionner(ui.comboBox_universites, index_universite)
+        if ui.comboBox_facultes.count() > 1:
+            ui.comboBox_facultes.setCurrentIndex(1)
+            agir(fenetre.afficher_selection)
+
+        nom, code = f"Faculté Du Banc {sequence}", f"BANC{sequence}"
+        ui.lineEdit_nom_faculte.setText(nom)
+        ui.lineEdit_code_faculte.setText(code)
+        ui.lineEditl_nbEtudiants_faculte.setText("100")
+        ui.comboBox_universite_faculte.setCurrentIndex(index_universite)
+        agir(fenetre.ajouter_nouvelle_faculte)
+
+        index_faculte = ui.comboBox_facultes.findText(f"{nom} ({code})")
+        if index_faculte >= 0:
+            ui.comboBox_facultes.setCurrentIndex(index_faculte)
+            agir(fenetre.supprimer_selection)
+    print(f"{args.sequences} séquence(s) en {time.perf_counter() - debut:.1f} s\n")
+
+    for ligne in compteur_requetes.resume_latences():
+        print(f"   {ligne}")
+    chemin = compteur_requetes.exporter_json(args.json or os.path.join(os.getcwd(), "latences.json"))
+    print(f"\nHistogrammes : {chemin}")
+    fenetre.close()
+    return 0
+
+
+def banc_rejeu(args):
+    """
+    Enregistre une session de la fenêtre principale (traces.py) : rafales de changements
+    d'université, d'ajouts puis de suppressions de facultés, statistiques. La rejoue
+    ensuite sur des copies neuves de la base de départ : telle quelle, avec des PRAGMA
+    de cache, avec la réplique en mémoire et par plusieurs clients simultanés.
+    """
+    database = preparer_base_temporaire(args.universites, args.facultes)
+    import depot
+    import sauvegarde
+    import traces
+
+    # Base de départ des rejeux : la session enregistrée la modifie
+    origine = os.path.join(os.getcwd(), "origine.db")
+    sauvegarde.copier_a_chaud(database.engine.url.database, origine)
+
+    chemin = os.path.join(os.getcwd(), "session.trace.gz")
+    depot_enregistre = depot.DepotSQLAlchemy()
+    enregistreur = traces.EnregistreurTrace(chemin, depot_enregistre)
+    traces.enregistrer_appels(depot_enregistre, enregistreur)
+    application, fenetre = _fenetre_sans_affichage(depot_enregistre)
+    ui = fenetre.ui
+    aleatoire = random.Random(0)
+
+    def agir(action):
+        with open(os.devnull, "w") as nulle, contextlib.redirect_stdout(nulle):
+            action()
+        application.processEvents()
+
+    for rafale in range(args.rafales):
+        agir(fenetre.voir_statistiques)
+        # Défilement rapide dans la liste : seule la dernière université est chargée
+        for _ in range(args.changements):
+            ui.comboBox_universites.setCurrentIndex(aleatoire.randrange(1, ui.comboBox_universites.count()))
+            application.processEvents()
+        agir(fenetre.appliquer_selection_en_attente)
+
+        index_universite = ui.comboBox_universites.currentIndex()
+        ajoutees = []
+        for ajout in range(args.ajouts):
+            nom, code = f"Faculté Du Rejeu {rafale}-{ajout}", f"REJ{rafale}-{ajout}"
+            ui.lineEdit_nom_faculte.setText(nom)
+            ui.lineEdit_code_faculte.setText(code)
+            ui.lineEditl_nbEtudiants_faculte.setText(str(aleatoire.randrange(50, 5000)))
+            ui.comboBox_universite_faculte.setCurrentIndex(index_universite)
+            agir(fenetre.ajouter_nouvelle_faculte)
+            ajoutees.append(f"{nom} ({code})")
+        agir(fenetre.voir_statistiques)
+        for texte in ajoutees[::2]:
+            index_faculte = ui.comboBox_facultes.findText(texte)
+            if index_faculte >= 0:
+                ui.comboBox_facultes.setCurrentIndex(index_faculte)
+                agir(fenetre.supprimer_selection)
+    fenetre.close()
+    enregistreur.fermer()
+    database.session.close()
+    print("\n".join(traces.resume_trace(*traces.lire_trace(chemin))) + "\n")
+
+    configurations = (
+        ("Référence", {}),
+        ("PRAGMA cache et mmap", {"pragmas": ("cache_size=-65536", "mmap_size=268435456")}),
+        ("Réplique en mémoire", {"replique": True}),
+        (f"{args.clients} clients simultanés", {"clients": args.clients}),
+    )
+    conforme = True
+    for libelle, options in configurations:
+        rapport = traces.rejouer_trace(chemin, base=origine, vitesse=args.vitesse, **options)
+        lignes = traces.resume_rejeu(rapport)
+        print(f"{libelle} : {lignes[0]}")
+        for ligne in lignes[1:]:
+            print(f"   {ligne}")
+        # Un seul client doit retrouver exactement les résultats de l'enregistrement ;
+        # plusieurs clients voient aussi les ajouts des autres
+        if not options.get("clients"):
+            conforme = conforme and not rapport["erreurs"] and not rapport["ecarts"]
+    print(f"\nRejeu conforme à l'enregistrement : {'oui' if conforme else 'NON'}")
+    return 0 if conforme else 1
+
+
+def construire_parser():
+    parser = argparse.ArgumentParser(description="Bancs d'essai de performance")
+    sous_parsers = parser.add_subparsers(dest="banc", required=True)
+
+    parser_replique = sous_parsers.add_parser("replique", help="Fichier sur disque vs réplique en mémoire")
+    parser_replique.add_argument("--universites", type=int, default=2000)
+    parser_replique.add_argument("--facultes", type=int, default=20, help="Facultés par université")
+    parser_replique.add_argument("--repetitions", type=int, default=200)
+    parser_replique.add_argument("--ecritures", type=int, default=50, help="Ajouts suivis d'un rechargement")
+    parser_replique.set_defaults(fonction=banc_replique)
+
+    parser_requetes = sous_parsers.add_parser("requetes", help="Coût par appel des recherches mises en cache")
+    parser_requetes.add_argument("--universites", type=int, default=20)
+    parser_requetes.add_argument("--facultes", type=int, default=5, help="Facultés par université")
+    parser_requetes.add_argument("--appels", type=int, default=10000)
+    parser_requetes.set_defaults(fonction=banc_requetes)
+
+    parser_historique = sous_parsers.add_parser("historique", help="Requêtes sur l'historique des effectifs")
+    parser_historique.add_argument("--universites", type=int, default=5000)
+    parser_historique.add_argument("--facultes", type=int, default=20, help="Facultés par université")
+    parser_historique.add_argument("--annees", type=int, default=10)
+    parser_historique.add_argument("--repetitions", type=int, default=200)
+    parser_historique.set_defaults(fonction=banc_historique)
+
+    parser_doublons = sous_parsers.add_parser("doublons", help="Détection des quasi-doublons")
+    parser_doublons.add_argument("--universites", type=int, default=100000)
+    parser_doublons.add_argument("--facultes", type=int, default=10, help="Facultés par université")
+    parser_doublons.add_argument("--variantes", type=int, default=1000, help="Quasi-doublons injectés")
+    parser_doublons.add_argument("--recherches", type=int, default=2000)
+    parser_doublons.set_defaults(fonction=banc_doublons)
+
+    parser_sync = sous_parsers.add_parser("sync", help="Synchronisation d'un satellite par empreintes")
+    parser_sync.add_argument("--universites", type=int, default=50000)
+    parser_sync.add_argument("--facultes", type=int, default=20, help="Facultés par université")
+    parser_sync.add_argument("--changements", type=int, default=5, help="Universités modifiées sur le poste central")
+    parser_sync.set_defaults(fonction=banc_sync)
+
+    parser_plans = sous_parsers.add_parser("plans", help="Parcours complets dans les plans d'exécution")
+    parser_plans.add_argument("--universites", type=int, default=20000)
+    parser_plans.add_argument("--facultes", type=int, default=10, help="Facultés par université")
+    parser_plans.add_argument("--seuil", type=int, default=10000, help="Nombre de lignes d'une grande table")
+    parser_plans.set_defaults(fonction=banc_plans)
+
+    parser_memoire = sous_parsers.add_parser("memoire", help="Endurance de l'interface : croissance de la mémoire")
+    parser_memoire.add_argument("--universites", type=int, default=500)
+    parser_memoire.add_argument("--facultes", type=int, default=20, help="Facultés par université")
+    parser_memoire.add_argument("--actions", type=int, default=10000)
+    parser_memoire.add_argument("--chauffe", type=int, default=1000, help="Actions avant la mesure de référence")
+    parser_memoire.add_argument("--intervalle", type=int, default=1000, help="Actions entre deux mesures")
+    parser_memoire.add_argument("--tolerance", type=int, default=256, help="Croissance admise (Ko)")
+    parser_memoire.set_defaults(fonction=banc_memoire)
+
+    parser_graphe = sous_parsers.add_parser("graphe", help="Chargement des universités avec leurs facultés")
+    parser_graphe.add_argument("--universites", type=int, default=20000)
+    parser_graphe.add_argument("--facultes", type=int, default=20, help="Facultés par université")
+    parser_graphe.add_argument("--repetitions", type=int, default=3)
+    parser_graphe.set_defaults(fonction=banc_graphe)
+
+    parser_interface = sous_parsers.add_parser("interface", help="Latences des actions de la fenêtre principale")
+    parser_interface.add_argument("--universites", type=int, default=20000)
+    parser_interface.add_argument("--facultes", type=int, default=20, help="Facultés par université")
+    parser_interface.add_argument("--sequences", type=int, default=10, help="Séquences statistiques/sélection/ajout/suppression")
+    parser_interface.add_argument("--json", help="Fichier des histogrammes (défaut : latences.json dans le dossier temporaire)")
+    parser_interface.set_defaults(fonction=banc_interface)
+
+    parser_depot = sous_parsers.add_parser("depot", help="Conformité et lectures des dépôts SQLite et mémoire")
+    parser_depot.add_argument("--universites", type=int, default=20000)
+    parser_depot.add_argument("--facultes", type=int, default=20, help="Facultés par université")
+    parser_depot.add_argument("--repetitions", type=int, default=1000)
+    parser_depot.set_defaults(fonction=banc_depot)
+
+    parser_lots = sous_parsers.add_parser("lots", help="Opérations par ligne contre opérations par lot")
+    parser_lots.add_argument("--universites", type=int, default=20000)
+    parser_lots.add_argument("--facultes", type=int, default=20, help="Facultés par université")
+    parser_lots.add_argument("--lignes", type=int, default=500, help="Facultés touchées par opération")
+    parser_lots.set_defaults(fonction=banc_lots)
+
+    parser_classements = sous_parsers.add_parser("classements", help="Plus grandes facultés, rangs et tranches d'effectif")
+    parser_classements.add_argument("--universites", type=int, default=50000)
+    parser_classements.add_argument("--facultes", type=int, default=20, help="Facultés par université")
+    parser_classements.add_argument("--limite", type=int, default=100)
+    parser_classements.add_argument("--repetitions", type=int, default=50)
+    parser_classements.set_defaults(fonction=banc_classements)
+
+    parser_federation = sous_parsers.add_parser("federation", help="Fichiers régionaux : fusion en Python contre ATTACH")
+    parser_federation.add_argument("--fichiers", type=int, default=8)
+    parser_federation.add_argument("--universites", type=int, default=5000)
+    parser_federation.add_argument("--facultes", type=int, default=20, help="Facultés par université")
+    parser_federation.add_argument("--repetitions", type=int, default=20)
+    parser_federation.set_defaults(fonction=banc_federation)
+
+    parser_sauvegarde = sous_parsers.add_parser("sauvegarde", help="Instantanés à chaud : débit et attente des écritures")
+    parser_sauvegarde.add_argument("--universites", type=int, default=50000)
+    parser_sauvegarde.add_argument("--facultes", type=int, default=20, help="Facultés par université")
+    parser_sauvegarde.add_argument("--intervalle-ms", type=float, default=200, help="Pause entre deux écritures")
+    parser_sauvegarde.set_defaults(fonction=banc_sauvegarde)
+
+    parser_ecritures = sous_parsers.add_parser("ecritures", help="Écriture immédiate contre écriture différée")
+    parser_ecritures.add_argument("--universites", type=int, default=20000)
+    parser_ecritures.add_argument("--facultes", type=int, default=20, help="Facultés par université")
+    parser_ecritures.add_argument("--ajouts", type=int, default=20, help="Universités ajoutées par séquence")
+    parser_ecritures.add_argument("--facultes-ajoutees", type=int, default=10, help="Facultés par université ajoutée")
+    parser_ecritures.set_defaults(fonction=banc_ecritures)
+
+    parser_partage = sous_parsers.add_parser("partage", help="Processus lecteurs : sessions séparées contre catalogue partagé")
+    parser_partage.add_argument("--universites", type=int, default=20000)
+    parser_partage.add_argument("--facultes", type=int, default=20, help="Facultés par université")
+    parser_partage.add_argument("--processus", type=int, default=8, help="Processus lecteurs simultanés")
+    parser_partage.add_argument("--lectures", type=int, default=200, help="Universités ouvertes par processus")
+    parser_partage.set_defaults(fonction=banc_partage)
+
+    parser_rejeu = sous_parsers.add_parser("rejeu", help="Session de l'interface enregistrée puis rejouée")
+    parser_rejeu.add_argument("--universites", type=int, default=20000)
+    parser_rejeu.add_argument("--facultes", type=int, default=20, help="Facultés par université")
+    parser_rejeu.add_argument("--rafales", type=int, default=10, help="Rafales de la session enregistrée")
+    parser_rejeu.add_argument("--changements", type=int, default=15, help="Universités parcourues par rafale")
+    parser_rejeu.add_argument("--ajouts", type=int, default=5, help="Facultés ajoutées par rafale")
+    parser_rejeu.add_argument("--clients", type=int, default=4, help="Clients simultanés du dernier rejeu")
+    parser_rejeu.add_argument("--vitesse", type=float, default=0,
+                              help="1 : vitesse d'origine, 0 : au plus vite")
+    parser_rejeu.set_defaults(fonction=banc_rejeu)
+
+    return parser
+
+
+def main(argv=None):
+    args = construire_parser().parse_args(argv)
+    return args.fonction(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,553 @@
+# -*- coding: utf-8 -*-
+"""
+Catalogue en mémoire partagée pour les processus d'un même poste
+
+Sur un serveur de terminaux, chaque main.py (et chaque script) chargeait les mêmes
+universités et facultés dans sa propre session. Ici, un seul processus chargeur
+(`python cli.py partage servir`) publie le catalogue dans un segment de mémoire
+partagée (multiprocessing.shared_memory) ; les autres le lisent sans le copier.
+
+Contenu d'un segment (publication) :
+    - un en-tête : nombres d'universités, de facultés et de textes, compteur de
+      modifications du fichier au moment de la lecture ;
+    - des colonnes de largeur fixe (array) : identifiants, effectifs, position des
+      facultés de chaque université, index triés par identifiant et par code ;
+    - un réservoir de textes UTF-8 où chaque nom, ville ou code n'apparaît qu'une fois
+      (les colonnes n'en gardent que le numéro).
+
+Universités dans l'ordre de obtenir_universites (par nom), facultés regroupées par
+université et triées par nom : les listes de l'interface sont des tranches de colonnes.
+Les lectures rendent des vues (UniversitePartagee, FacultePartagee) qui ne décodent un
+texte du segment qu'au moment où on le lit.
+
+Version : un petit segment de contrôle porte le numéro de la publication courante ;
+chaque publication est un nouveau segment (nom_<version>), l'ancien est retiré une fois
+la version avancée. Fraîcheur : le compteur de modifications de l'en-tête du fichier
+SQLite (octets 24 à 27, avancé à chaque écriture validée, mode journal par défaut)
+est comparé à celui de la publication ; s'ils diffèrent, DepotPartage lit la base
+jusqu'à la publication suivante.
+"""
+
+import hashlib
+import os
+import struct
+import time
+from array import array
+from bisect import bisect_left
+from itertools import groupby
+from multiprocessing import shared_memory
+
+from sqlalchemy import create_engine, select
+
+import database
+from database import CodeFaculte, Faculte, FaculteCatalogue, NomFaculte, Universite, UniversiteCatalogue, Ville
+from depot import DepotSQLAlchemy
+
+# Vérification des changements du fichier par le chargeur (cli.py partage servir)
+INTERVALLE_DEFAUT_S = 2.0
+# Lectures du catalogue recommencées si la base change pendant la lecture
+MAX_ESSAIS_LECTURE = 5
+
+_CONTROLE = struct.Struct("<8sQ")
+_MAGIE_CONTROLE = b"BANQUECT"
+_EN_TETE = struct.Struct("<8sIIQIIIQ")
+_MAGIE_DONNEES = b"BANQUECA"
+_FORMAT = 1
+_SANS_ANNEE = -2 ** 31
+# Segments créés par ce processus (chargeur et lecteur dans le même processus)
+_CREES = set()
+# Descripteurs des fichiers dont on lit le compteur (voir compteur_modifications)
+_DESCRIPTEURS = {}
+
+# Colonnes d'une publication, dans l'ordre du segment : (nom, type array, longueur)
+# u : universités, f : facultés, t : textes du réservoir
+_COLONNES = (
+    ("u_id", "q", "u"),
+    ("u_annee", "i", "u"),
+    ("u_nb_facultes", "i", "u"),
+    ("u_total", "q", "u"),
+    ("u_nom", "I", "u"),
+    ("u_ville", "I", "u"),
+    ("u_code", "I", "u"),
+    ("u_premiere", "I", "u+1"),
+    ("u_ids_tries", "q", "u"),
+    ("u_positions", "I", "u"),
+    ("u_par_code", "I", "u"),
+    ("f_id", "q", "f"),
+    ("f_nombre", "i", "f"),
+    ("f_universite", "I", "f"),
+    ("f_nom", "I", "f"),
+    ("f_code", "I", "f"),
+    ("f_ids_tries", "q", "f"),
+    ("f_positions", "I", "f"),
+    ("t_debut", "I", "t+1"),
+)
+
+
+def nom_segment(base=None):
+    """Nom du segment de contrôle d'une base : un par fichier"""
+    chemin = os.path.abspath(base or database.engine.url.database)
+    return "banque_" + hashlib.sha1(chemin.encode("utf-8")).hexdigest()[:12]
+
+
+def compteur_modifications(base=None):
+    """
+    Compteur de modifications de l'en-tête du fichier SQLite
+
+    Sous POSIX, fermer un descripteur du fichier lève tous les verrous que SQLite y
+    tient dans ce processus (écriture en cours de la session comprise) : le descripteur
+    de chaque fichier reste donc ouvert. Un fichier remplacé (restauration) est rouvert,
+    l'ancien descripteur gardé pour la même raison.
+    """
+    chemin = os.path.abspath(base or database.engine.url.database)
+    if os.name != "posix":
+        with open(chemin, "rb") as fichier:
+            fichier.seek(24)
+            return int.from_bytes(fichier.read(4), "big")
+    descripteur = _DESCRIPTEURS.get(chemin)
+    if descripteur is None or os.fstat(descripteur).st_ino != os.stat(chemin).st_ino:
+        descripteur = _DESCRIPTEURS[chemin] = os.open(chemin, os.O_RDONLY)
+    return int.from_bytes(os.pread(descripteur, 4, 24), "big")
+
+
+def _attacher(nom):
+    """
+    Ouvre un segment existant sans le confier au resource_tracker
+
+    Avant Python 3.13, un processus qui ouvre un segment l'enregistre comme s'il l'avait
+    créé : le segment serait supprimé à sa sortie, sous les autres lecteurs.
+    """
+    try:
+        return shared_memory.SharedMemory(nom, track=False)
+    except TypeError:
+        segment = shared_memory.SharedMemory(nom)
+        if os.name == "posix" and nom not in _CREES:
+            from multiprocessing import resource_tracker
+            resource_tracker.unregister(segment._name, "shared_memory")
+        return segment
+
+
+def _creer(nom, taille):
+    segment = shared_memory.SharedMemory(nom, create=True, size=taille)
+    _CREES.add(nom)
+    return segment
+
+
+def _retirer(segment):
+    segment.close()
+    segment.unlink()
+    _CREES.discard(segment.name)
+
+
+def _disposition(nb_universites, nb_facultes, nb_textes):
+    """Position de chaque colonne et du réservoir de textes dans le segment"""
+    longueurs = {"u": nb_universites, "u+1": nb_universites + 1, "f": nb_facultes, "t+1": nb_textes + 1}
+    positions, position = {}, _EN_TETE.size
+    for nom, type_, longueur in _COLONNES:
+        position = (position + 7) // 8 * 8
+        positions[nom] = (position, type_, longueurs[longueur])
+        position += array(type_).itemsize * longueurs[longueur]
+    return positions, position
+
+
+# Catalogue d'un fichier quelconque, textes internés joints dans la requête : les caches
+# de database (VILLES, NOMS_FACULTES...) ne valent que pour la base de l'application
+_REQUETE_CATALOGUE = (
+    select(Universite.id, Universite.nom, Ville.nom, Universite.code_universite, Universite.annee_fondation,
+           Universite.nb_facultes, Universite.total_etudiants,
+           Faculte.id, NomFaculte.nom, CodeFaculte.code, Faculte.nombre_etudiants)
+    .join(Ville, Universite.ville_id == Ville.id)
+    .outerjoin(Faculte, Faculte.universite_id == Universite.id)
+    .outerjoin(NomFaculte, Faculte.nom_id == NomFaculte.id)
+    .outerjoin(CodeFaculte, Faculte.code_id == CodeFaculte.id)
+    .order_by(Universite.nom, NomFaculte.nom)
+)
+
+
+def _lire_catalogue(engine, base):
+    """
+    Catalogue (comme obtenir_catalogue, stratégie « lignes ») et compteur de modifications
+    d'une même lecture, par une connexion à ce fichier (la session de l'application
+    n'est pas touchée)
+    """
+    for _ in range(MAX_ESSAIS_LECTURE):
+        compteur = compteur_modifications(base)
+        with engine.connect() as connexion:
+            catalogue = [
+                UniversiteCatalogue(*universite, [FaculteCatalogue(ligne[7], ligne[8], ligne[9], ligne[10],
+                                                                   universite[0])
+                                                  for ligne in groupe if ligne[7] is not None])
+                for universite, groupe in groupby(connexion.execute(_REQUETE_CATALOGUE), key=lambda ligne: ligne[:7])
+            ]
+        # Une écriture pendant la lecture : recommencer pour ne pas publier un compteur faux
+        if compteur_modifications(base) == compteur:
+            return catalogue, compteur
+    return catalogue, None
+
+
+def _construire(catalogue, compteur, version):
+    """Colonnes et réservoir de textes d'une publication"""
+    textes, numeros = [], {}
+
+    def numero(texte):
+        texte = texte or ""
+        if texte not in numeros:
+            numeros[texte] = len(textes)
+            textes.append(texte)
+        return numeros[texte]
+
+    colonnes = {nom: array(type_) for nom, type_, _ in _COLONNES}
+    for position, universite in enumerate(catalogue):
+        colonnes["u_id"].append(universite.id)
+        colonnes["u_annee"].append(_SANS_ANNEE if universite.annee_fondation is None else universite.annee_fondation)
+        colonnes["u_nb_facultes"].append(universite.nb_facultes or 0)
+        colonnes["u_total"].append(universite.total_etudiants or 0)
+        colonnes["u_nom"].append(numero(universite.nom))
+        colonnes["u_ville"].append(numero(universite.ville))
+        colonnes["u_code"].append(numero(universite.code_universite))
+        colonnes["u_premiere"].append(len(colonnes["f_id"]))
+        for faculte in universite.facultes:
+            colonnes["f_id"].append(faculte.id)
+            colonnes["f_nombre"].append(faculte.nombre_etudiants or 0)
+            colonnes["f_universite"].append(position)
+            colonnes["f_nom"].append(numero(faculte.nom))
+            colonnes["f_code"].append(numero(faculte.code_faculte))
+    colonnes["u_premiere"].append(len(colonnes["f_id"]))
+
+    for prefixe in ("u", "f"):
+        identifiants = colonnes[f"{prefixe}_id"]
+        ordre = sorted(range(len(identifiants)), key=identifiants.__getitem__)
+        colonnes[f"{prefixe}_ids_tries"].extend(identifiants[i] for i in ordre)
+        colonnes[f"{prefixe}_positions"].extend(ordre)
+    codes = colonnes["u_code"]
+    colonnes["u_par_code"].extend(sorted(range(len(codes)), key=lambda i: textes[codes[i]]))
+
+    reservoir = bytearray()
+    for texte in textes:
+        colonnes["t_debut"].append(len(reservoir))
+        reservoir += texte.encode("utf-8")
+    colonnes["t_debut"].append(len(reservoir))
+
+    en_tete = _EN_TETE.pack(_MAGIE_DONNEES, _FORMAT, compteur if compteur is not None else 0, version,
+                            len(catalogue), len(colonnes["f_id"]), len(textes), len(reservoir))
+    return en_tete, colonnes, bytes(reservoir)
+
+
+class _Publication:
+    """Colonnes d'un segment publié, lues sur place (memoryview)"""
+
+    def __init__(self, segment):
+        self.segment = segment
+        (magie, format_, self.compteur, self.version, self.nb_universites, self.nb_facultes,
+         nb_textes, taille_reservoir) = _EN_TETE.unpack_from(segment.buf)
+        if magie != _MAGIE_DONNEES or format_ != _FORMAT:
+            raise ValueError(f"Segment {segment.name} : format inconnu")
+        positions, debut_reservoir = _disposition(self.nb_universites, self.nb_facultes, nb_textes)
+        self._vues = []
+        for nom, (position, type_, longueur) in positions.items():
+            taille = array(type_).itemsize * longueur
+            vue = segment.buf[position:position + taille].cast(type_)
+            self._vues.append(vue)
+            setattr(self, nom, vue)
+        self.reservoir = segment.buf[debut_reservoir:debut_reservoir + taille_reservoir]
+        self._vues.append(self.reservoir)
+
+    def __del__(self):
+        # Les vues d'abord : le segment ne peut pas être fermé tant qu'elles existent
+        for vue in getattr(self, "_vues", ()):
+            vue.release()
+        self.segment.close()
+
+    def texte(self, numero):
+        return str(self.reservoir[self.t_debut[numero]:self.t_debut[numero + 1]], "utf-8")
+
+    def position_universite(self, universite_id):
+        i = bisect_left(self.u_ids_tries, universite_id)
+        if i < self.nb_universites and self.u_ids_tries[i] == universite_id:
+            return self.u_positions[i]
+        return None
+
+    def position_faculte(self, faculte_id):
+        i = bisect_left(self.f_ids_tries, faculte_id)
+        if i < self.nb_facultes and self.f_ids_tries[i] == faculte_id:
+            return self.f_positions[i]
+        return None
+
+    def position_code(self, code_universite):
+        i = bisect_left(self.u_par_code, code_universite, key=lambda position: self.texte(self.u_code[position]))
+        if i < self.nb_universites and self.texte(self.u_code[self.u_par_code[i]]) == code_universite:
+            return self.u_par_code[i]
+        return None
+
+
+class UniversitePartagee:
+    """Université lue dans le segment (mêmes attributs que database.Universite)"""
+
+    __slots__ = ("_publication", "_position")
+
+    def __init__(self, publication, position):
+        self._publication = publication
+        self._position = position
+
+    @property
+    def id(self):
+        return self._publication.u_id[self._position]
+
+    @property
+    def nom(self):
+        return self._publication.texte(self._publication.u_nom[self._position])
+
+    @property
+    def ville(self):
+        return self._publication.texte(self._publication.u_ville[self._position])
+
+    @property
+    def code_universite(self):
+        return self._publication.texte(self._publication.u_code[self._position])
+
+    @property
+    def annee_fondation(self):
+        annee = self._publication.u_annee[self._position]
+        return None if annee == _SANS_ANNEE else annee
+
+    @property
+    def nb_facultes(self):
+        return self._publication.u_nb_facultes[self._position]
+
+    @property
+    def total_etudiants(self):
+        return self._publication.u_total[self._position]
+
+    def __repr__(self):
+        return f"<UniversitePartagee(id={self.id}, nom='{self.nom}', ville='{self.ville}', code='{self.code_universite}')>"
+
+
+class FacultePartagee:
+    """Faculté lue dans le segment (mêmes attributs que database.Faculte)"""
+
+    __slots__ = ("_publication", "_position")
+
+    def __init__(self, publication, position):
+        self._publication = publication
+        self._position = position
+
+    @property
+    def id(self):
+        return self._publication.f_id[self._position]
+
+    @property
+    def nom(self):
+        return self._publication.texte(self._publication.f_nom[self._position])
+
+    @property
+    def code_faculte(self):
+        return self._publication.texte(self._publication.f_code[self._position])
+
+    @property
+    def nombre_etudiants(self):
+        return self._publication.f_nombre[self._position]
+
+    @property
+    def universite_id(self):
+        return self._publication.u_id[self._publication.f_universite[self._position]]
+
+    def __repr__(self):
+        return (f"<FacultePartagee(id={self.id}, nom='{self.nom}', code='{self.code_faculte}', "
+                f"universite_id={self.universite_id})>")
+
+
+class PublicationCatalogue:
+    """Côté chargeur : publie le catalogue de la base dans la mémoire partagée"""
+
+    def __init__(self, base=None):
+        self.base = os.path.abspath(base or database.engine.url.database)
+        self.nom = nom_segment(self.base)
+        self.engine = create_engine(f"sqlite:///{self.base}")
+        # Schéma mis à jour comme à l'ouverture de la base par l'application
+        database.preparer_schema(self.engine)
+        try:
+            self.controle = _creer(self.nom, _CONTROLE.size)
+            _CONTROLE.pack_into(self.controle.buf, 0, _MAGIE_CONTROLE, 0)
+        except FileExistsError:
+            # Chargeur précédent arrêté sans fermer : reprendre après sa dernière version
+            self.controle = _attacher(self.nom)
+        self.version = _CONTROLE.unpack_from(self.controle.buf)[1]
+        self.segment = None
+        self.compteur = None
+
+    def a_jour(self):
+        """La publication courante correspond au fichier"""
+        return self.compteur is not None and self.compteur == compteur_modifications(self.base)
+
+    def publier(self):
+        """
+        Lit le catalogue et le publie sous une nouvelle version
+
+        Returns:
+            Rapport {"version", "universites", "facultes", "textes", "taille" (octets),
+            "lecture" (s), "publication" (s)}
+        """
+        debut = time.perf_counter()
+        catalogue, compteur = _lire_catalogue(self.engine, self.base)
+        lecture = time.perf_counter() - debut
+
+        debut = time.perf_counter()
+        version = self.version + 1
+        en_tete, colonnes, reservoir = _construire(catalogue, compteur, version)
+        _, nb_facultes, nb_textes = _EN_TETE.unpack(en_tete)[4:7]
+        positions, debut_reservoir = _disposition(len(catalogue), nb_facultes, nb_textes)
+        taille = debut_reservoir + len(reservoir)
+        try:
+            segment = _creer(f"{self.nom}_{version}", max(taille, 1))
+        except FileExistsError:
+            # Reste d'un chargeur arrêté brutalement : le remplacer
+            _retirer(_attacher(f"{self.nom}_{version}"))
+            segment = _creer(f"{self.nom}_{version}", max(taille, 1))
+        segment.buf[:len(en_tete)] = en_tete
+        for nom, (position, _, _) in positions.items():
+            octets = colonnes[nom].tobytes()
+            segment.buf[position:position + len(octets)] = octets
+        segment.buf[debut_reservoir:taille] = reservoir
+
+        # La version avance une fois le segment complet ; l'ancien segment est retiré
+        # (les lecteurs qui l'ont ouvert le gardent jusqu'à leur changement de version)
+        _CONTROLE.pack_into(self.controle.buf, 0, _MAGIE_CONTROLE, version)
+        if self.segment is not None:
+            _retirer(self.segment)
+        self.segment, self.version, self.compteur = segment, version, compteur
+        return {"version": version, "universites": len(catalogue), "facultes": nb_facultes, "textes": nb_textes,
+                "taille": taille, "lecture": lecture, "publication": time.perf_counter() - debut}
+
+    def servir(self, intervalle=INTERVALLE_DEFAUT_S, rapport=print):
+        """Publie, puis republie à chaque changement du fichier, jusqu'à Ctrl+C"""
+        try:
+            while True:
+                if not self.a_jour():
+                    rapport(resume_publication(self.publier()))
+                time.sleep(intervalle)
+        except KeyboardInterrupt:
+            pass
+
+    def fermer(self):
+        """Retire les segments : les lecteurs reviennent à la base"""
+        _CONTROLE.pack_into(self.controle.buf, 0, _MAGIE_CONTROLE, 0)
+        if self.segment is not None:
+            _retirer(self.segment)
+            self.segment = None
+        _retirer(self.controle)
+        self.engine.dispose()
+
+
+def resume_publication(rapport):
+    """Ligne lisible d'un rapport de PublicationCatalogue.publier()"""
+    return (f"Catalogue publié (version {rapport['version']}) : {rapport['universites']} universités, "
+            f"{rapport['facultes']} facultés, {rapport['textes']} textes distincts, "
+            f"{rapport['taille'] / 1e6:.1f} Mo ; lecture {rapport['lecture']:.2f} s, "
+            f"publication {rapport['publication']:.2f} s")
+
+
+class CataloguePartage:
+    """Côté lecteur : publication courante du catalogue, si elle correspond au fichier"""
+
+    def __init__(self, base=None):
+        self.base = os.path.abspath(base or database.engine.url.database)
+        self.nom = nom_segment(self.base)
+        self.controle = None
+        self.publication = None
+
+    def version_publiee(self):
+        """Version publiée dans le segment de contrôle (0 : aucun chargeur)"""
+        if self.controle is None:
+            try:
+                self.controle = _attacher(self.nom)
+            except FileNotFoundError:
+                return 0
+        magie, version = _CONTROLE.unpack_from(self.controle.buf)
+        return version if magie == _MAGIE_CONTROLE else 0
+
+    def courante(self):
+        """Publication à jour (_Publication), ou None : pas de chargeur, ou base modifiée depuis"""
+        version = self.version_publiee()
+        if not version:
+            self.publication = None
+            return None
+        if self.publication is None or self.publication.version != version:
+            try:
+                self.publication = _Publication(_attacher(f"{self.nom}_{version}"))
+            except FileNotFoundError:
+                # Remplacée entre la lecture de la version et l'ouverture : la base répond cette fois
+                self.publication = None
+                return None
+        if self.publication.compteur != compteur_modifications(self.base):
+            return None
+        return self.publication
+
+
+class DepotPartage(DepotSQLAlchemy):
+    """
+    Dépôt de la base SQLite dont les lectures de l'interface viennent du catalogue partagé
+
+    Les écritures et les autres lectures passent par la base, comme les lectures
+    elles-mêmes tant que la publication ne correspond pas au fichier.
+    """
+
+    def __init__(self, catalogue=None, publication=None):
+        """
+        Args:
+            catalogue: CataloguePartage à lire (défaut : celui de la base de l'application)
+            publication: PublicationCatalogue à republier quand elle est en retard
+                (chargeur dans le même processus : bancs d'essai, vérifications)
+        """
+        super().__init__()
+        self.catalogue = catalogue or CataloguePartage()
+        self.publication = publication
+        self.lectures_partagees = 0
+        self.lectures_base = 0
+
+    def _courante(self):
+        if self.publication is not None and not self.publication.a_jour():
+            self.publication.publier()
+        courante = self.catalogue.courante()
+        if courante is None:
+            self.lectures_base += 1
+        else:
+            self.lectures_partagees += 1
+        return courante
+
+    def universites(self):
+        courante = self._courante()
+        if courante is None:
+            return super().universites()
+        return [UniversitePartagee(courante, position) for position in range(courante.nb_universites)]
+
+    def universite(self, universite_id):
+        courante = self._courante()
+        if courante is None:
+            return super().universite(universite_id)
+        position = courante.position_universite(universite_id)
+        return UniversitePartagee(courante, position) if position is not None else None
+
+    def faculte(self, faculte_id):
+        courante = self._courante()
+        if courante is None:
+            return super().faculte(faculte_id)
+        position = courante.position_faculte(faculte_id)
+        return FacultePartagee(courante, position) if position is not None else None
+
+    def _facultes(self, courante, position):
+        if position is None:
+            return []
+        return [FacultePartagee(courante, i)
+                for i in range(courante.u_premiere[position], courante.u_premiere[position + 1])]
+
+    def facultes_par_universite(self, universite_id):
+        courante = self._courante()
+        if courante is None:
+            return super().facultes_par_universite(universite_id)
+        return self._facultes(courante, courante.position_universite(universite_id))
+
+    def facultes_par_code_universite(self, code_universite):
+        courante = self._courante()
+        if courante is None:
+            return super().facultes_par_code_universite(code_universite)
+        return self._facultes(courante, courante.position_code(code_universite))
@@ -0,0 +1,462 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Commandes en ligne de commande (sans interface graphique) pour le système Universités/Facultés
+
+Exemples :
+    python cli.py compteurs            # Vérifie les compteurs des universités
+    python cli.py compteurs --reparer  # Vérifie et reconstruit les compteurs
+    python cli.py importer exports/    # Importe les fichiers d'export du registraire
+    python cli.py exporter catalogue.csv --ville Montréal
+    python cli.py historique enregistrer 2025
+    python cli.py historique tendance --ville Québec --debut 2015
+    python cli.py historique croissances 2025 --par ville
+    python cli.py doublons --facultes  # Quasi-doublons d'universités et de facultés
+    python cli.py classement --code MED --limite 20
+    python cli.py classement --ville Québec --tranches 10
+    python cli.py maintenance --analyse-complete
+    python cli.py sync empreintes empreintes.bin                  # sur le satellite
+    python cli.py sync patch empreintes.bin patch.json.gz         # sur le poste central
+    python cli.py sync appliquer patch.json.gz                    # sur le satellite
+    python cli.py federation mtl/universites_facultes.db qc/universites_facultes.db
+    python cli.py sauvegarde creer --compresser    # Instantané à chaud, vérifié
+    python cli.py sauvegarde restaurer sauvegardes/universites_facultes-20250901-020000.db.gz
+    python cli.py partage servir       # Catalogue en mémoire partagée pour les main.py du poste
+    python cli.py trace rejouer session.trace.gz --clients 4 --vitesse 10 --pragma cache_size=-65536
+"""
+
+import argparse
+import json
+import os
+import signal
+import sqlite3
+import sys
+
+from sqlalchemy.exc import SQLAlchemyError
+
+# Pas d'affichage des requêtes SQL par défaut (voir l'option --sql)
+os.environ.setdefault("BANQUE_ECHO_SQL", "0")
+
+import catalogue_partage
+import database
+import doublons
+import exportation
+import federation
+import historique
+import importation
+import maintenance
+import sauvegarde
+import synchronisation
+import traces
+
+
+def commande_compteurs(args):
+    """Vérifie (et répare au besoin) les compteurs dénormalisés des universités"""
+    ecarts = database.verifier_compteurs(reparer=args.reparer)
+    
+    if not ecarts:
+        print("Compteurs cohérents")
+        return 0
+    
+    print(f"{len(ecarts)} université(s) avec des compteurs incohérents :")
+    for code, nb_facultes, nb_reel, total, total_reel in ecarts:
+        print(f"  - {code} : {nb_facultes} faculté(s) (réel {nb_reel}), {total} étudiants (réel {total_reel})")
+    
+    if args.reparer:
+        print("Compteurs reconstruits")
+        return 0
+    return 1
+
+
+def commande_importer(args):
+    """Importe des fichiers d'export en parallèle"""
+    resumes = importation.importer(args.chemins, processus=args.processus, taille_lot=args.lot)
+    return 1 if any(r["erreurs"] for r in resumes) else 0
+
+
+def commande_exporter(args):
+    """Exporte le catalogue universités × facultés"""
+    try:
+        nb_lignes = exportation.exporter_catalogue(args.chemin, args.format, args.ville, args.min_etudiants)
+    except (ValueError, RuntimeError) as e:
+        print(f"Erreur : {e}")
+        return 1
+    
+    print(f"{nb_lignes} ligne(s) exportées dans {args.chemin}")
+    return 0
+
+
+def commande_historique(args):
+    """Enregistre ou consulte l'historique des effectifs"""
+    if args.action == "enregistrer":
+        return 0 if historique.enregistrer_effectifs(args.periode) is not None else 1
+    
+    if args.action == "croissances":
+        print(f"Croissances {args.periode - 1} -> {args.periode} par {args.par} :")
+        for nom, precedent, actuel, croissance in historique.croissances(
+                args.periode, par=args.par, limite=args.limite, decroissant=not args.baisses):
+            taux = "n/a" if croissance is None else f"{croissance:+.1f} %"
+            print(f"  - {nom} : {precedent} -> {actuel} étudiants ({taux})")
+        return 0
+    
+    portee = {"faculte_id": args.faculte, "universite_id": args.universite, "ville": args.ville}
+    for ligne in historique.croissance_annuelle(args.debut, args.fin, **portee):
+        croissance = "" if ligne["croissance"] is None else f" ({ligne['croissance']:+.1f} %)"
+        print(f"  {ligne['periode']} : {ligne['etudiants']} étudiants{croissance}")
+    
+    resultat = historique.tendance(args.debut, args.fin, **portee)
+    if resultat is None:
+        print("Aucun historique pour cette portée")
+        return 1
+    print(f"Tendance sur {resultat['periodes']} période(s) : moyenne {resultat['moyenne']:.0f} étudiants, "
+          f"{resultat['pente']:+.1f} étudiants par période")
+    return 0
+
+
+def commande_doublons(args):
+    """Rapport des grappes de quasi-doublons"""
+    grappes = doublons.grappes_universites(args.seuil)
+    print(f"{len(grappes)} grappe(s) d'universités semblables :")
+    for grappe in grappes:
+        print("  - " + " | ".join(f"{nom} (#{identifiant})" for identifiant, nom in grappe))
+    
+    nb_grappes = len(grappes)
+    if args.facultes:
+        grappes_facultes = doublons.grappes_facultes(args.seuil)
+        print(f"{len(grappes_facultes)} grappe(s) de facultés semblables :")
+        for universite_id, grappe in grappes_facultes:
+            print(f"  - université #{universite_id} : " + " | ".join(f"{nom} (#{identifiant})" for identifiant, nom in grappe))
+        nb_grappes += len(grappes_facultes)
+    
+    return 1 if nb_grappes else 0
+
+
+def commande_classement(args):
+    """Plus grandes facultés, rang d'une faculté ou tranches d'effectif"""
+    portee = {"ville": args.ville, "code_faculte": args.code}
+    
+    if args.rang is not None:
+        rang = database.obtenir_rang_faculte(args.rang, **portee)
+        if rang is None:
+            print(f"Faculté #{args.rang} inconnue, sans effectif ou hors de la portée")
+            return 1
+        print(f"Faculté #{args.rang} : rang {rang}")
+        return 0
+    
+    if args.tranches:
+        for tranche in database.obtenir_tranches_effectifs(args.tranches, **portee):
+            print(f"  {tranche['tranche']:>3}. {tranche['facultes']} faculté(s) de {tranche['minimum']} à "
+                  f"{tranche['maximum']} étudiants (moyenne {tranche['moyenne']:.0f})")
+        return 0
+    
+    for faculte in database.obtenir_classement_facultes(args.limite, **portee):
+        print(f"  {faculte.rang:>5}. {faculte.nom} ({faculte.code_faculte}) - {faculte.universite} : "
+              f"{faculte.nombre_etudiants} étudiants")
+    return 0
+
+
+def commande_maintenance(args):
+    if args.convertir:
+        print("Passage en auto_vacuum incrémental :")
+        for ligne in maintenance.resume_entretien(maintenance.convertir_vacuum_incremental()):
+            print(f"  {ligne}")
+    
+    print("Entretien de la base :")
+    for ligne in maintenance.resume_entretien(maintenance.entretenir(analyse_complete=args.analyse_complete, seuil=args.seuil)):
+        print(f"  {ligne}")
+    return 0
+
+
+def commande_sync(args):
+    """Synchronisation du catalogue par empreintes (voir synchronisation.py)"""
+    try:
+        engine_base = synchronisation.ouvrir_base(args.base)
+        
+        if args.action == "empreintes":
+            arbre = synchronisation.ecrire_empreintes(args.fichier, engine_base)
+            print(f"Empreintes de {len(synchronisation.SEAUX)} seaux écrites dans {args.fichier} "
+                  f"({os.path.getsize(args.fichier)} octets, racine {arbre.racine.hex()})")
+        
+        elif args.action == "comparer":
+            local = synchronisation.ArbreEmpreintes.depuis_base(engine_base)
+            autre = synchronisation.ArbreEmpreintes.depuis_base(synchronisation.ouvrir_base(args.autre))
+            differents, comparaisons = synchronisation.seaux_differents(local, autre)
+            print(f"{len(differents)} seau(x) différent(s), {comparaisons} empreinte(s) comparée(s)")
+            return 1 if differents else 0
+        
+        elif args.action == "patch":
+            resume = synchronisation.creer_patch(synchronisation.lire_empreintes(args.empreintes), args.fichier, engine_base)
+            print(f"Patch écrit dans {args.fichier} : {resume['universites']} université(s) dans "
+                  f"{resume['seaux']} seau(x), {resume['taille']} octets ({resume['comparaisons']} empreintes comparées)")
+        
+        else:
+            resume = synchronisation.appliquer_patch(args.fichier, engine_base, args.forcer)
+            print(f"Patch appliqué : {resume['creees']} université(s) créée(s), {resume['modifiees']} modifiée(s), "
+                  f"{resume['supprimees']} supprimée(s) dans {resume['seaux']} seau(x)")
+    except (ValueError, OSError, synchronisation.ConflitSynchronisation) as e:
+        print(f"Erreur : {e}")
+        return 1
+    
+    return 0
+
+
+def commande_federation(args):
+    """Statistiques (et liste des universités) de plusieurs fichiers de catalogue réunis"""
+    try:
+        with federation.Federation(args.fichiers) as federes:
+            statistiques = federes.obtenir_statistiques()
+            if args.universites:
+                for universite in federes.obtenir_universites():
+                    print(f"  [{universite.source}] {universite.nom} ({universite.code_universite}) - "
+                          f"{universite.ville} : {universite.nb_facultes} faculté(s)")
+    except (ValueError, sqlite3.Error, SQLAlchemyError) as e:
+        print(f"Erreur : {e}")
+        return 1
+    
+    for source, valeurs in statistiques["par_source"].items():
+        print(f"{source} : {valeurs['universites']} université(s), {valeurs['facultes']} faculté(s), "
+              f"{valeurs['etudiants']} étudiants")
+    print(f"Province : {statistiques['universites']} université(s), {statistiques['facultes']} faculté(s), "
+          f"{statistiques['etudiants']} étudiants")
+    return 0
+
+
+def commande_sauvegarde(args):
+    """Instantanés à chaud de la base (voir sauvegarde.py)"""
+    options = {"dossier": args.dossier}
+    try:
+        if args.action == "creer":
+            rapport = sauvegarde.sauvegarder(compresser=args.compresser, garder=args.garder, **options)
+            print("\n".join(sauvegarde.resume_sauvegarde(rapport)))
+        
+        elif args.action == "liste":
+            instantanes = sauvegarde.lister_instantanes(args.dossier)
+            for chemin in instantanes:
+                print(f"  {os.path.basename(chemin)} ({os.path.getsize(chemin) / 1e6:.1f} Mo)")
+            print(f"{len(instantanes)} instantané(s) dans {args.dossier or sauvegarde.dossier_sauvegardes()}")
+        
+        elif args.action == "planifier":
+            print(f"Un instantané toutes les {args.minutes} minute(s) (Ctrl+C pour arrêter)")
+            sauvegarde.planifier(args.minutes, compresser=args.compresser, garder=args.garder, **options)
+        
+        else:
+            securite = sauvegarde.restaurer(args.fichier, securite=not args.sans_securite)
+            if securite:
+                print(f"Base actuelle sauvegardée dans {securite}")
+            print(f"Base restaurée depuis {args.fichier}")
+    except (OSError, sqlite3.Error, sauvegarde.SauvegardeInvalide) as e:
+        print(f"Erreur : {e}")
+        return 1
+    
+    return 0
+
+
+def commande_partage(args):
+    """Catalogue en mémoire partagée pour les processus du poste (voir catalogue_partage.py)"""
+    if args.action == "etat":
+        catalogue = catalogue_partage.CataloguePartage()
+        version = catalogue.version_publiee()
+        if not version:
+            print("Aucun catalogue partagé pour cette base (lancer : python cli.py partage servir)")
+            return 1
+        etat = "à jour" if catalogue.courante() is not None else "en retard sur la base (republication en attente)"
+        publication = catalogue.publication
+        print(f"Catalogue partagé {catalogue.nom}, version {version} : {etat}")
+        if publication is not None:
+            print(f"  {publication.nb_universites} universités, {publication.nb_facultes} facultés, "
+                  f"{publication.segment.size / 1e6:.1f} Mo")
+        return 0
+    
+    try:
+        publication = catalogue_partage.PublicationCatalogue()
+    except OSError as e:
+        print(f"Erreur : {e}")
+        return 1
+    print(f"Catalogue partagé {publication.nom}, vérifié toutes les {args.intervalle} s (Ctrl+C pour arrêter)")
+    # Arrêt du service (SIGTERM) comme Ctrl+C : les segments sont retirés
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    try:
+        publication.servir(args.intervalle)
+    except (sqlite3.Error, SQLAlchemyError) as e:
+        print(f"Erreur : {e}")
+        return 1
+    finally:
+        # Les lecteurs reviennent à la base
+        publication.fermer()
+    return 0
+
+
+def commande_trace(args):
+    """Résumé et rejeu des traces enregistrées par main.py --trace (voir traces.py)"""
+    try:
+        if args.action == "resume":
+            print("\n".join(traces.resume_trace(*traces.lire_trace(args.trace))))
+            return 0
+        
+        rapport = traces.rejouer_trace(args.trace, base=args.base, clients=args.clients, vitesse=args.vitesse,
+                                       pragmas=args.pragma, replique=args.replique, depot=args.depot,
+                                       copie=not args.sur_place)
+    except (OSError, ValueError, RuntimeError, sqlite3.Error) as e:
+        print(f"Erreur : {e}")
+        return 1
+    
+    print("\n".join(traces.resume_rejeu(rapport)))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as fichier:
+            json.dump(rapport, fichier, ensure_ascii=False, indent=2)
+        print(f"Rapport écrit dans {args.json}")
+    return 0
+
+
+def construire_parser():
+    parser = argparse.ArgumentParser(description="Outils en ligne de commande du système universitaire")
+    parser.add_argument("--sql", action="store_true", help="Afficher les requêtes SQL exécutées")
+    sous_parsers = parser.add_subparsers(dest="commande", required=True)
+    
+    parser_compteurs = sous_parsers.add_parser("compteurs", help="Vérifier les compteurs nb_facultes/total_etudiants")
+    parser_compteurs.add_argument("--reparer", action="store_true", help="Reconstruire les compteurs en cas d'écart")
+    parser_compteurs.set_defaults(fonction=commande_compteurs)
+    
+    parser_importer = sous_parsers.add_parser("importer", help="Importer des fichiers d'export (.json/.csv) en parallèle")
+    parser_importer.add_argument("chemins", nargs="+", help="Fichiers ou dossiers à importer")
+    parser_importer.add_argument("--processus", type=int, default=None, help="Nombre de processus (défaut : nombre de cœurs)")
+    parser_importer.add_argument("--lot", type=int, default=importation.TAILLE_LOT_DEFAUT, help="Facultés par transaction")
+    parser_importer.set_defaults(fonction=commande_importer)
+    
+    parser_exporter = sous_parsers.add_parser("exporter", help="Exporter le catalogue (csv, jsonl, colonnes, parquet)")
+    parser_exporter.add_argument("chemin", help="Fichier de destination")
+    parser_exporter.add_argument("--format", choices=exportation.FORMATS, default=None, help="Format (défaut : selon l'extension)")
+    parser_exporter.add_argument("--ville", default=None, help="Ne garder que les universités de cette ville")
+    parser_exporter.add_argument("--min-etudiants", type=int, default=None, help="Nombre minimal d'étudiants par faculté")
+    parser_exporter.set_defaults(fonction=commande_exporter)
+    
+    parser_doublons = sous_parsers.add_parser("doublons", help="Rechercher les quasi-doublons de noms")
+    parser_doublons.add_argument("--facultes", action="store_true", help="Chercher aussi parmi les facultés de chaque université")
+    parser_doublons.add_argument("--seuil", type=float, default=doublons.SEUIL_DEFAUT, help="Similarité minimale (0 à 1)")
+    parser_doublons.set_defaults(fonction=commande_doublons)
+    
+    parser_classement = sous_parsers.add_parser("classement", help="Plus grandes facultés, rang ou tranches d'effectif")
+    parser_classement.add_argument("--limite", type=int, default=10, help="Nombre de facultés classées")
+    parser_classement.add_argument("--ville", default=None, help="Ne classer que les facultés de cette ville")
+    parser_classement.add_argument("--code", default=None, help="Ne classer que les facultés de ce code (ex. MED)")
+    affichage = parser_classement.add_mutually_exclusive_group()
+    affichage.add_argument("--rang", type=int, default=None, help="Rang de la faculté de cet identifiant")
+    affichage.add_argument("--tranches", type=int, default=None, help="Répartir les facultés en tranches d'effectif")
+    parser_classement.set_defaults(fonction=commande_classement)
+    
+    parser_maintenance = sous_parsers.add_parser("maintenance", help="Statistiques du planificateur et réduction du fichier")
+    parser_maintenance.add_argument("--analyse-complete", action="store_true", help="ANALYZE sur toutes les lignes")
+    parser_maintenance.add_argument("--seuil", type=float, default=maintenance.SEUIL_PAGES_LIBRES,
+                                    help="Proportion de pages libres à partir de laquelle le fichier est réduit")
+    parser_maintenance.add_argument("--convertir", action="store_true",
+                                    help="Passer d'abord une ancienne base en auto_vacuum incrémental (VACUUM complet)")
+    parser_maintenance.set_defaults(fonction=commande_maintenance)
+    
+    parser_sync = sous_parsers.add_parser("sync", help="Synchroniser le catalogue entre deux bases par empreintes")
+    parser_sync.add_argument("--base", default=None, help="Fichier de base (défaut : universites_facultes.db)")
+    actions_sync = parser_sync.add_subparsers(dest="action", required=True)
+    
+    parser_empreintes = actions_sync.add_parser("empreintes", help="Écrire les empreintes de la base (satellite)")
+    parser_empreintes.add_argument("fichier", help="Fichier d'empreintes à envoyer au poste central")
+    
+    parser_patch = actions_sync.add_parser("patch", help="Écrire le patch pour un satellite (poste central)")
+    parser_patch.add_argument("empreintes", help="Fichier d'empreintes reçu du satellite")
+    parser_patch.add_argument("fichier", help="Fichier du patch (.json.gz)")
+    
+    parser_appliquer = actions_sync.add_parser("appliquer", help="Appliquer un patch reçu (satellite)")
+    parser_appliquer.add_argument("fichier", help="Fichier du patch")
+    parser_appliquer.add_argument("--forcer", action="store_true", help="Appliquer même si la base a changé depuis les empreintes")
+    
+    parser_comparer = actions_sync.add_parser("comparer", help="Compter les seaux qui diffèrent d'une autre base")
+    parser_comparer.add_argument("autre", help="Autre fichier de base")
+    
+    parser_sync.set_defaults(fonction=commande_sync)
+    
+    parser_federation = sous_parsers.add_parser("federation", help="Statistiques de plusieurs fichiers de catalogue réunis")
+    parser_federation.add_argument("fichiers", nargs="+", help="Fichiers universites_facultes.db des bureaux régionaux")
+    parser_federation.add_argument("--universites", action="store_true", help="Lister aussi les universités de tous les fichiers")
+    parser_federation.set_defaults(fonction=commande_federation)
+    
+    parser_sauvegarde = sous_parsers.add_parser("sauvegarde", help="Instantanés à chaud de la base et restauration")
+    parser_sauvegarde.add_argument("--dossier", default=None,
+                                   help="Dossier des instantanés (défaut : BANQUE_SAUVEGARDES ou sauvegardes/)")
+    actions_sauvegarde = parser_sauvegarde.add_subparsers(dest="action", required=True)
+    
+    parser_creer = actions_sauvegarde.add_parser("creer", help="Prendre un instantané vérifié sans arrêter l'application")
+    parser_planifier = actions_sauvegarde.add_parser("planifier", help="Prendre un instantané à intervalle régulier")
+    parser_planifier.add_argument("--minutes", type=float, required=True, help="Intervalle entre deux instantanés")
+    for parser_action in (parser_creer, parser_planifier):
+        parser_action.add_argument("--compresser", action="store_true", help="Compresser l'instantané (.db.gz)")
+        parser_action.add_argument("--garder", type=int, default=sauvegarde.GARDER_DEFAUT,
+                                   help="Instantanés les plus récents conservés (0 : tous)")
+    
+    actions_sauvegarde.add_parser("liste", help="Lister les instantanés, du plus ancien au plus récent")
+    
+    parser_restaurer = actions_sauvegarde.add_parser("restaurer", help="Remplacer la base par un instantané (application fermée)")
+    parser_restaurer.add_argument("fichier", help="Instantané (.db ou .db.gz)")
+    parser_restaurer.add_argument("--sans-securite", action="store_true",
+                                  help="Ne pas sauvegarder d'abord la base actuelle")
+    
+    parser_sauvegarde.set_defaults(fonction=commande_sauvegarde)
+    
+    parser_partage = sous_parsers.add_parser("partage", help="Catalogue en mémoire partagée pour les processus du poste")
+    actions_partage = parser_partage.add_subparsers(dest="action", required=True)
+    parser_servir = actions_partage.add_parser("servir", help="Publier le catalogue et le republier à chaque changement")
+    parser_servir.add_argument("--intervalle", type=float, default=catalogue_partage.INTERVALLE_DEFAUT_S,
+                               help="Secondes entre deux vérifications des changements de la base")
+    actions_partage.add_parser("etat", help="Version et fraîcheur du catalogue publié")
+    parser_partage.set_defaults(fonction=commande_partage)
+    
+    parser_trace = sous_parsers.add_parser("trace", help="Résumer ou rejouer une trace de main.py --trace")
+    actions_trace = parser_trace.add_subparsers(dest="action", required=True)
+    parser_resume = actions_trace.add_parser("resume", help="Appels enregistrés par méthode")
+    parser_resume.add_argument("trace", help="Fichier de trace")
+    parser_rejouer = actions_trace.add_parser("rejouer", help="Rejouer une trace et mesurer les latences")
+    parser_rejouer.add_argument("trace", help="Fichier de trace")
+    parser_rejouer.add_argument("--base", default=None, help="Base de rejeu (défaut : universites_facultes.db)")
+    parser_rejouer.add_argument("--sur-place", action="store_true",
+                                help="Rejouer directement sur la base plutôt que sur une copie")
+    parser_rejouer.add_argument("--clients", type=int, default=1, help="Clients simultanés (un processus chacun)")
+    parser_rejouer.add_argument("--vitesse", type=float, default=1.0,
+                                help="1 : vitesse d'origine, 10 : dix fois plus vite, 0 : au plus vite")
+    parser_rejouer.add_argument("--pragma", action="append", default=[], metavar="NOM=VALEUR",
+                                help="Réglage SQLite de chaque connexion (répétable)")
+    parser_rejouer.add_argument("--replique", action="store_true", help="Lectures sur une copie en mémoire")
+    parser_rejouer.add_argument("--depot", choices=traces.DEPOTS_REJEU, default="sqlite",
+                                help="Dépôt rejoué (memoire : catalogue chargé au départ)")
+    parser_rejouer.add_argument("--json", metavar="CHEMIN", help="Écrire aussi le rapport en JSON")
+    parser_trace.set_defaults(fonction=commande_trace)
+    
+    parser_historique = sous_parsers.add_parser("historique", help="Historique des effectifs des facultés")
+    actions_historique = parser_historique.add_subparsers(dest="action", required=True)
+    
+    parser_enregistrer = actions_historique.add_parser("enregistrer", help="Enregistrer les effectifs actuels pour une période")
+    parser_enregistrer.add_argument("periode", type=int, help="Période (par exemple l'année)")
+    
+    parser_tendance = actions_historique.add_parser("tendance", help="Effectifs, croissance et tendance sur une plage")
+    parser_tendance.add_argument("--debut", type=int, default=None, help="Première période")
+    parser_tendance.add_argument("--fin", type=int, default=None, help="Dernière période")
+    portee = parser_tendance.add_mutually_exclusive_group()
+    portee.add_argument("--faculte", type=int, default=None, help="Identifiant d'une faculté")
+    portee.add_argument("--universite", type=int, default=None, help="Identifiant d'une université")
+    portee.add_argument("--ville", default=None, help="Nom d'une ville")
+    
+    parser_croissances = actions_historique.add_parser("croissances", help="Classement des croissances d'une période à l'autre")
+    parser_croissances.add_argument("periode", type=int, help="Période comparée à la précédente")
+    parser_croissances.add_argument("--par", choices=tuple(historique.REGROUPEMENTS), default="universite")
+    parser_croissances.add_argument("--limite", type=int, default=20, help="Nombre de résultats")
+    parser_croissances.add_argument("--baisses", action="store_true", help="Plus fortes baisses en premier")
+    
+    parser_historique.set_defaults(fonction=commande_historique)
+    
+    return parser
+
+
+def main(argv=None):
+    args = construire_parser().parse_args(argv)
+    database.engine.echo = args.sql
+    return args.fonction(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,21 +1,275 @@
-from sqlalchemy import create_engine, Column, Integer, String, ForeignKey
-from sqlalchemy.orm import declarative_base, sessionmaker, relationship
+import gc
+import os
+import sqlite3
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+from itertools import groupby
+
+from sqlalchemy import (create_engine, Column, Integer, String, ForeignKey, Index, inspect, text,
+                        select, insert, update, delete, func, bindparam, event, literal, union_all)
+from sqlalchemy.ext.hybrid import hybrid_property, Comparator
+from sqlalchemy.orm import declarative_base, sessionmaker, relationship, selectinload, contains_eager
+from sqlalchemy.sql import operators
+from sqlalchemy.pool import StaticPool
+
+from validation import valider_universite, valider_faculte, valider_nombre_etudiants
 
 # Configuration de la base de données
-engine = create_engine("sqlite:///universites_facultes.db", echo=True)
+# BANQUE_ECHO_SQL=0 désactive l'affichage des requêtes (outils en ligne de commande, bancs d'essai)
+# query_cache_size : cache des requêtes compilées (voir les REQUETE_* plus bas,
+# construites une seule fois pour que leur clé de cache soit aussi réutilisée)
+engine = create_engine(
+    "sqlite:///universites_facultes.db",
+    echo=os.environ.get("BANQUE_ECHO_SQL", "1") == "1",
+    query_cache_size=1200,
+)
+
+# BANQUE_PLANS=1 (développement) affiche les requêtes qui parcourent une grande table en entier
+if os.environ.get("BANQUE_PLANS") == "1":
+    import diagnostics
+    diagnostics.surveiller()
+
 Base = declarative_base()
 Session = sessionmaker(bind=engine)
 session = Session()
 
+# Réplique en mémoire pour les sessions en lecture seule (voir activer_replique_memoire)
+engine_replique = None
+session_lecture = None
+_connexion_replique = None
+_connexion_veille = None
+_version_donnees = None
+# Recopie de la réplique différée : voir _rafraichir_replique
+DELAI_REPLIQUE_S = 2.0
+_delai_replique = DELAI_REPLIQUE_S
+_version_vue = None
+_instant_version_vue = 0.0
+
+# Tables de correspondance : chaque ville, nom ou code de faculté n'est stocké qu'une
+# fois ; universites et facultes n'en gardent que l'identifiant entier
+class Ville(Base):
+    __tablename__ = "villes"
+    
+    id = Column(Integer, primary_key=True)
+    nom = Column(String(100), unique=True, nullable=False)
+
+class NomFaculte(Base):
+    __tablename__ = "noms_facultes"
+    
+    id = Column(Integer, primary_key=True)
+    nom = Column(String(100), unique=True, nullable=False)
+
+class CodeFaculte(Base):
+    __tablename__ = "codes_facultes"
+    
+    id = Column(Integer, primary_key=True)
+    code = Column(String(10), unique=True, nullable=False)
+
+# Clé de Connection.info : textes ajoutés aux tables de correspondance par la
+# transaction en cours, confirmés dans le cache seulement à sa validation
+_TEXTES_NON_VALIDES = "textes_internes_non_valides"
+
+class TableInterne:
+    """
+    Cache en mémoire d'une table de correspondance (texte <-> identifiant)
+    
+    Les tables de correspondance sont petites (quelques villes, quelques dizaines de
+    noms de facultés) : elles sont lues en entier au premier besoin, puis un texte
+    déjà vu ne coûte plus aucune requête.
+    """
+    
+    def __init__(self, modele, colonne):
+        self.modele = modele
+        self.colonne = colonne
+        self.ids = {}
+        self.textes = {}
+        self.charge = False
+    
+    def charger(self):
+        """Lit toute la table de correspondance"""
+        with engine.connect() as connexion:
+            lignes = connexion.execute(select(self.modele.id, self.colonne)).all()
+        for identifiant, texte in lignes:
+            self.ids[texte] = identifiant
+            self.textes[identifiant] = texte
+        self.charge = True
+    
+    def vider(self):
+        self.ids.clear()
+        self.textes.clear()
+        self.charge = False
+    
+    def texte(self, identifiant):
+        """Texte d'un identifiant (None si inconnu)"""
+        if identifiant is None:
+            return None
+        texte = self.textes.get(identifiant)
+        if texte is None:
+            self.charger()
+            texte = self.textes.get(identifiant)
+        return texte
+    
+    def identifiant(self, texte, connexion):
+        """
+        Identifiant d'un texte, ajouté à la table de correspondance s'il n'y est pas
+        
+        L'ajout se fait dans la transaction de connexion : il n'entre dans le cache
+        qu'à sa validation (une transaction annulée pourrait réutiliser l'identifiant).
+        """
+        identifiant = self.ids.get(texte)
+        if identifiant is not None:
+            return identifiant
+        
+        non_valides = connexion.info.setdefault(_TEXTES_NON_VALIDES, {})
+        identifiant = non_valides.get((self, texte))
+        if identifiant is not None:
+            return identifiant
+        
+        identifiant = connexion.execute(select(self.modele.id).where(self.colonne == texte)).scalar()
+        if identifiant is not None:
+            self.ids[texte] = identifiant
+            self.textes[identifiant] = texte
+            return identifiant
+        
+        identifiant = connexion.execute(
+            insert(self.modele).values({self.colonne.key: texte})).inserted_primary_key[0]
+        non_valides[(self, texte)] = identifiant
+        # Lecture seulement (affichage d'un objet juste inséré) ; retiré si la transaction est annulée
+        self.textes[identifiant] = texte
+        return identifiant
+    
+    def expression_identifiant(self, valeur):
+        """Identifiant d'un texte pour une requête : un entier s'il est connu, sinon une sous-requête"""
+        if isinstance(valeur, str):
+            if not self.charge:
+                self.charger()
+            identifiant = self.ids.get(valeur)
+            if identifiant is not None:
+                return identifiant
+        return select(self.modele.id).where(self.colonne == valeur).scalar_subquery()
+    
+    def expression_texte(self, colonne_id):
+        """Sous-requête corrélée donnant le texte d'une colonne d'identifiants"""
+        return (select(self.colonne).where(self.modele.id == colonne_id)
+                .correlate_except(self.modele).scalar_subquery())
+
+def identifiants_textes(connexion, modele, colonne, textes):
+    """
+    Identifiants de plusieurs textes dans une table de correspondance, créés au besoin
+    
+    Pour les écritures en masse sur n'importe quelle base (le cache de TableInterne
+    ne vaut que pour `engine`).
+    
+    Returns:
+        Dictionnaire texte -> identifiant
+    """
+    textes = set(textes)
+    if not textes:
+        return {}
+    connexion.execute(insert(modele).prefix_with("OR IGNORE"), [{colonne.key: texte} for texte in textes])
+    return dict(connexion.execute(select(colonne, modele.id).where(colonne.in_(textes))).all())
+
+VILLES = TableInterne(Ville, Ville.nom)
+NOMS_FACULTES = TableInterne(NomFaculte, NomFaculte.nom)
+CODES_FACULTES = TableInterne(CodeFaculte, CodeFaculte.code)
+TABLES_INTERNES = (VILLES, NOMS_FACULTES, CODES_FACULTES)
+
+def _valider_textes_internes(connexion):
+    for (table, texte), identifiant in connexion.info.pop(_TEXTES_NON_VALIDES, {}).items():
+        table.ids[texte] = identifiant
+
+def _annuler_textes_internes(connexion):
+    for (table, texte), identifiant in connexion.info.pop(_TEXTES_NON_VALIDES, {}).items():
+        table.textes.pop(identifiant, None)
+
+def _suivre_textes_internes(engine_cible):
+    """Tient le cache des tables de correspondance à jour des transactions de engine_cible"""
+    if not event.contains(engine_cible, "commit", _valider_textes_internes):
+        event.listen(engine_cible, "commit", _valider_textes_internes)
+        event.listen(engine_cible, "rollback", _annuler_textes_internes)
+
+_suivre_textes_internes(engine)
+
+class ComparateurInterne(Comparator):
+    """
+    Comparaisons sur un attribut texte interné
+    
+    L'égalité avec un texte devient une comparaison d'entiers sur la colonne
+    d'identifiants ; les autres opérations (tri, LIKE...) portent sur le texte.
+    """
+    
+    def __init__(self, colonne_id, table):
+        super().__init__(colonne_id)
+        self.table = table
+    
+    def __clause_element__(self):
+        return self.table.expression_texte(self.expression)
+    
+    def operate(self, op, *autres, **kwargs):
+        if op is operators.eq and autres[0] is not None:
+            return self.expression == self.table.expression_identifiant(autres[0])
+        if op is operators.in_op:
+            return self.expression.in_(
+                select(self.table.modele.id).where(self.table.colonne.in_(autres[0])))
+        return op(self.__clause_element__(), *autres, **kwargs)
+    
+    def reverse_operate(self, op, autre, **kwargs):
+        return op(autre, self.__clause_element__(), **kwargs)
+
+def texte_interne(colonne_id, table):
+    """
+    Attribut texte stocké sous forme d'identifiant dans une table de correspondance
+    
+    En lecture, le texte vient du cache ; en écriture, un texte inconnu est résolu
+    au prochain flush, dans la transaction de la session (_resoudre_textes_internes).
+    """
+    def lire(instance):
+        en_attente = instance.__dict__.get("_textes_en_attente", {})
+        if colonne_id in en_attente:
+            return en_attente[colonne_id][1]
+        return table.texte(getattr(instance, colonne_id))
+    
+    def ecrire(instance, texte):
+        en_attente = instance.__dict__.setdefault("_textes_en_attente", {})
+        en_attente.pop(colonne_id, None)
+        identifiant = table.ids.get(texte)
+        if identifiant is None and texte is not None:
+            en_attente[colonne_id] = (table, texte)
+        setattr(instance, colonne_id, identifiant)
+    
+    return hybrid_property(
+        lire, ecrire, custom_comparator=lambda cls: ComparateurInterne(getattr(cls, colonne_id), table))
+
+@event.listens_for(Session, "before_flush")
+def _resoudre_textes_internes(session_orm, contexte, instances):
+    """Remplace les textes inconnus du cache par leur identifiant avant l'écriture"""
+    for instance in list(session_orm.new) + list(session_orm.dirty):
+        en_attente = instance.__dict__.pop("_textes_en_attente", None)
+        if en_attente:
+            connexion = session_orm.connection()
+            for colonne_id, (table, texte) in en_attente.items():
+                setattr(instance, colonne_id, table.identifiant(texte, connexion))
+
 class Universite(Base):
     __tablename__ = "universites"
+    __table_args__ = (
+        # Universités d'une ville (filtres et regroupements par ville)
+        Index("ix_universites_ville_nom", "ville_id", "nom"),
+    )
     
     id = Column(Integer, primary_key=True)
     nom = Column(String(150), unique=True, nullable=False)
-    ville = Column(String(100), nullable=False)
+    ville_id = Column(Integer, ForeignKey("villes.id"), nullable=False)
+    ville = texte_interne("ville_id", VILLES)
     code_universite = Column(String(10), unique=True, nullable=False)
     annee_fondation = Column(Integer, nullable=True)
     
+    # Compteurs dénormalisés : maintenus par les triggers de la table facultes
+    # (voir TRIGGERS_COMPTEURS), ils évitent de charger les facultés pour les afficher
+    nb_facultes = Column(Integer, nullable=False, default=0, server_default="0")
+    total_etudiants = Column(Integer, nullable=False, default=0, server_default="0")
+    
     # Relation 1-à-N : Une université a plusieurs facultés
     # cascade="all, delete-orphan" : si on supprime une université, ses facultés sont supprimées
     facultes = relationship("Faculte", back_populates="universite", cascade="all, delete-orphan")
@@ -25,10 +279,23 @@ class Universite(Base):
 
 class Faculte(Base):
     __tablename__ = "facultes"
+    __table_args__ = (
+        # Facultés d'une université triées par nom (listes dépendantes, catalogue)
+        # (couvrant pour le catalogue : pas de lecture de la table pour ces colonnes)
+        Index("ix_facultes_universite_nom", "universite_id", "nom_id", "code_id", "nombre_etudiants"),
+        # Tris du catalogue complet et regroupements par nom ou par code
+        Index("ix_facultes_nom", "nom_id"),
+        # Classements (obtenir_classement_facultes) : plus grandes facultés de tout le
+        # catalogue, ou d'un code de faculté, lues dans l'ordre de l'index
+        Index("ix_facultes_code_nombre_etudiants", "code_id", "nombre_etudiants"),
+        Index("ix_facultes_nombre_etudiants", "nombre_etudiants"),
+    )
     
     id = Column(Integer, primary_key=True)
-    nom = Column(String(100), nullable=False)
-    code_faculte = Column(String(10), nullable=False)
+    nom_id = Column(Integer, ForeignKey("noms_facultes.id"), nullable=False)
+    nom = texte_interne("nom_id", NOMS_FACULTES)
+    code_id = Column(Integer, ForeignKey("codes_facultes.id"), nullable=False)
+    code_faculte = texte_interne("code_id", CODES_FACULTES)
     nombre_etudiants = Column(Integer, default=0)
     
     # Clé étrangère obligatoire vers l'université
@@ -40,8 +307,275 @@ class Faculte(Base):
     def __repr__(self):
         return f"<Faculte(id={self.id}, nom='{self.nom}', code='{self.code_faculte}', etudiants={self.nombre_etudiants}, universite_id={self.universite_id})>"
 
-# Création des tables
-Base.metadata.create_all(engine)
+class HistoriqueEffectif(Base):
+    """Nombre d'étudiants d'une faculté pour une période (voir historique.py)"""
+    __tablename__ = "historique_effectifs"
+    __table_args__ = (
+        # Agrégats d'une période sur toutes les facultés, sans lire la table
+        Index("ix_historique_periode", "periode", "nombre_etudiants"),
+        # Sans rowid : les lignes sont rangées directement dans l'index (faculte_id, periode)
+        {"sqlite_with_rowid": False},
+    )
+    
+    faculte_id = Column(Integer, ForeignKey("facultes.id"), primary_key=True)
+    # Année universitaire (ex. 2024) ou tout entier croissant (ex. 202409)
+    periode = Column(Integer, primary_key=True)
+    nombre_etudiants = Column(Integer, nullable=False)
+    
+    def __repr__(self):
+        return f"<HistoriqueEffectif(faculte_id={self.faculte_id}, periode={self.periode}, etudiants={self.nombre_etudiants})>"
+
+# Requêtes des recherches fréquentes, construites une seule fois : d'un appel à l'autre
+# seuls les paramètres changent, la construction et la compilation SQL sont réutilisées
+REQUETE_FACULTES_PAR_UNIVERSITE = (
+    select(Faculte)
+    .join(NomFaculte, Faculte.nom_id == NomFaculte.id)
+    .where(Faculte.universite_id == bindparam("universite_id"))
+    .order_by(NomFaculte.nom)
+)
+
+REQUETE_FACULTES_PAR_CODE_UNIVERSITE = (
+    select(Faculte)
+    .join(Universite, Faculte.universite_id == Universite.id)
+    .join(NomFaculte, Faculte.nom_id == NomFaculte.id)
+    .where(Universite.code_universite == bindparam("code_universite"))
+    .order_by(NomFaculte.nom)
+)
+
+REQUETE_UNIVERSITE_EXISTANTE = (
+    select(Universite.id)
+    .where((Universite.nom == bindparam("nom")) | (Universite.code_universite == bindparam("code_universite")))
+    .limit(1)
+)
+
+REQUETE_FACULTE_EXISTANTE = (
+    select(Faculte.id)
+    .where(Faculte.nom == bindparam("nom"), Faculte.universite_id == bindparam("universite_id"))
+    .limit(1)
+)
+
+# Triggers qui gardent nb_facultes et total_etudiants cohérents avec la table facultes,
+# peu importe si la modification passe par l'ORM ou par du SQL direct
+TRIGGERS_COMPTEURS = [
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_facultes_insert AFTER INSERT ON facultes
+    BEGIN
+        UPDATE universites
+        SET nb_facultes = nb_facultes + 1,
+            total_etudiants = total_etudiants + COALESCE(NEW.nombre_etudiants, 0)
+        WHERE id = NEW.universite_id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_facultes_delete AFTER DELETE ON facultes
+    BEGIN
+        UPDATE universites
+        SET nb_facultes = nb_facultes - 1,
+            total_etudiants = total_etudiants - COALESCE(OLD.nombre_etudiants, 0)
+        WHERE id = OLD.universite_id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_facultes_update AFTER UPDATE OF nombre_etudiants, universite_id ON facultes
+    BEGIN
+        UPDATE universites
+        SET nb_facultes = nb_facultes - 1,
+            total_etudiants = total_etudiants - COALESCE(OLD.nombre_etudiants, 0)
+        WHERE id = OLD.universite_id;
+        UPDATE universites
+        SET nb_facultes = nb_facultes + 1,
+            total_etudiants = total_etudiants + COALESCE(NEW.nombre_etudiants, 0)
+        WHERE id = NEW.universite_id;
+    END
+    """,
+]
+
+# L'historique d'une faculté supprimée disparaît avec elle
+TRIGGERS_HISTORIQUE = [
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_facultes_delete_historique AFTER DELETE ON facultes
+    BEGIN
+        DELETE FROM historique_effectifs WHERE faculte_id = OLD.id;
+    END
+    """,
+]
+
+# Recalcule les compteurs à partir de la table facultes (une seule requête)
+SQL_RECONSTRUIRE_COMPTEURS = """
+    UPDATE universites
+    SET nb_facultes = (SELECT COUNT(*) FROM facultes WHERE facultes.universite_id = universites.id),
+        total_etudiants = (SELECT COALESCE(SUM(nombre_etudiants), 0) FROM facultes
+                           WHERE facultes.universite_id = universites.id)
+"""
+
+# Passage des colonnes texte (ville, nom, code_faculte) aux tables de correspondance
+SQL_MIGRATION_TEXTES_INTERNES = [
+    "INSERT OR IGNORE INTO villes (nom) SELECT DISTINCT ville FROM universites",
+    "INSERT OR IGNORE INTO noms_facultes (nom) SELECT DISTINCT nom FROM facultes",
+    "INSERT OR IGNORE INTO codes_facultes (code) SELECT DISTINCT code_faculte FROM facultes",
+    # Sans réécrire les références des autres tables vers les tables renommées
+    "PRAGMA legacy_alter_table = ON",
+    "ALTER TABLE universites RENAME TO universites_texte",
+    "ALTER TABLE facultes RENAME TO facultes_texte",
+]
+
+SQL_COPIE_TEXTES_INTERNES = [
+    """
+    INSERT INTO universites (id, nom, ville_id, code_universite, annee_fondation, nb_facultes, total_etudiants)
+    SELECT u.id, u.nom, v.id, u.code_universite, u.annee_fondation, u.nb_facultes, u.total_etudiants
+    FROM universites_texte u JOIN villes v ON v.nom = u.ville
+    """,
+    """
+    INSERT INTO facultes (id, nom_id, code_id, nombre_etudiants, universite_id)
+    SELECT f.id, n.id, c.id, f.nombre_etudiants, f.universite_id
+    FROM facultes_texte f
+    JOIN noms_facultes n ON n.nom = f.nom
+    JOIN codes_facultes c ON c.code = f.code_faculte
+    """,
+    "DROP TABLE facultes_texte",
+    "DROP TABLE universites_texte",
+    "PRAGMA legacy_alter_table = OFF",
+]
+
+def _migrer_textes_internes(connexion):
+    """
+    Reconstruit universites et facultes avec des identifiants à la place des textes
+    
+    Les identifiants des universités et des facultés sont conservés. Les triggers
+    disparaissent avec les anciennes tables et sont recréés par preparer_schema.
+    """
+    for table in ("universites", "facultes"):
+        for index in inspect(connexion).get_indexes(table):
+            connexion.execute(text(f'DROP INDEX "{index["name"]}"'))
+    for instruction in SQL_MIGRATION_TEXTES_INTERNES:
+        connexion.execute(text(instruction))
+    Universite.__table__.create(connexion)
+    Faculte.__table__.create(connexion)
+    for instruction in SQL_COPIE_TEXTES_INTERNES:
+        connexion.execute(text(instruction))
+
+# Index remplacés par un index plus complet (préfixe identique) : supprimés des anciennes bases
+INDEX_REMPLACES = ["ix_facultes_code"]
+
+def preparer_schema(engine_cible):
+    """
+    Crée les tables manquantes et met à jour une base existante
+    (colonnes de compteurs, tables de correspondance, index et triggers)
+    """
+    with engine_cible.begin() as connexion:
+        # Base neuve : les pages libérées par les suppressions pourront être rendues
+        # au système par morceaux (PRAGMA incremental_vacuum, voir maintenance.py)
+        if not inspect(connexion).get_table_names():
+            connexion.execute(text("PRAGMA auto_vacuum = INCREMENTAL"))
+        Base.metadata.create_all(connexion)
+    
+    with engine_cible.begin() as connexion:
+        colonnes = {c["name"] for c in inspect(connexion).get_columns("universites")}
+        compteurs_ajoutes = False
+        for colonne in ("nb_facultes", "total_etudiants"):
+            if colonne not in colonnes:
+                connexion.execute(text(f"ALTER TABLE universites ADD COLUMN {colonne} INTEGER NOT NULL DEFAULT 0"))
+                compteurs_ajoutes = True
+        
+        textes_migres = "ville" in colonnes
+        if textes_migres:
+            _migrer_textes_internes(connexion)
+        
+        for index in INDEX_REMPLACES:
+            connexion.execute(text(f'DROP INDEX IF EXISTS "{index}"'))
+        
+        # create_all ne crée les index que pour les nouvelles tables
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(connexion, checkfirst=True)
+        
+        for trigger in TRIGGERS_COMPTEURS + TRIGGERS_HISTORIQUE:
+            connexion.execute(text(trigger))
+        
+        # Une ancienne base n'avait pas de compteurs : les calculer une première fois
+        if compteurs_ajoutes:
+            connexion.execute(text(SQL_RECONSTRUIRE_COMPTEURS))
+    
+    # Rendre au système la place des anciennes colonnes texte (et passer en auto_vacuum
+    # incrémental au passage, VACUUM étant de toute façon nécessaire pour en changer)
+    if textes_migres:
+        with engine_cible.connect().execution_options(isolation_level="AUTOCOMMIT") as connexion:
+            connexion.execute(text("PRAGMA auto_vacuum = INCREMENTAL"))
+            connexion.execute(text("VACUUM"))
+
+# Création des tables et mise à jour de la base par défaut : à sa première connexion, pas
+# à l'importation. Les démonstrations, essais et bancs d'essai passent par utiliser_engine
+# (gabarits.py) avant toute lecture : universites_facultes.db n'est alors ni créée ni migrée.
+_schema_en_attente = True
+
+def _preparer_schema_differe(connexion):
+    global _schema_en_attente
+    if _schema_en_attente:
+        _schema_en_attente = False
+        try:
+            preparer_schema(connexion.engine)
+        except Exception:
+            _schema_en_attente = True
+            raise
+
+event.listen(engine, "engine_connect", _preparer_schema_differe)
+
+# Données de base (initialiser_donnees, depot.DepotMemoire.avec_donnees_initiales)
+UNIVERSITES_INITIALES = [
+    {"nom": "Université de Montréal", "ville": "Montréal", "code": "UdeM", "annee": 1878},
+    {"nom": "UQAM", "ville": "Montréal", "code": "UQAM", "annee": 1969},
+    {"nom": "Université Laval", "ville": "Québec", "code": "UL", "annee": 1663},
+    {"nom": "Concordia University", "ville": "Montréal", "code": "CONC", "annee": 1974},
+]
+
+FACULTES_INITIALES = [
+    # Université de Montréal (UdeM)
+    {"nom": "Faculté de Médecine", "code": "MED", "etudiants": 2500, "universite_code": "UdeM"},
+    {"nom": "Faculté de Génie", "code": "GENIE", "etudiants": 1800, "universite_code": "UdeM"},
+    {"nom": "Faculté de Droit", "code": "DROIT", "etudiants": 1200, "universite_code": "UdeM"},
+    
+    # UQAM
+    {"nom": "École des Sciences de la Gestion", "code": "ESG", "etudiants": 3000, "universite_code": "UQAM"},
+    {"nom": "Faculté des Arts", "code": "ARTS", "etudiants": 1500, "universite_code": "UQAM"},
+    {"nom": "Faculté des Sciences", "code": "SCI", "etudiants": 2200, "universite_code": "UQAM"},
+    
+    # Université Laval (UL)
+    {"nom": "Faculté de Médecine", "code": "MED", "etudiants": 2000, "universite_code": "UL"},
+    {"nom": "Faculté des Sciences et de Génie", "code": "FSG", "etudiants": 2800, "universite_code": "UL"},
+    
+    # Concordia University (CONC)
+    {"nom": "Gina Cody School of Engineering", "code": "ENG", "etudiants": 2100, "universite_code": "CONC"},
+    {"nom": "John Molson School of Business", "code": "BUS", "etudiants": 2600, "universite_code": "CONC"},
+]
+
+def inserer_donnees_initiales(connexion):
+    """
+    Insère UNIVERSITES_INITIALES et FACULTES_INITIALES dans la transaction de connexion
+    
+    Quelques requêtes en tout (SQL Core, triggers de compteurs actifs) : sert aussi à
+    construire les gabarits de gabarits.py, sur n'importe quelle base.
+    """
+    table_universites = Universite.__table__
+    ids_villes = identifiants_textes(connexion, Ville, Ville.nom, {u["ville"] for u in UNIVERSITES_INITIALES})
+    connexion.execute(insert(table_universites), [{
+        "nom": donnees["nom"],
+        "ville_id": ids_villes[donnees["ville"]],
+        "code_universite": donnees["code"],
+        "annee_fondation": donnees["annee"],
+    } for donnees in UNIVERSITES_INITIALES])
+    
+    # Identifiants des universités par code : une requête, pas une par faculté
+    ids_universites = dict(connexion.execute(
+        select(table_universites.c.code_universite, table_universites.c.id)
+        .where(table_universites.c.code_universite.in_([u["code"] for u in UNIVERSITES_INITIALES]))).all())
+    ids_noms = identifiants_textes(connexion, NomFaculte, NomFaculte.nom, {f["nom"] for f in FACULTES_INITIALES})
+    ids_codes = identifiants_textes(connexion, CodeFaculte, CodeFaculte.code, {f["code"] for f in FACULTES_INITIALES})
+    connexion.execute(insert(Faculte.__table__), [{
+        "nom_id": ids_noms[donnees["nom"]],
+        "code_id": ids_codes[donnees["code"]],
+        "nombre_etudiants": donnees["etudiants"],
+        "universite_id": ids_universites[donnees["universite_code"]],
+    } for donnees in FACULTES_INITIALES])
 
 def initialiser_donnees():
     """Initialise quelques données de base si la base est vide"""
@@ -53,64 +587,48 @@ def initialiser_donnees():
     
     print("Initialisation des données de base...")
     
-    # Créer les universités
-    universites_donnees = [
-        {"nom": "Université de Montréal", "ville": "Montréal", "code": "UdeM", "annee": 1878},
-        {"nom": "UQAM", "ville": "Montréal", "code": "UQAM", "annee": 1969},
-        {"nom": "Université Laval", "ville": "Québec", "code": "UL", "annee": 1663},
-        {"nom": "Concordia University", "ville": "Montréal", "code": "CONC", "annee": 1974},
-    ]
+    try:
+        inserer_donnees_initiales(session.connection())
+        session.commit()
+    except Exception as e:
+        session.rollback()
+        print(f"Erreur lors de l'initialisation des données : {e}")
+        return
     
-    universites_objets = []
-    for data in universites_donnees:
-        universite = Universite(
-            nom=data["nom"], 
-            ville=data["ville"], 
-            code_universite=data["code"], 
-            annee_fondation=data["annee"]
-        )
-        universites_objets.append(universite)
-        session.add(universite)
-    
-    # Flush pour obtenir les IDs
-    session.flush()
-    
-    # Créer les facultés pour chaque université
-    facultes_donnees = [
-        # Université de Montréal (UdeM)
-        {"nom": "Faculté de Médecine", "code": "MED", "etudiants": 2500, "universite_code": "UdeM"},
-        {"nom": "Faculté de Génie", "code": "GENIE", "etudiants": 1800, "universite_code": "UdeM"},
-        {"nom": "Faculté de Droit", "code": "DROIT", "etudiants": 1200, "universite_code": "UdeM"},
-        
-        # UQAM
-        {"nom": "École des Sciences de la Gestion", "code": "ESG", "etudiants": 3000, "universite_code": "UQAM"},
-        {"nom": "Faculté des Arts", "code": "ARTS", "etudiants": 1500, "universite_code": "UQAM"},
-        {"nom": "Faculté des Sciences", "code": "SCI", "etudiants": 2200, "universite_code": "UQAM"},
-        
-        # Université Laval (UL)
-        {"nom": "Faculté de Médecine", "code": "MED", "etudiants": 2000, "universite_code": "UL"},
-        {"nom": "Faculté des Sciences et de Génie", "code": "FSG", "etudiants": 2800, "universite_code": "UL"},
-        
-        # Concordia University (CONC)
-        {"nom": "Gina Cody School of Engineering", "code": "ENG", "etudiants": 2100, "universite_code": "CONC"},
-        {"nom": "John Molson School of Business", "code": "BUS", "etudiants": 2600, "universite_code": "CONC"},
-    ]
+    print(f"Données initialisées : {len(UNIVERSITES_INITIALES)} universités et {len(FACULTES_INITIALES)} facultés")
+
+def utiliser_engine(nouvel_engine, preparer=True):
+    """
+    Fait travailler le module sur une autre base, sans redémarrer
+    
+    `session` reste le même objet (les modules qui l'ont importée la suivent) mais
+    est vidée et liée au nouvel engine ; `engine` est remplacé (les autres modules
+    passent par database.engine). La réplique est désactivée et les caches des tables
+    de correspondance vidés : ils ne valent que pour un engine.
+    
+    Args:
+        nouvel_engine: Engine de la base à utiliser
+        preparer: Mettre d'abord le schéma de la base à jour (preparer_schema)
+    
+    Returns:
+        L'engine remplacé, à redonner pour revenir à la base précédente
+    """
+    global engine
     
-    for fac_data in facultes_donnees:
-        # Trouver l'université correspondante
-        universite = session.query(Universite).filter_by(code_universite=fac_data["universite_code"]).first()
-        if universite:
-            faculte = Faculte(
-                nom=fac_data["nom"],
-                code_faculte=fac_data["code"],
-                nombre_etudiants=fac_data["etudiants"],
-                universite_id=universite.id
-            )
-            session.add(faculte)
-    
-    # Sauvegarder tout
-    session.commit()
-    print(f"Données initialisées : {len(universites_donnees)} universités et {len(facultes_donnees)} facultés")
+    if preparer:
+        preparer_schema(nouvel_engine)
+    
+    desactiver_replique_memoire()
+    session.close()
+    
+    precedent = engine
+    engine = nouvel_engine
+    Session.configure(bind=engine)
+    session.bind = engine
+    _suivre_textes_internes(engine)
+    for table in TABLES_INTERNES:
+        table.vider()
+    return precedent
 
 def ajouter_universite(nom, ville, code_universite, annee_fondation=None):
     """
@@ -127,21 +645,14 @@ def ajouter_universite(nom, ville, code_universite, annee_fondation=None):
     """
     try:
         # Validation des données
-        if not nom or not ville or not code_universite:
-            print("Erreur : Nom, ville et code sont obligatoires")
-            return None
-        
-        if len(code_universite) > 10:
-            print("Erreur : Le code université ne peut pas dépasser 10 caractères")
-            return None
-        
-        if annee_fondation and annee_fondation < 1000:
-            print("Erreur : L'année de fondation doit être supérieure à 1000")
+        erreur = valider_universite(nom, ville, code_universite, annee_fondation)
+        if erreur:
+            print(f"Erreur : {erreur}")
             return None
         
         # Vérifier que l'université n'existe pas déjà
-        universite_existante = session.query(Universite).filter(
-            (Universite.nom == nom) | (Universite.code_universite == code_universite)
+        universite_existante = session.scalars(
+            REQUETE_UNIVERSITE_EXISTANTE, {"nom": nom, "code_universite": code_universite}
         ).first()
         
         if universite_existante:
@@ -182,28 +693,20 @@ def ajouter_faculte(nom_faculte, code_faculte, nombre_etudiants, universite_id):
     """
     try:
         # Validation des données
-        if not nom_faculte or not code_faculte:
-            print("Erreur : Nom et code de la faculté sont obligatoires")
-            return None
-        
-        if len(code_faculte) > 10:
-            print("Erreur : Le code faculté ne peut pas dépasser 10 caractères")
-            return None
-        
-        if nombre_etudiants < 0:
-            print("Erreur : Le nombre d'étudiants doit être positif")
+        erreur = valider_faculte(nom_faculte, code_faculte, nombre_etudiants)
+        if erreur:
+            print(f"Erreur : {erreur}")
             return None
         
         # Vérifier que l'université existe
-        universite = session.query(Universite).filter_by(id=universite_id).first()
+        universite = session.get(Universite, universite_id)
         if not universite:
             print(f"Erreur : L'université avec l'ID {universite_id} n'existe pas")
             return None
         
         # Vérifier que la faculté n'existe pas déjà pour cette université
-        faculte_existante = session.query(Faculte).filter_by(
-            nom=nom_faculte, 
-            universite_id=universite_id
+        faculte_existante = session.scalars(
+            REQUETE_FACULTE_EXISTANTE, {"nom": nom_faculte, "universite_id": universite_id}
         ).first()
         
         if faculte_existante:
@@ -229,31 +732,504 @@ def ajouter_faculte(nom_faculte, code_faculte, nombre_etudiants, universite_id):
         print(f"Erreur lors de l'ajout de la faculté : {e}")
         return None
 
+# Opérations par lot : une transaction et quelques requêtes ensemblistes (IN) par lot,
+# quel que soit le nombre de lignes ; les triggers tiennent les compteurs à jour
+
+def supprimer_facultes(faculte_ids):
+    """
+    Supprime plusieurs facultés (et leur historique) en une transaction
+    
+    Returns:
+        Nombre de facultés supprimées, ou None si erreur
+    """
+    try:
+        resultat = session.execute(delete(Faculte).where(Faculte.id.in_(list(faculte_ids))))
+        session.commit()
+        return resultat.rowcount
+    except Exception as e:
+        session.rollback()
+        print(f"Erreur lors de la suppression des facultés : {e}")
+        return None
+
+def supprimer_universites(universite_ids):
+    """
+    Supprime plusieurs universités et toutes leurs facultés en une transaction
+    
+    Returns:
+        Nombre d'universités supprimées, ou None si erreur
+    """
+    universite_ids = list(universite_ids)
+    try:
+        # Les suppressions en masse ne suivent pas la cascade de l'ORM : facultés d'abord
+        session.execute(delete(Faculte).where(Faculte.universite_id.in_(universite_ids)))
+        resultat = session.execute(delete(Universite).where(Universite.id.in_(universite_ids)))
+        session.commit()
+        return resultat.rowcount
+    except Exception as e:
+        session.rollback()
+        print(f"Erreur lors de la suppression des universités : {e}")
+        return None
+
+def reassigner_facultes(faculte_ids, universite_id):
+    """
+    Rattache plusieurs facultés à une autre université en une transaction
+    
+    Refusé si l'université cible se retrouverait avec deux facultés du même nom
+    (même règle que ajouter_faculte).
+    
+    Returns:
+        Nombre de facultés déplacées, ou None si erreur
+    """
+    faculte_ids = list(faculte_ids)
+    try:
+        universite = session.get(Universite, universite_id)
+        if not universite:
+            print(f"Erreur : L'université avec l'ID {universite_id} n'existe pas")
+            return None
+        
+        # Facultés déplacées et facultés déjà dans la cible : chaque nom au plus une fois
+        deplacees = Faculte.id.in_(faculte_ids)
+        conflits = session.scalars(
+            select(NomFaculte.nom)
+            .join(Faculte, Faculte.nom_id == NomFaculte.id)
+            .where(deplacees | (Faculte.universite_id == universite_id))
+            .group_by(NomFaculte.id)
+            .having(func.count() > 1)
+        ).all()
+        if conflits:
+            print(f"Erreur : {universite.nom} aurait plusieurs facultés nommées {', '.join(conflits[:5])}")
+            return None
+        
+        resultat = session.execute(
+            update(Faculte)
+            .where(deplacees, Faculte.universite_id != universite_id)
+            .values(universite_id=universite_id)
+        )
+        session.commit()
+        return resultat.rowcount
+    except Exception as e:
+        session.rollback()
+        print(f"Erreur lors du déplacement des facultés : {e}")
+        return None
+
+def modifier_nombre_etudiants(faculte_ids, nombre=None, ecart=None):
+    """
+    Modifie le nombre d'étudiants de plusieurs facultés en une transaction
+    
+    Args:
+        nombre: Nouveau nombre d'étudiants de chaque faculté
+        ecart: Ou bien nombre à ajouter (négatif pour retirer) à chacune
+    
+    Returns:
+        Nombre de facultés modifiées, ou None si erreur (un effectif deviendrait négatif)
+    """
+    if (nombre is None) == (ecart is None):
+        raise ValueError("Donner soit nombre, soit ecart")
+    
+    faculte_ids = list(faculte_ids)
+    actuel = func.coalesce(Faculte.nombre_etudiants, 0)
+    try:
+        if nombre is not None:
+            erreur = valider_nombre_etudiants(nombre)
+            valeur = nombre
+        else:
+            plus_petit = session.scalar(select(func.min(actuel)).where(Faculte.id.in_(faculte_ids)))
+            erreur = valider_nombre_etudiants(plus_petit + ecart) if plus_petit is not None else None
+            valeur = actuel + ecart
+        if erreur:
+            print(f"Erreur : {erreur}")
+            return None
+        
+        resultat = session.execute(
+            update(Faculte).where(Faculte.id.in_(faculte_ids)).values(nombre_etudiants=valeur),
+            execution_options={"synchronize_session": "fetch"},
+        )
+        session.commit()
+        return resultat.rowcount
+    except Exception as e:
+        session.rollback()
+        print(f"Erreur lors de la modification des effectifs : {e}")
+        return None
+
+def activer_replique_memoire(delai=DELAI_REPLIQUE_S):
+    """
+    Copie la base du disque dans une base SQLite en mémoire (API de sauvegarde)
+    et sert toutes les lectures obtenir_* depuis cette copie.
+    
+    Les écritures continuent d'aller sur le disque via `session`. Une recopie coûte
+    une copie complète du fichier (proportionnelle à sa taille, pas à l'écriture) :
+    elle n'a lieu qu'une fois le fichier inchangé depuis `delai` secondes ; d'ici là
+    les lectures vont au fichier (voir _rafraichir_replique).
+    
+    Args:
+        delai: Secondes sans écriture avant la recopie (0 : à chaque changement)
+    """
+    global engine_replique, session_lecture, _connexion_replique, _connexion_veille, _delai_replique
+    
+    if session_lecture is not None:
+        return
+    
+    # Schéma à jour avant la première copie (préparation différée de la base par défaut)
+    with engine.connect():
+        pass
+    _connexion_replique = sqlite3.connect(":memory:", check_same_thread=False)
+    engine_replique = create_engine(
+        "sqlite://",
+        creator=lambda: _connexion_replique,
+        poolclass=StaticPool,
+    )
+    session_lecture = Session(bind=engine_replique)
+    
+    # Connexion dédiée à la surveillance : data_version change quand une
+    # autre connexion (dont celle de `session`) valide une écriture
+    _connexion_veille = sqlite3.connect(engine.url.database, check_same_thread=False)
+    _delai_replique = delai
+    _recopier_replique(_connexion_veille.execute("PRAGMA data_version").fetchone()[0])
+    
+    print("Réplique en mémoire activée pour les lectures")
+
+def desactiver_replique_memoire():
+    """Revient aux lectures directes sur le fichier"""
+    global engine_replique, session_lecture, _connexion_replique, _connexion_veille
+    
+    if session_lecture is None:
+        return
+    
+    session_lecture.close()
+    engine_replique.dispose()
+    _connexion_replique.close()
+    _connexion_veille.close()
+    engine_replique = session_lecture = _connexion_replique = _connexion_veille = None
+
+def _recopier_replique(version):
+    """Copie complète du fichier dans la réplique"""
+    global _version_donnees
+    
+    # Terminer la transaction de lecture en cours avant d'écraser la réplique
+    session_lecture.rollback()
+    _connexion_veille.backup(_connexion_replique)
+    session_lecture.expire_all()
+    _version_donnees = version
+
+def _rafraichir_replique():
+    """
+    Indique si la réplique peut servir la lecture, en la recopiant au besoin
+    
+    Chaque ajout ou suppression de l'interface est suivi d'un rechargement : recopier
+    à chaque changement ferait payer une copie du fichier entier à chaque clic. Tant
+    que le fichier change (data_version différente de celle de la réplique depuis moins
+    de _delai_replique secondes), les lectures vont au fichier ; la recopie n'a lieu
+    qu'une fois les écritures calmées, à la lecture suivante.
+    """
+    global _version_vue, _instant_version_vue
+    
+    version = _connexion_veille.execute("PRAGMA data_version").fetchone()[0]
+    if version == _version_donnees:
+        return True
+    
+    maintenant = time.monotonic()
+    if version != _version_vue:
+        _version_vue, _instant_version_vue = version, maintenant
+    if maintenant - _instant_version_vue < _delai_replique:
+        return False
+    _recopier_replique(version)
+    return True
+
+def session_de_lecture():
+    """Session à utiliser pour les lectures : la réplique si elle est active et à jour"""
+    if session_lecture is None or not _rafraichir_replique():
+        return session
+    return session_lecture
+
 def obtenir_universites():
     """Retourne toutes les universités triées par nom"""
-    return session.query(Universite).order_by(Universite.nom).all()
+    return session_de_lecture().query(Universite).order_by(Universite.nom).all()
 
 def obtenir_facultes_par_universite(universite_id):
     """Retourne toutes les facultés d'une université donnée"""
-    return session.query(Faculte).filter_by(universite_id=universite_id).order_by(Faculte.nom).all()
+    return session_de_lecture().scalars(REQUETE_FACULTES_PAR_UNIVERSITE, {"universite_id": universite_id}).all()
 
 def obtenir_facultes_par_code_universite(code_universite):
     """Retourne toutes les facultés d'une université donnée par son code"""
-    universite = session.query(Universite).filter_by(code_universite=code_universite).first()
-    if universite:
-        return obtenir_facultes_par_universite(universite.id)
-    return []
+    # Une seule requête : jointure sur le code plutôt que deux allers-retours
+    return session_de_lecture().scalars(REQUETE_FACULTES_PAR_CODE_UNIVERSITE, {"code_universite": code_universite}).all()
+
+def obtenir_facultes_des_universites(universite_ids):
+    """Facultés de plusieurs universités en une requête, triées par université puis par nom"""
+    return session_de_lecture().scalars(
+        select(Faculte)
+        .join(Universite, Faculte.universite_id == Universite.id)
+        .join(NomFaculte, Faculte.nom_id == NomFaculte.id)
+        .where(Faculte.universite_id.in_(list(universite_ids)))
+        .order_by(Universite.nom, NomFaculte.nom)
+    ).all()
 
 def obtenir_statistiques():
     """Retourne les statistiques de la base de données"""
-    nb_universites = session.query(Universite).count()
-    nb_facultes = session.query(Faculte).count()
+    session_lue = session_de_lecture()
+    nb_universites = session_lue.query(Universite).count()
+    nb_facultes = session_lue.query(Faculte).count()
     
     return {
         "universites": nb_universites,
         "facultes": nb_facultes
     }
 
+# Classements des facultés par nombre d'étudiants : les ex æquo partagent un rang (1, 2, 2, 4...)
+FaculteClassee = namedtuple("FaculteClassee", "rang id nom code_faculte nombre_etudiants universite_id universite")
+
+def _portee_classement(requete, ville, code_faculte):
+    """Facultés classées d'une requête, restreintes à une ville (Universite jointe) ou à un code"""
+    requete = requete.where(Faculte.nombre_etudiants.isnot(None))
+    if code_faculte:
+        requete = requete.where(Faculte.code_faculte == code_faculte)
+    if ville:
+        requete = requete.where(Universite.ville == ville)
+    return requete
+
+def obtenir_classement_facultes(limite=10, ville=None, code_faculte=None):
+    """
+    Plus grandes facultés de tout le catalogue, d'une ville ou d'un code de faculté
+    (ex. "MED" : les facultés de médecine de toutes les universités)
+    
+    Les facultés sont lues dans l'ordre de ix_facultes_nombre_etudiants (ou de
+    ix_facultes_code_nombre_etudiants pour un code) : la lecture s'arrête après
+    `limite` lignes, quelle que soit la taille du catalogue.
+    
+    Returns:
+        Liste de FaculteClassee, de la plus grande à la plus petite
+    """
+    requete = _portee_classement(
+        select(Faculte.id, NomFaculte.nom, CodeFaculte.code, Faculte.nombre_etudiants,
+               Faculte.universite_id, Universite.nom)
+        .join(Universite, Faculte.universite_id == Universite.id)
+        .join(NomFaculte, Faculte.nom_id == NomFaculte.id)
+        .join(CodeFaculte, Faculte.code_id == CodeFaculte.id),
+        ville, code_faculte,
+    ).order_by(Faculte.nombre_etudiants.desc(), Faculte.id.desc()).limit(limite)
+    
+    classement = []
+    for position, ligne in enumerate(session_de_lecture().execute(requete), 1):
+        precedente = classement[-1] if classement else None
+        rang = precedente.rang if precedente and precedente.nombre_etudiants == ligne[3] else position
+        classement.append(FaculteClassee(rang, *ligne))
+    return classement
+
+def obtenir_rang_faculte(faculte_id, ville=None, code_faculte=None):
+    """
+    Rang d'une faculté (1 = la plus grande) dans le catalogue, une ville ou un code
+    de faculté : un comptage des facultés plus grandes sur l'index des effectifs
+    
+    Returns:
+        Le rang, ou None si la faculté est inconnue, sans effectif ou hors de la portée
+    """
+    session_lue = session_de_lecture()
+    requete = select(Faculte.nombre_etudiants).where(Faculte.id == faculte_id)
+    if ville:
+        requete = requete.join(Universite, Faculte.universite_id == Universite.id)
+    nombre = session_lue.scalar(_portee_classement(requete, ville, code_faculte))
+    if nombre is None:
+        return None
+    
+    requete = select(func.count()).select_from(Faculte).where(Faculte.nombre_etudiants > nombre)
+    if ville:
+        requete = requete.join(Universite, Faculte.universite_id == Universite.id)
+    return session_lue.scalar(_portee_classement(requete, ville, code_faculte)) + 1
+
+def obtenir_tranches_effectifs(nb_tranches=4, ville=None, code_faculte=None):
+    """
+    Répartit les facultés en nb_tranches tranches de même taille par effectif
+    (quartiles par défaut)
+    
+    Ce sont les tranches de NTILE (les premières ont une faculté de plus si le compte
+    ne tombe pas juste), mais chacune est lue comme une plage de l'index des effectifs
+    (LIMIT/OFFSET) : un comptage et une requête UNION ALL, sans fonction de fenêtre
+    sur toutes les facultés (cinq fois plus lente sur un million de facultés).
+    
+    Returns:
+        Liste de {"tranche", "facultes", "minimum", "maximum", "moyenne"},
+        de la tranche des plus petites facultés à celle des plus grandes
+    """
+    def portee(requete):
+        if ville:
+            requete = requete.join(Universite, Faculte.universite_id == Universite.id)
+        return _portee_classement(requete, ville, code_faculte)
+    
+    session_lue = session_de_lecture()
+    nb_facultes = session_lue.scalar(portee(select(func.count()).select_from(Faculte)))
+    taille, reste = divmod(nb_facultes, nb_tranches)
+    
+    requetes = []
+    debut = 0
+    for tranche in range(1, nb_tranches + 1):
+        longueur = taille + (1 if tranche <= reste else 0)
+        if not longueur:
+            break
+        plage = (portee(select(Faculte.nombre_etudiants.label("etudiants")))
+                 .order_by(Faculte.nombre_etudiants).limit(longueur).offset(debut).subquery())
+        requetes.append(select(literal(tranche).label("tranche"), func.count(), func.min(plage.c.etudiants),
+                               func.max(plage.c.etudiants), func.avg(plage.c.etudiants)))
+        debut += longueur
+    if not requetes:
+        return []
+    
+    lignes = session_lue.execute(union_all(*requetes).order_by("tranche"))
+    return [
+        {"tranche": tranche, "facultes": nombre, "minimum": minimum, "maximum": maximum, "moyenne": moyenne}
+        for tranche, nombre, minimum, maximum, moyenne in lignes
+    ]
+
+# Stratégies de chargement du catalogue (obtenir_catalogue)
+CHARGEMENT_SELECTIN = "selectin"
+CHARGEMENT_JOINT = "joint"
+CHARGEMENT_LIGNES = "lignes"
+STRATEGIES_CATALOGUE = (CHARGEMENT_SELECTIN, CHARGEMENT_JOINT, CHARGEMENT_LIGNES)
+
+# Résultats de la stratégie « lignes » : mêmes attributs que les objets Universite/Faculte
+UniversiteCatalogue = namedtuple(
+    "UniversiteCatalogue",
+    "id nom ville code_universite annee_fondation nb_facultes total_etudiants facultes")
+FaculteCatalogue = namedtuple("FaculteCatalogue", "id nom code_faculte nombre_etudiants universite_id")
+
+def _filtres_catalogue(requete, codes_universites, ville, universite_ids):
+    if codes_universites is not None:
+        requete = requete.where(Universite.code_universite.in_(codes_universites))
+    if ville is not None:
+        requete = requete.where(Universite.ville == ville)
+    if universite_ids is not None:
+        requete = requete.where(Universite.id.in_(universite_ids))
+    return requete
+
+def _cle_nom(faculte):
+    return faculte.nom
+
+@contextmanager
+def _sans_ramasse_miettes():
+    """
+    Suspend le ramasse-miettes cyclique le temps d'un chargement massif d'objets ORM
+    
+    Chaque objet chargé déclenche sinon des collectes qui reparcourent tous les
+    objets déjà créés : jusqu'aux deux tiers du temps de chargement du catalogue.
+    """
+    actif = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if actif:
+            gc.enable()
+
+def obtenir_catalogue(strategie=CHARGEMENT_SELECTIN, codes_universites=None, ville=None, universite_ids=None):
+    """
+    Universités (triées par nom) avec leurs facultés (triées par nom), sans une
+    requête par université
+    
+    Args:
+        strategie: Chargement des facultés
+            - CHARGEMENT_SELECTIN : une requête pour les universités, puis les facultés
+              par paquets de 500 universités (selectinload) ;
+            - CHARGEMENT_JOINT : une seule requête, universités et facultés jointes
+              (chaque université est répétée sur chaque ligne de ses facultés) ;
+            - CHARGEMENT_LIGNES : une seule requête de colonnes, regroupées en Python en
+              UniversiteCatalogue/FaculteCatalogue, sans objets ORM (grands catalogues,
+              lecture seule).
+        codes_universites, ville, universite_ids: Filtres (None : pas de filtre)
+    
+    Returns:
+        Liste d'universités dont l'attribut facultes est déjà chargé
+    """
+    session_lue = session_de_lecture()
+    
+    if strategie == CHARGEMENT_SELECTIN:
+        requete = select(Universite).options(selectinload(Universite.facultes)).order_by(Universite.nom)
+        with _sans_ramasse_miettes():
+            universites = session_lue.scalars(
+                _filtres_catalogue(requete, codes_universites, ville, universite_ids)).all()
+        # Tri des facultés par nom, sur place (sans événement ni historique) : noms lus
+        # dans le cache de NOMS_FACULTES, sans requête
+        if not NOMS_FACULTES.charge:
+            NOMS_FACULTES.charger()
+        noms = NOMS_FACULTES.textes
+        for universite in universites:
+            universite.facultes.sort(key=lambda faculte: noms.get(faculte.nom_id) or faculte.nom)
+        return universites
+    
+    if strategie == CHARGEMENT_JOINT:
+        requete = (
+            select(Universite)
+            .outerjoin(Faculte, Faculte.universite_id == Universite.id)
+            .outerjoin(NomFaculte, Faculte.nom_id == NomFaculte.id)
+            .options(contains_eager(Universite.facultes))
+            .order_by(Universite.nom, NomFaculte.nom)
+        )
+        with _sans_ramasse_miettes():
+            return session_lue.scalars(
+                _filtres_catalogue(requete, codes_universites, ville, universite_ids)).unique().all()
+    
+    if strategie == CHARGEMENT_LIGNES:
+        # Parcours de l'index couvrant (universite_id, nom_id, ...) : pas de lecture de la table facultes
+        requete = (
+            select(Universite.id, Universite.nom, Universite.ville_id, Universite.code_universite,
+                   Universite.annee_fondation, Universite.nb_facultes, Universite.total_etudiants,
+                   Faculte.id, Faculte.nom_id, Faculte.code_id, Faculte.nombre_etudiants)
+            .outerjoin(Faculte, Faculte.universite_id == Universite.id)
+            .order_by(Universite.nom)
+        )
+        lignes = session_lue.execute(_filtres_catalogue(requete, codes_universites, ville, universite_ids))
+        
+        universites = []
+        with _sans_ramasse_miettes():
+            for universite, groupe in groupby(lignes, key=lambda ligne: ligne[:7]):
+                identifiant, nom, ville_id, code, annee, nb_facultes, total_etudiants = universite
+                facultes = sorted(
+                    (FaculteCatalogue(ligne[7], NOMS_FACULTES.texte(ligne[8]), CODES_FACULTES.texte(ligne[9]),
+                                      ligne[10], identifiant)
+                     for ligne in groupe if ligne[7] is not None),
+                    key=_cle_nom)
+                universites.append(UniversiteCatalogue(
+                    identifiant, nom, VILLES.texte(ville_id), code, annee, nb_facultes, total_etudiants, facultes))
+        return universites
+    
+    raise ValueError(f"Stratégie de chargement inconnue : {strategie} (choix : {', '.join(STRATEGIES_CATALOGUE)})")
+
+def verifier_compteurs(reparer=False):
+    """
+    Compare les compteurs dénormalisés des universités avec la table facultes
+    
+    Args:
+        reparer: Si True, recalcule tous les compteurs lorsqu'un écart est trouvé
+    
+    Returns:
+        Liste des écarts (code, nb_facultes, nb_reel, total_etudiants, total_reel)
+    """
+    ecarts = session.execute(text("""
+        SELECT u.code_universite, u.nb_facultes, COUNT(f.id),
+               u.total_etudiants, COALESCE(SUM(f.nombre_etudiants), 0)
+        FROM universites u
+        LEFT JOIN facultes f ON f.universite_id = u.id
+        GROUP BY u.id
+        HAVING u.nb_facultes != COUNT(f.id)
+            OR u.total_etudiants != COALESCE(SUM(f.nombre_etudiants), 0)
+    """)).all()
+    
+    if ecarts and reparer:
+        reconstruire_compteurs()
+    else:
+        # Terminer la transaction de lecture
+        session.commit()
+    
+    return ecarts
+
+def reconstruire_compteurs():
+    """Recalcule nb_facultes et total_etudiants pour toutes les universités"""
+    try:
+        session.execute(text(SQL_RECONSTRUIRE_COMPTEURS))
+        session.commit()
+        print("Compteurs des universités reconstruits")
+    except Exception as e:
+        session.rollback()
+        print(f"Erreur lors de la reconstruction des compteurs : {e}")
+
 def afficher_toutes_les_donnees():
     """Affiche toutes les données de la base de données"""
     print("\n" + "="*60)
@@ -266,8 +1242,8 @@ def afficher_toutes_les_donnees():
     print(f"   - {stats['universites']} universités")
     print(f"   - {stats['facultes']} facultés")
     
-    # Afficher toutes les universités avec leurs facultés
-    universites = obtenir_universites()
+    # Afficher toutes les universités avec leurs facultés (chargées en une requête, sans objets ORM)
+    universites = obtenir_catalogue(CHARGEMENT_LIGNES)
     for univ in universites:
         print(f"\nUNIVERSITE : {univ.nom}")
         print(f"   Ville : {univ.ville}")
@@ -275,10 +1251,9 @@ def afficher_toutes_les_donnees():
         if univ.annee_fondation:
             print(f"   Fondée en : {univ.annee_fondation}")
         
-        facultes = obtenir_facultes_par_universite(univ.id)
-        if facultes:
-            print(f"   Facultés ({len(facultes)}):")
-            for fac in facultes:
+        if univ.facultes:
+            print(f"   Facultés ({univ.nb_facultes}) - {univ.total_etudiants} étudiants :")
+            for fac in univ.facultes:
                 print(f"      - {fac.nom} ({fac.code_faculte}) - {fac.nombre_etudiants} étudiants")
         else:
             print(f"   Aucune faculté")
@@ -3,18 +3,31 @@
 """
 Script de test et démonstration pour le système Universités/Facultés
 Montre la relation 1-à-N et les listes dépendantes
+
+Les tests ajoutent et suppriment des données : ils travaillent par défaut sur une
+copie jetable du gabarit de base (voir gabarits.py), jamais sur universites_facultes.db.
+
+    python demo.py                    # copie en mémoire du gabarit "base"
+    python demo.py --gabarit moyen    # copie d'un gabarit plus gros (construit au premier usage)
+    python demo.py --base-reelle      # ancienne manière : directement sur universites_facultes.db
 """
 
+import argparse
+from contextlib import nullcontext
+
+import gabarits
 from database import (session, Universite, Faculte, 
-                     obtenir_universites, obtenir_facultes_par_universite,
-                     ajouter_faculte, initialiser_donnees)
+                     obtenir_universites, obtenir_facultes_par_universite, obtenir_catalogue,
+                     ajouter_faculte, initialiser_donnees, CHARGEMENT_LIGNES)
 
 def test_relation_1_to_n():
     """Test de la relation 1-à-N entre Universités et Facultés"""
     print("=== TEST RELATION 1-À-N ===")
     
     # Vérifier qu'une université peut avoir plusieurs facultés
-    udem = session.query(Universite).filter_by(nom="Université de Montréal").first()
+    # (facultés chargées avec l'université : udem.facultes ne relance pas de requête)
+    catalogue = obtenir_catalogue(codes_universites=["UdeM"])
+    udem = catalogue[0] if catalogue else None
     if udem:
         print(f"Université : {udem.nom}")
         print(f"Nombre de facultés : {len(udem.facultes)}")
@@ -118,19 +131,20 @@ def afficher_donnees_completes():
     """Affiche toutes les données de la base"""
     print("=== DONNÉES COMPLÈTES DE LA BASE ===")
     
-    universites_liste = obtenir_universites()
+    # Toutes les facultés en une requête plutôt qu'une requête par université
+    universites_liste = obtenir_catalogue(CHARGEMENT_LIGNES)
     
     for universite in universites_liste:
         print(f"\n{universite.nom} ({universite.code_universite}) - {universite.ville}")
-        facultes = obtenir_facultes_par_universite(universite.id)
         
-        if facultes:
-            for faculte in facultes:
+        if universite.facultes:
+            for faculte in universite.facultes:
                 print(f"  - {faculte.nom} ({faculte.code_faculte}) : {faculte.nombre_etudiants} étudiants")
         else:
             print("  (Aucune faculté)")
     
-    print(f"\nTOTAL : {len(universites_liste)} universités, {session.query(Faculte).count()} facultés")
+    nb_facultes = sum(len(universite.facultes) for universite in universites_liste)
+    print(f"\nTOTAL : {len(universites_liste)} universités, {nb_facultes} facultés")
     print()
 
 def demonstration_listes_dependantes():
@@ -164,10 +178,7 @@ def demonstration_listes_dependantes():
     
     print()
 
-if __name__ == "__main__":
-    print(" DÉMONSTRATION COMPLÈTE - SYSTÈME UNIVERSITÉS/FACULTÉS")
-    print("=" * 60)
-    
+def executer_tests():
     # Initialiser les données
     initialiser_donnees()
     
@@ -187,3 +198,23 @@ if __name__ == "__main__":
         print(f"Erreur lors des tests : {e}")
     finally:
         session.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Démonstration du système Universités/Facultés")
+    parser.add_argument("--gabarit", choices=tuple(gabarits.GABARITS), default="base",
+                        help="Gabarit copié pour la démonstration")
+    parser.add_argument("--fichier", action="store_true",
+                        help="Copier le gabarit dans un fichier temporaire plutôt qu'en mémoire")
+    parser.add_argument("--base-reelle", action="store_true",
+                        help="Travailler directement sur universites_facultes.db (modifiée par les tests)")
+    options = parser.parse_args()
+    
+    print(" DÉMONSTRATION COMPLÈTE - SYSTÈME UNIVERSITÉS/FACULTÉS")
+    print("=" * 60)
+    
+    if options.base_reelle:
+        contexte = nullcontext()
+    else:
+        contexte = gabarits.base_ephemere(options.gabarit, en_memoire=not options.fichier)
+    with contexte:
+        executer_tests()
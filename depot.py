@@ -0,0 +1,751 @@
+# -*- coding: utf-8 -*-
+"""
+Dépôts des universités et facultés : une interface, deux implémentations
+
+    - DepotSQLAlchemy : la base SQLite, par les fonctions de database.py ;
+    - DepotMemoire : tout en mémoire, avec des index (dictionnaires et listes triées)
+      sur l'identifiant, le code, le nom et l'université des facultés. Aucune
+      entrée/sortie : simulations, démonstrations et vérifications rapides.
+
+Les deux dépôts rendent des objets aux mêmes attributs (id, nom, ville,
+code_universite, nb_facultes... / id, nom, code_faculte, nombre_etudiants,
+universite_id), à ne pas modifier directement. Comme dans database.py, une
+opération refusée affiche la raison et retourne None (ou False).
+
+CONFORMITE liste les vérifications que tout dépôt doit passer (voir
+verifier_conformite et `python benchmarks.py depot`).
+"""
+
+from bisect import bisect_left, insort
+from heapq import nlargest
+
+from doublons import IndexDoublons, normaliser, similarite, SEUIL_DEFAUT
+from validation import valider_universite, valider_faculte, valider_nombre_etudiants
+
+
+class Depot:
+    """Opérations de l'application sur les universités et facultés"""
+
+    # Les données vivent dans la base SQLite (catalogue, exportation, entretien possibles)
+    base_sqlite = False
+
+    def universites(self):
+        """Toutes les universités triées par nom"""
+        raise NotImplementedError
+
+    def universite(self, universite_id):
+        """Université par identifiant (None si inconnue)"""
+        raise NotImplementedError
+
+    def universite_existante(self, nom, code_universite):
+        """Université portant ce nom ou ce code (None s'il n'y en a pas)"""
+        raise NotImplementedError
+
+    def faculte(self, faculte_id):
+        """Faculté par identifiant (None si inconnue)"""
+        raise NotImplementedError
+
+    def facultes_par_universite(self, universite_id):
+        """Facultés d'une université triées par nom"""
+        raise NotImplementedError
+
+    def facultes_par_code_universite(self, code_universite):
+        """Facultés de l'université de ce code triées par nom"""
+        raise NotImplementedError
+
+    def ajouter_universite(self, nom, ville, code_universite, annee_fondation=None):
+        """Université créée, ou None (données invalides, nom ou code déjà utilisé)"""
+        raise NotImplementedError
+
+    def ajouter_faculte(self, nom_faculte, code_faculte, nombre_etudiants, universite_id):
+        """Faculté créée, ou None (données invalides, université inconnue, nom déjà utilisé dans l'université)"""
+        raise NotImplementedError
+
+    def supprimer_universite(self, universite_id):
+        """Supprime l'université et ses facultés ; False si elle n'existe pas"""
+        raise NotImplementedError
+
+    def supprimer_faculte(self, faculte_id):
+        """Supprime la faculté ; False si elle n'existe pas"""
+        raise NotImplementedError
+
+    def facultes_des_universites(self, universite_ids):
+        """Facultés de plusieurs universités, triées par nom d'université puis par nom"""
+        raise NotImplementedError
+
+    def statistiques(self):
+        """{"universites": nombre, "facultes": nombre}"""
+        raise NotImplementedError
+
+    # Classements par nombre d'étudiants : tout le catalogue, une ville ou un code de faculté
+
+    def classement_facultes(self, limite=10, ville=None, code_faculte=None):
+        """Plus grandes facultés : liste de database.FaculteClassee (ex æquo au même rang)"""
+        raise NotImplementedError
+
+    def rang_faculte(self, faculte_id, ville=None, code_faculte=None):
+        """Rang de la faculté (1 = la plus grande) ; None si inconnue, sans effectif ou hors de la portée"""
+        raise NotImplementedError
+
+    def tranches_effectifs(self, nb_tranches=4, ville=None, code_faculte=None):
+        """Tranches de même taille par effectif : liste de {"tranche", "facultes", "minimum", "maximum", "moyenne"}"""
+        raise NotImplementedError
+
+    # Opérations par lot : tout ou rien, nombre de lignes touchées ou None si refusé
+
+    def supprimer_facultes(self, faculte_ids):
+        """Supprime plusieurs facultés ; nombre supprimé"""
+        raise NotImplementedError
+
+    def supprimer_universites(self, universite_ids):
+        """Supprime plusieurs universités et leurs facultés ; nombre d'universités supprimées"""
+        raise NotImplementedError
+
+    def reassigner_facultes(self, faculte_ids, universite_id):
+        """Rattache des facultés à une autre université (refusé en cas de nom en double) ; nombre déplacé"""
+        raise NotImplementedError
+
+    def modifier_nombre_etudiants(self, faculte_ids, nombre=None, ecart=None):
+        """Fixe (nombre) ou décale (ecart) l'effectif de plusieurs facultés ; nombre modifié"""
+        raise NotImplementedError
+
+    def doublons_universite(self, nom, seuil=SEUIL_DEFAUT):
+        """Universités au nom proche : liste de (id, nom, ville, similarité)"""
+        raise NotImplementedError
+
+    def doublons_faculte(self, nom_faculte, universite_id, seuil=SEUIL_DEFAUT):
+        """Facultés de l'université au nom proche : liste de (id, nom, similarité)"""
+        raise NotImplementedError
+
+    def fermer(self):
+        """Termine les écritures en cours (fermeture de l'application)"""
+
+
+class DepotSQLAlchemy(Depot):
+    """Dépôt de la base SQLite (session globale de database.py, réplique comprise)"""
+
+    base_sqlite = True
+
+    def __init__(self):
+        import database
+        self.database = database
+
+    def universites(self):
+        return self.database.obtenir_universites()
+
+    def universite(self, universite_id):
+        return self.database.session_de_lecture().get(self.database.Universite, universite_id)
+
+    def universite_existante(self, nom, code_universite):
+        database = self.database
+        identifiant = database.session.scalars(
+            database.REQUETE_UNIVERSITE_EXISTANTE, {"nom": nom, "code_universite": code_universite}).first()
+        return database.session.get(database.Universite, identifiant) if identifiant is not None else None
+
+    def faculte(self, faculte_id):
+        return self.database.session_de_lecture().get(self.database.Faculte, faculte_id)
+
+    def facultes_par_universite(self, universite_id):
+        return self.database.obtenir_facultes_par_universite(universite_id)
+
+    def facultes_par_code_universite(self, code_universite):
+        return self.database.obtenir_facultes_par_code_universite(code_universite)
+
+    def ajouter_universite(self, nom, ville, code_universite, annee_fondation=None):
+        return self.database.ajouter_universite(nom, ville, code_universite, annee_fondation)
+
+    def ajouter_faculte(self, nom_faculte, code_faculte, nombre_etudiants, universite_id):
+        return self.database.ajouter_faculte(nom_faculte, code_faculte, nombre_etudiants, universite_id)
+
+    def _supprimer(self, modele, identifiant):
+        session = self.database.session
+        try:
+            objet = session.get(modele, identifiant)
+            if objet is None:
+                return False
+            session.delete(objet)
+            session.commit()
+            return True
+        except Exception as e:
+            session.rollback()
+            print(f"Erreur lors de la suppression : {e}")
+            return False
+
+    def supprimer_universite(self, universite_id):
+        return self._supprimer(self.database.Universite, universite_id)
+
+    def supprimer_faculte(self, faculte_id):
+        return self._supprimer(self.database.Faculte, faculte_id)
+
+    def facultes_des_universites(self, universite_ids):
+        return self.database.obtenir_facultes_des_universites(universite_ids)
+
+    def statistiques(self):
+        return self.database.obtenir_statistiques()
+
+    def classement_facultes(self, limite=10, ville=None, code_faculte=None):
+        return self.database.obtenir_classement_facultes(limite, ville, code_faculte)
+
+    def rang_faculte(self, faculte_id, ville=None, code_faculte=None):
+        return self.database.obtenir_rang_faculte(faculte_id, ville, code_faculte)
+
+    def tranches_effectifs(self, nb_tranches=4, ville=None, code_faculte=None):
+        return self.database.obtenir_tranches_effectifs(nb_tranches, ville, code_faculte)
+
+    def supprimer_facultes(self, faculte_ids):
+        return self.database.supprimer_facultes(faculte_ids)
+
+    def supprimer_universites(self, universite_ids):
+        return self.database.supprimer_universites(universite_ids)
+
+    def reassigner_facultes(self, faculte_ids, universite_id):
+        return self.database.reassigner_facultes(faculte_ids, universite_id)
+
+    def modifier_nombre_etudiants(self, faculte_ids, nombre=None, ecart=None):
+        return self.database.modifier_nombre_etudiants(faculte_ids, nombre, ecart)
+
+    def doublons_universite(self, nom, seuil=SEUIL_DEFAUT):
+        import doublons
+        return doublons.doublons_universite(nom, seuil)
+
+    def doublons_faculte(self, nom_faculte, universite_id, seuil=SEUIL_DEFAUT):
+        import doublons
+        return doublons.doublons_faculte(nom_faculte, universite_id, seuil)
+
+
+class FicheUniversite:
+    """Université du dépôt en mémoire (mêmes attributs que database.Universite)"""
+
+    __slots__ = ("id", "nom", "ville", "code_universite", "annee_fondation", "nb_facultes", "total_etudiants")
+
+    def __init__(self, id, nom, ville, code_universite, annee_fondation=None):
+        self.id = id
+        self.nom = nom
+        self.ville = ville
+        self.code_universite = code_universite
+        self.annee_fondation = annee_fondation
+        self.nb_facultes = 0
+        self.total_etudiants = 0
+
+    def __repr__(self):
+        return f"<FicheUniversite(id={self.id}, nom='{self.nom}', ville='{self.ville}', code='{self.code_universite}')>"
+
+
+class FicheFaculte:
+    """Faculté du dépôt en mémoire (mêmes attributs que database.Faculte)"""
+
+    __slots__ = ("id", "nom", "code_faculte", "nombre_etudiants", "universite_id")
+
+    def __init__(self, id, nom, code_faculte, nombre_etudiants, universite_id):
+        self.id = id
+        self.nom = nom
+        self.code_faculte = code_faculte
+        self.nombre_etudiants = nombre_etudiants
+        self.universite_id = universite_id
+
+    def __repr__(self):
+        return (f"<FicheFaculte(id={self.id}, nom='{self.nom}', code='{self.code_faculte}', "
+                f"etudiants={self.nombre_etudiants}, universite_id={self.universite_id})>")
+
+
+class DepotMemoire(Depot):
+    """
+    Dépôt entièrement en mémoire
+
+    Index :
+        - identifiant -> fiche (universités, facultés) ;
+        - code et nom -> identifiant d'université ;
+        - liste triée des (nom, id) des universités : liste complète dans l'ordre ;
+        - par université, liste triée des (nom, id) de ses facultés : liste dans
+          l'ordre et recherche d'un nom par dichotomie.
+    """
+
+    def __init__(self):
+        self._universites = {}
+        self._facultes = {}
+        self._ids_par_code = {}
+        self._ids_par_nom = {}
+        self._noms_tries = []
+        self._facultes_triees = {}
+        self._index_doublons = IndexDoublons()
+        self._dernier_id_universite = 0
+        self._dernier_id_faculte = 0
+
+    @classmethod
+    def avec_donnees_initiales(cls):
+        """Dépôt rempli des universités et facultés de initialiser_donnees()"""
+        from database import UNIVERSITES_INITIALES, FACULTES_INITIALES
+
+        depot = cls()
+        for donnees in UNIVERSITES_INITIALES:
+            depot._inserer_universite(donnees["nom"], donnees["ville"], donnees["code"], donnees["annee"])
+        for donnees in FACULTES_INITIALES:
+            universite = depot._universites[depot._ids_par_code[donnees["universite_code"]]]
+            depot._inserer_faculte(donnees["nom"], donnees["code"], donnees["etudiants"], universite)
+        return depot
+
+    @classmethod
+    def depuis_catalogue(cls, catalogue):
+        """
+        Dépôt rempli sans validation ni message depuis database.obtenir_catalogue()
+
+        Les identifiants sont renumérotés dans l'ordre du catalogue.
+        """
+        depot = cls()
+        for universite in catalogue:
+            fiche = depot._inserer_universite(universite.nom, universite.ville, universite.code_universite,
+                                              universite.annee_fondation)
+            for faculte in universite.facultes:
+                depot._inserer_faculte(faculte.nom, faculte.code_faculte, faculte.nombre_etudiants, fiche)
+        return depot
+
+    # --- Lectures --------------------------------------------------------------
+
+    def universites(self):
+        return [self._universites[identifiant] for _, identifiant in self._noms_tries]
+
+    def universite(self, universite_id):
+        return self._universites.get(universite_id)
+
+    def universite_existante(self, nom, code_universite):
+        identifiant = self._ids_par_nom.get(nom)
+        if identifiant is None:
+            identifiant = self._ids_par_code.get(code_universite)
+        return self._universites.get(identifiant)
+
+    def faculte(self, faculte_id):
+        return self._facultes.get(faculte_id)
+
+    def facultes_par_universite(self, universite_id):
+        return [self._facultes[identifiant] for _, identifiant in self._facultes_triees.get(universite_id, ())]
+
+    def facultes_par_code_universite(self, code_universite):
+        identifiant = self._ids_par_code.get(code_universite)
+        return self.facultes_par_universite(identifiant) if identifiant is not None else []
+
+    def facultes_des_universites(self, universite_ids):
+        universites = sorted((self._universites[identifiant] for identifiant in set(universite_ids)
+                              if identifiant in self._universites), key=lambda universite: universite.nom)
+        return [faculte for universite in universites for faculte in self.facultes_par_universite(universite.id)]
+
+    def statistiques(self):
+        return {"universites": len(self._universites), "facultes": len(self._facultes)}
+
+    def _facultes_classees(self, ville, code_faculte):
+        """Facultés avec un effectif, d'une ville ou d'un code de faculté (parcours de toutes les fiches)"""
+        return [faculte for faculte in self._facultes.values()
+                if faculte.nombre_etudiants is not None
+                and (not code_faculte or faculte.code_faculte == code_faculte)
+                and (not ville or self._universites[faculte.universite_id].ville == ville)]
+
+    def classement_facultes(self, limite=10, ville=None, code_faculte=None):
+        from database import FaculteClassee
+
+        # Même ordre que la base : effectif puis identifiant décroissants
+        plus_grandes = nlargest(limite, self._facultes_classees(ville, code_faculte),
+                                key=lambda faculte: (faculte.nombre_etudiants, faculte.id))
+        classement = []
+        for position, faculte in enumerate(plus_grandes, 1):
+            precedente = classement[-1] if classement else None
+            rang = (precedente.rang if precedente and precedente.nombre_etudiants == faculte.nombre_etudiants
+                    else position)
+            classement.append(FaculteClassee(rang, faculte.id, faculte.nom, faculte.code_faculte,
+                                             faculte.nombre_etudiants, faculte.universite_id,
+                                             self._universites[faculte.universite_id].nom))
+        return classement
+
+    def rang_faculte(self, faculte_id, ville=None, code_faculte=None):
+        portee = self._facultes_classees(ville, code_faculte)
+        faculte = self._facultes.get(faculte_id)
+        if faculte not in portee:
+            return None
+        return 1 + sum(1 for autre in portee if autre.nombre_etudiants > faculte.nombre_etudiants)
+
+    def tranches_effectifs(self, nb_tranches=4, ville=None, code_faculte=None):
+        effectifs = sorted(faculte.nombre_etudiants for faculte in self._facultes_classees(ville, code_faculte))
+        # Découpage de NTILE : les premières tranches ont une faculté de plus si le compte ne tombe pas juste
+        taille, reste = divmod(len(effectifs), nb_tranches)
+        tranches = []
+        debut = 0
+        for tranche in range(1, nb_tranches + 1):
+            longueur = taille + (1 if tranche <= reste else 0)
+            if not longueur:
+                break
+            plage = effectifs[debut:debut + longueur]
+            tranches.append({"tranche": tranche, "facultes": longueur, "minimum": plage[0],
+                             "maximum": plage[-1], "moyenne": sum(plage) / longueur})
+            debut += longueur
+        return tranches
+
+    def _faculte_nommee(self, universite_id, nom_faculte):
+        """Identifiant de la faculté de ce nom dans l'université (None s'il n'y en a pas)"""
+        triees = self._facultes_triees.get(universite_id, [])
+        position = bisect_left(triees, (nom_faculte,))
+        if position < len(triees) and triees[position][0] == nom_faculte:
+            return triees[position][1]
+        return None
+
+    # --- Écritures -------------------------------------------------------------
+
+    def ajouter_universite(self, nom, ville, code_universite, annee_fondation=None):
+        erreur = valider_universite(nom, ville, code_universite, annee_fondation)
+        if erreur:
+            print(f"Erreur : {erreur}")
+            return None
+        if self.universite_existante(nom, code_universite):
+            print(f"Erreur : Une université avec ce nom ou ce code existe déjà")
+            return None
+
+        universite = self._inserer_universite(nom, ville, code_universite, annee_fondation)
+        print(f"Université '{nom}' ajoutée avec succès")
+        return universite
+
+    def ajouter_faculte(self, nom_faculte, code_faculte, nombre_etudiants, universite_id):
+        erreur = valider_faculte(nom_faculte, code_faculte, nombre_etudiants)
+        if erreur:
+            print(f"Erreur : {erreur}")
+            return None
+        universite = self._universites.get(universite_id)
+        if universite is None:
+            print(f"Erreur : L'université avec l'ID {universite_id} n'existe pas")
+            return None
+        if self._faculte_nommee(universite_id, nom_faculte) is not None:
+            print(f"Erreur : La faculté '{nom_faculte}' existe déjà pour {universite.nom}")
+            return None
+
+        faculte = self._inserer_faculte(nom_faculte, code_faculte, nombre_etudiants, universite)
+        print(f"Faculté '{nom_faculte}' ajoutée avec succès à {universite.nom}")
+        return faculte
+
+    def _inserer_universite(self, nom, ville, code_universite, annee_fondation):
+        self._dernier_id_universite += 1
+        universite = FicheUniversite(self._dernier_id_universite, nom, ville, code_universite, annee_fondation)
+        self._universites[universite.id] = universite
+        self._ids_par_code[code_universite] = universite.id
+        self._ids_par_nom[nom] = universite.id
+        insort(self._noms_tries, (nom, universite.id))
+        self._facultes_triees[universite.id] = []
+        self._index_doublons.ajouter(universite.id, nom)
+        return universite
+
+    def _inserer_faculte(self, nom_faculte, code_faculte, nombre_etudiants, universite):
+        self._dernier_id_faculte += 1
+        faculte = FicheFaculte(self._dernier_id_faculte, nom_faculte, code_faculte, nombre_etudiants, universite.id)
+        self._ajouter_fiche_faculte(faculte, universite)
+        return faculte
+
+    def _ajouter_fiche_faculte(self, faculte, universite):
+        self._facultes[faculte.id] = faculte
+        insort(self._facultes_triees[universite.id], (faculte.nom, faculte.id))
+        # Compteurs tenus à jour comme par les triggers de la base
+        universite.nb_facultes += 1
+        universite.total_etudiants += faculte.nombre_etudiants or 0
+
+    def supprimer_faculte(self, faculte_id):
+        faculte = self._facultes.pop(faculte_id, None)
+        if faculte is None:
+            return False
+        triees = self._facultes_triees[faculte.universite_id]
+        del triees[bisect_left(triees, (faculte.nom, faculte.id))]
+        universite = self._universites[faculte.universite_id]
+        universite.nb_facultes -= 1
+        universite.total_etudiants -= faculte.nombre_etudiants or 0
+        return True
+
+    def supprimer_universite(self, universite_id):
+        universite = self._universites.pop(universite_id, None)
+        if universite is None:
+            return False
+        for _, faculte_id in self._facultes_triees.pop(universite_id):
+            del self._facultes[faculte_id]
+        del self._ids_par_code[universite.code_universite]
+        del self._ids_par_nom[universite.nom]
+        del self._noms_tries[bisect_left(self._noms_tries, (universite.nom, universite.id))]
+        # L'index des doublons garde l'identifiant : écarté à la recherche
+        return True
+
+    # --- Opérations par lot ------------------------------------------------------
+    # Vérifications d'abord, modifications ensuite : un lot refusé ne change rien
+
+    def supprimer_facultes(self, faculte_ids):
+        return sum(self.supprimer_faculte(identifiant) for identifiant in set(faculte_ids))
+
+    def supprimer_universites(self, universite_ids):
+        return sum(self.supprimer_universite(identifiant) for identifiant in set(universite_ids))
+
+    def reassigner_facultes(self, faculte_ids, universite_id):
+        universite = self._universites.get(universite_id)
+        if universite is None:
+            print(f"Erreur : L'université avec l'ID {universite_id} n'existe pas")
+            return None
+
+        deplacees = [self._facultes[identifiant] for identifiant in set(faculte_ids)
+                     if identifiant in self._facultes and self._facultes[identifiant].universite_id != universite_id]
+        noms = [nom for nom, _ in self._facultes_triees[universite_id]] + [faculte.nom for faculte in deplacees]
+        conflits = sorted({nom for nom in noms if noms.count(nom) > 1})
+        if conflits:
+            print(f"Erreur : {universite.nom} aurait plusieurs facultés nommées {', '.join(conflits[:5])}")
+            return None
+
+        for faculte in deplacees:
+            self.supprimer_faculte(faculte.id)
+            faculte.universite_id = universite_id
+            self._ajouter_fiche_faculte(faculte, universite)
+        return len(deplacees)
+
+    def modifier_nombre_etudiants(self, faculte_ids, nombre=None, ecart=None):
+        if (nombre is None) == (ecart is None):
+            raise ValueError("Donner soit nombre, soit ecart")
+
+        facultes = [self._facultes[identifiant] for identifiant in set(faculte_ids) if identifiant in self._facultes]
+        nouveaux = [nombre if nombre is not None else (faculte.nombre_etudiants or 0) + ecart for faculte in facultes]
+        erreur = next(filter(None, map(valider_nombre_etudiants, nouveaux)), None)
+        if erreur:
+            print(f"Erreur : {erreur}")
+            return None
+
+        for faculte, nouveau in zip(facultes, nouveaux):
+            self._universites[faculte.universite_id].total_etudiants += nouveau - (faculte.nombre_etudiants or 0)
+            faculte.nombre_etudiants = nouveau
+        return len(facultes)
+
+    # --- Quasi-doublons --------------------------------------------------------
+
+    def doublons_universite(self, nom, seuil=SEUIL_DEFAUT):
+        resultats = []
+        for identifiant, _, _ in self._index_doublons.chercher(nom, seuil=seuil):
+            universite = self._universites.get(identifiant)
+            if universite is not None:
+                resultats.append((identifiant, universite.nom, universite.ville,
+                                  similarite(normaliser(nom), normaliser(universite.nom))))
+        return resultats
+
+    def doublons_faculte(self, nom_faculte, universite_id, seuil=SEUIL_DEFAUT):
+        normalise = normaliser(nom_faculte)
+        resultats = []
+        for nom, identifiant in self._facultes_triees.get(universite_id, ()):
+            score = similarite(normalise, normaliser(nom))
+            if score >= seuil:
+                resultats.append((identifiant, nom, score))
+        return sorted(resultats, key=lambda resultat: -resultat[2])
+
+
+# --- Vérifications de conformité ------------------------------------------------
+# Chaque vérification reçoit un dépôt vide et lève AssertionError en cas d'écart
+
+def _attendre(condition, message):
+    if not condition:
+        raise AssertionError(message)
+
+
+def _conformite_vide(depot):
+    _attendre(depot.universites() == [], "un dépôt vide liste des universités")
+    _attendre(depot.statistiques() == {"universites": 0, "facultes": 0}, "statistiques d'un dépôt vide")
+    _attendre(depot.universite(1) is None, "université inconnue trouvée")
+    _attendre(depot.facultes_par_universite(1) == [], "facultés d'une université inconnue")
+    _attendre(depot.facultes_par_code_universite("INCONNU") == [], "facultés d'un code inconnu")
+
+
+def _conformite_universites(depot):
+    laval = depot.ajouter_universite("Université Laval", "Québec", "UL", 1663)
+    uqam = depot.ajouter_universite("UQAM", "Montréal", "UQAM", 1969)
+    concordia = depot.ajouter_universite("Concordia University", "Montréal", "CONC")
+    _attendre(None not in (laval, uqam, concordia), "ajout d'université refusé")
+    _attendre([u.nom for u in depot.universites()] == ["Concordia University", "UQAM", "Université Laval"],
+              "universités non triées par nom")
+    lue = depot.universite(laval.id)
+    _attendre((lue.nom, lue.ville, lue.code_universite, lue.annee_fondation, lue.nb_facultes, lue.total_etudiants)
+              == ("Université Laval", "Québec", "UL", 1663, 0, 0), "attributs de l'université relue")
+    _attendre(depot.universite(concordia.id).annee_fondation is None, "année de fondation absente")
+    _attendre(depot.universite_existante("UQAM", "AUTRE").id == uqam.id, "université existante par nom")
+    _attendre(depot.universite_existante("Autre", "UL").id == laval.id, "université existante par code")
+    _attendre(depot.universite_existante("Autre", "AUTRE") is None, "université existante inventée")
+    _attendre(depot.statistiques() == {"universites": 3, "facultes": 0}, "statistiques après ajouts")
+
+
+def _conformite_refus_universites(depot):
+    depot.ajouter_universite("UQAM", "Montréal", "UQAM")
+    _attendre(depot.ajouter_universite("UQAM", "Québec", "AUTRE") is None, "nom en double accepté")
+    _attendre(depot.ajouter_universite("Autre", "Québec", "UQAM") is None, "code en double accepté")
+    _attendre(depot.ajouter_universite("", "Québec", "VIDE") is None, "nom vide accepté")
+    _attendre(depot.ajouter_universite("Trop Long", "Québec", "X" * 11) is None, "code trop long accepté")
+    _attendre(depot.ajouter_universite("Ancienne", "Québec", "ANC", 999) is None, "année trop ancienne acceptée")
+    _attendre(depot.statistiques()["universites"] == 1, "université refusée enregistrée")
+
+
+def _conformite_facultes(depot):
+    udem = depot.ajouter_universite("Université de Montréal", "Montréal", "UdeM", 1878)
+    laval = depot.ajouter_universite("Université Laval", "Québec", "UL", 1663)
+    medecine = depot.ajouter_faculte("Faculté de Médecine", "MED", 2500, udem.id)
+    depot.ajouter_faculte("Faculté de Génie", "GENIE", 1800, udem.id)
+    depot.ajouter_faculte("Faculté de Droit", "DROIT", 1200, udem.id)
+    _attendre(medecine is not None and medecine.universite_id == udem.id, "ajout de faculté refusé")
+    _attendre([f.code_faculte for f in depot.facultes_par_universite(udem.id)] == ["DROIT", "GENIE", "MED"],
+              "facultés non triées par nom")
+    _attendre([f.nom for f in depot.facultes_par_code_universite("UdeM")]
+              == [f.nom for f in depot.facultes_par_universite(udem.id)], "facultés par code de l'université")
+    lue = depot.faculte(medecine.id)
+    _attendre((lue.nom, lue.code_faculte, lue.nombre_etudiants, lue.universite_id)
+              == ("Faculté de Médecine", "MED", 2500, udem.id), "attributs de la faculté relue")
+
+    # Même nom dans une autre université : permis ; dans la même : refusé
+    _attendre(depot.ajouter_faculte("Faculté de Médecine", "MED", 2000, laval.id) is not None,
+              "même nom refusé dans une autre université")
+    _attendre(depot.ajouter_faculte("Faculté de Médecine", "MED2", 10, udem.id) is None, "faculté en double acceptée")
+    _attendre(depot.ajouter_faculte("Faculté X", "X", 10, 99999) is None, "faculté d'une université inconnue acceptée")
+    _attendre(depot.ajouter_faculte("Faculté Y", "Y", -1, udem.id) is None, "effectif négatif accepté")
+
+    relue = depot.universite(udem.id)
+    _attendre((relue.nb_facultes, relue.total_etudiants) == (3, 5500), "compteurs de l'université après ajouts")
+    _attendre(depot.statistiques() == {"universites": 2, "facultes": 4}, "statistiques après ajouts")
+
+
+def _conformite_suppressions(depot):
+    udem = depot.ajouter_universite("Université de Montréal", "Montréal", "UdeM")
+    uqam = depot.ajouter_universite("UQAM", "Montréal", "UQAM")
+    droit = depot.ajouter_faculte("Faculté de Droit", "DROIT", 1200, udem.id)
+    depot.ajouter_faculte("Faculté de Génie", "GENIE", 1800, udem.id)
+    arts = depot.ajouter_faculte("Faculté des Arts", "ARTS", 1500, uqam.id)
+    droit_id, arts_id, udem_id = droit.id, arts.id, udem.id
+
+    _attendre(depot.supprimer_faculte(droit_id), "suppression de faculté refusée")
+    _attendre(depot.faculte(droit_id) is None, "faculté supprimée encore lue")
+    _attendre(not depot.supprimer_faculte(droit_id), "faculté supprimée deux fois")
+    relue = depot.universite(udem_id)
+    _attendre((relue.nb_facultes, relue.total_etudiants) == (1, 1800), "compteurs après suppression de faculté")
+
+    _attendre(depot.supprimer_universite(udem_id), "suppression d'université refusée")
+    _attendre(depot.universite(udem_id) is None, "université supprimée encore lue")
+    _attendre(depot.facultes_par_universite(udem_id) == [], "facultés d'une université supprimée")
+    _attendre(not depot.supprimer_universite(udem_id), "université supprimée deux fois")
+    _attendre([u.nom for u in depot.universites()] == ["UQAM"], "liste après suppression")
+    _attendre(depot.faculte(arts_id) is not None, "faculté d'une autre université supprimée")
+    _attendre(depot.statistiques() == {"universites": 1, "facultes": 1}, "statistiques après suppressions")
+
+    # Nom et code de nouveau libres
+    _attendre(depot.ajouter_universite("Université de Montréal", "Montréal", "UdeM") is not None,
+              "nom et code d'une université supprimée toujours pris")
+
+
+def _conformite_doublons(depot):
+    udem = depot.ajouter_universite("Université de Montréal", "Montréal", "UdeM")
+    depot.ajouter_universite("Université Laval", "Québec", "UL")
+    depot.ajouter_faculte("Faculté des Sciences", "SCI", 100, udem.id)
+    trouves = depot.doublons_universite("Universite de Montreal")
+    _attendre([(identifiant, nom, ville) for identifiant, nom, ville, _ in trouves]
+              == [(udem.id, "Université de Montréal", "Montréal")], "quasi-doublon d'université")
+    _attendre([nom for _, nom, _ in depot.doublons_faculte("Faculte des sciences", udem.id)]
+              == ["Faculté des Sciences"], "quasi-doublon de faculté")
+    _attendre(depot.doublons_universite("Polytechnique") == [], "doublon d'université inventé")
+
+    depot.supprimer_universite(udem.id)
+    _attendre(depot.doublons_universite("Universite de Montreal") == [], "doublon d'une université supprimée")
+
+
+def _conformite_lots(depot):
+    udem = depot.ajouter_universite("Université de Montréal", "Montréal", "UdeM")
+    laval = depot.ajouter_universite("Université Laval", "Québec", "UL")
+    uqam = depot.ajouter_universite("UQAM", "Montréal", "UQAM")
+    udem_id, laval_id, uqam_id = udem.id, laval.id, uqam.id
+    medecine = depot.ajouter_faculte("Faculté de Médecine", "MED", 2500, udem_id).id
+    droit = depot.ajouter_faculte("Faculté de Droit", "DROIT", 1200, udem_id).id
+    genie = depot.ajouter_faculte("Faculté de Génie", "GENIE", 1800, udem_id).id
+    depot.ajouter_faculte("Faculté de Médecine", "MED", 2000, laval_id)
+    arts = depot.ajouter_faculte("Faculté des Arts", "ARTS", 1500, uqam_id).id
+
+    _attendre([f.code_faculte for f in depot.facultes_des_universites([uqam_id, udem_id])]
+              == ["ARTS", "DROIT", "GENIE", "MED"], "facultés de plusieurs universités")
+
+    # Effectifs : fixés, décalés, jamais négatifs
+    _attendre(depot.modifier_nombre_etudiants([droit, genie], nombre=1000) == 2, "effectifs fixés")
+    _attendre(depot.modifier_nombre_etudiants([droit, medecine], ecart=-1100) is None, "effectif négatif accepté")
+    _attendre(depot.faculte(medecine).nombre_etudiants == 2500, "lot refusé appliqué en partie")
+    _attendre(depot.modifier_nombre_etudiants([droit, medecine], ecart=500) == 2, "effectifs décalés")
+    _attendre([depot.faculte(i).nombre_etudiants for i in (medecine, droit, genie)] == [3000, 1500, 1000],
+              "effectifs après modification")
+    _attendre(depot.universite(udem_id).total_etudiants == 5500, "total d'étudiants après modification")
+
+    # Déplacement : refusé si un nom serait en double dans l'université cible
+    _attendre(depot.reassigner_facultes([medecine, droit], laval_id) is None, "nom en double après déplacement")
+    _attendre(depot.faculte(droit).universite_id == udem_id, "lot refusé appliqué en partie")
+    _attendre(depot.reassigner_facultes([droit, genie], 99999) is None, "déplacement vers une université inconnue")
+    _attendre(depot.reassigner_facultes([droit, genie], laval_id) == 2, "déplacement refusé")
+    _attendre([f.code_faculte for f in depot.facultes_par_universite(laval_id)] == ["DROIT", "GENIE", "MED"],
+              "facultés de l'université cible")
+    udem, laval = depot.universite(udem_id), depot.universite(laval_id)
+    _attendre((udem.nb_facultes, udem.total_etudiants, laval.nb_facultes, laval.total_etudiants)
+              == (1, 3000, 3, 4500), "compteurs après déplacement")
+
+    # Suppressions
+    _attendre(depot.supprimer_facultes([droit, arts]) == 2, "suppression de facultés")
+    _attendre(depot.universite(uqam_id).nb_facultes == 0, "compteurs après suppression de facultés")
+    _attendre(depot.supprimer_universites([udem_id, laval_id]) == 2, "suppression d'universités")
+    _attendre(depot.statistiques() == {"universites": 1, "facultes": 0}, "statistiques après les lots")
+
+
+def _conformite_classements(depot):
+    udem = depot.ajouter_universite("Université de Montréal", "Montréal", "UdeM")
+    laval = depot.ajouter_universite("Université Laval", "Québec", "UL")
+    medecine_udem = depot.ajouter_faculte("Faculté de Médecine", "MED", 2500, udem.id).id
+    droit = depot.ajouter_faculte("Faculté de Droit", "DROIT", 1200, udem.id).id
+    genie = depot.ajouter_faculte("Faculté de Génie", "GENIE", 2500, udem.id).id
+    medecine_laval = depot.ajouter_faculte("Faculté de Médecine", "MED", 3000, laval.id).id
+    arts = depot.ajouter_faculte("Faculté des Arts", "ARTS", 800, laval.id).id
+
+    # Ex æquo : même rang, le plus récent d'abord
+    classement = depot.classement_facultes(3)
+    _attendre([(f.rang, f.id) for f in classement] == [(1, medecine_laval), (2, genie), (2, medecine_udem)],
+              "trois plus grandes facultés")
+    premiere = classement[0]
+    _attendre((premiere.nom, premiere.code_faculte, premiere.nombre_etudiants, premiere.universite_id,
+               premiere.universite) == ("Faculté de Médecine", "MED", 3000, laval.id, "Université Laval"),
+              "attributs d'une faculté classée")
+    _attendre([f.id for f in depot.classement_facultes(10, code_faculte="MED")] == [medecine_laval, medecine_udem],
+              "classement d'un code de faculté")
+    _attendre([f.id for f in depot.classement_facultes(10, ville="Québec")] == [medecine_laval, arts],
+              "classement d'une ville")
+    _attendre(depot.classement_facultes(10, code_faculte="INCONNU") == [], "classement d'un code inconnu")
+
+    _attendre([depot.rang_faculte(i) for i in (medecine_laval, genie, medecine_udem, droit, arts)] == [1, 2, 2, 4, 5],
+              "rangs dans tout le catalogue")
+    _attendre(depot.rang_faculte(medecine_udem, code_faculte="MED") == 2, "rang dans un code de faculté")
+    _attendre(depot.rang_faculte(droit, ville="Montréal") == 3, "rang dans une ville")
+    _attendre(depot.rang_faculte(droit, ville="Québec") is None, "rang hors de la portée")
+    _attendre(depot.rang_faculte(99999) is None, "rang d'une faculté inconnue")
+
+    tranches = depot.tranches_effectifs(2)
+    _attendre([(t["tranche"], t["facultes"], t["minimum"], t["maximum"], t["moyenne"]) for t in tranches]
+              == [(1, 3, 800, 2500, 1500), (2, 2, 2500, 3000, 2750)], "tranches d'effectif")
+    _attendre(len(depot.tranches_effectifs(10)) == 5, "plus de tranches que de facultés")
+    _attendre(depot.tranches_effectifs(4, ville="Sherbrooke") == [], "tranches d'une ville sans faculté")
+
+
+CONFORMITE = [
+    ("dépôt vide", _conformite_vide),
+    ("ajout et lecture des universités", _conformite_universites),
+    ("refus des universités invalides ou en double", _conformite_refus_universites),
+    ("facultés, compteurs et refus", _conformite_facultes),
+    ("suppressions et cascade", _conformite_suppressions),
+    ("quasi-doublons", _conformite_doublons),
+    ("opérations par lot", _conformite_lots),
+    ("classements par effectif", _conformite_classements),
+]
+
+
+def verifier_conformite(fabrique):
+    """
+    Passe CONFORMITE sur des dépôts neufs
+
+    Args:
+        fabrique: Fonction sans argument retournant un dépôt vide
+
+    Returns:
+        Liste de (nom de la vérification, message) pour les vérifications en échec
+    """
+    echecs = []
+    for nom, verification in CONFORMITE:
+        try:
+            verification(fabrique())
+        except Exception as e:
+            echecs.append((nom, f"{type(e).__name__} : {e}"))
+    return echecs
@@ -0,0 +1,227 @@
+# -*- coding: utf-8 -*-
+"""
+Diagnostic des plans d'exécution (EXPLAIN QUERY PLAN)
+
+Chaque requête émise par un moteur surveillé est expliquée une fois (par texte SQL),
+juste avant son exécution. Un SCAN, c'est-à-dire un parcours complet, d'une table
+d'au moins SEUIL_GRANDE_TABLE lignes est signalé.
+
+Deux usages :
+    - en développement : BANQUE_PLANS=1 affiche chaque nouveau parcours complet
+      (voir database.py) ;
+    - en vérification : le bloc `with verifier_plans(): ...` lève RegressionPlan
+      si une requête du bloc parcourt une grande table. verifier_fonctions()
+      applique ce contrôle à chaque fonction de lecture de database.py.
+      `python benchmarks.py plans` le lance sur une base synthétique.
+"""
+
+import re
+import sqlite3
+from contextlib import contextmanager
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Une table plus petite se parcourt en moins d'une milliseconde : pas la peine de la signaler
+SEUIL_GRANDE_TABLE = 10000
+
+_EXPLICABLES = ("SELECT", "WITH", "INSERT", "UPDATE", "DELETE")
+_PARCOURS = re.compile(r"^SCAN (\w+)")
+_ALIAS = re.compile(r'\b(?:FROM|JOIN)\s+"?(\w+)"?(?:\s+(?:AS\s+)?"?(\w+)"?)?', re.IGNORECASE)
+_MOTS_CLES = {"ON", "WHERE", "JOIN", "LEFT", "INNER", "CROSS", "OUTER", "GROUP", "ORDER",
+              "LIMIT", "UNION", "HAVING", "USING", "NATURAL", "SELECT", "VALUES", "SET"}
+
+
+class RegressionPlan(AssertionError):
+    """Une requête parcourt entièrement une grande table"""
+
+
+def _tables_par_alias(requete):
+    """Alias -> table, pour les noms utilisés dans le plan (« SCAN u »)"""
+    tables = {}
+    for table, alias in _ALIAS.findall(requete):
+        tables[table] = table
+        if alias and alias.upper() not in _MOTS_CLES:
+            tables[alias] = table
+    return tables
+
+
+def _nombre_lignes(curseur, table):
+    """
+    Nombre de lignes d'une table, estimé sans la parcourir
+
+    MAX(rowid) : recherche dans la clé primaire. Une table WITHOUT ROWID (historique_effectifs)
+    n'a pas de rowid : statistiques d'ANALYZE (sqlite_stat1) si elles existent, sinon COUNT(*).
+    """
+    try:
+        return curseur.execute(f'SELECT MAX(rowid) FROM "{table}"').fetchone()[0] or 0
+    except sqlite3.OperationalError:
+        pass
+    try:
+        stat = curseur.execute("SELECT stat FROM sqlite_stat1 WHERE tbl = ? LIMIT 1", (table,)).fetchone()
+    except sqlite3.OperationalError:
+        stat = None
+    if stat and stat[0]:
+        return int(stat[0].split()[0])
+    return curseur.execute(f'SELECT COUNT(*) FROM "{table}"').fetchone()[0]
+
+
+class SurveillancePlans:
+    """
+    Explique les requêtes d'un moteur (tous les moteurs par défaut) et relève
+    les parcours complets de grandes tables
+
+    Attributes:
+        plans: Texte SQL -> lignes du plan
+        parcours: Liste de (table, nombre de lignes, détail du plan, texte SQL)
+    """
+
+    def __init__(self, cible=Engine, seuil=SEUIL_GRANDE_TABLE, signaler=None):
+        """
+        Args:
+            cible: Moteur à surveiller (ou la classe Engine pour tous)
+            seuil: Nombre de lignes à partir duquel une table est grande
+            signaler: Fonction appelée avec chaque nouveau parcours complet
+        """
+        self.cible = cible
+        self.seuil = seuil
+        self.signaler = signaler
+        self.plans = {}
+        self.parcours = []
+        event.listen(cible, "before_cursor_execute", self._avant_requete)
+
+    def arreter(self):
+        event.remove(self.cible, "before_cursor_execute", self._avant_requete)
+
+    def _avant_requete(self, connexion, curseur, requete, parametres, contexte, executemany):
+        if requete in self.plans or not requete.lstrip().upper().startswith(_EXPLICABLES):
+            return
+        if executemany:
+            parametres = parametres[0] if parametres else ()
+
+        # Curseur DBAPI distinct : ne déclenche aucun événement et ne touche pas au curseur de la requête
+        explication = connexion.connection.cursor()
+        try:
+            plan = [ligne[3] for ligne in explication.execute("EXPLAIN QUERY PLAN " + requete, parametres)]
+            self.plans[requete] = plan
+
+            tables = _tables_par_alias(requete)
+            parcours = []
+            for detail in plan:
+                trouve = _PARCOURS.match(detail)
+                table = trouve and tables.get(trouve.group(1))
+                if not table:
+                    continue
+                nb_lignes = _nombre_lignes(explication, table)
+                if nb_lignes >= self.seuil:
+                    parcours.append((table, nb_lignes, detail, requete))
+        except sqlite3.Error:
+            # Le diagnostic ne doit jamais faire échouer la requête qu'il observe
+            self.plans[requete] = []
+            return
+        finally:
+            explication.close()
+
+        for un_parcours in parcours:
+            self.parcours.append(un_parcours)
+            if self.signaler:
+                self.signaler(*un_parcours)
+
+
+def afficher_parcours(table, nb_lignes, detail, requete):
+    """Signalement par défaut (mode développement)"""
+    print(f"PLAN : parcours complet de {table} ({nb_lignes} lignes) - {detail}\n   {' '.join(requete.split())}")
+
+
+def surveiller(cible=Engine, seuil=SEUIL_GRANDE_TABLE):
+    """Mode développement : affiche chaque requête qui parcourt une grande table"""
+    return SurveillancePlans(cible, seuil, afficher_parcours)
+
+
+@contextmanager
+def verifier_plans(cible=Engine, seuil=SEUIL_GRANDE_TABLE, tolerees=()):
+    """
+    Bloc de vérification : lève RegressionPlan si une requête du bloc parcourt
+    entièrement une grande table
+
+    Args:
+        tolerees: Tables dont le parcours complet est voulu (liste complète, comptage...)
+    """
+    surveillance = SurveillancePlans(cible, seuil)
+    try:
+        yield surveillance
+    finally:
+        surveillance.arreter()
+
+    regressions = [parcours for parcours in surveillance.parcours if parcours[0] not in tolerees]
+    if regressions:
+        raise RegressionPlan("\n".join(
+            f"parcours complet de {table} ({nb_lignes} lignes) - {detail}\n   {' '.join(requete.split())}"
+            for table, nb_lignes, detail, requete in regressions))
+
+
+# Fonctions de lecture de database.py vérifiées :
+# (nom, appel avec le module database et un exemple de données, tables parcourues volontairement)
+VERIFICATIONS = [
+    ("obtenir_universites", lambda db, exemple: db.obtenir_universites(), {"universites"}),
+    ("obtenir_facultes_par_universite",
+     lambda db, exemple: db.obtenir_facultes_par_universite(exemple.id), set()),
+    ("obtenir_facultes_par_code_universite",
+     lambda db, exemple: db.obtenir_facultes_par_code_universite(exemple.code_universite), set()),
+    ("obtenir_statistiques", lambda db, exemple: db.obtenir_statistiques(), {"universites", "facultes"}),
+    ("Universite.facultes", lambda db, exemple: [faculte.nom for faculte in exemple.facultes], set()),
+    ("doublon d'université (ajouter_universite)",
+     lambda db, exemple: db.session.scalars(
+         db.REQUETE_UNIVERSITE_EXISTANTE, {"nom": exemple.nom, "code_universite": exemple.code_universite}).first(),
+     set()),
+    ("doublon de faculté (ajouter_faculte)",
+     lambda db, exemple: db.session.scalars(
+         db.REQUETE_FACULTE_EXISTANTE, {"nom": "Faculté de Génie", "universite_id": exemple.id}).first(),
+     set()),
+    *((f"obtenir_catalogue ({strategie}, filtré)",
+       lambda db, exemple, strategie=strategie: db.obtenir_catalogue(
+           strategie, codes_universites=[exemple.code_universite]),
+       set())
+      for strategie in ("selectin", "joint", "lignes")),
+    ("filtre par ville",
+     lambda db, exemple: db.session.query(db.Universite).filter(db.Universite.ville == exemple.ville).limit(20).all(),
+     set()),
+    ("obtenir_classement_facultes", lambda db, exemple: db.obtenir_classement_facultes(100), set()),
+    ("obtenir_classement_facultes (code)",
+     lambda db, exemple: db.obtenir_classement_facultes(100, code_faculte="MED"), set()),
+    ("obtenir_classement_facultes (ville)",
+     lambda db, exemple: db.obtenir_classement_facultes(100, ville=exemple.ville), set()),
+    ("obtenir_rang_faculte", lambda db, exemple: db.obtenir_rang_faculte(1, code_faculte="MED"), set()),
+    ("obtenir_tranches_effectifs", lambda db, exemple: db.obtenir_tranches_effectifs(), set()),
+    ("historique : tendance d'une université",
+     lambda db, exemple: _historique().tendance(universite_id=exemple.id), set()),
+    ("historique : croissance annuelle d'une ville",
+     lambda db, exemple: _historique().croissance_annuelle(ville=exemple.ville), set()),
+]
+
+
+def _historique():
+    # Importé à l'appel : historique importe database, qui importe ce module (BANQUE_PLANS=1)
+    import historique
+    return historique
+
+
+def verifier_fonctions(database, seuil=SEUIL_GRANDE_TABLE):
+    """
+    Vérifie les plans de chaque fonction de VERIFICATIONS
+
+    Returns:
+        Liste de (nom de la fonction, message) pour les fonctions en régression
+    """
+    exemple = database.session.get(database.Universite, database.session.scalar(
+        database.select(database.Universite.id).order_by(database.Universite.id.desc()).limit(1)))
+    regressions = []
+    for nom, appel, tolerees in VERIFICATIONS:
+        # Chaque fonction relit la base (pas d'objets déjà chargés)
+        database.session.expire_all()
+        try:
+            with verifier_plans(database.engine, seuil, tolerees):
+                appel(database, exemple)
+        except RegressionPlan as e:
+            regressions.append((nom, str(e)))
+    return regressions
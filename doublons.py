@@ -0,0 +1,344 @@
+# -*- coding: utf-8 -*-
+"""
+Détection des quasi-doublons d'universités et de facultés
+
+Les noms sont normalisés (accents, casse, ponctuation, espaces) puis découpés en
+trigrammes. Une signature MinHash par nom (variante à une seule fonction de hachage
+répartie en cases, « one permutation hashing ») sert d'index de blocage (LSH par bandes) :
+seuls les noms qui partagent une bande sont comparés, jamais toutes les paires.
+La similarité retenue est le coefficient de Jaccard des trigrammes.
+
+Deux noms qui diffèrent par leurs nombres (« Université Paris 1 » et « Université
+Paris 8 ») ne sont jamais considérés comme des doublons.
+
+Portées : les universités sont comparées entre elles, les facultés seulement avec
+les autres facultés de la même université (même règle que ajouter_faculte).
+"""
+
+import re
+import unicodedata
+from array import array
+from collections import defaultdict
+from functools import lru_cache
+
+from sqlalchemy import select
+
+import database
+from database import Universite, Faculte, Ville, NomFaculte
+
+SEUIL_DEFAUT = 0.8
+
+# 6 bandes de 3 valeurs MinHash : deux noms de similarité 0,8 partagent une bande
+# dans 98 % des cas, deux noms de similarité 0,3 dans moins de 15 % des cas
+NB_BANDES = 6
+LIGNES_PAR_BANDE = 3
+
+# Seaux trop peuplés (parties de noms très courantes) : ignorés comme des mots vides.
+# Les noms identiques après normalisation sont regroupés à part et jamais manqués.
+TAILLE_MAX_SEAU = 64
+
+NB_CASES = NB_BANDES * LIGNES_PAR_BANDE
+# Hachages tronqués à 30 bits : entiers Python d'un seul « chiffre », rapides à comparer
+_MASQUE = (1 << 30) - 1
+_VIDE = 1 << 30
+
+_ACCENTS = re.compile("[\u0300-\u036f]+")
+_SEPARATEURS = re.compile(r"[\W_]+")
+_NOMBRES = re.compile(r"\d+")
+
+
+@lru_cache(maxsize=100_000)
+def normaliser(nom):
+    """Minuscules, sans accents ni ponctuation, mots séparés par une seule espace"""
+    sans_accents = _ACCENTS.sub("", unicodedata.normalize("NFKD", nom or ""))
+    return _SEPARATEURS.sub(" ", sans_accents.casefold()).strip()
+
+
+def trigrammes(normalise):
+    """Ensemble des trigrammes d'un nom normalisé (bornes de mots comprises)"""
+    texte = f" {normalise} "
+    return {texte[i:i + 3] for i in range(len(texte) - 2)}
+
+
+@lru_cache(maxsize=100_000)
+def similarite(normalise_a, normalise_b):
+    """
+    Coefficient de Jaccard des trigrammes de deux noms normalisés (0 à 1)
+
+    En cache : les mêmes paires de noms de facultés reviennent dans chaque université.
+    """
+    if _NOMBRES.findall(normalise_a) != _NOMBRES.findall(normalise_b):
+        return 0.0
+    a, b = trigrammes(normalise_a), trigrammes(normalise_b)
+    return len(a & b) / len(a | b) if a or b else 1.0
+
+
+@lru_cache(maxsize=100_000)
+def _cles(normalise):
+    """
+    Clés LSH d'un nom normalisé : une par bande de la signature MinHash
+
+    Les nombres du nom font partie de chaque clé, ce qui sépare d'emblée
+    « Campus 12 » de « Campus 13 ».
+    """
+    # Un seul hachage par trigramme : il choisit une case et donne la valeur à minimiser
+    signature = [_VIDE] * NB_CASES
+    texte = f" {normalise} "
+    for i in range(len(texte) - 2):
+        valeur = hash(texte[i:i + 3]) & _MASQUE
+        case = valeur % NB_CASES
+        if valeur < signature[case]:
+            signature[case] = valeur
+
+    # Cases vides : reprennent la valeur de la case pleine suivante (densification)
+    for case in range(NB_CASES):
+        if signature[case] == _VIDE:
+            for decalage in range(1, NB_CASES):
+                suivante = signature[(case + decalage) % NB_CASES]
+                if suivante != _VIDE:
+                    signature[case] = suivante + decalage * _VIDE
+                    break
+
+    nombres = tuple(_NOMBRES.findall(normalise))
+    return tuple(
+        hash((bande, *signature[bande * LIGNES_PAR_BANDE:(bande + 1) * LIGNES_PAR_BANDE], nombres))
+        for bande in range(NB_BANDES)
+    )
+
+
+class IndexDoublons:
+    """Index de blocage MinHash/LSH : trouve les noms proches d'un nom sans tout comparer"""
+
+    def __init__(self):
+        # Clé de bande -> identifiants ; (nom normalisé, portée) -> identifiants
+        self._seaux = defaultdict(list)
+        self._identiques = defaultdict(list)
+        # Identifiant -> (nom, nom normalisé, portée)
+        self._noms = {}
+
+    def __len__(self):
+        return len(self._noms)
+
+    def ajouter(self, identifiant, nom, portee=None):
+        normalise = normaliser(nom)
+        self._noms[identifiant] = (nom, normalise, portee)
+        self._identiques[(normalise, portee)].append(identifiant)
+        for cle in _cles(normalise):
+            self._seaux[(cle, portee)].append(identifiant)
+
+    def chercher(self, nom, portee=None, seuil=SEUIL_DEFAUT):
+        """
+        Noms de l'index proches de nom dans la même portée
+
+        Returns:
+            Liste de (identifiant, nom, similarité), du plus proche au moins proche
+        """
+        normalise = normaliser(nom)
+        candidats = set(self._identiques.get((normalise, portee), ()))
+        for cle in _cles(normalise):
+            seau = self._seaux.get((cle, portee), ())
+            if len(seau) <= TAILLE_MAX_SEAU:
+                candidats.update(seau)
+
+        resultats = []
+        for identifiant in candidats:
+            nom_candidat, normalise_candidat, _ = self._noms[identifiant]
+            score = similarite(normalise, normalise_candidat)
+            if score >= seuil:
+                resultats.append((identifiant, nom_candidat, score))
+        return sorted(resultats, key=lambda resultat: -resultat[2])
+
+
+def grappes(elements, seuil=SEUIL_DEFAUT):
+    """
+    Regroupe les quasi-doublons d'une liste de noms d'une même portée
+
+    Les noms identiques après normalisation sont regroupés directement et le MinHash
+    n'est calculé qu'une fois par nom distinct. Les bandes sont traitées l'une après
+    l'autre (union-find) : temps et mémoire quasi linéaires en nombre de noms.
+
+    Args:
+        elements: Itérable de (identifiant, nom)
+
+    Returns:
+        Liste de grappes d'au moins deux éléments, chacune une liste de (identifiant, nom)
+    """
+    # Nom normalisé -> numéro de groupe ; chaque groupe réunit les noms identiques
+    numeros = {}
+    groupes = []
+    for identifiant, nom in elements:
+        normalise = normaliser(nom)
+        numero = numeros.setdefault(normalise, len(groupes))
+        if numero == len(groupes):
+            groupes.append([])
+        groupes[numero].append((identifiant, nom))
+
+    normalises = list(numeros)
+    cles = array("q")
+    for normalise in normalises:
+        cles.extend(_cles(normalise))
+
+    parents = list(range(len(normalises)))
+
+    def racine(numero):
+        while parents[numero] != numero:
+            parents[numero] = parents[parents[numero]]
+            numero = parents[numero]
+        return numero
+
+    for bande in range(NB_BANDES):
+        premiers = {}
+        seaux = defaultdict(list)
+        for numero in range(len(normalises)):
+            cle = cles[numero * NB_BANDES + bande]
+            premier = premiers.setdefault(cle, numero)
+            if premier != numero:
+                seaux[premier].append(numero)
+
+        for premier, autres in seaux.items():
+            if len(autres) >= TAILLE_MAX_SEAU:
+                continue
+            membres = [premier] + autres
+            for i, a in enumerate(membres):
+                for b in membres[i + 1:]:
+                    racine_a, racine_b = racine(a), racine(b)
+                    if racine_a != racine_b and similarite(normalises[a], normalises[b]) >= seuil:
+                        parents[racine_b] = racine_a
+
+    reunis = defaultdict(list)
+    for numero, groupe in enumerate(groupes):
+        reunis[racine(numero)].extend(groupe)
+    return [grappe for grappe in reunis.values() if len(grappe) > 1]
+
+
+# --- Recherche à l'ajout ----------------------------------------------------
+
+_index_universites = IndexDoublons()
+_dernier_id_indexe = 0
+# Engine dont les universités sont indexées (voir database.utiliser_engine)
+_engine_indexe = None
+
+
+def _index_universites_a_jour():
+    """Index des universités, complété par celles créées depuis le dernier appel"""
+    global _dernier_id_indexe, _engine_indexe
+
+    if database.engine is not _engine_indexe:
+        reinitialiser_index_universites()
+        _engine_indexe = database.engine
+
+    nouvelles = database.session_de_lecture().execute(
+        select(Universite.id, Universite.nom)
+        .where(Universite.id > _dernier_id_indexe)
+        .order_by(Universite.id)
+    )
+    for identifiant, nom in nouvelles:
+        _index_universites.ajouter(identifiant, nom)
+        _dernier_id_indexe = identifiant
+    return _index_universites
+
+
+def reinitialiser_index_universites():
+    """
+    Oublie l'index des universités : il sera reconstruit au prochain appel
+
+    À appeler quand des identifiants d'universités supprimées peuvent être réutilisés
+    (table vidée, base remplacée) : l'index ne lit que les identifiants nouveaux.
+    """
+    global _index_universites, _dernier_id_indexe
+    _index_universites = IndexDoublons()
+    _dernier_id_indexe = 0
+
+
+def doublons_universite(nom, seuil=SEUIL_DEFAUT):
+    """
+    Universités existantes dont le nom ressemble à nom
+
+    Returns:
+        Liste de (id, nom, ville, similarité), du plus proche au moins proche
+    """
+    trouves = _index_universites_a_jour().chercher(nom, seuil=seuil)
+    if not trouves:
+        return []
+
+    # Relecture en base : écarte les universités supprimées ou renommées depuis l'indexation
+    actuelles = {
+        identifiant: (nom_actuel, ville)
+        for identifiant, nom_actuel, ville in database.session_de_lecture().execute(
+            select(Universite.id, Universite.nom, Ville.nom)
+            .join(Ville, Universite.ville_id == Ville.id)
+            .where(Universite.id.in_([identifiant for identifiant, _, _ in trouves])))
+    }
+    resultats = []
+    for identifiant, _, _ in trouves:
+        if identifiant in actuelles:
+            nom_actuel, ville = actuelles[identifiant]
+            score = similarite(normaliser(nom), normaliser(nom_actuel))
+            if score >= seuil:
+                resultats.append((identifiant, nom_actuel, ville, score))
+    return resultats
+
+
+def doublons_faculte(nom_faculte, universite_id, seuil=SEUIL_DEFAUT):
+    """
+    Facultés de l'université dont le nom ressemble à nom_faculte
+
+    Une université n'a que quelques dizaines de facultés : elles sont lues
+    (index universite_id, nom_id) et comparées directement.
+
+    Returns:
+        Liste de (id, nom, similarité), du plus proche au moins proche
+    """
+    normalise = normaliser(nom_faculte)
+    resultats = []
+    for identifiant, nom in database.session_de_lecture().execute(
+            select(Faculte.id, NomFaculte.nom)
+            .join(NomFaculte, Faculte.nom_id == NomFaculte.id)
+            .where(Faculte.universite_id == universite_id)):
+        score = similarite(normalise, normaliser(nom))
+        if score >= seuil:
+            resultats.append((identifiant, nom, score))
+    return sorted(resultats, key=lambda resultat: -resultat[2])
+
+
+# --- Rapports ---------------------------------------------------------------
+
+def grappes_universites(seuil=SEUIL_DEFAUT):
+    """
+    Toutes les grappes d'universités quasi identiques
+
+    Returns:
+        Liste de grappes, chacune une liste de (id, nom)
+    """
+    with database.Session() as session_rapport:
+        return grappes(session_rapport.execute(select(Universite.id, Universite.nom)), seuil)
+
+
+def grappes_facultes(seuil=SEUIL_DEFAUT):
+    """
+    Toutes les grappes de facultés quasi identiques au sein d'une même université
+
+    Les facultés sont lues en flux dans l'ordre de l'index (universite_id, nom_id)
+    et traitées université par université.
+
+    Returns:
+        Liste de (universite_id, grappe) où grappe est une liste de (id, nom)
+    """
+    resultats = []
+    requete = (
+        select(Faculte.universite_id, Faculte.id, NomFaculte.nom)
+        .join(NomFaculte, Faculte.nom_id == NomFaculte.id)
+        .order_by(Faculte.universite_id)
+        .execution_options(yield_per=10000)
+    )
+
+    with database.Session() as session_rapport:
+        universite_courante, facultes = None, []
+        for universite_id, identifiant, nom in session_rapport.execute(requete):
+            if universite_id != universite_courante:
+                resultats.extend((universite_courante, grappe) for grappe in grappes(facultes, seuil))
+                universite_courante, facultes = universite_id, []
+            facultes.append((identifiant, nom))
+        resultats.extend((universite_courante, grappe) for grappe in grappes(facultes, seuil))
+
+    return resultats
@@ -0,0 +1,602 @@
+# -*- coding: utf-8 -*-
+"""
+Écriture différée des ajouts et suppressions de la fenêtre principale
+
+DepotSQLAlchemy valide chaque ajout ou suppression (session.commit()) avant de rendre
+la main : l'utilisateur attend la synchronisation du fichier à chaque clic. DepotDiffere
+(main.py --ecriture-differee) rend la main dès que la modification est :
+
+    1. vérifiée comme le ferait la base (validation, nom ou code déjà pris...) ;
+    2. ajoutée au journal des écritures en attente (une ligne JSON, synchronisée) ;
+    3. appliquée aux lectures du dépôt (universités, facultés, compteurs, doublons).
+
+Un thread écrit ensuite la file par lots, une transaction par lot. Une écriture
+refusée par la base est retirée des lectures (la fenêtre se recharge) et signalée aux
+`ecouteurs`. Les lectures d'ensemble (statistiques, classements, lots) attendent que
+la file soit vide.
+
+Identifiants : une université ou faculté ajoutée reçoit un identifiant provisoire
+négatif. Il reste le sien jusqu'à la fermeture du dépôt : les lectures le rendent aussi
+après l'écriture, et les opérations l'acceptent.
+
+Reprise : les écritures du journal sont rejouées à l'ouverture suivante. Un ajout
+déjà présent à l'identique et une suppression d'une ligne absente passent pour
+appliqués : un lot validé juste avant un arrêt brutal, encore au journal, n'est pas
+écrit deux fois.
+"""
+
+import json
+import os
+import threading
+import time
+
+import database
+from depot import DepotSQLAlchemy, FicheUniversite, FicheFaculte
+from doublons import normaliser, similarite, SEUIL_DEFAUT
+from validation import valider_universite, valider_faculte
+
+# Écritures regroupées dans un lot : celles arrivées dans ce délai, au plus TAILLE_LOT
+DELAI_REGROUPEMENT_S = 0.25
+TAILLE_LOT = 500
+
+AJOUT_UNIVERSITE = "ajouter_universite"
+AJOUT_FACULTE = "ajouter_faculte"
+SUPPRESSION_UNIVERSITE = "supprimer_universite"
+SUPPRESSION_FACULTE = "supprimer_faculte"
+
+
+def chemin_journal():
+    """Journal à côté de la base : universites_facultes-ecritures.jsonl"""
+    return os.path.splitext(os.path.abspath(database.engine.url.database))[0] + "-ecritures.jsonl"
+
+
+def decrire(operation):
+    """Libellé d'une écriture pour les messages"""
+    nature = operation["operation"]
+    if nature == AJOUT_UNIVERSITE:
+        return f"Ajout de l'université '{operation['nom']}'"
+    if nature == AJOUT_FACULTE:
+        return f"Ajout de la faculté '{operation['nom']}'"
+    if nature == SUPPRESSION_UNIVERSITE:
+        return f"Suppression de l'université {operation['id']}"
+    return f"Suppression de la faculté {operation['id']}"
+
+
+class JournalEcritures:
+    """
+    Écritures en attente, une ligne JSON par écriture
+
+    ajouter() ne rend la main qu'une fois la ligne synchronisée sur le disque ;
+    reecrire() remplace le fichier d'un coup (fichier temporaire puis os.replace).
+    """
+
+    def __init__(self, chemin):
+        self.chemin = chemin
+
+    def lire(self):
+        """Écritures du journal ; une dernière ligne incomplète (arrêt pendant l'ajout) est ignorée"""
+        if not os.path.exists(self.chemin):
+            return []
+        operations = []
+        with open(self.chemin, encoding="utf-8") as fichier:
+            for ligne in fichier:
+                try:
+                    operations.append(json.loads(ligne))
+                except json.JSONDecodeError:
+                    print(f"Journal {self.chemin} : ligne incomplète ignorée")
+        return operations
+
+    def ajouter(self, operation):
+        with open(self.chemin, "a", encoding="utf-8") as fichier:
+            fichier.write(json.dumps(operation, ensure_ascii=False) + "\n")
+            fichier.flush()
+            os.fsync(fichier.fileno())
+
+    def reecrire(self, operations):
+        if not operations:
+            if os.path.exists(self.chemin):
+                os.remove(self.chemin)
+            return
+        temporaire = self.chemin + ".tmp"
+        with open(temporaire, "w", encoding="utf-8") as fichier:
+            for operation in operations:
+                fichier.write(json.dumps(operation, ensure_ascii=False) + "\n")
+            fichier.flush()
+            os.fsync(fichier.fileno())
+        os.replace(temporaire, self.chemin)
+
+
+class _Attente:
+    """Effet des écritures en attente sur les lectures"""
+
+    def __init__(self, file, fiches, reel):
+        self.reel = reel
+        self.universites = {}
+        self.facultes = {}
+        self.universites_supprimees = set()
+        # Facultés déjà écrites dont la suppression attend : identifiant -> écriture
+        self.facultes_supprimees = {}
+        for operation in file:
+            nature, identifiant = operation["operation"], operation["id"]
+            if nature in (AJOUT_UNIVERSITE, AJOUT_FACULTE):
+                cible = self.universites if nature == AJOUT_UNIVERSITE else self.facultes
+                cible[identifiant] = fiches[identifiant]
+            elif nature == SUPPRESSION_UNIVERSITE:
+                if self.universites.pop(identifiant, None) is None:
+                    self.universites_supprimees.add(identifiant)
+            elif self.facultes.pop(identifiant, None) is None:
+                self.facultes_supprimees[identifiant] = operation
+
+        # Écarts des compteurs nb_facultes / total_etudiants par université
+        self.ecarts = {}
+        for faculte in self.facultes.values():
+            self._decaler(faculte.universite_id, 1, faculte.nombre_etudiants or 0)
+        for operation in self.facultes_supprimees.values():
+            self._decaler(operation["universite_id"], -1, -(operation["nombre_etudiants"] or 0))
+
+    def _decaler(self, universite_id, nb_facultes, etudiants):
+        ecart = self.ecarts.setdefault(self.reel(universite_id), [0, 0])
+        ecart[0] += nb_facultes
+        ecart[1] += etudiants
+
+    def universite_retiree(self, universite_id):
+        """Suppression en attente, ou ajout en attente annulé par une suppression"""
+        universite_id = self.reel(universite_id)
+        return (universite_id in self.universites_supprimees
+                or (universite_id < 0 and universite_id not in self.universites))
+
+    def faculte_retiree(self, faculte_id, universite_id):
+        return faculte_id in self.facultes_supprimees or self.universite_retiree(universite_id)
+
+
+class DepotDiffere(DepotSQLAlchemy):
+    """Dépôt de la base SQLite dont les ajouts et suppressions sont écrits en arrière-plan"""
+
+    def __init__(self, journal=None, delai=DELAI_REGROUPEMENT_S, taille_lot=TAILLE_LOT):
+        """
+        Args:
+            journal: Fichier du journal (défaut : chemin_journal())
+            delai: Attente avant d'écrire un lot, pour y regrouper les écritures suivantes
+            taille_lot: Écritures au plus par transaction
+        """
+        super().__init__()
+        self.journal = JournalEcritures(journal or chemin_journal())
+        self.delai = delai
+        self.taille_lot = taille_lot
+        # Appelés (depuis le thread d'écriture) avec le message de chaque écriture refusée
+        self.ecouteurs = []
+        self.ecritures_validees = 0
+        self.ecritures_refusees = 0
+        self.lots_ecrits = 0
+
+        self._verrou = threading.RLock()
+        self._condition = threading.Condition(self._verrou)
+        self._file = []
+        # Fiches des ajouts en attente, par identifiant provisoire
+        self._fiches = {}
+        # Identifiant provisoire -> définitif, et l'inverse (alias rendus par les lectures)
+        self._ids_reels = {}
+        self._alias_universites = {}
+        self._alias_facultes = {}
+        self._sequence = 0
+        self._prochain_id = -1
+        self._generation = self._generation_lue = 0
+        self._presse = False
+        self._arret = False
+
+        reprises = self.journal.lire()
+        for operation in reprises:
+            self._reprendre(operation)
+        if reprises:
+            print(f"{len(reprises)} écriture(s) en attente reprise(s) du journal {self.journal.chemin}")
+
+        self._thread = threading.Thread(target=self._travailler, name="ecriture_differee", daemon=True)
+        self._thread.start()
+
+    # --- File et journal ----------------------------------------------------------
+
+    def _reprendre(self, operation):
+        self._file.append(operation)
+        self._sequence = max(self._sequence, operation["sequence"])
+        if operation["operation"] == AJOUT_UNIVERSITE:
+            self._fiches[operation["id"]] = FicheUniversite(
+                operation["id"], operation["nom"], operation["ville"], operation["code_universite"],
+                operation["annee_fondation"])
+        elif operation["operation"] == AJOUT_FACULTE:
+            self._fiches[operation["id"]] = FicheFaculte(
+                operation["id"], operation["nom"], operation["code_faculte"], operation["nombre_etudiants"],
+                operation["universite_id"])
+        if operation["id"] < 0:
+            self._prochain_id = min(self._prochain_id, operation["id"] - 1)
+
+    def _enfiler(self, operation, fiche=None):
+        """Journalise l'écriture (synchronisé sur le disque), puis la rend visible aux lectures"""
+        with self._condition:
+            self._sequence += 1
+            operation["sequence"] = self._sequence
+            self.journal.ajouter(operation)
+            self._file.append(operation)
+            if fiche is not None:
+                self._fiches[fiche.id] = fiche
+            self._condition.notify_all()
+
+    def _nouvel_id(self):
+        identifiant = self._prochain_id
+        self._prochain_id -= 1
+        return identifiant
+
+    def _reel(self, identifiant):
+        return self._ids_reels.get(identifiant, identifiant)
+
+    def en_attente(self):
+        """Nombre d'écritures pas encore validées dans la base"""
+        with self._verrou:
+            return len(self._file)
+
+    def vider(self):
+        """Écrit sans délai toute la file et attend la fin (validée ou refusée)"""
+        with self._condition:
+            self._presse = True
+            self._condition.notify_all()
+            while self._file:
+                self._condition.wait()
+            self._presse = False
+        self._rafraichir_session()
+
+    def fermer(self):
+        """Vide la file et arrête le thread d'écriture"""
+        self.vider()
+        with self._condition:
+            self._arret = True
+            self._condition.notify_all()
+        self._thread.join()
+
+    # --- Thread d'écriture --------------------------------------------------------
+
+    def _travailler(self):
+        while True:
+            with self._condition:
+                while not self._file and not self._arret:
+                    self._condition.wait()
+                if not self._file:
+                    return
+                # Regrouper les écritures qui suivent de près
+                echeance = time.monotonic() + self.delai
+                while not (self._presse or self._arret or len(self._file) >= self.taille_lot):
+                    reste = echeance - time.monotonic()
+                    if reste <= 0:
+                        break
+                    self._condition.wait(reste)
+                lot = self._file[:self.taille_lot]
+            refus = self._ecrire_lot(lot)
+            for message in refus:
+                for ecouteur in list(self.ecouteurs):
+                    ecouteur(message)
+
+    def _ecrire_lot(self, lot):
+        """Une transaction pour tout le lot ; en cas d'erreur imprévue, une par écriture"""
+        session = database.Session()
+        try:
+            ids_lot = {}
+            refus = [self._appliquer(session, operation, ids_lot) for operation in lot]
+            with self._verrou:
+                session.commit()
+                return self._terminer(lot, refus, ids_lot)
+        except Exception as e:
+            session.rollback()
+            if len(lot) > 1:
+                return [message for operation in lot for message in self._ecrire_lot([operation])]
+            with self._verrou:
+                return self._terminer(lot, [f"Erreur lors de l'écriture : {e}"], {})
+        finally:
+            session.close()
+
+    def _appliquer(self, session, operation, ids_lot):
+        """
+        Applique une écriture dans la transaction du lot
+
+        Returns:
+            None, ou la raison du refus (rien n'est alors écrit pour cette écriture)
+        """
+        nature, identifiant = operation["operation"], operation["id"]
+        reel = ids_lot.get(identifiant, self._reel(identifiant))
+
+        if nature == AJOUT_UNIVERSITE:
+            valeurs = (operation["nom"], operation["ville"], operation["code_universite"], operation["annee_fondation"])
+            existante = session.scalars(database.REQUETE_UNIVERSITE_EXISTANTE,
+                                        {"nom": valeurs[0], "code_universite": valeurs[2]}).first()
+            if existante is not None:
+                universite = session.get(database.Universite, existante)
+                # Rejouée après un arrêt brutal : déjà écrite
+                if (universite.nom, universite.ville, universite.code_universite,
+                        universite.annee_fondation) != valeurs:
+                    return "Une université avec ce nom ou ce code existe déjà"
+            else:
+                universite = database.Universite(nom=valeurs[0], ville=valeurs[1], code_universite=valeurs[2],
+                                                 annee_fondation=valeurs[3])
+                session.add(universite)
+                session.flush()
+            ids_lot[identifiant] = universite.id
+            return None
+
+        if nature == AJOUT_FACULTE:
+            universite_id = operation["universite_id"]
+            universite_id = ids_lot.get(universite_id, self._reel(universite_id))
+            if universite_id < 0 or session.get(database.Universite, universite_id) is None:
+                return "L'université n'existe plus"
+            valeurs = (operation["nom"], operation["code_faculte"], operation["nombre_etudiants"])
+            existante = session.scalars(database.REQUETE_FACULTE_EXISTANTE,
+                                        {"nom": valeurs[0], "universite_id": universite_id}).first()
+            if existante is not None:
+                faculte = session.get(database.Faculte, existante)
+                if (faculte.nom, faculte.code_faculte, faculte.nombre_etudiants) != valeurs:
+                    return f"La faculté '{valeurs[0]}' existe déjà dans cette université"
+            else:
+                faculte = database.Faculte(nom=valeurs[0], code_faculte=valeurs[1], nombre_etudiants=valeurs[2],
+                                           universite_id=universite_id)
+                session.add(faculte)
+                session.flush()
+            ids_lot[identifiant] = faculte.id
+            return None
+
+        # Suppression : absente (déjà supprimée, ou son ajout a été refusé), rien à faire
+        modele = database.Universite if nature == SUPPRESSION_UNIVERSITE else database.Faculte
+        objet = session.get(modele, reel) if reel > 0 else None
+        if objet is not None:
+            session.delete(objet)
+            session.flush()
+        return None
+
+    def _terminer(self, lot, refus, ids_lot):
+        """Retire le lot de la file (le verrou est tenu : les lectures voient la base à jour)"""
+        messages = []
+        for operation, raison in zip(lot, refus):
+            self._file.remove(operation)
+            self._fiches.pop(operation["id"], None)
+            if raison is None:
+                self.ecritures_validees += 1
+            else:
+                self.ecritures_refusees += 1
+                message = f"{decrire(operation)} annulé(e) : {raison}"
+                print(f"Erreur : {message}")
+                messages.append(message)
+
+        for operation in lot:
+            provisoire = operation["id"]
+            if provisoire < 0 and provisoire in ids_lot:
+                reel = ids_lot[provisoire]
+                self._ids_reels[provisoire] = reel
+                alias = self._alias_universites if operation["operation"] == AJOUT_UNIVERSITE else self._alias_facultes
+                alias[reel] = provisoire
+        # Identifiants définitifs dans les écritures restantes (et dans le journal)
+        for operation in self._file:
+            for cle in ("id", "universite_id"):
+                if operation.get(cle, 0) < 0 and operation[cle] in self._ids_reels:
+                    operation[cle] = self._ids_reels[operation[cle]]
+        self.journal.reecrire(self._file)
+
+        self.lots_ecrits += 1
+        self._generation += 1
+        self._condition.notify_all()
+        return messages
+
+    # --- Lectures -------------------------------------------------------------------
+
+    def _rafraichir_session(self):
+        """Oublie les objets lus avant les derniers lots (compteurs changés par une autre connexion)"""
+        if self._generation_lue != self._generation:
+            self._generation_lue = self._generation
+            self.database.session.expire_all()
+
+    def _attente(self):
+        self._rafraichir_session()
+        return _Attente(self._file, self._fiches, self._reel)
+
+    def _universite_vue(self, universite, attente):
+        """Université telle que la voit l'application : alias et compteurs des écritures en attente"""
+        ecart = attente.ecarts.get(self._reel(universite.id))
+        alias = self._alias_universites.get(universite.id)
+        if ecart is None and alias is None and not isinstance(universite, FicheUniversite):
+            return universite
+        vue = FicheUniversite(alias or universite.id, universite.nom, universite.ville, universite.code_universite,
+                              universite.annee_fondation)
+        base = (0, 0) if isinstance(universite, FicheUniversite) else (universite.nb_facultes,
+                                                                       universite.total_etudiants)
+        vue.nb_facultes = base[0] + (ecart[0] if ecart else 0)
+        vue.total_etudiants = base[1] + (ecart[1] if ecart else 0)
+        return vue
+
+    def _faculte_vue(self, faculte):
+        alias = self._alias_facultes.get(faculte.id)
+        alias_universite = self._alias_universites.get(faculte.universite_id)
+        if alias is None and alias_universite is None:
+            return faculte
+        return FicheFaculte(alias or faculte.id, faculte.nom, faculte.code_faculte, faculte.nombre_etudiants,
+                            alias_universite or faculte.universite_id)
+
+    def universites(self):
+        with self._verrou:
+            attente = self._attente()
+            ecrites = super().universites()
+            if not (self._file or self._alias_universites):
+                return ecrites
+            vues = [self._universite_vue(universite, attente) for universite in ecrites
+                    if not attente.universite_retiree(universite.id)]
+            vues += [self._universite_vue(fiche, attente) for fiche in attente.universites.values()]
+            vues.sort(key=lambda universite: universite.nom)
+            return vues
+
+    def universite(self, universite_id):
+        with self._verrou:
+            attente = self._attente()
+            reel = self._reel(universite_id)
+            if reel in attente.universites:
+                return self._universite_vue(attente.universites[reel], attente)
+            if reel < 0 or attente.universite_retiree(reel):
+                return None
+            universite = super().universite(reel)
+            return self._universite_vue(universite, attente) if universite is not None else None
+
+    def universite_existante(self, nom, code_universite):
+        with self._verrou:
+            attente = self._attente()
+            for fiche in attente.universites.values():
+                if fiche.nom == nom or fiche.code_universite == code_universite:
+                    return self._universite_vue(fiche, attente)
+            universite = super().universite_existante(nom, code_universite)
+            if universite is None or attente.universite_retiree(universite.id):
+                return None
+            return self._universite_vue(universite, attente)
+
+    def faculte(self, faculte_id):
+        with self._verrou:
+            attente = self._attente()
+            reel = self._reel(faculte_id)
+            if reel in attente.facultes:
+                fiche = attente.facultes[reel]
+                return None if attente.universite_retiree(fiche.universite_id) else fiche
+            faculte = super().faculte(reel) if reel > 0 else None
+            if faculte is None or attente.faculte_retiree(faculte.id, faculte.universite_id):
+                return None
+            return self._faculte_vue(faculte)
+
+    def facultes_par_universite(self, universite_id):
+        with self._verrou:
+            attente = self._attente()
+            reel = self._reel(universite_id)
+            if attente.universite_retiree(reel):
+                return []
+            ecrites = super().facultes_par_universite(reel) if reel > 0 else []
+            facultes = [self._faculte_vue(faculte) for faculte in ecrites
+                        if faculte.id not in attente.facultes_supprimees]
+            ajoutees = [fiche for fiche in attente.facultes.values() if self._reel(fiche.universite_id) == reel]
+            if ajoutees:
+                facultes = sorted(facultes + ajoutees, key=lambda faculte: faculte.nom)
+            return facultes
+
+    def doublons_universite(self, nom, seuil=SEUIL_DEFAUT):
+        with self._verrou:
+            attente = self._attente()
+            resultats = [(self._alias_universites.get(identifiant, identifiant), nom_trouve, ville, score)
+                         for identifiant, nom_trouve, ville, score in super().doublons_universite(nom, seuil)
+                         if not attente.universite_retiree(identifiant)]
+            normalise = normaliser(nom)
+            for fiche in attente.universites.values():
+                score = similarite(normalise, normaliser(fiche.nom))
+                if score >= seuil:
+                    resultats.append((fiche.id, fiche.nom, fiche.ville, score))
+            return sorted(resultats, key=lambda resultat: -resultat[3])
+
+    def doublons_faculte(self, nom_faculte, universite_id, seuil=SEUIL_DEFAUT):
+        with self._verrou:
+            attente = self._attente()
+            reel = self._reel(universite_id)
+            ecrites = super().doublons_faculte(nom_faculte, reel, seuil) if reel > 0 else []
+            resultats = [(self._alias_facultes.get(identifiant, identifiant), nom, score) for identifiant, nom, score in ecrites
+                         if identifiant not in attente.facultes_supprimees]
+            normalise = normaliser(nom_faculte)
+            for fiche in attente.facultes.values():
+                score = similarite(normalise, normaliser(fiche.nom))
+                if self._reel(fiche.universite_id) == reel and score >= seuil:
+                    resultats.append((fiche.id, fiche.nom, score))
+            return sorted(resultats, key=lambda resultat: -resultat[2])
+
+    # Lectures d'ensemble et opérations par lot : sur la base, une fois la file écrite
+
+    def facultes_par_code_universite(self, code_universite):
+        self.vider()
+        return [self._faculte_vue(faculte) for faculte in super().facultes_par_code_universite(code_universite)]
+
+    def facultes_des_universites(self, universite_ids):
+        self.vider()
+        return [self._faculte_vue(faculte)
+                for faculte in super().facultes_des_universites([self._reel(i) for i in universite_ids])]
+
+    def statistiques(self):
+        self.vider()
+        return super().statistiques()
+
+    def classement_facultes(self, limite=10, ville=None, code_faculte=None):
+        self.vider()
+        return [faculte._replace(id=self._alias_facultes.get(faculte.id, faculte.id),
+                                 universite_id=self._alias_universites.get(faculte.universite_id,
+                                                                           faculte.universite_id))
+                for faculte in super().classement_facultes(limite, ville, code_faculte)]
+
+    def rang_faculte(self, faculte_id, ville=None, code_faculte=None):
+        self.vider()
+        return super().rang_faculte(self._reel(faculte_id), ville, code_faculte)
+
+    def tranches_effectifs(self, nb_tranches=4, ville=None, code_faculte=None):
+        self.vider()
+        return super().tranches_effectifs(nb_tranches, ville, code_faculte)
+
+    def supprimer_facultes(self, faculte_ids):
+        self.vider()
+        return super().supprimer_facultes([self._reel(i) for i in faculte_ids])
+
+    def supprimer_universites(self, universite_ids):
+        self.vider()
+        return super().supprimer_universites([self._reel(i) for i in universite_ids])
+
+    def reassigner_facultes(self, faculte_ids, universite_id):
+        self.vider()
+        return super().reassigner_facultes([self._reel(i) for i in faculte_ids], self._reel(universite_id))
+
+    def modifier_nombre_etudiants(self, faculte_ids, nombre=None, ecart=None):
+        self.vider()
+        return super().modifier_nombre_etudiants([self._reel(i) for i in faculte_ids], nombre, ecart)
+
+    # --- Écritures (mises en file) -------------------------------------------------------
+
+    def ajouter_universite(self, nom, ville, code_universite, annee_fondation=None):
+        erreur = valider_universite(nom, ville, code_universite, annee_fondation)
+        if erreur:
+            print(f"Erreur : {erreur}")
+            return None
+        with self._verrou:
+            if self.universite_existante(nom, code_universite):
+                print(f"Erreur : Une université avec ce nom ou ce code existe déjà")
+                return None
+            fiche = FicheUniversite(self._nouvel_id(), nom, ville, code_universite, annee_fondation)
+            self._enfiler({"operation": AJOUT_UNIVERSITE, "id": fiche.id, "nom": nom, "ville": ville,
+                           "code_universite": code_universite, "annee_fondation": annee_fondation}, fiche)
+        print(f"Université '{nom}' ajoutée (écriture en attente)")
+        return fiche
+
+    def ajouter_faculte(self, nom_faculte, code_faculte, nombre_etudiants, universite_id):
+        erreur = valider_faculte(nom_faculte, code_faculte, nombre_etudiants)
+        if erreur:
+            print(f"Erreur : {erreur}")
+            return None
+        with self._verrou:
+            universite = self.universite(universite_id)
+            if universite is None:
+                print(f"Erreur : L'université avec l'ID {universite_id} n'existe pas")
+                return None
+            if any(faculte.nom == nom_faculte for faculte in self.facultes_par_universite(universite_id)):
+                print(f"Erreur : La faculté '{nom_faculte}' existe déjà pour {universite.nom}")
+                return None
+            fiche = FicheFaculte(self._nouvel_id(), nom_faculte, code_faculte, nombre_etudiants, universite.id)
+            self._enfiler({"operation": AJOUT_FACULTE, "id": fiche.id, "nom": nom_faculte, "code_faculte": code_faculte,
+                           "nombre_etudiants": nombre_etudiants, "universite_id": self._reel(universite.id)}, fiche)
+        print(f"Faculté '{nom_faculte}' ajoutée à {universite.nom} (écriture en attente)")
+        return fiche
+
+    def supprimer_universite(self, universite_id):
+        with self._verrou:
+            if self.universite(universite_id) is None:
+                return False
+            self._enfiler({"operation": SUPPRESSION_UNIVERSITE, "id": self._reel(universite_id)})
+        return True
+
+    def supprimer_faculte(self, faculte_id):
+        with self._verrou:
+            faculte = self.faculte(faculte_id)
+            if faculte is None:
+                return False
+            # Université et effectif gardés pour les compteurs des lectures
+            self._enfiler({"operation": SUPPRESSION_FACULTE, "id": self._reel(faculte_id),
+                           "universite_id": self._reel(faculte.universite_id),
+                           "nombre_etudiants": faculte.nombre_etudiants})
+        return True
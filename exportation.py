@@ -0,0 +1,222 @@
+# -*- coding: utf-8 -*-
+"""
+Exportation du catalogue complet (universités × facultés)
+
+Une seule requête jointe est lue en flux (yield_per) et écrite au fur et à mesure :
+la mémoire utilisée ne dépend pas de la taille du catalogue.
+
+Formats :
+    csv      : texte séparé par des virgules (compressé en gzip si le fichier finit par .gz)
+    jsonl    : un objet JSON par ligne (compressé en gzip si le fichier finit par .gz)
+    colonnes : format en colonnes compressées (zlib) par groupes de lignes, relu par lire_colonnes()
+    parquet  : Apache Parquet, si pyarrow est installé
+"""
+
+import csv
+import gzip
+import json
+import struct
+import zlib
+
+from sqlalchemy import select
+
+import database
+from database import Universite, Faculte, Ville, NomFaculte, CodeFaculte
+
+FORMATS = ("csv", "jsonl", "colonnes", "parquet")
+TAILLE_LOT = 10000
+
+COLONNES = [
+    "universite_id", "universite", "ville", "code_universite", "annee_fondation",
+    "faculte_id", "faculte", "code_faculte", "nombre_etudiants",
+]
+
+MAGIC_COLONNES = b"BUCOL1\n"
+
+
+def requete_catalogue(ville=None, min_etudiants=None):
+    """Construit la requête jointe universités × facultés avec les filtres demandés"""
+    requete = (
+        select(
+            Universite.id, Universite.nom, Ville.nom, Universite.code_universite,
+            Universite.annee_fondation, Faculte.id, NomFaculte.nom, CodeFaculte.code,
+            Faculte.nombre_etudiants,
+        )
+        .select_from(Universite)
+        .join(Ville, Universite.ville_id == Ville.id)
+        .outerjoin(Faculte, Faculte.universite_id == Universite.id)
+        .outerjoin(NomFaculte, Faculte.nom_id == NomFaculte.id)
+        .outerjoin(CodeFaculte, Faculte.code_id == CodeFaculte.id)
+        .order_by(Universite.nom, NomFaculte.nom)
+    )
+
+    if ville:
+        requete = requete.where(Universite.ville == ville)
+    if min_etudiants is not None:
+        requete = requete.where(Faculte.nombre_etudiants >= min_etudiants)
+
+    return requete
+
+
+def lots_catalogue(ville=None, min_etudiants=None, taille_lot=TAILLE_LOT):
+    """
+    Parcourt le catalogue par lots de lignes, sans jamais tout charger
+
+    Utilise sa propre session : peut être appelé depuis un thread d'arrière-plan.
+    """
+    requete = requete_catalogue(ville, min_etudiants).execution_options(yield_per=taille_lot)
+
+    with database.Session() as session_export:
+        resultat = session_export.execute(requete)
+        for lot in resultat.partitions():
+            yield lot
+
+
+def deviner_format(chemin):
+    """Déduit le format d'exportation à partir de l'extension du fichier"""
+    nom = chemin.lower()
+    if nom.endswith(".gz"):
+        nom = nom[:-3]
+    for extension, format_ in ((".csv", "csv"), (".jsonl", "jsonl"), (".json", "jsonl"),
+                               (".parquet", "parquet"), (".col", "colonnes")):
+        if nom.endswith(extension):
+            return format_
+    return "csv"
+
+
+def _ouvrir_texte(chemin):
+    if chemin.lower().endswith(".gz"):
+        return gzip.open(chemin, "wt", encoding="utf-8", newline="")
+    return open(chemin, "w", encoding="utf-8", newline="")
+
+
+def _ecrire_csv(chemin, lots):
+    nb_lignes = 0
+    with _ouvrir_texte(chemin) as fichier:
+        ecrivain = csv.writer(fichier)
+        ecrivain.writerow(COLONNES)
+        for lot in lots:
+            ecrivain.writerows(lot)
+            nb_lignes += len(lot)
+    return nb_lignes
+
+
+def _ecrire_jsonl(chemin, lots):
+    nb_lignes = 0
+    with _ouvrir_texte(chemin) as fichier:
+        for lot in lots:
+            for ligne in lot:
+                fichier.write(json.dumps(dict(zip(COLONNES, ligne)), ensure_ascii=False))
+                fichier.write("\n")
+            nb_lignes += len(lot)
+    return nb_lignes
+
+
+def _ecrire_colonnes(chemin, lots):
+    """
+    Chaque lot devient un groupe de lignes ; chaque colonne d'un groupe est un bloc
+    zlib indépendant. Le pied de fichier (JSON) donne la position de chaque bloc,
+    ce qui permet de relire une seule colonne.
+    """
+    groupes = []
+    nb_lignes = 0
+    with open(chemin, "wb") as fichier:
+        fichier.write(MAGIC_COLONNES)
+        for lot in lots:
+            blocs = []
+            for valeurs in zip(*lot):
+                donnees = zlib.compress(json.dumps(valeurs, ensure_ascii=False).encode("utf-8"))
+                blocs.append([fichier.tell(), len(donnees)])
+                fichier.write(donnees)
+            groupes.append({"lignes": len(lot), "blocs": blocs})
+            nb_lignes += len(lot)
+
+        pied = json.dumps({"colonnes": COLONNES, "lignes": nb_lignes, "groupes": groupes}).encode("utf-8")
+        fichier.write(pied)
+        fichier.write(struct.pack("<Q", len(pied)))
+        fichier.write(MAGIC_COLONNES)
+    return nb_lignes
+
+
+def lire_colonnes(chemin, colonnes=None):
+    """
+    Relit un fichier au format colonnes, groupe par groupe
+
+    Args:
+        colonnes: Noms des colonnes à lire (toutes par défaut)
+
+    Yields:
+        Dictionnaire {colonne: liste de valeurs} pour chaque groupe de lignes
+    """
+    with open(chemin, "rb") as fichier:
+        if fichier.read(len(MAGIC_COLONNES)) != MAGIC_COLONNES:
+            raise ValueError(f"{chemin} n'est pas un fichier au format colonnes")
+
+        fichier.seek(-(len(MAGIC_COLONNES) + 8), 2)
+        taille_pied = struct.unpack("<Q", fichier.read(8))[0]
+        fichier.seek(-(len(MAGIC_COLONNES) + 8 + taille_pied), 2)
+        pied = json.loads(fichier.read(taille_pied))
+
+        noms = colonnes or pied["colonnes"]
+        positions = [pied["colonnes"].index(nom) for nom in noms]
+        for groupe in pied["groupes"]:
+            resultat = {}
+            for nom, position in zip(noms, positions):
+                debut, taille = groupe["blocs"][position]
+                fichier.seek(debut)
+                resultat[nom] = json.loads(zlib.decompress(fichier.read(taille)))
+            yield resultat
+
+
+def _ecrire_parquet(chemin, lots):
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise RuntimeError("Le format parquet nécessite pyarrow (pip install pyarrow)")
+
+    schema = pyarrow.schema([
+        ("universite_id", pyarrow.int64()), ("universite", pyarrow.string()),
+        ("ville", pyarrow.string()), ("code_universite", pyarrow.string()),
+        ("annee_fondation", pyarrow.int64()), ("faculte_id", pyarrow.int64()),
+        ("faculte", pyarrow.string()), ("code_faculte", pyarrow.string()),
+        ("nombre_etudiants", pyarrow.int64()),
+    ])
+
+    nb_lignes = 0
+    with pyarrow.parquet.ParquetWriter(chemin, schema, compression="zstd") as ecrivain:
+        for lot in lots:
+            ecrivain.write_table(pyarrow.Table.from_arrays(
+                [pyarrow.array(valeurs, type=champ.type) for valeurs, champ in zip(zip(*lot), schema)],
+                schema=schema))
+            nb_lignes += len(lot)
+    return nb_lignes
+
+
+ECRIVAINS = {
+    "csv": _ecrire_csv,
+    "jsonl": _ecrire_jsonl,
+    "colonnes": _ecrire_colonnes,
+    "parquet": _ecrire_parquet,
+}
+
+
+def exporter_catalogue(chemin, format_=None, ville=None, min_etudiants=None, taille_lot=TAILLE_LOT):
+    """
+    Exporte le catalogue universités × facultés dans un fichier
+
+    Args:
+        chemin: Fichier de destination
+        format_: csv, jsonl, colonnes ou parquet (déduit de l'extension par défaut)
+        ville: Ne garder que les universités de cette ville
+        min_etudiants: Ne garder que les facultés ayant au moins ce nombre d'étudiants
+        taille_lot: Nombre de lignes lues et écrites à la fois
+
+    Returns:
+        Nombre de lignes exportées
+    """
+    format_ = format_ or deviner_format(chemin)
+    if format_ not in ECRIVAINS:
+        raise ValueError(f"Format inconnu : {format_} (formats : {', '.join(FORMATS)})")
+
+    return ECRIVAINS[format_](chemin, lots_catalogue(ville, min_etudiants, taille_lot))
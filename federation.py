@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+"""
+Lectures fédérées sur les fichiers de catalogue des bureaux régionaux
+
+Chaque bureau régional garde son propre universites_facultes.db. Une fédération attache
+ces fichiers (ATTACH, en lecture seule) à une seule connexion SQLite en mémoire et y crée
+des vues temporaires UNION ALL : universites_federees, facultes_federees et
+statistiques_federees. Chaque ligne porte le nom de sa source (le bureau régional).
+
+Les identifiants ne sont uniques que dans un fichier : une université fédérée se désigne
+par (source, id). Les filtres sur la source sont poussés par SQLite dans chaque branche
+de l'union, et les agrégats sont calculés fichier par fichier (compteurs dénormalisés) :
+les statistiques de la province coûtent une seule requête.
+
+SQLite limite le nombre de bases attachées à une connexion (10 par défaut, voir
+limite_fichiers).
+
+Exemple :
+    with Federation({"Montréal": "mtl/universites_facultes.db",
+                     "Québec": "qc/universites_facultes.db"}) as federation:
+        federation.obtenir_statistiques()
+"""
+
+import os
+import sqlite3
+from collections import namedtuple
+from urllib.request import pathname2url
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import StaticPool
+
+import database
+
+# Mêmes attributs que les objets Universite/Faculte, plus la source
+UniversiteFederee = namedtuple(
+    "UniversiteFederee",
+    "source id nom ville code_universite annee_fondation nb_facultes total_etudiants")
+FaculteFederee = namedtuple("FaculteFederee", "source id nom code_faculte nombre_etudiants universite_id")
+
+# Une branche par fichier attaché ({schema} : alias de l'ATTACH, {source} : littéral SQL)
+BRANCHE_UNIVERSITES = """
+SELECT {source} AS source, u.id, u.nom, v.nom AS ville, u.code_universite,
+       u.annee_fondation, u.nb_facultes, u.total_etudiants
+FROM {schema}.universites AS u JOIN {schema}.villes AS v ON v.id = u.ville_id"""
+
+BRANCHE_FACULTES = """
+SELECT {source} AS source, f.id, n.nom, c.code AS code_faculte, f.nombre_etudiants, f.universite_id
+FROM {schema}.facultes AS f
+JOIN {schema}.noms_facultes AS n ON n.id = f.nom_id
+JOIN {schema}.codes_facultes AS c ON c.id = f.code_id"""
+
+# Agrégats calculés dans chaque fichier sur les compteurs des universités (une ligne par source)
+BRANCHE_STATISTIQUES = """
+SELECT {source} AS source, count(*) AS universites,
+       coalesce(sum(nb_facultes), 0) AS facultes, coalesce(sum(total_etudiants), 0) AS etudiants
+FROM {schema}.universites"""
+
+REQUETE_UNIVERSITES = text(f"SELECT {', '.join(UniversiteFederee._fields)} "
+                           "FROM universites_federees ORDER BY nom, source")
+REQUETE_FACULTES_PAR_UNIVERSITE = text(
+    f"SELECT {', '.join(FaculteFederee._fields)} FROM facultes_federees "
+    "WHERE source = :source AND universite_id = :universite_id ORDER BY nom")
+REQUETE_STATISTIQUES = text("SELECT source, universites, facultes, etudiants FROM statistiques_federees")
+
+
+def limite_fichiers():
+    """Nombre maximal de fichiers attachés à une connexion (limite de compilation de SQLite)"""
+    connexion = sqlite3.connect(":memory:")
+    try:
+        return connexion.getlimit(sqlite3.SQLITE_LIMIT_ATTACHED)
+    finally:
+        connexion.close()
+
+
+def _litteral(texte):
+    return "'" + texte.replace("'", "''") + "'"
+
+
+def _sources(fichiers):
+    """{source: chemin} à partir d'un dictionnaire ou d'une liste de chemins"""
+    if isinstance(fichiers, dict):
+        return dict(fichiers)
+
+    sources = {}
+    for chemin in fichiers:
+        # Source : nom du dossier du bureau (mtl/universites_facultes.db), sinon du fichier
+        nom_fichier = os.path.splitext(os.path.basename(chemin))[0]
+        dossier = os.path.basename(os.path.dirname(os.path.abspath(chemin)))
+        source = dossier if nom_fichier == "universites_facultes" and dossier else nom_fichier
+        if source in sources:
+            raise ValueError(f"Deux fichiers ont la même source « {source} » : nommez les sources explicitement")
+        sources[source] = chemin
+    return sources
+
+
+class Federation:
+    """Lectures de database.py sur l'union de plusieurs fichiers de catalogue"""
+
+    def __init__(self, fichiers, preparer=True):
+        """
+        Args:
+            fichiers: {source: chemin}, ou liste de chemins (source : nom du dossier ou du fichier)
+            preparer: Mettre d'abord chaque fichier au schéma actuel (preparer_schema),
+                comme le fait l'application à l'ouverture
+        """
+        self.sources = _sources(fichiers)
+        if not self.sources:
+            raise ValueError("Aucun fichier à fédérer")
+        limite = limite_fichiers()
+        if len(self.sources) > limite:
+            raise ValueError(f"{len(self.sources)} fichiers : SQLite en attache au plus {limite} à une connexion")
+
+        for chemin in self.sources.values():
+            if not os.path.isfile(chemin):
+                raise ValueError(f"Fichier introuvable : {chemin}")
+            if preparer:
+                engine_fichier = create_engine(f"sqlite:///{chemin}")
+                database.preparer_schema(engine_fichier)
+                engine_fichier.dispose()
+
+        self._connexion = sqlite3.connect(":memory:", uri=True, check_same_thread=False)
+        branches = {"universites": [], "facultes": [], "statistiques": []}
+        for numero, (source, chemin) in enumerate(self.sources.items()):
+            schema = f"region_{numero}"
+            uri = f"file:{pathname2url(os.path.abspath(chemin))}?mode=ro"
+            self._connexion.execute(f"ATTACH DATABASE ? AS {schema}", (uri,))
+            parametres = {"schema": schema, "source": _litteral(source)}
+            branches["universites"].append(BRANCHE_UNIVERSITES.format(**parametres))
+            branches["facultes"].append(BRANCHE_FACULTES.format(**parametres))
+            branches["statistiques"].append(BRANCHE_STATISTIQUES.format(**parametres))
+        for nom, requetes in branches.items():
+            self._connexion.execute(f"CREATE TEMP VIEW {nom}_federees AS" + "\nUNION ALL".join(requetes))
+
+        connexion = self._connexion
+        self.engine = create_engine("sqlite://", creator=lambda: connexion, poolclass=StaticPool,
+                                    echo=database.engine.echo)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exception):
+        self.fermer()
+
+    def fermer(self):
+        self.engine.dispose()
+        self._connexion.close()
+
+    def obtenir_universites(self):
+        """Universités de tous les fichiers triées par nom (puis par source)"""
+        with self.engine.connect() as connexion:
+            return [UniversiteFederee(*ligne) for ligne in connexion.execute(REQUETE_UNIVERSITES)]
+
+    def obtenir_facultes_par_universite(self, universite_id, source):
+        """Facultés d'une université d'un fichier, triées par nom"""
+        with self.engine.connect() as connexion:
+            return [FaculteFederee(*ligne) for ligne in connexion.execute(
+                REQUETE_FACULTES_PAR_UNIVERSITE, {"source": source, "universite_id": universite_id})]
+
+    def obtenir_statistiques(self):
+        """
+        Statistiques de la province et de chaque source, en une requête
+
+        Returns:
+            {"universites", "facultes", "etudiants", "par_source": {source: {mêmes clés}}}
+        """
+        with self.engine.connect() as connexion:
+            lignes = connexion.execute(REQUETE_STATISTIQUES).all()
+
+        par_source = {source: {"universites": universites, "facultes": facultes, "etudiants": etudiants}
+                      for source, universites, facultes, etudiants in lignes}
+        totaux = {cle: sum(valeurs[cle] for valeurs in par_source.values())
+                  for cle in ("universites", "facultes", "etudiants")}
+        return {**totaux, "par_source": par_source}
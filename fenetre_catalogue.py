@@ -0,0 +1,328 @@
+# -*- coding: utf-8 -*-
+"""
+Vue tableau du catalogue complet (toutes les facultés de toutes les universités)
+
+Le modèle ne charge jamais tout le catalogue : les lignes arrivent par pages
+(pagination par clé, canFetchMore/fetchMore) au fil du défilement, et seules les
+dernières pages consultées restent en mémoire. Tris et filtres sont faits en SQL.
+"""
+
+from collections import OrderedDict
+
+from PySide6.QtCore import Qt, QAbstractTableModel, QModelIndex, QTimer
+from PySide6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit,
+                               QSpinBox, QTableView, QHeaderView, QAbstractItemView)
+from sqlalchemy import select, tuple_, and_, or_
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import Join
+
+import database
+from database import Universite, Faculte, Ville, NomFaculte, CodeFaculte
+
+TAILLE_PAGE = 200
+PAGES_EN_CACHE = 50
+
+
+class JointureOrdonnee(Join):
+    """
+    Jointure interne que SQLite parcourt dans l'ordre écrit (CROSS JOIN)
+
+    Les noms de facultés étant dans une table de correspondance, aucun index ne donne
+    l'ordre complet d'un tri par université : SQLite choisit alors de trier tout le
+    catalogue. En partant de la table de la première clé de tri, il ne trie que les
+    facultés de chaque université (« right part of ORDER BY »). Avec les statistiques
+    d'ANALYZE, il placerait aussi les petites tables de correspondance en tête :
+    tout l'ordre de parcours est donc imposé.
+    """
+    inherit_cache = True
+
+
+@compiles(JointureOrdonnee, "sqlite")
+def _compiler_jointure_ordonnee(jointure, compilateur, **kw):
+    kw.pop("asfrom", None)
+    return (jointure.left._compiler_dispatch(compilateur, asfrom=True, **kw)
+            + " CROSS JOIN " + jointure.right._compiler_dispatch(compilateur, asfrom=True, **kw)
+            + " ON " + jointure.onclause._compiler_dispatch(compilateur, **kw))
+
+
+# Conditions de jointure entre deux tables du catalogue
+_LIENS = [
+    ({Faculte, Universite}, Faculte.universite_id == Universite.id),
+    ({Universite, Ville}, Universite.ville_id == Ville.id),
+    ({Faculte, NomFaculte}, Faculte.nom_id == NomFaculte.id),
+    ({Faculte, CodeFaculte}, Faculte.code_id == CodeFaculte.id),
+]
+
+
+def _parcours(*modeles):
+    """Jointure des tables du catalogue parcourues dans l'ordre donné"""
+    jointure = modeles[0].__table__
+    for position, modele in enumerate(modeles[1:], 1):
+        deja_jointes = set(modeles[:position])
+        condition = next(condition for paire, condition in _LIENS
+                         if modele in paire and paire - {modele} <= deja_jointes)
+        jointure = JointureOrdonnee(jointure, modele.__table__, condition)
+    return jointure
+
+
+# Sans ordre imposé : quand un filtre très sélectif (code d'université) donne le point de départ
+JOINTURE_LIBRE = (
+    Faculte.__table__
+    .join(Universite.__table__, Faculte.universite_id == Universite.id)
+    .join(Ville.__table__, Universite.ville_id == Ville.id)
+    .join(NomFaculte.__table__, Faculte.nom_id == NomFaculte.id)
+    .join(CodeFaculte.__table__, Faculte.code_id == CodeFaculte.id)
+)
+
+# Colonnes affichées : (titre, colonnes de la clé de tri, la dernière étant Faculte.id, jointure)
+# (les textes internés sont triés sur les tables de correspondance jointes ; le parcours
+# part de la table de la première clé et suit les index vers les autres)
+COLONNES = [
+    ("Université", (Universite.nom, NomFaculte.nom, Faculte.id),
+     _parcours(Universite, Faculte, Ville, NomFaculte, CodeFaculte)),
+    ("Ville", (Ville.nom, Universite.nom, NomFaculte.nom, Faculte.id),
+     _parcours(Ville, Universite, Faculte, NomFaculte, CodeFaculte)),
+    ("Faculté", (NomFaculte.nom, Faculte.id),
+     _parcours(NomFaculte, Faculte, Universite, Ville, CodeFaculte)),
+    ("Code", (CodeFaculte.code, Faculte.id),
+     _parcours(CodeFaculte, Faculte, Universite, Ville, NomFaculte)),
+    ("Étudiants", (Faculte.nombre_etudiants, Faculte.id),
+     _parcours(Faculte, Universite, Ville, NomFaculte, CodeFaculte)),
+]
+
+# Valeurs lues pour chaque ligne : les colonnes affichées, puis de quoi reconstruire les clés
+VALEURS = [Universite.nom, Ville.nom, NomFaculte.nom, CodeFaculte.code,
+           Faculte.nombre_etudiants, Faculte.id]
+POSITIONS = {id(colonne): position for position, colonne in enumerate(VALEURS)}
+
+MAX_ETUDIANTS = 10_000_000
+
+
+def _condition_apres(cle, dernier, descendant):
+    """
+    Condition « après la dernière ligne lue » pour une clé de tri composée
+
+    Seule la première colonne peut être NULL (nombre_etudiants) : SQLite place
+    les NULL en premier en ordre croissant, en dernier en ordre décroissant.
+    Pour une colonne NOT NULL, la simple comparaison de tuples garde l'index utilisable.
+    """
+    premiere, reste = cle[0], cle[1:]
+    comparer = tuple_(*cle).__lt__ if descendant else tuple_(*cle).__gt__
+    comparer_reste = tuple_(*reste).__lt__ if descendant else tuple_(*reste).__gt__
+
+    if not premiere.expression.nullable:
+        return comparer(tuple_(*dernier))
+
+    if dernier[0] is None:
+        suite_nulls = and_(premiere.is_(None), comparer_reste(tuple_(*dernier[1:])))
+        return suite_nulls if descendant else or_(suite_nulls, premiere.isnot(None))
+
+    apres = comparer(tuple_(*dernier))
+    return or_(apres, premiere.is_(None)) if descendant else apres
+
+
+class ModeleCatalogue(QAbstractTableModel):
+    """Modèle Qt paginé par clé sur la jointure facultés × universités"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.filtres = {}
+        self.colonne_tri = 0
+        self.descendant = False
+        self._reinitialiser_pages()
+
+    def _reinitialiser_pages(self):
+        self._nb_lignes = 0
+        self._termine = False
+        # Clé de la dernière ligne de chaque page : page n+1 = lignes après curseurs[n]
+        self._curseurs = []
+        # Pages récemment lues (LRU) : numéro -> lignes
+        self._pages = OrderedDict()
+
+    # --- Requêtes ---------------------------------------------------------
+
+    def _requete(self):
+        # Une seule université : l'index du code suffit, inutile d'imposer l'ordre
+        jointure = COLONNES[self.colonne_tri][2]
+        if self.filtres.get("code_universite"):
+            jointure = JOINTURE_LIBRE
+
+        requete = select(*VALEURS).select_from(jointure)
+
+        if self.filtres.get("code_universite"):
+            requete = requete.where(Universite.code_universite == self.filtres["code_universite"])
+        if self.filtres.get("ville"):
+            requete = requete.where(Universite.ville == self.filtres["ville"])
+        if self.filtres.get("min_etudiants") is not None:
+            requete = requete.where(Faculte.nombre_etudiants >= self.filtres["min_etudiants"])
+        if self.filtres.get("max_etudiants") is not None:
+            requete = requete.where(Faculte.nombre_etudiants <= self.filtres["max_etudiants"])
+
+        cle = COLONNES[self.colonne_tri][1]
+        ordre = [colonne.desc() if self.descendant else colonne.asc() for colonne in cle]
+        return requete.order_by(*ordre).limit(TAILLE_PAGE)
+
+    def _cle_de(self, ligne):
+        return tuple(ligne[POSITIONS[id(colonne)]] for colonne in COLONNES[self.colonne_tri][1])
+
+    def _lire_page(self, numero):
+        requete = self._requete()
+        if numero > 0:
+            requete = requete.where(_condition_apres(
+                COLONNES[self.colonne_tri][1], self._curseurs[numero - 1], self.descendant))
+
+        lignes = [tuple(ligne) for ligne in database.session_de_lecture().execute(requete)]
+
+        self._pages[numero] = lignes
+        self._pages.move_to_end(numero)
+        while len(self._pages) > PAGES_EN_CACHE:
+            self._pages.popitem(last=False)
+        return lignes
+
+    def _ligne(self, rangee):
+        numero, position = divmod(rangee, TAILLE_PAGE)
+        page = self._pages.get(numero)
+        if page is None:
+            # Page sortie du cache : la relire à partir de son curseur
+            page = self._lire_page(numero)
+        else:
+            self._pages.move_to_end(numero)
+        return page[position] if position < len(page) else None
+
+    # --- Interface QAbstractTableModel -------------------------------------
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._nb_lignes
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(COLONNES)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return COLONNES[section][0]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.TextAlignmentRole and index.column() == 4:
+            return int(Qt.AlignRight | Qt.AlignVCenter)
+        if role != Qt.DisplayRole:
+            return None
+        ligne = self._ligne(index.row())
+        return None if ligne is None else ligne[index.column()]
+
+    def tout_charge(self):
+        """Vrai quand la dernière page a été lue"""
+        return self._termine
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and not self._termine
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or self._termine:
+            return
+
+        numero = len(self._curseurs)
+        lignes = self._lire_page(numero)
+        if len(lignes) < TAILLE_PAGE:
+            self._termine = True
+        if not lignes:
+            return
+
+        self._curseurs.append(self._cle_de(lignes[-1]))
+        self.beginInsertRows(QModelIndex(), self._nb_lignes, self._nb_lignes + len(lignes) - 1)
+        self._nb_lignes += len(lignes)
+        self.endInsertRows()
+
+    def sort(self, colonne, ordre=Qt.AscendingOrder):
+        self.colonne_tri = colonne
+        self.descendant = ordre == Qt.DescendingOrder
+        self.recharger()
+
+    # --- Filtres -------------------------------------------------------------
+
+    def appliquer_filtres(self, **filtres):
+        self.filtres = filtres
+        self.recharger()
+
+    def recharger(self):
+        self.beginResetModel()
+        self._reinitialiser_pages()
+        self.endResetModel()
+
+
+class FenetreCatalogue(QDialog):
+    """Fenêtre de consultation du catalogue complet avec tris et filtres"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Catalogue complet des facultés")
+        self.resize(900, 600)
+
+        # Un code plutôt qu'une liste déroulante : le catalogue peut compter
+        # des dizaines de milliers d'universités
+        self.lineEdit_code_universite = QLineEdit()
+        self.lineEdit_code_universite.setPlaceholderText("Code de l'université")
+
+        self.lineEdit_ville = QLineEdit()
+        self.lineEdit_ville.setPlaceholderText("Ville")
+
+        # La valeur minimale (-1) signifie « pas de borne »
+        self.spinBox_min = QSpinBox()
+        self.spinBox_max = QSpinBox()
+        for spin_box, texte in ((self.spinBox_min, "Min. étudiants"), (self.spinBox_max, "Max. étudiants")):
+            spin_box.setRange(-1, MAX_ETUDIANTS)
+            spin_box.setValue(-1)
+            spin_box.setSpecialValueText(texte)
+
+        layout_filtres = QHBoxLayout()
+        for widget in (self.lineEdit_code_universite, self.lineEdit_ville, self.spinBox_min, self.spinBox_max):
+            layout_filtres.addWidget(widget)
+
+        self.modele = ModeleCatalogue(self)
+        self.tableView = QTableView()
+        self.tableView.setModel(self.modele)
+        self.tableView.setSortingEnabled(True)
+        self.tableView.sortByColumn(0, Qt.AscendingOrder)
+        self.tableView.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.tableView.verticalHeader().setVisible(False)
+        # Hauteur de ligne fixe : pas de mesure du contenu de chaque ligne
+        self.tableView.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.tableView.horizontalHeader().setSectionResizeMode(QHeaderView.Interactive)
+        self.tableView.horizontalHeader().setStretchLastSection(True)
+
+        self.label_etat = QLabel()
+
+        layout = QVBoxLayout(self)
+        layout.addLayout(layout_filtres)
+        layout.addWidget(self.tableView)
+        layout.addWidget(self.label_etat)
+
+        # Les filtres sont appliqués après une courte pause de saisie
+        self.minuterie_filtres = QTimer(self)
+        self.minuterie_filtres.setSingleShot(True)
+        self.minuterie_filtres.setInterval(300)
+        self.minuterie_filtres.timeout.connect(self.appliquer_filtres)
+
+        self.lineEdit_code_universite.textChanged.connect(self.planifier_filtres)
+        self.lineEdit_ville.textChanged.connect(self.planifier_filtres)
+        self.spinBox_min.valueChanged.connect(self.planifier_filtres)
+        self.spinBox_max.valueChanged.connect(self.planifier_filtres)
+        self.modele.rowsInserted.connect(self.afficher_etat)
+        self.modele.modelReset.connect(self.afficher_etat)
+
+    def planifier_filtres(self, *args):
+        self.minuterie_filtres.start()
+
+    def appliquer_filtres(self):
+        self.modele.appliquer_filtres(
+            code_universite=self.lineEdit_code_universite.text().strip() or None,
+            ville=self.lineEdit_ville.text().strip() or None,
+            min_etudiants=self.spinBox_min.value() if self.spinBox_min.value() >= 0 else None,
+            max_etudiants=self.spinBox_max.value() if self.spinBox_max.value() >= 0 else None,
+        )
+
+    def afficher_etat(self, *args):
+        suite = "" if self.modele.tout_charge() else " (la suite se charge au défilement)"
+        self.label_etat.setText(f"{self.modele.rowCount()} ligne(s) chargée(s){suite}")
@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+"""
+Fenêtre des latences des actions utilisateur
+
+Une ligne par action (durées du traitement, des requêtes SQL et délai jusqu'à
+l'affichage) et l'histogramme de l'action sélectionnée. Les mesures viennent de
+instrumentation.compteur_requetes.
+"""
+
+import time
+
+from PySide6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QPushButton, QLabel,
+                               QTableWidget, QTableWidgetItem, QPlainTextEdit, QFileDialog,
+                               QAbstractItemView, QHeaderView)
+
+from instrumentation import compteur_requetes
+
+COLONNES = ["Action", "Exécutions", "Traitement p50 (ms)", "p90", "p99", "Max",
+            "Requêtes (moy.)", "SQL (moy. ms)", "Affichage p50 (ms)", "p90"]
+
+# Largeur de la plus longue barre des histogrammes, en caractères
+LARGEUR_BARRE = 40
+
+
+def barres(histogramme):
+    """Lignes de texte : une barre par classe non vide"""
+    plus_grand = max(histogramme.comptes) or 1
+    return [f"{libelle:>16} | {'#' * max(1, round(compte * LARGEUR_BARRE / plus_grand))} {compte}"
+            for libelle, compte in histogramme.classes() if compte]
+
+
+class FenetreLatences(QDialog):
+    """Histogrammes des durées de chaque action"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Latences des actions")
+        self.resize(950, 600)
+
+        self.tableWidget_actions = QTableWidget()
+        self.tableWidget_actions.setColumnCount(len(COLONNES))
+        self.tableWidget_actions.setHorizontalHeaderLabels(COLONNES)
+        self.tableWidget_actions.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.tableWidget_actions.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.tableWidget_actions.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.tableWidget_actions.verticalHeader().setVisible(False)
+        self.tableWidget_actions.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+
+        self.plainTextEdit_histogramme = QPlainTextEdit()
+        self.plainTextEdit_histogramme.setReadOnly(True)
+
+        self.label_etat = QLabel()
+
+        self.pushButton_Actualiser = QPushButton("Actualiser")
+        self.pushButton_Reinitialiser = QPushButton("Réinitialiser")
+        self.pushButton_Exporter = QPushButton("Exporter en JSON...")
+        layout_boutons = QHBoxLayout()
+        for bouton in (self.pushButton_Actualiser, self.pushButton_Reinitialiser, self.pushButton_Exporter):
+            layout_boutons.addWidget(bouton)
+
+        layout = QVBoxLayout(self)
+        layout.addWidget(self.tableWidget_actions, 1)
+        layout.addWidget(self.plainTextEdit_histogramme, 1)
+        layout.addWidget(self.label_etat)
+        layout.addLayout(layout_boutons)
+
+        self.tableWidget_actions.itemSelectionChanged.connect(self.afficher_histogramme)
+        self.pushButton_Actualiser.clicked.connect(self.rafraichir)
+        self.pushButton_Reinitialiser.clicked.connect(self.reinitialiser)
+        self.pushButton_Exporter.clicked.connect(self.exporter)
+
+        self.rafraichir()
+
+    def rafraichir(self):
+        self.noms = sorted(compteur_requetes.latences)
+        self.tableWidget_actions.setRowCount(len(self.noms))
+        for rangee, nom in enumerate(self.noms):
+            latences = compteur_requetes.latences[nom]
+            traitement, affichage = latences.traitement, latences.affichage
+            valeurs = [nom, traitement.nombre,
+                       f"{traitement.quantile(0.5):.1f}", f"{traitement.quantile(0.9):.1f}",
+                       f"{traitement.quantile(0.99):.1f}", f"{traitement.maximum:.1f}",
+                       f"{latences.requetes.moyenne():.1f}", f"{latences.sql.moyenne():.1f}",
+                       f"{affichage.quantile(0.5):.1f}", f"{affichage.quantile(0.9):.1f}"]
+            for colonne, valeur in enumerate(valeurs):
+                self.tableWidget_actions.setItem(rangee, colonne, QTableWidgetItem(str(valeur)))
+        self.afficher_histogramme()
+
+    def afficher_histogramme(self):
+        rangees = self.tableWidget_actions.selectionModel().selectedRows()
+        if not rangees:
+            self.plainTextEdit_histogramme.setPlainText("Sélectionnez une action pour voir ses histogrammes.")
+            return
+        nom = self.noms[rangees[0].row()]
+        latences = compteur_requetes.latences[nom]
+        lignes = [f"{nom} - traitement :", *barres(latences.traitement),
+                  "", "Requêtes SQL (durée cumulée par action) :", *barres(latences.sql),
+                  "", "Du clic à l'affichage :", *barres(latences.affichage)]
+        self.plainTextEdit_histogramme.setPlainText("\n".join(lignes))
+
+    def reinitialiser(self):
+        compteur_requetes.reinitialiser()
+        self.rafraichir()
+
+    def exporter(self):
+        nom = time.strftime("latences_%Y%m%d_%H%M%S.json")
+        chemin, _ = QFileDialog.getSaveFileName(self, "Exporter les latences", nom, "JSON (*.json)")
+        if chemin:
+            compteur_requetes.exporter_json(chemin)
+            self.label_etat.setText(f"Latences exportées dans {chemin}")
@@ -0,0 +1,233 @@
+# -*- coding: utf-8 -*-
+"""
+Fenêtre des opérations par lot
+
+Sélection multiple d'universités (à gauche) et de leurs facultés (à droite), puis :
+    - suppression des universités ou des facultés sélectionnées ;
+    - rattachement des facultés sélectionnées à une autre université ;
+    - modification de l'effectif des facultés sélectionnées (fixé ou décalé).
+
+Chaque opération demande une seule confirmation et passe par une seule transaction
+du dépôt, quel que soit le nombre de lignes ; la fenêtre principale n'est rechargée
+qu'une fois (signal donnees_modifiees).
+"""
+
+from PySide6.QtCore import Qt, QTimer, Signal
+from PySide6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QGridLayout, QLabel, QLineEdit,
+                               QListWidget, QListWidgetItem, QTableWidget, QTableWidgetItem, QPushButton,
+                               QComboBox, QSpinBox, QMessageBox, QAbstractItemView, QHeaderView)
+
+from instrumentation import action_utilisateur
+
+COLONNES = ["Faculté", "Code", "Étudiants", "Université"]
+
+# Regroupement des changements de sélection (défilement au clavier), comme dans main.py
+DELAI_SELECTION_MS = 50
+
+# Bornes du champ des effectifs (le décalage peut être négatif)
+EFFECTIF_MAX = 1_000_000
+
+MODE_FIXER = "Fixer à"
+MODE_AJOUTER = "Ajouter"
+
+
+class FenetreLots(QDialog):
+    """Opérations sur plusieurs universités ou facultés à la fois"""
+
+    # Message à afficher dans la fenêtre principale, qui se recharge une fois
+    donnees_modifiees = Signal(str)
+
+    def __init__(self, depot, parent=None):
+        super().__init__(parent)
+        self.depot = depot
+        self.setWindowTitle("Opérations par lot")
+        self.resize(1000, 650)
+
+        self.lineEdit_filtre = QLineEdit()
+        self.lineEdit_filtre.setPlaceholderText("Filtrer les universités...")
+
+        self.listWidget_universites = QListWidget()
+        self.listWidget_universites.setSelectionMode(QAbstractItemView.ExtendedSelection)
+
+        self.tableWidget_facultes = QTableWidget()
+        self.tableWidget_facultes.setColumnCount(len(COLONNES))
+        self.tableWidget_facultes.setHorizontalHeaderLabels(COLONNES)
+        self.tableWidget_facultes.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.tableWidget_facultes.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.tableWidget_facultes.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        self.tableWidget_facultes.verticalHeader().setVisible(False)
+        self.tableWidget_facultes.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+
+        self.label_selection = QLabel()
+
+        self.pushButton_SupprimerUniversites = QPushButton("Supprimer les universités")
+        self.pushButton_SupprimerFacultes = QPushButton("Supprimer les facultés")
+        self.comboBox_cible = QComboBox()
+        self.pushButton_Rattacher = QPushButton("Rattacher les facultés")
+        self.comboBox_mode = QComboBox()
+        self.comboBox_mode.addItems([MODE_FIXER, MODE_AJOUTER])
+        self.spinBox_etudiants = QSpinBox()
+        self.spinBox_etudiants.setRange(-EFFECTIF_MAX, EFFECTIF_MAX)
+        self.pushButton_Effectifs = QPushButton("Modifier les effectifs")
+
+        layout_actions = QGridLayout()
+        layout_actions.addWidget(self.pushButton_SupprimerUniversites, 0, 0)
+        layout_actions.addWidget(self.pushButton_SupprimerFacultes, 0, 1)
+        layout_actions.addWidget(QLabel("Vers l'université :"), 1, 0)
+        layout_actions.addWidget(self.comboBox_cible, 1, 1, 1, 2)
+        layout_actions.addWidget(self.pushButton_Rattacher, 1, 3)
+        layout_actions.addWidget(QLabel("Étudiants :"), 2, 0)
+        layout_actions.addWidget(self.comboBox_mode, 2, 1)
+        layout_actions.addWidget(self.spinBox_etudiants, 2, 2)
+        layout_actions.addWidget(self.pushButton_Effectifs, 2, 3)
+
+        layout_universites = QVBoxLayout()
+        layout_universites.addWidget(self.lineEdit_filtre)
+        layout_universites.addWidget(self.listWidget_universites)
+        layout_listes = QHBoxLayout()
+        layout_listes.addLayout(layout_universites, 1)
+        layout_listes.addWidget(self.tableWidget_facultes, 2)
+
+        layout = QVBoxLayout(self)
+        layout.addLayout(layout_listes, 1)
+        layout.addWidget(self.label_selection)
+        layout.addLayout(layout_actions)
+
+        # Une seule lecture des facultés pour une rafale de changements de sélection
+        self.minuterie_selection = QTimer(self)
+        self.minuterie_selection.setSingleShot(True)
+        self.minuterie_selection.setInterval(DELAI_SELECTION_MS)
+        self.minuterie_selection.timeout.connect(self.charger_facultes)
+
+        self.lineEdit_filtre.textChanged.connect(self.filtrer_universites)
+        self.listWidget_universites.itemSelectionChanged.connect(self.minuterie_selection.start)
+        self.tableWidget_facultes.itemSelectionChanged.connect(self.afficher_selection)
+        self.pushButton_SupprimerUniversites.clicked.connect(self.supprimer_universites)
+        self.pushButton_SupprimerFacultes.clicked.connect(self.supprimer_facultes)
+        self.pushButton_Rattacher.clicked.connect(self.rattacher_facultes)
+        self.pushButton_Effectifs.clicked.connect(self.modifier_effectifs)
+
+        self.rafraichir()
+
+    # --- Listes -------------------------------------------------------------------
+
+    def rafraichir(self):
+        """Relit les universités (en gardant la sélection de celles qui restent) et leurs facultés"""
+        selection = set(self.universites_selectionnees())
+        universites = self.depot.universites()
+        self.noms_universites = {universite.id: universite.nom for universite in universites}
+
+        self.listWidget_universites.blockSignals(True)
+        self.listWidget_universites.clear()
+        self.comboBox_cible.clear()
+        for universite in universites:
+            element = QListWidgetItem(f"{universite.nom} ({universite.code_universite}) - "
+                                      f"{universite.nb_facultes} faculté(s)")
+            element.setData(Qt.UserRole, universite.id)
+            self.listWidget_universites.addItem(element)
+            element.setSelected(universite.id in selection)
+            self.comboBox_cible.addItem(universite.nom, universite.id)
+        self.listWidget_universites.blockSignals(False)
+
+        self.filtrer_universites(self.lineEdit_filtre.text())
+        self.charger_facultes()
+
+    def filtrer_universites(self, texte):
+        texte = texte.strip().casefold()
+        for rangee in range(self.listWidget_universites.count()):
+            element = self.listWidget_universites.item(rangee)
+            element.setHidden(bool(texte) and texte not in element.text().casefold())
+
+    def universites_selectionnees(self):
+        return [element.data(Qt.UserRole) for element in self.listWidget_universites.selectedItems()]
+
+    def facultes_selectionnees(self):
+        return [self.tableWidget_facultes.item(index.row(), 0).data(Qt.UserRole)
+                for index in self.tableWidget_facultes.selectionModel().selectedRows()]
+
+    def charger_facultes(self):
+        """Facultés de toutes les universités sélectionnées, en une lecture du dépôt"""
+        self.minuterie_selection.stop()
+        universite_ids = self.universites_selectionnees()
+        facultes = self.depot.facultes_des_universites(universite_ids) if universite_ids else []
+
+        self.tableWidget_facultes.setUpdatesEnabled(False)
+        self.tableWidget_facultes.clearContents()
+        self.tableWidget_facultes.setRowCount(len(facultes))
+        for rangee, faculte in enumerate(facultes):
+            valeurs = [faculte.nom, faculte.code_faculte, faculte.nombre_etudiants,
+                       self.noms_universites.get(faculte.universite_id, "")]
+            for colonne, valeur in enumerate(valeurs):
+                self.tableWidget_facultes.setItem(rangee, colonne, QTableWidgetItem(str(valeur)))
+            self.tableWidget_facultes.item(rangee, 0).setData(Qt.UserRole, faculte.id)
+        self.tableWidget_facultes.setUpdatesEnabled(True)
+        self.afficher_selection()
+
+    def afficher_selection(self):
+        nb_universites = len(self.listWidget_universites.selectedItems())
+        nb_facultes = len(self.tableWidget_facultes.selectionModel().selectedRows())
+        self.label_selection.setText(f"{nb_universites} université(s) et {nb_facultes} faculté(s) "
+                                     f"sélectionnée(s) sur {self.tableWidget_facultes.rowCount()} affichée(s)")
+
+    # --- Opérations ---------------------------------------------------------------
+
+    def confirmer(self, question):
+        reponse = QMessageBox.question(self, "Opération par lot", question,
+                                       QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
+        return reponse == QMessageBox.StandardButton.Yes
+
+    def terminer(self, resultat, message):
+        """Un seul rafraîchissement, ici et dans la fenêtre principale"""
+        if resultat is None:
+            # Raison déjà affichée par le dépôt
+            QMessageBox.warning(self, "Erreur", "Opération refusée : rien n'a été modifié. Vérifiez les logs.")
+            return
+        self.rafraichir()
+        self.donnees_modifiees.emit(message.format(resultat))
+
+    @action_utilisateur("Lot : suppression d'universités")
+    def supprimer_universites(self):
+        universite_ids = self.universites_selectionnees()
+        if not universite_ids:
+            QMessageBox.warning(self, "Sélection", "Sélectionnez au moins une université.")
+            return
+        if self.confirmer(f"Supprimer {len(universite_ids)} université(s) et toutes leurs facultés?"):
+            self.terminer(self.depot.supprimer_universites(universite_ids), "LOT : {} université(s) supprimée(s)")
+
+    @action_utilisateur("Lot : suppression de facultés")
+    def supprimer_facultes(self):
+        faculte_ids = self.facultes_selectionnees()
+        if not faculte_ids:
+            QMessageBox.warning(self, "Sélection", "Sélectionnez au moins une faculté.")
+            return
+        if self.confirmer(f"Supprimer {len(faculte_ids)} faculté(s)?"):
+            self.terminer(self.depot.supprimer_facultes(faculte_ids), "LOT : {} faculté(s) supprimée(s)")
+
+    @action_utilisateur("Lot : rattachement de facultés")
+    def rattacher_facultes(self):
+        faculte_ids = self.facultes_selectionnees()
+        universite_id = self.comboBox_cible.currentData()
+        if not faculte_ids or universite_id is None:
+            QMessageBox.warning(self, "Sélection", "Sélectionnez des facultés et l'université cible.")
+            return
+        cible = self.comboBox_cible.currentText()
+        if self.confirmer(f"Rattacher {len(faculte_ids)} faculté(s) à {cible}?"):
+            self.terminer(self.depot.reassigner_facultes(faculte_ids, universite_id),
+                          f"LOT : {{}} faculté(s) rattachée(s) à {cible}")
+
+    @action_utilisateur("Lot : modification des effectifs")
+    def modifier_effectifs(self):
+        faculte_ids = self.facultes_selectionnees()
+        if not faculte_ids:
+            QMessageBox.warning(self, "Sélection", "Sélectionnez au moins une faculté.")
+            return
+        valeur = self.spinBox_etudiants.value()
+        if self.comboBox_mode.currentText() == MODE_FIXER:
+            question = f"Fixer l'effectif de {len(faculte_ids)} faculté(s) à {valeur} étudiants?"
+            modification = {"nombre": valeur}
+        else:
+            question = f"Ajouter {valeur:+d} étudiants à l'effectif de {len(faculte_ids)} faculté(s)?"
+            modification = {"ecart": valeur}
+        if self.confirmer(question):
+            self.terminer(self.depot.modifier_nombre_etudiants(faculte_ids, **modification),
+                          "LOT : effectif modifié pour {} faculté(s)")
@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+"""
+Fenêtre de diagnostic de la mémoire (main.py --memoire)
+
+Tableau des mesures du SuiviMemoire, plus fortes hausses d'allocation depuis la
+référence (calculées à la demande : quelques secondes) et enregistrement du rapport
+complet sur disque.
+"""
+
+import time
+
+from PySide6.QtCore import Qt
+from PySide6.QtGui import QGuiApplication
+from PySide6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
+                               QTableWidget, QTableWidgetItem, QPlainTextEdit, QFileDialog,
+                               QAbstractItemView, QHeaderView)
+
+# Dernières mesures affichées dans le tableau (le rapport les contient toutes)
+MESURES_AFFICHEES = 200
+
+
+class FenetreMemoire(QDialog):
+    """Mesures de la mémoire de la session en cours"""
+
+    def __init__(self, suivi, parent=None):
+        super().__init__(parent)
+        self.suivi = suivi
+        self.setWindowTitle("Diagnostic de la mémoire")
+        self.resize(900, 600)
+
+        self.tableWidget_mesures = QTableWidget()
+        self.tableWidget_mesures.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.tableWidget_mesures.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.tableWidget_mesures.verticalHeader().setVisible(False)
+        self.tableWidget_mesures.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+
+        self.plainTextEdit_differences = QPlainTextEdit()
+        self.plainTextEdit_differences.setReadOnly(True)
+
+        self.label_etat = QLabel()
+
+        self.pushButton_Mesurer = QPushButton("Mesurer maintenant")
+        self.pushButton_Reference = QPushButton("Nouvelle référence")
+        self.pushButton_Comparer = QPushButton("Comparer à la référence")
+        self.pushButton_Enregistrer = QPushButton("Enregistrer le rapport...")
+        layout_boutons = QHBoxLayout()
+        for bouton in (self.pushButton_Mesurer, self.pushButton_Reference, self.pushButton_Comparer,
+                       self.pushButton_Enregistrer):
+            layout_boutons.addWidget(bouton)
+
+        layout = QVBoxLayout(self)
+        layout.addWidget(self.tableWidget_mesures, 2)
+        layout.addWidget(QLabel("Plus fortes variations depuis la référence :"))
+        layout.addWidget(self.plainTextEdit_differences, 1)
+        layout.addWidget(self.label_etat)
+        layout.addLayout(layout_boutons)
+
+        self.pushButton_Mesurer.clicked.connect(self.mesurer)
+        self.pushButton_Reference.clicked.connect(self.definir_reference)
+        self.pushButton_Comparer.clicked.connect(self.comparer)
+        self.pushButton_Enregistrer.clicked.connect(self.enregistrer_rapport)
+
+        self.rafraichir()
+
+    def mesurer(self):
+        self.suivi.mesurer("manuelle")
+        self.rafraichir()
+
+    def definir_reference(self):
+        self.suivi.definir_reference()
+        self.rafraichir()
+
+    def comparer(self):
+        QGuiApplication.setOverrideCursor(Qt.WaitCursor)
+        try:
+            differences = self.suivi.differences()
+        finally:
+            QGuiApplication.restoreOverrideCursor()
+        self.plainTextEdit_differences.setPlainText("\n".join(str(difference) for difference in differences))
+
+    def enregistrer_rapport(self):
+        nom = time.strftime("memoire_%Y%m%d_%H%M%S.txt")
+        chemin, _ = QFileDialog.getSaveFileName(self, "Enregistrer le rapport", nom, "Texte (*.txt)")
+        if chemin:
+            QGuiApplication.setOverrideCursor(Qt.WaitCursor)
+            try:
+                self.suivi.ecrire_rapport(chemin)
+            finally:
+                QGuiApplication.restoreOverrideCursor()
+            self.label_etat.setText(f"Rapport enregistré dans {chemin}")
+
+    def rafraichir(self):
+        mesures = list(self.suivi.mesures)[-MESURES_AFFICHEES:]
+        noms_objets = sorted({nom for mesure in mesures for nom in mesure["objets"]})
+        noms_sondes = sorted({nom for mesure in mesures for nom in mesure["sondes"]})
+        entetes = ["Mesure", "Heure", "Étiquette", "Actuelle (Ko)", "Maximale (Ko)"] + noms_objets + noms_sondes
+
+        self.tableWidget_mesures.clear()
+        self.tableWidget_mesures.setColumnCount(len(entetes))
+        self.tableWidget_mesures.setHorizontalHeaderLabels(entetes)
+        self.tableWidget_mesures.setRowCount(len(mesures))
+        # La plus récente en haut
+        for rangee, mesure in enumerate(reversed(mesures)):
+            valeurs = ([mesure["numero"], time.strftime("%H:%M:%S", time.localtime(mesure["temps"])),
+                        mesure["etiquette"], mesure["actuelle"] // 1024, mesure["maximale"] // 1024]
+                       + [mesure["objets"].get(nom, 0) for nom in noms_objets]
+                       + [mesure["sondes"].get(nom, "") for nom in noms_sondes])
+            for colonne, valeur in enumerate(valeurs):
+                self.tableWidget_mesures.setItem(rangee, colonne, QTableWidgetItem(str(valeur)))
+
+        self.label_etat.setText(f"{len(self.suivi.mesures)} mesure(s), croissance depuis la référence : "
+                                f"{self.suivi.croissance() / 1024:.0f} Ko")
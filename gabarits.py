@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+"""
+Bases jetables pour les démonstrations, les essais et les bancs d'essai
+
+Un gabarit est une base complète (schéma, index, triggers, données) construite une
+seule fois puis gardée sur disque. Chaque exécution en reçoit une copie isolée :
+    - en mémoire, par l'API de sauvegarde de SQLite (le plus rapide) ;
+    - ou dans un fichier temporaire (réplique en mémoire, plusieurs connexions).
+
+universites_facultes.db n'est jamais modifiée et des exécutions parallèles ne se
+gênent pas : un gabarit est construit sous un nom temporaire puis renommé.
+
+Les gabarits vivent dans BANQUE_GABARITS (par défaut <dossier temporaire>/banque_gabarits).
+Leur nom contient une empreinte du schéma, des données de base et des paramètres :
+un gabarit périmé n'est jamais réutilisé.
+
+Exemple :
+    with base_ephemere("moyen"):
+        ...  # database.session, database.engine et tout le reste travaillent sur la copie
+"""
+
+import hashlib
+import os
+import shutil
+import sqlite3
+import tempfile
+import time
+from contextlib import closing, contextmanager
+
+from sqlalchemy import create_engine
+from sqlalchemy.pool import StaticPool
+from sqlalchemy.schema import CreateIndex, CreateTable
+
+import database
+import synthetique
+
+# Gabarits nommés : (universités synthétiques, facultés par université, données de base)
+GABARITS = {
+    "base": (0, 0, True),
+    "moyen": (2000, 20, True),
+    "grand": (50000, 20, True),
+}
+
+
+def dossier_gabarits():
+    return os.environ.get("BANQUE_GABARITS") or os.path.join(tempfile.gettempdir(), "banque_gabarits")
+
+
+def _empreinte(nb_universites, facultes_par_universite, donnees_initiales):
+    """Empreinte de ce qui fait le contenu d'un gabarit"""
+    dialecte = database.engine.dialect
+    contenu = repr((
+        [str(CreateTable(table).compile(dialect=dialecte)) for table in database.Base.metadata.sorted_tables],
+        sorted(str(CreateIndex(index).compile(dialect=dialecte))
+               for table in database.Base.metadata.sorted_tables for index in table.indexes),
+        database.TRIGGERS_COMPTEURS, database.TRIGGERS_HISTORIQUE,
+        database.UNIVERSITES_INITIALES if donnees_initiales else None,
+        database.FACULTES_INITIALES if donnees_initiales else None,
+        nb_universites, facultes_par_universite,
+    ))
+    return hashlib.sha1(contenu.encode("utf-8")).hexdigest()[:12]
+
+
+def _parametres(nom_ou_parametres):
+    if isinstance(nom_ou_parametres, str):
+        if nom_ou_parametres not in GABARITS:
+            raise ValueError(f"Gabarit inconnu : {nom_ou_parametres} (connus : {', '.join(GABARITS)})")
+        return GABARITS[nom_ou_parametres]
+    return nom_ou_parametres
+
+
+def construire_gabarit(gabarit="base"):
+    """
+    Chemin du fichier du gabarit, construit s'il n'existe pas encore
+
+    Args:
+        gabarit: Nom d'un gabarit de GABARITS, ou tuple
+            (universités synthétiques, facultés par université, données de base)
+    """
+    nb_universites, facultes_par_universite, donnees_initiales = _parametres(gabarit)
+    dossier = dossier_gabarits()
+    chemin = os.path.join(dossier, f"gabarit_{nb_universites}x{facultes_par_universite}"
+                                   f"{'_base' if donnees_initiales else ''}_"
+                                   f"{_empreinte(nb_universites, facultes_par_universite, donnees_initiales)}.db")
+    if os.path.exists(chemin):
+        return chemin
+
+    os.makedirs(dossier, exist_ok=True)
+    temporaire = f"{chemin}.{os.getpid()}.tmp"
+    debut = time.perf_counter()
+    engine_gabarit = create_engine(f"sqlite:///{temporaire}")
+    try:
+        database.preparer_schema(engine_gabarit)
+        if donnees_initiales:
+            with engine_gabarit.begin() as connexion:
+                database.inserer_donnees_initiales(connexion)
+        if nb_universites:
+            synthetique.remplir_base(engine_gabarit, nb_universites, facultes_par_universite)
+        # Statistiques du planificateur faites une fois pour toutes les copies
+        with engine_gabarit.begin() as connexion:
+            connexion.exec_driver_sql("ANALYZE")
+    except BaseException:
+        engine_gabarit.dispose()
+        os.remove(temporaire)
+        raise
+    engine_gabarit.dispose()
+
+    # Renommage atomique : un autre processus qui construit le même gabarit écrit le même contenu
+    os.replace(temporaire, chemin)
+    print(f"Gabarit construit en {time.perf_counter() - debut:.1f} s : {chemin}")
+    return chemin
+
+
+def cloner(gabarit="base", en_memoire=True, dossier=None):
+    """
+    Engine d'une copie isolée d'un gabarit
+
+    Args:
+        en_memoire: Copie dans une base :memory: (API de sauvegarde), sinon dans un fichier
+        dossier: Dossier du fichier de la copie (par défaut un dossier temporaire neuf)
+    """
+    source = construire_gabarit(gabarit)
+    echo = database.engine.echo
+
+    if en_memoire:
+        # Une seule connexion, partagée : une base :memory: n'existe que pour sa connexion
+        connexion = sqlite3.connect(":memory:", check_same_thread=False)
+        with closing(sqlite3.connect(source)) as connexion_gabarit:
+            connexion_gabarit.backup(connexion)
+        return create_engine("sqlite://", creator=lambda: connexion, poolclass=StaticPool, echo=echo)
+
+    chemin = os.path.join(dossier or tempfile.mkdtemp(prefix="banque_copie_"), "universites_facultes.db")
+    shutil.copyfile(source, chemin)
+    return create_engine(f"sqlite:///{chemin}", echo=echo)
+
+
+@contextmanager
+def base_ephemere(gabarit="base", en_memoire=True):
+    """
+    Le temps du bloc, database travaille sur une copie neuve du gabarit
+
+    La copie est détruite à la sortie et la base précédente reprise.
+    """
+    engine_copie = cloner(gabarit, en_memoire)
+    precedent = database.utiliser_engine(engine_copie, preparer=False)
+    try:
+        yield engine_copie
+    finally:
+        database.utiliser_engine(precedent, preparer=False)
+        engine_copie.dispose()
+        if not en_memoire:
+            shutil.rmtree(os.path.dirname(engine_copie.url.database), ignore_errors=True)
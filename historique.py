@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+"""
+Historique des effectifs des facultés
+
+Faculte.nombre_etudiants ne garde que la valeur actuelle ; enregistrer_effectifs()
+en prend une photo pour une période dans la table historique_effectifs. Les séries,
+tendances et croissances sont calculées en SQL, pour une faculté, une université,
+une ville ou tout le catalogue.
+"""
+
+from sqlalchemy import select, insert, func, literal, case
+
+import database
+from database import session, Universite, Faculte, Ville, NomFaculte, HistoriqueEffectif
+
+
+def enregistrer_effectifs(periode):
+    """
+    Enregistre le nombre d'étudiants actuel de toutes les facultés pour une période
+    (une seule requête INSERT ... SELECT ; remplace une photo existante)
+    
+    Returns:
+        Nombre de facultés enregistrées, ou None si erreur
+    """
+    try:
+        resultat = session.execute(
+            insert(HistoriqueEffectif).prefix_with("OR REPLACE").from_select(
+                ["faculte_id", "periode", "nombre_etudiants"],
+                select(Faculte.id, literal(periode), func.coalesce(Faculte.nombre_etudiants, 0)),
+            )
+        )
+        session.commit()
+        print(f"Effectifs de la période {periode} enregistrés : {resultat.rowcount} faculté(s)")
+        return resultat.rowcount
+    
+    except Exception as e:
+        session.rollback()
+        print(f"Erreur lors de l'enregistrement des effectifs : {e}")
+        return None
+
+
+def _serie(debut=None, fin=None, faculte_id=None, universite_id=None, ville=None):
+    """Requête (periode, etudiants) : total des effectifs par période sur la portée demandée"""
+    requete = select(
+        HistoriqueEffectif.periode.label("periode"),
+        func.sum(HistoriqueEffectif.nombre_etudiants).label("etudiants"),
+    )
+    
+    if faculte_id is not None:
+        requete = requete.where(HistoriqueEffectif.faculte_id == faculte_id)
+    elif universite_id is not None or ville:
+        requete = requete.join(Faculte, HistoriqueEffectif.faculte_id == Faculte.id)
+        if universite_id is not None:
+            requete = requete.where(Faculte.universite_id == universite_id)
+        if ville:
+            requete = requete.join(Universite, Faculte.universite_id == Universite.id).where(Universite.ville == ville)
+    
+    if debut is not None:
+        requete = requete.where(HistoriqueEffectif.periode >= debut)
+    if fin is not None:
+        requete = requete.where(HistoriqueEffectif.periode <= fin)
+    
+    return requete.group_by(HistoriqueEffectif.periode).order_by(HistoriqueEffectif.periode)
+
+
+def effectifs_plage(debut=None, fin=None, faculte_id=None, universite_id=None, ville=None):
+    """
+    Retourne les effectifs par période entre debut et fin (inclus)
+    
+    La portée est une faculté, une université, une ville, ou tout le catalogue
+    si aucun filtre n'est donné.
+    
+    Returns:
+        Liste de (periode, nombre_etudiants)
+    """
+    return [tuple(ligne) for ligne in database.session_de_lecture().execute(
+        _serie(debut, fin, faculte_id, universite_id, ville))]
+
+
+def tendance(debut=None, fin=None, faculte_id=None, universite_id=None, ville=None):
+    """
+    Tendance linéaire des effectifs (moindres carrés, sommes calculées en SQL)
+    
+    Returns:
+        Dictionnaire {"periodes", "moyenne", "pente"} où pente est la variation
+        moyenne d'étudiants par période, ou None s'il n'y a pas d'historique
+    """
+    serie = _serie(debut, fin, faculte_id, universite_id, ville).subquery()
+    x, y = serie.c.periode, serie.c.etudiants
+    
+    n, somme_x, somme_y, somme_xx, somme_xy = database.session_de_lecture().execute(select(
+        func.count(), func.sum(x), func.sum(y), func.sum(x * x), func.sum(x * y)
+    )).one()
+    
+    if not n:
+        return None
+    
+    denominateur = n * somme_xx - somme_x * somme_x
+    pente = (n * somme_xy - somme_x * somme_y) / denominateur if denominateur else 0.0
+    return {"periodes": n, "moyenne": somme_y / n, "pente": pente}
+
+
+def croissance_annuelle(debut=None, fin=None, faculte_id=None, universite_id=None, ville=None):
+    """
+    Croissance d'une période à l'autre (fonction de fenêtre LAG en SQL)
+    
+    Returns:
+        Liste de dictionnaires {"periode", "etudiants", "variation", "croissance"}
+        où croissance est en pourcentage (None pour la première période)
+    """
+    serie = _serie(debut, fin, faculte_id, universite_id, ville).subquery()
+    precedent = func.lag(serie.c.etudiants).over(order_by=serie.c.periode)
+    
+    lignes = database.session_de_lecture().execute(select(
+        serie.c.periode,
+        serie.c.etudiants,
+        serie.c.etudiants - precedent,
+        (serie.c.etudiants - precedent) * 100.0 / func.nullif(precedent, 0),
+    ).order_by(serie.c.periode))
+    
+    return [
+        {"periode": periode, "etudiants": etudiants, "variation": variation, "croissance": croissance}
+        for periode, etudiants, variation, croissance in lignes
+    ]
+
+
+REGROUPEMENTS = {
+    "faculte": (Faculte.id, NomFaculte.nom),
+    "universite": (Universite.id, Universite.nom),
+    "ville": (Universite.ville_id, Ville.nom),
+}
+
+
+def croissances(periode, periode_precedente=None, par="universite", limite=20, decroissant=True):
+    """
+    Classe toutes les facultés, universités ou villes selon leur croissance entre
+    deux périodes, en une seule requête
+    
+    Args:
+        periode: Période de comparaison
+        periode_precedente: Période de référence (défaut : periode - 1)
+        par: "faculte", "universite" ou "ville"
+        limite: Nombre de résultats (None pour tous)
+        decroissant: Plus fortes croissances en premier
+    
+    Returns:
+        Liste de (nom, etudiants_precedents, etudiants_actuels, croissance en %) ; la
+        croissance est None (après les autres) si la période de référence compte 0 étudiant
+    """
+    if periode_precedente is None:
+        periode_precedente = periode - 1
+    cle, libelle = REGROUPEMENTS[par]
+    
+    actuel = func.sum(case((HistoriqueEffectif.periode == periode, HistoriqueEffectif.nombre_etudiants)))
+    precedent = func.sum(case((HistoriqueEffectif.periode == periode_precedente, HistoriqueEffectif.nombre_etudiants)))
+    croissance = (actuel - precedent) * 100.0 / func.nullif(precedent, 0)
+    
+    requete = (
+        select(libelle, precedent, actuel, croissance)
+        .select_from(HistoriqueEffectif)
+        .join(Faculte, HistoriqueEffectif.faculte_id == Faculte.id)
+        .join(Universite, Faculte.universite_id == Universite.id)
+        .join(Ville, Universite.ville_id == Ville.id)
+        .join(NomFaculte, Faculte.nom_id == NomFaculte.id)
+        .where(HistoriqueEffectif.periode.in_([periode, periode_precedente]))
+        .group_by(cle)
+        .having(precedent.isnot(None), actuel.isnot(None))
+        .order_by(croissance.is_(None), croissance.desc() if decroissant else croissance.asc())
+    )
+    if limite:
+        requete = requete.limit(limite)
+    
+    return [tuple(ligne) for ligne in database.session_de_lecture().execute(requete)]
@@ -0,0 +1,314 @@
+# -*- coding: utf-8 -*-
+"""
+Importation en parallèle des fichiers d'export du registraire
+
+Chaque fichier décrit une université et ses facultés. La lecture et la validation
+(mêmes règles que ajouter_universite/ajouter_faculte) se font dans un
+ProcessPoolExecutor ; les lignes validées remontent ensuite vers un seul écrivain,
+le processus principal, qui insère par gros lots dans des transactions.
+
+Formats acceptés :
+    .json : {"universite": {"nom", "ville", "code_universite", "annee_fondation"},
+             "facultes": [{"nom", "code_faculte", "nombre_etudiants"}, ...]}
+    .csv  : colonnes nom_universite, ville, code_universite, annee_fondation,
+            nom_faculte, code_faculte, nombre_etudiants (une ligne par faculté)
+"""
+
+import csv
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from validation import valider_universite, valider_faculte
+
+EXTENSIONS_ACCEPTEES = (".json", ".csv")
+TAILLE_LOT_DEFAUT = 5000
+
+
+def _entier(valeur, defaut=None):
+    """Convertit une valeur lue dans un fichier en entier (ou defaut si vide)"""
+    if valeur is None or str(valeur).strip() == "":
+        return defaut
+    return int(valeur)
+
+
+def _lire_json(chemin):
+    with open(chemin, encoding="utf-8") as fichier:
+        contenu = json.load(fichier)
+
+    # Un fichier peut contenir une université ou une liste d'universités
+    blocs = contenu if isinstance(contenu, list) else [contenu]
+    for bloc in blocs:
+        yield bloc.get("universite", {}), bloc.get("facultes", [])
+
+
+def _lire_csv(chemin):
+    universites = {}
+    with open(chemin, encoding="utf-8", newline="") as fichier:
+        for ligne in csv.DictReader(fichier):
+            code = (ligne.get("code_universite") or "").strip()
+            if code not in universites:
+                universites[code] = ({
+                    "nom": ligne.get("nom_universite"),
+                    "ville": ligne.get("ville"),
+                    "code_universite": code,
+                    "annee_fondation": ligne.get("annee_fondation"),
+                }, [])
+            if ligne.get("nom_faculte"):
+                universites[code][1].append({
+                    "nom": ligne.get("nom_faculte"),
+                    "code_faculte": ligne.get("code_faculte"),
+                    "nombre_etudiants": ligne.get("nombre_etudiants"),
+                })
+    return universites.values()
+
+
+def analyser_fichier(chemin):
+    """
+    Lit et valide un fichier d'export (exécuté dans un processus de travail)
+
+    Returns:
+        Dictionnaire {"fichier", "universites", "erreurs"} où universites ne contient
+        que des données validées, prêtes à être écrites
+    """
+    resultat = {"fichier": chemin, "universites": [], "erreurs": []}
+
+    try:
+        if chemin.lower().endswith(".json"):
+            blocs = _lire_json(chemin)
+        else:
+            blocs = _lire_csv(chemin)
+
+        for donnees_uni, donnees_facultes in blocs:
+            nom = (donnees_uni.get("nom") or "").strip()
+            ville = (donnees_uni.get("ville") or "").strip()
+            code = (donnees_uni.get("code_universite") or "").strip()
+            try:
+                annee = _entier(donnees_uni.get("annee_fondation"))
+            except ValueError:
+                resultat["erreurs"].append(f"{code or nom} : année de fondation invalide")
+                continue
+
+            erreur = valider_universite(nom, ville, code, annee)
+            if erreur:
+                resultat["erreurs"].append(f"{code or nom or '?'} : {erreur}")
+                continue
+
+            facultes = []
+            noms_vus = set()
+            for numero, donnees_fac in enumerate(donnees_facultes, 1):
+                nom_fac = (donnees_fac.get("nom") or "").strip()
+                code_fac = (donnees_fac.get("code_faculte") or "").strip()
+                try:
+                    etudiants = _entier(donnees_fac.get("nombre_etudiants"), 0)
+                except ValueError:
+                    resultat["erreurs"].append(f"{code}, faculté {numero} : nombre d'étudiants invalide")
+                    continue
+
+                erreur = valider_faculte(nom_fac, code_fac, etudiants)
+                if not erreur and nom_fac in noms_vus:
+                    erreur = f"La faculté '{nom_fac}' apparaît deux fois"
+                if erreur:
+                    resultat["erreurs"].append(f"{code}, faculté {numero} : {erreur}")
+                    continue
+
+                noms_vus.add(nom_fac)
+                facultes.append((nom_fac, code_fac, etudiants))
+
+            resultat["universites"].append({
+                "nom": nom, "ville": ville, "code_universite": code,
+                "annee_fondation": annee, "facultes": facultes,
+            })
+
+    except Exception as e:
+        resultat["erreurs"].append(f"Fichier illisible : {e}")
+
+    return resultat
+
+
+class _Ecrivain:
+    """Seul écrivain de l'importation : insère les lignes validées par lots"""
+
+    def __init__(self, connexion, taille_lot):
+        import database
+        from database import Universite, Faculte, NomFaculte, Ville
+
+        self.database = database
+        self.connexion = connexion
+        self.taille_lot = taille_lot
+        self.table_universites = Universite.__table__
+        self.table_facultes = Faculte.__table__
+        self.facultes_en_attente = []
+        self.transaction = connexion.begin()
+
+        # Un seul aller-retour pour connaître l'existant ; la fiche (nom, ville, année)
+        # de chaque code permet de reconnaître la même université dans plusieurs fichiers
+        self.ids_par_code = {}
+        self.fiches_par_code = {}
+        self.codes_par_nom = {}
+        for id_, nom, code, ville, annee in connexion.execute(
+                self.table_universites.select().with_only_columns(
+                    self.table_universites.c.id, self.table_universites.c.nom,
+                    self.table_universites.c.code_universite, Ville.__table__.c.nom,
+                    self.table_universites.c.annee_fondation)
+                .join_from(self.table_universites, Ville.__table__)):
+            self.ids_par_code[code] = id_
+            self.fiches_par_code[code] = (nom, ville, annee)
+            self.codes_par_nom[nom] = code
+
+        self.facultes_existantes = set(connexion.execute(
+            self.table_facultes.select().with_only_columns(
+                self.table_facultes.c.universite_id, NomFaculte.__table__.c.nom)
+            .join_from(self.table_facultes, NomFaculte.__table__)).all())
+
+    def ecrire(self, resultat):
+        """Écrit le contenu validé d'un fichier et retourne son résumé"""
+        resume = {"fichier": resultat["fichier"], "universites": 0, "facultes": 0,
+                  "doublons": 0, "erreurs": list(resultat["erreurs"])}
+
+        for uni in resultat["universites"]:
+            code = uni["code_universite"]
+            code_du_nom = self.codes_par_nom.get(uni["nom"])
+
+            if code_du_nom is not None and code_du_nom != code:
+                resume["erreurs"].append(f"{code} : le nom '{uni['nom']}' est déjà utilisé par {code_du_nom}")
+                continue
+
+            # Même règle que ajouter_universite : un code déjà utilisé par une autre
+            # université est refusé ; la même fiche reçoit les facultés du fichier
+            fiche = (uni["nom"], uni["ville"], uni["annee_fondation"])
+            fiche_du_code = self.fiches_par_code.get(code)
+            if fiche_du_code is not None and fiche_du_code != fiche:
+                nom, ville, annee = fiche_du_code
+                resume["erreurs"].append(
+                    f"{code} : le code est déjà utilisé par '{nom}' ({ville}, {annee or 'année inconnue'})")
+                continue
+
+            universite_id = self.ids_par_code.get(code)
+            if universite_id is None:
+                universite_id = self.connexion.execute(self.table_universites.insert().values(
+                    nom=uni["nom"], ville_id=self.database.VILLES.identifiant(uni["ville"], self.connexion),
+                    code_universite=code,
+                    annee_fondation=uni["annee_fondation"])).inserted_primary_key[0]
+                self.ids_par_code[code] = universite_id
+                self.fiches_par_code[code] = fiche
+                self.codes_par_nom[uni["nom"]] = code
+                resume["universites"] += 1
+
+            for nom_fac, code_fac, etudiants in uni["facultes"]:
+                # Même règle que ajouter_faculte : (nom, université) unique
+                if (universite_id, nom_fac) in self.facultes_existantes:
+                    resume["doublons"] += 1
+                    continue
+                self.facultes_existantes.add((universite_id, nom_fac))
+                self.facultes_en_attente.append({
+                    "nom_id": self.database.NOMS_FACULTES.identifiant(nom_fac, self.connexion),
+                    "code_id": self.database.CODES_FACULTES.identifiant(code_fac, self.connexion),
+                    "nombre_etudiants": etudiants, "universite_id": universite_id,
+                })
+                resume["facultes"] += 1
+
+            if len(self.facultes_en_attente) >= self.taille_lot:
+                self.valider_lot()
+
+        return resume
+
+    def valider_lot(self):
+        """Insère les facultés en attente (executemany) et valide la transaction"""
+        if self.facultes_en_attente:
+            self.connexion.execute(self.table_facultes.insert(), self.facultes_en_attente)
+            self.facultes_en_attente = []
+        self.transaction.commit()
+        self.transaction = self.connexion.begin()
+
+    def terminer(self):
+        self.valider_lot()
+        self.transaction.commit()
+
+    def annuler(self):
+        self.transaction.rollback()
+
+
+def lister_fichiers(chemins):
+    """Développe les dossiers en la liste de leurs fichiers d'export"""
+    fichiers = []
+    for chemin in chemins:
+        if os.path.isdir(chemin):
+            for nom in sorted(os.listdir(chemin)):
+                if nom.lower().endswith(EXTENSIONS_ACCEPTEES):
+                    fichiers.append(os.path.join(chemin, nom))
+        else:
+            fichiers.append(chemin)
+    return fichiers
+
+
+def importer_fichiers(chemins, processus=None, taille_lot=TAILLE_LOT_DEFAUT, progression=None):
+    """
+    Importe des fichiers d'export en parallélisant la lecture et la validation
+
+    Args:
+        chemins: Fichiers ou dossiers à importer
+        processus: Nombre de processus de travail (défaut : nombre de cœurs)
+        taille_lot: Nombre de facultés insérées par transaction
+        progression: Fonction appelée après chaque fichier avec
+                     (nb_traites, nb_total, resume_du_fichier)
+
+    Returns:
+        Liste des résumés par fichier (universites, facultes, doublons, erreurs)
+    """
+    # Importé ici pour que les processus de travail n'ouvrent pas la base
+    import database
+
+    fichiers = lister_fichiers(chemins)
+    resumes = []
+
+    with database.engine.connect() as connexion:
+        ecrivain = _Ecrivain(connexion, taille_lot)
+        try:
+            with ProcessPoolExecutor(max_workers=processus) as executeur:
+                futurs = [executeur.submit(analyser_fichier, chemin) for chemin in fichiers]
+                for futur in as_completed(futurs):
+                    resume = ecrivain.ecrire(futur.result())
+                    resumes.append(resume)
+                    if progression:
+                        progression(len(resumes), len(fichiers), resume)
+            ecrivain.terminer()
+        except BaseException:
+            ecrivain.annuler()
+            raise
+
+    return resumes
+
+
+def afficher_progression(nb_traites, nb_total, resume):
+    """Progression par défaut : une ligne par fichier traité"""
+    etat = "OK" if not resume["erreurs"] else f"{len(resume['erreurs'])} erreur(s)"
+    print(f"[{nb_traites}/{nb_total}] {os.path.basename(resume['fichier'])} : "
+          f"{resume['universites']} université(s), {resume['facultes']} faculté(s), "
+          f"{resume['doublons']} doublon(s) - {etat}")
+
+
+def afficher_resume(resumes, duree):
+    """Affiche le bilan d'une importation et le détail des erreurs par fichier"""
+    total_uni = sum(r["universites"] for r in resumes)
+    total_fac = sum(r["facultes"] for r in resumes)
+    total_doublons = sum(r["doublons"] for r in resumes)
+    en_erreur = [r for r in resumes if r["erreurs"]]
+
+    print(f"\nIMPORTATION TERMINÉE en {duree:.2f} s")
+    print(f"   - {len(resumes)} fichier(s), {total_uni} université(s), {total_fac} faculté(s) ajoutées")
+    print(f"   - {total_doublons} doublon(s) ignoré(s), {len(en_erreur)} fichier(s) avec erreurs")
+
+    for resume in en_erreur:
+        print(f"\n{resume['fichier']} :")
+        for erreur in resume["erreurs"]:
+            print(f"   - {erreur}")
+
+
+def importer(chemins, processus=None, taille_lot=TAILLE_LOT_DEFAUT):
+    """Importe les fichiers en affichant la progression et le bilan"""
+    debut = time.perf_counter()
+    resumes = importer_fichiers(chemins, processus, taille_lot, afficher_progression)
+    afficher_resume(resumes, time.perf_counter() - debut)
+    return resumes
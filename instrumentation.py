@@ -0,0 +1,223 @@
+# -*- coding: utf-8 -*-
+"""
+Instrumentation des actions utilisateur
+
+Pour chaque action (changement d'université, ajout, statistiques...) :
+    - le nombre de requêtes SQL émises et leur durée cumulée ;
+    - la durée du traitement (du clic à la fin de la méthode) ;
+    - le délai jusqu'au prochain affichage de la fenêtre, mesuré depuis le clic
+      (signalé par la fenêtre, voir Application.event dans main.py).
+
+Les durées sont regroupées en histogrammes à classes logarithmiques, consultables
+dans la fenêtre des latences et exportables en JSON.
+"""
+
+import functools
+import json
+import threading
+import time
+from bisect import bisect_left
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Bornes supérieures des classes des histogrammes, en millisecondes (la dernière classe est ouverte)
+LIMITES_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000)
+
+
+class Histogramme:
+    """Répartition de durées en classes fixes : mémoire constante quel que soit le nombre de mesures"""
+
+    def __init__(self, limites=LIMITES_MS):
+        self.limites = limites
+        self.comptes = [0] * (len(limites) + 1)
+        self.nombre = 0
+        self.total = 0.0
+        self.maximum = 0.0
+
+    def ajouter(self, valeur):
+        self.comptes[bisect_left(self.limites, valeur)] += 1
+        self.nombre += 1
+        self.total += valeur
+        self.maximum = max(self.maximum, valeur)
+
+    def moyenne(self):
+        return self.total / self.nombre if self.nombre else 0.0
+
+    def quantile(self, proportion):
+        """Borne supérieure de la classe qui contient le quantile (le maximum pour la dernière)"""
+        if not self.nombre:
+            return 0.0
+        rang = proportion * self.nombre
+        cumul = 0
+        for classe, compte in enumerate(self.comptes):
+            cumul += compte
+            if cumul >= rang and compte:
+                return min(self.limites[classe], self.maximum) if classe < len(self.limites) else self.maximum
+        return self.maximum
+
+    def classes(self):
+        """Liste de (libellé de la classe, nombre de mesures)"""
+        bornes = ["0", *map(str, self.limites)]
+        return [(f"{bornes[classe]}-{bornes[classe + 1]} ms" if classe < len(self.limites)
+                 else f"> {self.limites[-1]} ms", compte)
+                for classe, compte in enumerate(self.comptes)]
+
+    def en_dict(self):
+        return {
+            "nombre": self.nombre,
+            "moyenne_ms": round(self.moyenne(), 3),
+            "p50_ms": round(self.quantile(0.50), 3),
+            "p90_ms": round(self.quantile(0.90), 3),
+            "p99_ms": round(self.quantile(0.99), 3),
+            "max_ms": round(self.maximum, 3),
+            "limites_ms": list(self.limites),
+            "comptes": list(self.comptes),
+        }
+
+
+class LatencesAction:
+    """Histogrammes d'une action : traitement, requêtes SQL et délai jusqu'à l'affichage"""
+
+    def __init__(self):
+        self.traitement = Histogramme()
+        self.sql = Histogramme()
+        self.affichage = Histogramme()
+        self.requetes = Histogramme(limites=(0, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000))
+
+    def en_dict(self):
+        return {
+            "traitement": self.traitement.en_dict(),
+            "sql": self.sql.en_dict(),
+            "affichage": self.affichage.en_dict(),
+            "requetes": self.requetes.en_dict(),
+        }
+
+
+class CompteurRequetes:
+    """Compte et chronomètre les requêtes SQL exécutées par le thread principal, tous moteurs confondus"""
+
+    def __init__(self):
+        self.total = 0
+        # Durée cumulée des requêtes, en secondes
+        self.duree_sql = 0.0
+        # Nom de l'action -> [nombre d'exécutions, nombre total de requêtes]
+        self.par_action = {}
+        # Nom de l'action -> LatencesAction
+        self.latences = {}
+        # Fonctions appelées à la fin de chaque action avec (nom, nb_requetes)
+        self.ecouteurs = []
+        self._profondeur = 0
+        self._debut_requete = None
+        # (nom, début) de la dernière action, jusqu'au prochain affichage de la fenêtre
+        self._affichage_attendu = None
+        event.listen(Engine, "before_cursor_execute", self._avant_requete)
+        event.listen(Engine, "after_cursor_execute", self._apres_requete)
+
+    def _avant_requete(self, connexion, curseur, requete, parametres, contexte, executemany):
+        # Les exportations en arrière-plan ne doivent pas fausser les mesures de l'interface
+        if threading.current_thread() is threading.main_thread():
+            self.total += 1
+            self._debut_requete = time.perf_counter()
+
+    def _apres_requete(self, connexion, curseur, requete, parametres, contexte, executemany):
+        if self._debut_requete is not None and threading.current_thread() is threading.main_thread():
+            self.duree_sql += time.perf_counter() - self._debut_requete
+            self._debut_requete = None
+
+    def enregistrer(self, nom, nb_requetes, duree=None, duree_sql=None, debut=None):
+        """
+        Args:
+            duree, duree_sql: Durées du traitement et de ses requêtes (secondes)
+            debut: Instant du début de l'action (perf_counter) pour le délai d'affichage
+        """
+        compte = self.par_action.setdefault(nom, [0, 0])
+        compte[0] += 1
+        compte[1] += nb_requetes
+
+        if duree is not None:
+            latences = self.latences.setdefault(nom, LatencesAction())
+            latences.traitement.ajouter(duree * 1000)
+            latences.sql.ajouter((duree_sql or 0.0) * 1000)
+            latences.requetes.ajouter(nb_requetes)
+        if debut is not None:
+            self._affichage_attendu = (nom, debut)
+
+        for ecouteur in self.ecouteurs:
+            ecouteur(nom, nb_requetes)
+
+    def signaler_affichage(self):
+        """La fenêtre vient d'être redessinée : clôt la mesure de la dernière action"""
+        if self._affichage_attendu is None:
+            return
+        nom, debut = self._affichage_attendu
+        self._affichage_attendu = None
+        self.latences.setdefault(nom, LatencesAction()).affichage.ajouter((time.perf_counter() - debut) * 1000)
+
+    def moyenne(self, nom):
+        """Nombre moyen de requêtes par exécution de l'action"""
+        executions, requetes = self.par_action.get(nom, (0, 0))
+        return requetes / executions if executions else 0.0
+
+    def resume(self):
+        """Lignes de texte : requêtes par action"""
+        return [
+            f"{nom} : {requetes} requête(s) en {executions} action(s), {requetes / executions:.1f} par action"
+            for nom, (executions, requetes) in sorted(self.par_action.items())
+        ]
+
+    def resume_latences(self):
+        """Lignes de texte : durées par action (médiane, 90e centile, maximum)"""
+        lignes = []
+        for nom, latences in sorted(self.latences.items()):
+            traitement, affichage = latences.traitement, latences.affichage
+            lignes.append(
+                f"{nom} : {traitement.nombre} fois, traitement p50 {traitement.quantile(0.5):.1f} ms "
+                f"p90 {traitement.quantile(0.9):.1f} ms max {traitement.maximum:.1f} ms, "
+                f"SQL {latences.sql.moyenne():.1f} ms en {latences.requetes.moyenne():.1f} requête(s), "
+                f"affichage p90 {affichage.quantile(0.9):.1f} ms")
+        return lignes
+
+    def exporter_json(self, chemin):
+        """Écrit les histogrammes de chaque action dans un fichier JSON"""
+        with open(chemin, "w", encoding="utf-8") as fichier:
+            json.dump({
+                "limites_ms": list(LIMITES_MS),
+                "actions": {nom: latences.en_dict() for nom, latences in sorted(self.latences.items())},
+            }, fichier, ensure_ascii=False, indent=2)
+        return chemin
+
+    def reinitialiser(self):
+        self.par_action.clear()
+        self.latences.clear()
+        self._affichage_attendu = None
+
+
+compteur_requetes = CompteurRequetes()
+
+
+def action_utilisateur(nom):
+    """
+    Décorateur : mesure les requêtes SQL et la durée d'une action
+
+    Seule l'action la plus externe est enregistrée : une démonstration qui appelle
+    voir_statistiques compte pour une seule action.
+    """
+    def decorateur(fonction):
+        @functools.wraps(fonction)
+        def enveloppe(*args, **kwargs):
+            compteur = compteur_requetes
+            compteur._profondeur += 1
+            debut_requetes, debut_sql = compteur.total, compteur.duree_sql
+            debut = time.perf_counter()
+            try:
+                return fonction(*args, **kwargs)
+            finally:
+                compteur._profondeur -= 1
+                if compteur._profondeur == 0:
+                    compteur.enregistrer(nom, compteur.total - debut_requetes,
+                                         duree=time.perf_counter() - debut,
+                                         duree_sql=compteur.duree_sql - debut_sql,
+                                         debut=debut)
+        return enveloppe
+    return decorateur
@@ -126,6 +126,24 @@ class Ui_MainWindow(object):
 
         self.layout_buttons.addWidget(self.pushButton_Supprimer)
 
+        self.pushButton_Exporter = QPushButton(self.layoutWidget1)
+        self.pushButton_Exporter.setObjectName(u"pushButton_Exporter")
+        self.pushButton_Exporter.setFont(font1)
+
+        self.layout_buttons.addWidget(self.pushButton_Exporter)
+
+        self.pushButton_Catalogue = QPushButton(self.layoutWidget1)
+        self.pushButton_Catalogue.setObjectName(u"pushButton_Catalogue")
+        self.pushButton_Catalogue.setFont(font1)
+
+        self.layout_buttons.addWidget(self.pushButton_Catalogue)
+
+        self.pushButton_OperationsLot = QPushButton(self.layoutWidget1)
+        self.pushButton_OperationsLot.setObjectName(u"pushButton_OperationsLot")
+        self.pushButton_OperationsLot.setFont(font1)
+
+        self.layout_buttons.addWidget(self.pushButton_OperationsLot)
+
 
         self.layout_resultats.addLayout(self.layout_buttons)
 
@@ -366,6 +384,9 @@ class Ui_MainWindow(object):
         self.pushButton_VoirStats.setText(QCoreApplication.translate("MainWindow", u"Voir Statistiques", None))
         self.pushButton_Demo.setText(QCoreApplication.translate("MainWindow", u"D\u00e9monstration", None))
         self.pushButton_Supprimer.setText(QCoreApplication.translate("MainWindow", u"Supprimer", None))
+        self.pushButton_Exporter.setText(QCoreApplication.translate("MainWindow", u"Exporter", None))
+        self.pushButton_Catalogue.setText(QCoreApplication.translate("MainWindow", u"Catalogue Complet", None))
+        self.pushButton_OperationsLot.setText(QCoreApplication.translate("MainWindow", u"Op\u00e9rations par Lot", None))
         self.pushButton_ViderMessages.setText(QCoreApplication.translate("MainWindow", u"Vider les Messages", None))
         self.groupe_ajout_universite.setTitle(QCoreApplication.translate("MainWindow", u"Ajout une Universit\u00e9", None))
         self.label_nom_universite.setText(QCoreApplication.translate("MainWindow", u"Nom de l'universit\u00e9:", None))
@@ -1,25 +1,151 @@
 import sys
 import os
+import argparse
 # Ensure we're using the virtual environment
 venv_site_packages = os.path.join(os.path.dirname(__file__), 'env', 'Lib', 'site-packages')
 if venv_site_packages not in sys.path:
     sys.path.insert(0, venv_site_packages)
 
-from PySide6.QtWidgets import QApplication, QMainWindow, QMessageBox
-from PySide6.QtCore import Qt
+from PySide6.QtWidgets import QApplication, QMainWindow, QMessageBox, QFileDialog, QPushButton
+from PySide6.QtCore import Qt, QObject, QThread, Signal, QTimer, QSignalBlocker, QEvent
+from PySide6.QtGui import QKeySequence, QShortcut
 from interface import Ui_MainWindow
-from database import (session, Universite, Faculte,
-                        obtenir_universites, obtenir_facultes_par_universite,
-                        ajouter_faculte, initialiser_donnees, afficher_toutes_les_donnees)
+from depot import DepotSQLAlchemy, DepotMemoire
+from ecriture_differee import DepotDiffere
+from catalogue_partage import DepotPartage
+from exportation import exporter_catalogue
+from fenetre_catalogue import FenetreCatalogue
+from fenetre_latences import FenetreLatences
+from fenetre_lots import FenetreLots
+from fenetre_memoire import FenetreMemoire
+from instrumentation import action_utilisateur, compteur_requetes
+from maintenance import entretenir, optimiser_connexion, pages_a_liberer, resume_entretien
+from memoire import SuiviMemoire
+import database
+import sauvegarde
+import traces
+from database import (session, initialiser_donnees, afficher_toutes_les_donnees,
+                        activer_replique_memoire)
+
+class TacheExportation(QThread):
+    """Exporte le catalogue en arrière-plan pour ne pas bloquer l'interface"""
+    terminee = Signal(int, str)
+    echec = Signal(str)
+
+    def __init__(self, chemin, format_, parent=None):
+        super().__init__(parent)
+        self.chemin = chemin
+        self.format_ = format_
+
+    def run(self):
+        try:
+            nb_lignes = exporter_catalogue(self.chemin, self.format_)
+            self.terminee.emit(nb_lignes, self.chemin)
+        except Exception as e:
+            self.echec.emit(str(e))
+
+class TacheSauvegarde(QThread):
+    """Prend un instantané de la base en arrière-plan (copie à chaud par étapes)"""
+    terminee = Signal(object)
+    echec = Signal(str)
+
+    def __init__(self, options, parent=None):
+        super().__init__(parent)
+        self.options = options
+
+    def run(self):
+        try:
+            self.terminee.emit(sauvegarde.sauvegarder(**self.options))
+        except Exception as e:
+            self.echec.emit(str(e))
+
+class RelaisEcritures(QObject):
+    """Ramène dans le fil de l'interface les refus d'écritures différées (--ecriture-differee)"""
+    refus = Signal(str)
+
+# Délai de regroupement des changements de sélection (défilement au clavier, rechargements)
+DELAI_SELECTION_MS = 50
+
+# Entretien de la base après ce délai sans action de l'utilisateur, par morceaux
+# d'au plus PAGES_PAR_ENTRETIEN pages libérées pour ne pas figer l'interface
+DELAI_ENTRETIEN_MS = 5 * 60 * 1000
+PAGES_PAR_ENTRETIEN = 2000
+
+# Lignes gardées dans la zone des résultats : les plus anciennes disparaissent
+# (une instance ouverte des semaines ne doit pas accumuler tout son historique)
+LIGNES_MAX_RESULTATS = 5000
+
+# Mesure de la mémoire (option --memoire) à cet intervalle
+DELAI_MESURE_MEMOIRE_MS = 60 * 1000
+
+# Statistiques : plus grandes facultés affichées et nombre de tranches d'effectif (quartiles)
+NB_CLASSEMENT = 10
+NB_TRANCHES = 4
+
+# Aucune université n'a encore été affichée dans la liste des facultés
+_AUCUNE_UNIVERSITE = object()
 
 class Application(QMainWindow):
-    def __init__(self):
+    def __init__(self, suivi_memoire=None, rapport_memoire=None, depot=None,
+                 sauvegarde_minutes=0, sauvegarde_options=None):
         super().__init__()
         self.ui = Ui_MainWindow()
         self.ui.setupUi(self)
-
-        # Initialiser la base de données
-        initialiser_donnees()
+        self.ui.textEdit_resultats.document().setMaximumBlockCount(LIGNES_MAX_RESULTATS)
+
+        # Dépôt des universités et facultés : la base SQLite par défaut
+        self.depot = depot if depot is not None else DepotSQLAlchemy()
+
+        # Les changements de sélection rapprochés sont regroupés en un seul chargement
+        self.universite_affichee = _AUCUNE_UNIVERSITE
+        self.minuterie_selection = QTimer(self)
+        self.minuterie_selection.setSingleShot(True)
+        self.minuterie_selection.setInterval(DELAI_SELECTION_MS)
+        self.minuterie_selection.timeout.connect(self.on_universites_change)
+
+        # Entretien de la base pendant l'inactivité : la minuterie repart à chaque action
+        self.tache_exportation = None
+        self.minuterie_entretien = QTimer(self)
+        self.minuterie_entretien.setSingleShot(True)
+        self.minuterie_entretien.setInterval(DELAI_ENTRETIEN_MS)
+        self.minuterie_entretien.timeout.connect(self.entretenir_base)
+        if self.depot.base_sqlite:
+            self.minuterie_entretien.start()
+
+        # Instantanés planifiés (--sauvegarde-minutes), pris pendant que l'application travaille
+        self.tache_sauvegarde = None
+        self.sauvegarde_options = sauvegarde_options or {}
+        self.minuterie_sauvegarde = QTimer(self)
+        self.minuterie_sauvegarde.setInterval(int(sauvegarde_minutes * 60 * 1000))
+        self.minuterie_sauvegarde.timeout.connect(self.sauvegarder_base)
+        if self.depot.base_sqlite and sauvegarde_minutes > 0:
+            self.minuterie_sauvegarde.start()
+
+        # Écritures différées refusées par la base : l'utilisateur est prévenu et les listes rechargées
+        self.relais_ecritures = RelaisEcritures(self)
+        self.relais_ecritures.refus.connect(self.on_ecriture_refusee)
+        if isinstance(self.depot, DepotDiffere):
+            self.depot.ecouteurs.append(self.relais_ecritures.refus.emit)
+
+        # Requêtes SQL par action dans la barre d'état, latences dans leur fenêtre
+        compteur_requetes.ecouteurs.append(self.afficher_requetes_action)
+        self.pushButton_Latences = QPushButton("Latences")
+        self.pushButton_Latences.clicked.connect(self.ouvrir_latences)
+        self.statusBar().addPermanentWidget(self.pushButton_Latences)
+        QShortcut(QKeySequence("Ctrl+Shift+L"), self, self.ouvrir_latences)
+
+        # Suivi de la mémoire sur demande (--memoire)
+        self.suivi_memoire = suivi_memoire
+        self.rapport_memoire = rapport_memoire
+        if suivi_memoire is not None:
+            self.activer_suivi_memoire()
+
+        # Initialiser la base de données ; sans elle, ni catalogue ni exportation
+        if self.depot.base_sqlite:
+            initialiser_donnees()
+        else:
+            self.ui.pushButton_Exporter.setEnabled(False)
+            self.ui.pushButton_Catalogue.setEnabled(False)
 
         # Connecter les signaux aux méthodes
         self.connecter_signaux()
@@ -32,7 +158,8 @@ class Application(QMainWindow):
 
     def connecter_signaux(self):
         # Signal principal : changement de universités met à jour les facultés
-        self.ui.comboBox_universites.currentTextChanged.connect(self.on_universites_change)
+        # (sur l'index et non le texte, avec un délai pour regrouper les changements)
+        self.ui.comboBox_universites.currentIndexChanged.connect(self.planifier_changement_universite)
         
         # Changement de facultés active le bouton d'affichage
         self.ui.comboBox_facultes.currentTextChanged.connect(self.on_facultes_change)
@@ -45,9 +172,18 @@ class Application(QMainWindow):
         self.ui.pushButton_Demo.clicked.connect(self.lancer_demonstration)
         self.ui.pushButton_ViderMessages.clicked.connect(self.vider_messages)
         self.ui.pushButton_Supprimer.clicked.connect(self.supprimer_selection)
+        self.ui.pushButton_Exporter.clicked.connect(self.exporter_donnees)
+        self.ui.pushButton_Catalogue.clicked.connect(self.ouvrir_catalogue)
+        self.ui.pushButton_OperationsLot.clicked.connect(self.ouvrir_operations_lot)
 
+    @action_utilisateur("Chargement des universités")
     def charger_universites(self):
         try:
+            # Bloquer les signaux pendant le remplissage : clear() et addItem()
+            # déclencheraient sinon un chargement des facultés chacun
+            bloqueurs = [QSignalBlocker(combo) for combo in (
+                self.ui.comboBox_universites, self.ui.comboBox_facultes, self.ui.comboBox_universite_faculte)]
+            
             # Vider les ComboBox
             self.ui.comboBox_universites.clear()
             self.ui.comboBox_facultes.clear()
@@ -59,23 +195,55 @@ class Application(QMainWindow):
             self.ui.comboBox_universite_faculte.addItem(defaut_item, None)
             
             # Récupérer et ajouter tous les universite
-            universite_liste = obtenir_universites()
+            universite_liste = self.depot.universites()
             
             for universite in universite_liste:
                 # Stocker l'ID du universite comme data
                 self.ui.comboBox_universites.addItem(universite.nom, universite.id)
                 self.ui.comboBox_universite_faculte.addItem(universite.nom, universite.id)
+                
+                # Les compteurs dénormalisés s'affichent sans requête supplémentaire
+                resume = f"{universite.nb_facultes} faculté(s), {universite.total_etudiants} étudiants"
+                self.ui.comboBox_universites.setItemData(self.ui.comboBox_universites.count() - 1, resume, Qt.ToolTipRole)
             
             self.ui.textEdit_resultats.append(f"Liste des universités chargées : {len(universite_liste)} universités disponibles")
             
+            # Un seul rafraîchissement des facultés, une fois les listes remplies
+            for bloqueur in bloqueurs:
+                bloqueur.unblock()
+            self.minuterie_selection.stop()
+            self.on_universites_change(forcer=True)
+            
         except Exception as e:
             QMessageBox.critical(self, "Erreur", f"Erreur lors du chargement des universités : {e}")
     
-    def on_universites_change(self):
+    def planifier_changement_universite(self, _index=None):
+        # Redémarrer le délai : seule la dernière sélection sera chargée
+        self.minuterie_selection.start()
+    
+    def appliquer_selection_en_attente(self):
+        # Charger immédiatement une sélection encore en attente (sélection automatique)
+        if self.minuterie_selection.isActive():
+            self.minuterie_selection.stop()
+            self.on_universites_change()
+    
+    @action_utilisateur("Sélection d'une université")
+    def on_universites_change(self, forcer=False):
         # Récupérer l'ID de l'iniversité sélectionnée
         universite_id = self.ui.comboBox_universites.currentData()
         universite_nom = self.ui.comboBox_universites.currentText()
         
+        # Même université que celle déjà affichée : rien à recharger
+        if not forcer and universite_id == self.universite_affichee:
+            return
+        self.universite_affichee = universite_id
+        
+        # Le signal de la liste des facultés n'est émis qu'une fois, après le remplissage
+        with QSignalBlocker(self.ui.comboBox_facultes):
+            self.remplir_facultes(universite_id, universite_nom)
+        self.on_facultes_change()
+    
+    def remplir_facultes(self, universite_id, universite_nom):
         # Vider la liste des facultés
         self.ui.comboBox_facultes.clear()
         
@@ -88,7 +256,7 @@ class Application(QMainWindow):
         
         try:
             # Récupérer les facultés du université sélectionné
-            facultes = obtenir_facultes_par_universite(universite_id)
+            facultes = self.depot.facultes_par_universite(universite_id)
             
             if facultes:
                 # Activer la ComboBox des facultés
@@ -124,6 +292,7 @@ class Application(QMainWindow):
         else:
             self.ui.pushButton_AfficherSelection.setEnabled(False)
     
+    @action_utilisateur("Affichage de la sélection")
     def afficher_selection(self):
         universite_nom = self.ui.comboBox_universites.currentText()
         faculte_nom = self.ui.comboBox_facultes.currentText()
@@ -138,6 +307,7 @@ class Application(QMainWindow):
         else:
             QMessageBox.critical(self, "Erreur", f"Rien de selectionner")
     
+    @action_utilisateur("Ajout d'une université")
     def ajouter_nouvelle_universite(self):
         try:
             nom_uni = self.ui.lineEdit_nom_universite.text().strip().title()
@@ -167,18 +337,23 @@ class Application(QMainWindow):
                 return
             
             # Vérifier que l'université n'existe pas déjà
-            universite_existant = session.query(Universite).filter(
-                (Universite.nom == nom_uni) | (Universite.code_universite == code_uni)
-            ).first()
+            universite_existant = self.depot.universite_existante(nom_uni, code_uni)
             
             if universite_existant:
                 QMessageBox.warning(self, "Erreur", f"Cette université existe déjà!")
                 return
             
+            # Quasi-doublons (« Universite de Montreal » pour « Université de Montréal »)
+            semblables = [f"{nom} ({ville})" for _, nom, ville, _ in self.depot.doublons_universite(nom_uni)]
+            if semblables and not self.confirmer_malgre_doublons(nom_uni, semblables):
+                return
+            
             # Créer la nouvelle université
-            nouvelle_universite = Universite(nom=nom_uni, ville=ville_uni, code_universite=code_uni, annee_fondation=annee)
-            session.add(nouvelle_universite)
-            session.commit()
+            nouvelle_universite = self.depot.ajouter_universite(nom_uni, ville_uni, code_uni, int(annee) if annee else None)
+            if nouvelle_universite is None:
+                # Message déjà affiché par le dépôt
+                QMessageBox.warning(self, "Erreur", "Impossible d'ajouter l'université. Vérifiez les logs.")
+                return
             
             # Succès
             self.ui.textEdit_resultats.append(f"NOUVELLE UNIVERSITÉ AJOUTÉE : {nom_uni} ({code_uni})")
@@ -195,9 +370,9 @@ class Application(QMainWindow):
             QMessageBox.information(self, "Succès", f"Université '{nom_uni}' ajoutée avec succès!")
             
         except Exception as e:
-            session.rollback()
             QMessageBox.critical(self, "Erreur", f"Erreur lors de l'ajout de l'université : {e}")
     
+    @action_utilisateur("Ajout d'une faculté")
     def ajouter_nouvelle_faculte(self):
         try:
             # Récupérer les données du formulaire
@@ -234,8 +409,13 @@ class Application(QMainWindow):
             #     QMessageBox.warning(self, "Erreur", f"Cette faculté existe déjà!")
             #     return
             
-            # Ajouter la faculté via la fonction de la base de données
-            nouvelle_faculte = ajouter_faculte(nom_faculte, code_faculte, int(nb_etudiants), id_uni)
+            # Quasi-doublons parmi les facultés de la même université
+            semblables = [nom for _, nom, _ in self.depot.doublons_faculte(nom_faculte, id_uni)]
+            if semblables and not self.confirmer_malgre_doublons(nom_faculte, semblables):
+                return
+            
+            # Ajouter la faculté via le dépôt
+            nouvelle_faculte = self.depot.ajouter_faculte(nom_faculte, code_faculte, int(nb_etudiants), id_uni)
             
             if nouvelle_faculte:
                 # Succès
@@ -249,7 +429,7 @@ class Application(QMainWindow):
                 
                 # Actualiser les listes si l'université actuel correspond
                 if self.ui.comboBox_universites.currentData() == id_uni:
-                    self.on_universites_change()
+                    self.on_universites_change(forcer=True)
                 
                 QMessageBox.information(
                     self, 
@@ -263,29 +443,51 @@ class Application(QMainWindow):
         except Exception as e:
             QMessageBox.critical(self, "Erreur", f"Erreur lors de l'ajout : {e}")
     
+    @action_utilisateur("Statistiques")
     def voir_statistiques(self):
         try:
-            nb_uni = session.query(Universite).count()
-            nb_facul = session.query(Faculte).count()
+            stats = self.depot.statistiques()
+            nb_uni = stats["universites"]
+            nb_facul = stats["facultes"]
             
             # Détail par pays
             message = f"STATISTIQUES DE LA BASE DE DONNÉES\n\n"
             message += f"Total : {nb_uni} université, {nb_facul} facultés\n\n"
             
-            liste_uni = obtenir_universites()
+            # Classements lus dans l'ordre des index des effectifs : quelques lignes seulement
+            message += "Plus grandes facultés :\n"
+            for faculte in self.depot.classement_facultes(NB_CLASSEMENT):
+                message += f"  {faculte.rang}. {faculte.nom} ({faculte.universite}) : {faculte.nombre_etudiants} étudiants\n"
+            message += f"\nRépartition des effectifs en {NB_TRANCHES} tranches :\n"
+            for tranche in self.depot.tranches_effectifs(NB_TRANCHES):
+                message += (f"  {tranche['tranche']}. {tranche['facultes']} faculté(s) de {tranche['minimum']} "
+                            f"à {tranche['maximum']} étudiants (moyenne {tranche['moyenne']:.0f})\n")
+            faculte_id = self.ui.comboBox_facultes.currentData()
+            faculte = self.depot.faculte(faculte_id) if faculte_id is not None else None
+            if faculte is not None:
+                rang = self.depot.rang_faculte(faculte.id)
+                rang_code = self.depot.rang_faculte(faculte.id, code_faculte=faculte.code_faculte)
+                if rang is not None:
+                    message += (f"\n{faculte.nom} : rang {rang} du catalogue, "
+                                f"rang {rang_code} des facultés {faculte.code_faculte}\n")
+            message += "\n"
+            
+            # Les compteurs sont stockés sur l'université : aucune faculté à charger
+            liste_uni = self.depot.universites()
             for uni in liste_uni:
-                nb_facul_uni = len(uni.facultes)
-                message += f"• {uni.nom} ({uni.code_universite}) : {nb_facul_uni} faculté(s)\n"
+                message += f"• {uni.nom} ({uni.code_universite}) : {uni.nb_facultes} faculté(s), {uni.total_etudiants} étudiants\n"
             
             QMessageBox.information(self, "Statistiques", message)
             
             self.ui.textEdit_resultats.append(f"Statistiques : {nb_uni} université, {nb_facul} facultés")
 
-            afficher_toutes_les_donnees()
+            if self.depot.base_sqlite:
+                afficher_toutes_les_donnees()
             
         except Exception as e:
             QMessageBox.critical(self, "Erreur", f"Erreur lors du calcul des statistiques : {e}")
 
+    @action_utilisateur("Démonstration")
     def lancer_demonstration(self):
         chosen_uni = "UQAM"
         chosen_facul = "Faculté des Arts (ARTS)"
@@ -299,6 +501,7 @@ class Application(QMainWindow):
         index_uni = self.ui.comboBox_universites.findText(chosen_uni)
         if index_uni >= 0:
             self.ui.comboBox_universites.setCurrentIndex(index_uni)
+            self.appliquer_selection_en_attente()
             self.ui.textEdit_resultats.append(f"1. Sélection automatique de l'université '{chosen_uni}'")
             
             # 3. Sélectionner une faculté
@@ -312,6 +515,174 @@ class Application(QMainWindow):
         
         self.ui.textEdit_resultats.append("=== DÉMONSTRATION TERMINÉE ===\n")
 
+    def exporter_donnees(self):
+        filtres = {
+            "CSV (*.csv)": "csv",
+            "JSON Lines (*.jsonl)": "jsonl",
+            "Colonnes compressées (*.col)": "colonnes",
+            "Parquet (*.parquet)": "parquet",
+        }
+        chemin, filtre = QFileDialog.getSaveFileName(self, "Exporter le catalogue", "catalogue.csv", ";;".join(filtres))
+        if not chemin:
+            return
+        
+        # L'exportation tourne dans un thread : l'interface reste utilisable
+        self.ui.pushButton_Exporter.setEnabled(False)
+        self.ui.textEdit_resultats.append(f"Exportation en cours vers {chemin}...")
+        
+        self.tache_exportation = TacheExportation(chemin, filtres.get(filtre), self)
+        self.tache_exportation.terminee.connect(self.on_exportation_terminee)
+        self.tache_exportation.echec.connect(self.on_exportation_echec)
+        self.tache_exportation.start()
+
+    def on_exportation_terminee(self, nb_lignes, chemin):
+        self.ui.pushButton_Exporter.setEnabled(True)
+        self.ui.textEdit_resultats.append(f"EXPORTATION TERMINÉE : {nb_lignes} ligne(s) écrites dans {chemin}")
+
+    def on_exportation_echec(self, message):
+        self.ui.pushButton_Exporter.setEnabled(True)
+        QMessageBox.critical(self, "Erreur", f"Erreur lors de l'exportation : {message}")
+
+    @action_utilisateur("Ouverture du catalogue")
+    def ouvrir_catalogue(self):
+        # Fenêtre non modale : le catalogue reste ouvert à côté de la fenêtre principale
+        self.fenetre_catalogue = FenetreCatalogue(self)
+        self.fenetre_catalogue.show()
+
+    def ouvrir_operations_lot(self):
+        # Fenêtre non modale : chaque lot recharge la fenêtre principale une seule fois
+        self.fenetre_lots = FenetreLots(self.depot, self)
+        self.fenetre_lots.donnees_modifiees.connect(self.on_lot_termine)
+        self.fenetre_lots.show()
+
+    def on_lot_termine(self, message):
+        self.ui.textEdit_resultats.append(message)
+        self.charger_universites()
+
+    def sauvegarder_base(self):
+        # Un instantané à la fois : le suivant attend la prochaine échéance
+        if self.tache_sauvegarde is not None and self.tache_sauvegarde.isRunning():
+            return
+        self.tache_sauvegarde = TacheSauvegarde(self.sauvegarde_options, self)
+        self.tache_sauvegarde.terminee.connect(self.on_sauvegarde_terminee)
+        self.tache_sauvegarde.echec.connect(self.on_sauvegarde_echec)
+        self.tache_sauvegarde.start()
+
+    def on_sauvegarde_terminee(self, rapport):
+        lignes = sauvegarde.resume_sauvegarde(rapport)
+        print("SAUVEGARDE DE LA BASE :\n   " + "\n   ".join(lignes))
+        self.statusBar().showMessage(lignes[0])
+
+    def on_sauvegarde_echec(self, message):
+        print(f"Erreur lors de la sauvegarde de la base : {message}")
+        self.statusBar().showMessage(f"Échec de la sauvegarde : {message}")
+
+    def on_ecriture_refusee(self, message):
+        self.ui.textEdit_resultats.append(f"ÉCRITURE REFUSÉE : {message}")
+        self.statusBar().showMessage(f"Écriture refusée : {message}")
+        QMessageBox.warning(self, "Écriture refusée", message)
+        self.charger_universites()
+
+    def activer_suivi_memoire(self):
+        suivi = self.suivi_memoire
+        suivi.ajouter_session("session", lambda: session)
+        suivi.ajouter_session("lecture", lambda: database.session_lecture)
+        document = self.ui.textEdit_resultats.document()
+        suivi.ajouter_sonde("resultats_caracteres", document.characterCount)
+        suivi.ajouter_sonde("resultats_lignes", document.blockCount)
+        suivi.ajouter_sonde("liste_universites", self.ui.comboBox_universites.count)
+        suivi.ajouter_sonde("liste_facultes", self.ui.comboBox_facultes.count)
+        suivi.definir_reference("démarrage")
+
+        self.minuterie_memoire = QTimer(self)
+        self.minuterie_memoire.setInterval(DELAI_MESURE_MEMOIRE_MS)
+        self.minuterie_memoire.timeout.connect(self.mesurer_memoire)
+        self.minuterie_memoire.start()
+
+        # Accès à la fenêtre de diagnostic : barre d'état et Ctrl+Maj+M
+        self.pushButton_Memoire = QPushButton("Mémoire")
+        self.pushButton_Memoire.clicked.connect(self.ouvrir_diagnostic_memoire)
+        self.statusBar().addPermanentWidget(self.pushButton_Memoire)
+        QShortcut(QKeySequence("Ctrl+Shift+M"), self, self.ouvrir_diagnostic_memoire)
+
+    def mesurer_memoire(self):
+        self.suivi_memoire.mesurer("périodique")
+        fenetre = getattr(self, "fenetre_memoire", None)
+        if fenetre is not None and fenetre.isVisible():
+            fenetre.rafraichir()
+
+    def ouvrir_diagnostic_memoire(self):
+        self.suivi_memoire.mesurer("ouverture du diagnostic")
+        self.fenetre_memoire = FenetreMemoire(self.suivi_memoire, self)
+        self.fenetre_memoire.show()
+
+    def ouvrir_latences(self):
+        # Fenêtre non modale : elle se met à jour avec le bouton Actualiser
+        self.fenetre_latences = FenetreLatences(self)
+        self.fenetre_latences.show()
+
+    def event(self, evenement):
+        resultat = super().event(evenement)
+        # UpdateRequest : la fenêtre et ses widgets viennent d'être redessinés
+        if evenement.type() == QEvent.UpdateRequest:
+            compteur_requetes.signaler_affichage()
+        return resultat
+
+    def afficher_requetes_action(self, nom, nb_requetes):
+        moyenne = compteur_requetes.moyenne(nom)
+        self.statusBar().showMessage(f"{nom} : {nb_requetes} requête(s) SQL (moyenne {moyenne:.1f})")
+        self.minuterie_entretien.start()
+
+    def entretenir_base(self):
+        if not self.depot.base_sqlite:
+            return
+
+        # L'exportation lit la base dans son thread et l'entretien ferait reprendre une
+        # sauvegarde en cours : attendre la prochaine période d'inactivité
+        if any(tache is not None and tache.isRunning()
+               for tache in (self.tache_exportation, self.tache_sauvegarde)):
+            self.minuterie_entretien.start()
+            return
+
+        try:
+            rapport = entretenir(max_pages=PAGES_PAR_ENTRETIEN)
+        except Exception as e:
+            print(f"Erreur lors de l'entretien de la base : {e}")
+            return
+
+        lignes = resume_entretien(rapport)
+        print("ENTRETIEN DE LA BASE :\n   " + "\n   ".join(lignes))
+        self.statusBar().showMessage(f"Entretien de la base : {lignes[0]}")
+
+        # Il reste des pages à rendre : continuer à la prochaine période d'inactivité
+        if pages_a_liberer(rapport["apres"]):
+            self.minuterie_entretien.start()
+
+    def closeEvent(self, event):
+        # Un instantané commencé est terminé (et vérifié) avant la fermeture
+        self.minuterie_sauvegarde.stop()
+        if self.tache_sauvegarde is not None:
+            self.tache_sauvegarde.wait()
+
+        # Les écritures en attente sont écrites avant de quitter
+        self.depot.fermer()
+
+        # Statistiques des tables que les requêtes de la session auraient voulu connaître
+        if self.depot.base_sqlite:
+            try:
+                optimiser_connexion(session.connection())
+                session.commit()
+            except Exception as e:
+                session.rollback()
+                print(f"Erreur lors de l'optimisation de la base : {e}")
+
+        if self.suivi_memoire is not None and self.rapport_memoire:
+            self.suivi_memoire.mesurer("fermeture")
+            self.suivi_memoire.ecrire_rapport(self.rapport_memoire)
+            print(f"Rapport mémoire écrit dans {self.rapport_memoire}")
+        super().closeEvent(event)
+
+    @action_utilisateur("Vider les messages")
     def vider_messages(self):
         self.ui.textEdit_resultats.clear()
         # self.ui.textEdit_resultats.append("Messages vidés.")
@@ -330,6 +701,18 @@ class Application(QMainWindow):
         elif answer == QMessageBox.StandardButton.No:
             return False
 
+    def confirmer_malgre_doublons(self, nom, semblables):
+        liste = "\n".join(f"  - {semblable}" for semblable in semblables[:10])
+        answer = QMessageBox.question(
+            self,
+            'Doublon probable',
+            f"'{nom}' ressemble à :\n{liste}\n\nAjouter quand même?",
+            QMessageBox.StandardButton.Yes |
+            QMessageBox.StandardButton.No
+        )
+        return answer == QMessageBox.StandardButton.Yes
+
+    @action_utilisateur("Suppression")
     def supprimer_selection(self):
         universite_nom = self.ui.comboBox_universites.currentText()
         faculte_nom = self.ui.comboBox_facultes.currentText()
@@ -339,11 +722,10 @@ class Application(QMainWindow):
             validation = self.valider_supprimer(f"la faculté \n'{faculte_nom}' \nde l'université {universite_nom}")
 
             if validation:
-                faculte = session.query(Faculte).get(self.ui.comboBox_facultes.currentData())
-
                 # Supprime la faculte
-                session.delete(faculte)
-                session.commit()
+                if not self.depot.supprimer_faculte(self.ui.comboBox_facultes.currentData()):
+                    QMessageBox.warning(self, "Erreur", "Impossible de supprimer la faculté. Vérifiez les logs.")
+                    return
 
                 # Succès
                 self.ui.textEdit_resultats.append(f"FACULTÉ SURPRIMÉE : {faculte_nom}")
@@ -362,11 +744,10 @@ class Application(QMainWindow):
             validation = self.valider_supprimer(f"l'université \n'{universite_nom}'")
 
             if validation:
-                universite = session.query(Universite).get(self.ui.comboBox_universites.currentData())
-
-                # Supprimer l'universite
-                session.delete(universite)
-                session.commit()
+                # Supprimer l'universite (et ses facultés)
+                if not self.depot.supprimer_universite(self.ui.comboBox_universites.currentData()):
+                    QMessageBox.warning(self, "Erreur", "Impossible de supprimer l'université. Vérifiez les logs.")
+                    return
 
                 # Succès
                 self.ui.textEdit_resultats.append(f"UNIVERSITÉ SURPRIMÉE : {universite_nom}")
@@ -384,12 +765,69 @@ class Application(QMainWindow):
             QMessageBox.critical(self, "Erreur", f"Rien de selectionner\nVeuillez utiliser les dropboxs du haut.")
 
 if __name__ == "__main__":
-    app = QApplication(sys.argv)
+    parser = argparse.ArgumentParser(description="Système de gestion universitaire")
+    parser.add_argument("--replique", action="store_true",
+                        help="Servir les lectures depuis une copie en mémoire de la base (bornes de consultation)")
+    parser.add_argument("--memoire", action="store_true",
+                        help="Suivre la mémoire (tracemalloc, objets ORM, zone des résultats) : bouton Mémoire, Ctrl+Maj+M")
+    parser.add_argument("--rapport-memoire", metavar="CHEMIN",
+                        help="Avec --memoire, écrire le rapport mémoire dans ce fichier à la fermeture")
+    parser.add_argument("--depot", choices=["sqlite", "memoire"], default="sqlite",
+                        help="Dépôt des données : la base SQLite, ou tout en mémoire sans écriture "
+                             "(données de base, perdues à la fermeture)")
+    parser.add_argument("--ecriture-differee", action="store_true",
+                        help="Ajouts et suppressions confirmés tout de suite et écrits en arrière-plan, "
+                             "par lots, avec un journal (voir ecriture_differee.py)")
+    parser.add_argument("--catalogue-partage", action="store_true",
+                        help="Lire les universités et facultés dans le catalogue en mémoire partagée du poste "
+                             "(publié par : python cli.py partage servir)")
+    parser.add_argument("--trace", metavar="CHEMIN",
+                        help="Enregistrer chaque appel à la couche de données dans ce fichier de trace "
+                             "(rejeu : python cli.py trace rejouer CHEMIN)")
+    parser.add_argument("--sauvegarde-minutes", type=float, default=0, metavar="MINUTES",
+                        help="Prendre un instantané à chaud de la base à cet intervalle (voir sauvegarde.py)")
+    parser.add_argument("--sauvegarde-garder", type=int, default=sauvegarde.GARDER_DEFAUT, metavar="N",
+                        help="Instantanés les plus récents conservés")
+    parser.add_argument("--sauvegarde-compresser", action="store_true", help="Compresser les instantanés (.db.gz)")
+    options, arguments_qt = parser.parse_known_args()
+    if options.ecriture_differee and options.catalogue_partage:
+        parser.error("--ecriture-differee et --catalogue-partage ne se combinent pas")
+
+    # Démarré avant tout chargement pour que la référence couvre toute la session
+    suivi_memoire = SuiviMemoire() if options.memoire else None
+
+    app = QApplication(sys.argv[:1] + arguments_qt)
+
+    if options.depot == "memoire":
+        depot = DepotMemoire.avec_donnees_initiales()
+    else:
+        # Initialiser les données si nécessaire
+        initialiser_donnees()
 
-    # Initialiser les données si nécessaire
-    initialiser_donnees()
+        if options.replique:
+            activer_replique_memoire()
+
+        if options.ecriture_differee:
+            depot = DepotDiffere()
+        elif options.catalogue_partage:
+            depot = DepotPartage()
+        else:
+            depot = DepotSQLAlchemy()
     
-    window = Application()
+    # Enregistrement de la charge de travail : branché avant le premier chargement
+    enregistreur = None
+    if options.trace:
+        enregistreur = traces.EnregistreurTrace(options.trace, depot)
+        traces.enregistrer_appels(depot, enregistreur)
+
+    window = Application(suivi_memoire, options.rapport_memoire, depot,
+                         sauvegarde_minutes=options.sauvegarde_minutes,
+                         sauvegarde_options={"garder": options.sauvegarde_garder,
+                                             "compresser": options.sauvegarde_compresser})
     window.show()
     
-    sys.exit(app.exec())
\ No newline at end of file
+    code_sortie = app.exec()
+    if enregistreur is not None:
+        enregistreur.fermer()
+        print(f"Trace écrite dans {options.trace} : {enregistreur.nb_appels} appel(s)")
+    sys.exit(code_sortie)
\ No newline at end of file
@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+"""
+Entretien du fichier universites_facultes.db
+
+    - ANALYZE : statistiques du planificateur de requêtes. L'entretien périodique
+      se contente d'un échantillon (analysis_limit), l'analyse complète est à la demande.
+    - PRAGMA incremental_vacuum : rend au système les pages libérées par les
+      suppressions en cascade et les rechargements, dès qu'elles dépassent un seuil.
+    - convertir_vacuum_incremental() : passe une base créée sans auto_vacuum en
+      auto_vacuum=INCREMENTAL (un VACUUM complet, une seule fois). Les bases neuves
+      le sont dès leur création (voir preparer_schema).
+
+Lancé par main.py après quelques minutes d'inactivité et par `python cli.py maintenance`.
+"""
+
+import database
+
+MODES_AUTO_VACUUM = {0: "aucun", 1: "complet", 2: "incrémental"}
+AUTO_VACUUM_INCREMENTAL = 2
+
+# Pages libres à partir desquelles le fichier est réduit : 10 % du fichier, et au moins 1 Mo
+SEUIL_PAGES_LIBRES = 0.10
+MIN_PAGES_LIBRES = 256
+
+# Lignes lues par index pour l'analyse périodique (0 : analyse complète)
+LIMITE_ANALYSE = 1000
+
+
+def etat_fichier(connexion):
+    """Taille du fichier, nombre de pages, pages libres et mode auto_vacuum"""
+    def pragma(nom):
+        return connexion.exec_driver_sql(f"PRAGMA {nom}").scalar()
+
+    taille_page = pragma("page_size")
+    pages = pragma("page_count")
+    return {
+        "taille": taille_page * pages,
+        "taille_page": taille_page,
+        "pages": pages,
+        "pages_libres": pragma("freelist_count"),
+        "auto_vacuum": pragma("auto_vacuum"),
+    }
+
+
+def pages_a_liberer(etat, seuil=SEUIL_PAGES_LIBRES):
+    """Nombre de pages libres à rendre au système (0 si sous le seuil)"""
+    libres = etat["pages_libres"]
+    if libres < MIN_PAGES_LIBRES or libres < seuil * etat["pages"]:
+        return 0
+    return libres
+
+
+def entretenir(engine_cible=None, analyse_complete=False, seuil=SEUIL_PAGES_LIBRES, max_pages=None):
+    """
+    Met à jour les statistiques et réduit le fichier si assez de pages sont libres
+
+    Args:
+        engine_cible: Moteur de la base (défaut : database.engine)
+        analyse_complete: ANALYZE sur toutes les lignes plutôt que sur un échantillon
+        seuil: Proportion de pages libres déclenchant la réduction
+        max_pages: Pages libérées au plus (entretien par petits morceaux dans l'interface)
+
+    Returns:
+        {"avant": etat, "apres": etat, "actions": liste de textes}
+    """
+    engine_cible = engine_cible or database.engine
+    actions = []
+
+    with engine_cible.connect().execution_options(isolation_level="AUTOCOMMIT") as connexion:
+        avant = etat_fichier(connexion)
+
+        connexion.exec_driver_sql(f"PRAGMA analysis_limit = {0 if analyse_complete else LIMITE_ANALYSE}")
+        connexion.exec_driver_sql("ANALYZE")
+        actions.append("ANALYZE complet" if analyse_complete else f"ANALYZE (échantillon de {LIMITE_ANALYSE} lignes)")
+
+        a_liberer = pages_a_liberer(avant, seuil)
+        if a_liberer and avant["auto_vacuum"] == AUTO_VACUUM_INCREMENTAL:
+            if max_pages:
+                a_liberer = min(a_liberer, max_pages)
+            # Une page par pas d'exécution : executescript va jusqu'au bout, execute s'arrêterait au premier
+            connexion.connection.driver_connection.executescript(f"PRAGMA incremental_vacuum({a_liberer});")
+            actions.append(f"incremental_vacuum ({a_liberer} pages)")
+        elif a_liberer:
+            actions.append(f"{a_liberer} pages libres non rendues : auto_vacuum inactif (cli.py maintenance --convertir)")
+
+        apres = etat_fichier(connexion)
+
+    return {"avant": avant, "apres": apres, "actions": actions}
+
+
+def convertir_vacuum_incremental(engine_cible=None):
+    """
+    Passe la base en auto_vacuum=INCREMENTAL (VACUUM complet : à faire hors utilisation)
+
+    Returns:
+        Rapport comme entretenir()
+    """
+    engine_cible = engine_cible or database.engine
+
+    with engine_cible.connect().execution_options(isolation_level="AUTOCOMMIT") as connexion:
+        avant = etat_fichier(connexion)
+        actions = []
+        if avant["auto_vacuum"] != AUTO_VACUUM_INCREMENTAL:
+            connexion.exec_driver_sql("PRAGMA auto_vacuum = INCREMENTAL")
+            connexion.exec_driver_sql("VACUUM")
+            actions.append("auto_vacuum = INCREMENTAL, VACUUM")
+        apres = etat_fichier(connexion)
+
+    return {"avant": avant, "apres": apres, "actions": actions}
+
+
+def optimiser_connexion(connexion):
+    """
+    PRAGMA optimize sur une connexion qui a servi : SQLite analyse les tables dont
+    les requêtes de cette connexion auraient profité (à appeler avant de la fermer)
+    """
+    connexion.exec_driver_sql("PRAGMA optimize")
+
+
+def _mo(octets):
+    return f"{octets / 1_048_576:.1f} Mo"
+
+
+def resume_entretien(rapport):
+    """Lignes de texte : état du fichier avant/après et actions effectuées"""
+    avant, apres = rapport["avant"], rapport["apres"]
+    return [
+        f"Taille : {_mo(avant['taille'])} -> {_mo(apres['taille'])}",
+        f"Pages : {avant['pages']} -> {apres['pages']} ({apres['taille_page']} octets), "
+        f"libres : {avant['pages_libres']} -> {apres['pages_libres']}",
+        f"auto_vacuum : {MODES_AUTO_VACUUM.get(apres['auto_vacuum'], apres['auto_vacuum'])}",
+    ] + [f"- {action}" for action in rapport["actions"] or ["aucune action"]]
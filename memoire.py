@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+"""
+Suivi de la mémoire des longues sessions (option --memoire de main.py)
+
+Chaque mesure relève :
+    - la mémoire allouée par Python, actuelle et maximale (tracemalloc) ;
+    - les objets de la carte d'identité de chaque session SQLAlchemy, par classe ;
+    - des sondes libres : taille du document des résultats, lignes des listes...
+
+Le rapport compare l'instantané de référence (definir_reference(), après une période
+de chauffe) au dernier : les lignes de code dont les allocations ont le plus augmenté
+désignent la fuite. La comparaison parcourt chaque bloc alloué (plusieurs secondes
+pour l'interface complète) : elle n'est faite que pour le rapport, jamais à chaque mesure.
+
+tracemalloc ralentit chaque allocation : le suivi n'est actif que sur demande.
+"""
+
+import gc
+import time
+import tracemalloc
+from collections import Counter, deque
+
+# Cadres de pile conservés par allocation (traces des plus fortes hausses dans le rapport)
+NB_CADRES = 10
+
+# Mesures conservées : une par minute pendant plus de deux semaines
+MESURES_MAX = 25000
+
+
+def compter_identites(session):
+    """Objets présents dans la carte d'identité d'une session, par nom de classe"""
+    return Counter(type(objet).__name__ for objet in session.identity_map.values())
+
+
+def _ko(octets):
+    return f"{octets / 1024:.0f} Ko"
+
+
+class SuiviMemoire:
+    """
+    Mesures périodiques de la mémoire d'un processus
+
+    Attributes:
+        sessions: Nom -> fonction retournant une session (ou None si elle n'existe pas)
+        sondes: Nom -> fonction retournant un nombre
+        mesures: Dernières mesures, des dictionnaires (voir mesurer)
+    """
+
+    def __init__(self, nb_cadres=NB_CADRES, mesures_max=MESURES_MAX):
+        self.sessions = {}
+        self.sondes = {}
+        self.mesures = deque(maxlen=mesures_max)
+        self.reference = None
+        self.dernier = None
+        self._numero_reference = None
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(nb_cadres)
+
+    def ajouter_session(self, nom, fonction):
+        self.sessions[nom] = fonction
+
+    def ajouter_sonde(self, nom, fonction):
+        self.sondes[nom] = fonction
+
+    def mesurer(self, etiquette="", instantane=True):
+        """
+        Prend une mesure et, par défaut, un instantané tracemalloc
+
+        Returns:
+            {"numero", "etiquette", "temps", "actuelle", "maximale", "objets", "sondes"}
+            où objets associe "session.Classe" à un nombre d'objets
+        """
+        # Le dernier instantané est libéré avant la mesure : seule la référence reste
+        # comptée, une quantité fixe qui ne fausse pas la croissance
+        self.dernier = None
+        # Les cycles inatteignables ne sont pas des fuites : les libérer avant de mesurer
+        gc.collect()
+        actuelle, maximale = tracemalloc.get_traced_memory()
+
+        objets = Counter()
+        for nom, fonction in self.sessions.items():
+            session = fonction()
+            if session is not None:
+                for classe, nombre in compter_identites(session).items():
+                    objets[f"{nom}.{classe}"] = nombre
+
+        sondes = {}
+        for nom, fonction in self.sondes.items():
+            try:
+                sondes[nom] = fonction()
+            except Exception as e:
+                sondes[nom] = f"erreur : {e}"
+
+        numero = self.mesures[-1]["numero"] + 1 if self.mesures else 1
+        mesure = {
+            "numero": numero,
+            "etiquette": etiquette,
+            "temps": time.time(),
+            "actuelle": actuelle,
+            "maximale": maximale,
+            "objets": dict(objets),
+            "sondes": sondes,
+        }
+        self.mesures.append(mesure)
+
+        self.dernier = tracemalloc.take_snapshot() if instantane else self.reference
+        return mesure
+
+    def definir_reference(self, etiquette="référence"):
+        """Nouvelle mesure qui sert de point de comparaison (après la chauffe des caches)"""
+        self.reference = self.dernier = None
+        gc.collect()
+        self.reference = tracemalloc.take_snapshot()
+        mesure = self.mesurer(etiquette, instantane=False)
+        self._numero_reference = mesure["numero"]
+        return mesure
+
+    def mesure_reference(self):
+        for mesure in self.mesures:
+            if mesure["numero"] == self._numero_reference:
+                return mesure
+        return None
+
+    def croissance(self):
+        """Octets alloués en plus depuis la mesure de référence"""
+        reference = self.mesure_reference()
+        if reference is None or not self.mesures:
+            return 0
+        return self.mesures[-1]["actuelle"] - reference["actuelle"]
+
+    def differences(self, limite=25, regroupement="lineno"):
+        """Plus fortes variations entre la référence et le dernier instantané (StatisticDiff)"""
+        if self.reference is None or self.dernier is None:
+            return []
+        # L'instantané de référence, alloué par tracemalloc.py, figure dans le dernier : écarté
+        return [difference for difference in self.dernier.compare_to(self.reference, regroupement)
+                if difference.traceback[0].filename != tracemalloc.__file__][:limite]
+
+    def lignes_rapport(self, limite=25, traces=5):
+        """Lignes de texte : mesures, plus fortes hausses par ligne de code et leurs traces"""
+        lignes = [f"Croissance depuis la référence (mesure {self._numero_reference}) : "
+                  f"{_ko(self.croissance())}", ""]
+
+        noms_objets = sorted({nom for mesure in self.mesures for nom in mesure["objets"]})
+        noms_sondes = sorted({nom for mesure in self.mesures for nom in mesure["sondes"]})
+        lignes.append("\t".join(["mesure", "heure", "etiquette", "actuelle_ko", "maximale_ko"]
+                                + noms_objets + noms_sondes))
+        for mesure in self.mesures:
+            lignes.append("\t".join(
+                [str(mesure["numero"]), time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(mesure["temps"])),
+                 mesure["etiquette"], str(mesure["actuelle"] // 1024), str(mesure["maximale"] // 1024)]
+                + [str(mesure["objets"].get(nom, 0)) for nom in noms_objets]
+                + [str(mesure["sondes"].get(nom, "")) for nom in noms_sondes]))
+
+        lignes += ["", f"Plus fortes variations par ligne de code ({limite}) :"]
+        lignes += [f"   {difference}" for difference in self.differences(limite)]
+
+        lignes += ["", f"Traces des {traces} plus fortes hausses :"]
+        hausses = [difference for difference in self.differences(traces, "traceback") if difference.size_diff > 0]
+        for difference in hausses:
+            lignes.append(f"+{_ko(difference.size_diff)} en {difference.count_diff:+d} bloc(s) :")
+            lignes += [f"   {ligne}" for ligne in difference.traceback.format()]
+        return lignes
+
+    def ecrire_rapport(self, chemin, limite=25):
+        with open(chemin, "w", encoding="utf-8") as fichier:
+            fichier.write("\n".join(self.lignes_rapport(limite)) + "\n")
+        return chemin
+
+    def arreter(self):
+        """Arrête tracemalloc et libère les instantanés"""
+        self.reference = self.dernier = None
+        tracemalloc.stop()
@@ -0,0 +1,252 @@
+# -*- coding: utf-8 -*-
+"""
+Sauvegardes à chaud de universites_facultes.db et restauration
+
+Copier le fichier pendant que l'application écrit (session.commit()) peut donner une
+copie incohérente. Les instantanés passent donc par l'API de sauvegarde de SQLite, par
+étapes de PAGES_PAR_ETAPE pages : chaque étape ne tient la base en lecture que quelques
+millisecondes, et une écriture de l'application n'attend au plus qu'une étape (son
+verrou PENDING fait patienter l'étape suivante jusqu'à ce qu'elle soit passée).
+
+Une écriture par une autre connexion pendant la copie fait reprendre SQLite au début.
+Après MAX_REPRISES reprises, le reste est copié en une seule étape : l'instantané se
+termine toujours, au prix d'une attente plus longue pour les écritures (rapportée).
+
+Chaque instantané :
+    - est une base complète, cohérente au moment où la copie se termine ;
+    - est vérifié (PRAGMA integrity_check) avant d'être gardé ;
+    - peut être compressé (gzip) ;
+    - porte sa date dans son nom : universites_facultes-AAAAMMJJ-HHMMSS.db[.gz].
+
+Seuls les `garder` instantanés les plus récents d'un dossier sont conservés.
+Planification : main.py --sauvegarde-minutes, ou `python cli.py sauvegarde planifier`.
+restaurer() remplace le contenu de la base par un instantané (application fermée),
+après un instantané de sécurité de la base actuelle.
+"""
+
+import gzip
+import os
+import re
+import shutil
+import sqlite3
+import time
+from contextlib import closing
+from datetime import datetime
+from urllib.request import pathname2url
+
+import database
+
+# 256 pages de 4 Ko : 1 Mo par étape, copié en quelques millisecondes
+PAGES_PAR_ETAPE = 256
+MAX_REPRISES = 3
+# Attente avant de réessayer une étape refusée (une écriture est en cours)
+PAUSE_OCCUPEE_S = 0.005
+
+GARDER_DEFAUT = 10
+FORMAT_DATE = "%Y%m%d-%H%M%S"
+_INSTANTANE = re.compile(r"^(?P<base>.+)-(?P<date>\d{8}-\d{6})(?:-\d+)?\.db(?:\.gz)?$")
+
+
+class SauvegardeInvalide(Exception):
+    """Un instantané ne passe pas la vérification d'intégrité"""
+
+
+class _TropDeReprises(Exception):
+    pass
+
+
+def chemin_base():
+    """Fichier de la base de l'application (database.engine)"""
+    return os.path.abspath(database.engine.url.database)
+
+
+def dossier_sauvegardes(base=None):
+    """BANQUE_SAUVEGARDES, sinon le dossier « sauvegardes » à côté de la base"""
+    return (os.environ.get("BANQUE_SAUVEGARDES")
+            or os.path.join(os.path.dirname(base or chemin_base()), "sauvegardes"))
+
+
+def _lecture_seule(chemin):
+    """Connexion en lecture seule (URI) à un fichier de base"""
+    return sqlite3.connect(f"file:{pathname2url(os.path.abspath(chemin))}?mode=ro", uri=True)
+
+
+def copier_a_chaud(source, destination, pages_par_etape=PAGES_PAR_ETAPE, max_reprises=MAX_REPRISES):
+    """
+    Copie la base source dans destination par l'API de sauvegarde, par étapes
+
+    Returns:
+        {"pages", "etapes", "reprises", "etape_max" (s), "bloc_final" (reste copié d'un coup)}
+    """
+    suivi = {"pages": 0, "etapes": 0, "reprises": 0, "etape_max": 0.0, "bloc_final": False}
+    precedent = {"restantes": None, "instant": time.perf_counter()}
+
+    def progression(statut, restantes, total):
+        maintenant = time.perf_counter()
+        suivi["pages"] = total
+        suivi["etapes"] += 1
+        suivi["etape_max"] = max(suivi["etape_max"], maintenant - precedent["instant"])
+        # Plus de pages restantes qu'à l'étape précédente : SQLite a repris au début
+        if precedent["restantes"] is not None and restantes > precedent["restantes"]:
+            suivi["reprises"] += 1
+            if suivi["reprises"] > max_reprises:
+                raise _TropDeReprises()
+        precedent["restantes"] = restantes
+        precedent["instant"] = time.perf_counter()
+
+    with closing(sqlite3.connect(source)) as connexion_source, closing(sqlite3.connect(destination)) as connexion:
+        try:
+            connexion_source.backup(connexion, pages=pages_par_etape, progress=progression, sleep=PAUSE_OCCUPEE_S)
+        except _TropDeReprises:
+            suivi["bloc_final"] = True
+            debut = time.perf_counter()
+            connexion_source.backup(connexion, pages=-1, sleep=PAUSE_OCCUPEE_S)
+            suivi["etape_max"] = max(suivi["etape_max"], time.perf_counter() - debut)
+    return suivi
+
+
+def verifier_integrite(chemin):
+    """Lève SauvegardeInvalide si PRAGMA integrity_check signale un problème"""
+    with closing(_lecture_seule(chemin)) as connexion:
+        problemes = [ligne[0] for ligne in connexion.execute("PRAGMA integrity_check")]
+    if problemes != ["ok"]:
+        raise SauvegardeInvalide(f"{chemin} : {'; '.join(problemes[:5])}")
+
+
+def lister_instantanes(dossier=None):
+    """Instantanés d'un dossier, du plus ancien au plus récent"""
+    dossier = dossier or dossier_sauvegardes()
+    if not os.path.isdir(dossier):
+        return []
+    noms = [nom for nom in os.listdir(dossier) if _INSTANTANE.match(nom)]
+    noms.sort(key=lambda nom: (_INSTANTANE.match(nom).group("date"), nom))
+    return [os.path.join(dossier, nom) for nom in noms]
+
+
+def appliquer_retention(dossier=None, garder=GARDER_DEFAUT):
+    """Supprime les instantanés au-delà des `garder` plus récents ; retourne les chemins supprimés"""
+    instantanes = lister_instantanes(dossier)
+    anciens = instantanes[:-garder] if garder else instantanes
+    for chemin in anciens:
+        os.remove(chemin)
+    return anciens
+
+
+def _nouveau_chemin(dossier, base, extension):
+    prefixe = os.path.join(dossier, f"{os.path.splitext(os.path.basename(base))[0]}-{datetime.now():{FORMAT_DATE}}")
+    chemin = prefixe + extension
+    numero = 2
+    while os.path.exists(chemin):
+        chemin = f"{prefixe}-{numero}{extension}"
+        numero += 1
+    return chemin
+
+
+def sauvegarder(base=None, dossier=None, compresser=False, garder=GARDER_DEFAUT, pages_par_etape=PAGES_PAR_ETAPE):
+    """
+    Prend un instantané vérifié de la base, sans arrêter l'application
+
+    Args:
+        base: Fichier à sauvegarder (défaut : la base de l'application)
+        dossier: Dossier des instantanés (défaut : dossier_sauvegardes())
+        compresser: Écrire l'instantané compressé (.db.gz)
+        garder: Instantanés conservés dans le dossier (None : tous)
+
+    Returns:
+        Rapport {"chemin", "taille", "taille_fichier", "duree", "debit" (Mo/s), "verification" (s),
+        "etapes", "reprises", "etape_max" (s), "bloc_final", "supprimes"}
+    """
+    base = os.path.abspath(base or chemin_base())
+    dossier = dossier or dossier_sauvegardes(base)
+    os.makedirs(dossier, exist_ok=True)
+    chemin = _nouveau_chemin(dossier, base, ".db.gz" if compresser else ".db")
+    partiel = chemin + ".partiel"
+
+    try:
+        debut = time.perf_counter()
+        rapport = copier_a_chaud(base, partiel, pages_par_etape)
+        rapport["duree"] = time.perf_counter() - debut
+        rapport["taille"] = os.path.getsize(partiel)
+        rapport["debit"] = rapport["taille"] / 1e6 / rapport["duree"] if rapport["duree"] else 0.0
+
+        debut = time.perf_counter()
+        verifier_integrite(partiel)
+        rapport["verification"] = time.perf_counter() - debut
+
+        if compresser:
+            with open(partiel, "rb") as entree, gzip.open(chemin + ".tmp", "wb", compresslevel=6) as sortie:
+                shutil.copyfileobj(entree, sortie, 1 << 20)
+            os.replace(chemin + ".tmp", chemin)
+            os.remove(partiel)
+        else:
+            os.replace(partiel, chemin)
+    except BaseException:
+        for reste in (partiel, chemin + ".tmp"):
+            if os.path.exists(reste):
+                os.remove(reste)
+        raise
+
+    rapport["chemin"] = chemin
+    rapport["taille_fichier"] = os.path.getsize(chemin)
+    rapport["supprimes"] = appliquer_retention(dossier, garder) if garder else []
+    return rapport
+
+
+def resume_sauvegarde(rapport):
+    """Lignes lisibles d'un rapport de sauvegarder()"""
+    lignes = [
+        f"Instantané : {rapport['chemin']} ({rapport['taille_fichier'] / 1e6:.1f} Mo)",
+        f"Copie : {rapport['taille'] / 1e6:.1f} Mo en {rapport['duree']:.2f} s ({rapport['debit']:.0f} Mo/s), "
+        f"{rapport['etapes']} étape(s), {rapport['reprises']} reprise(s), "
+        f"étape la plus longue {rapport['etape_max'] * 1000:.1f} ms"
+        + (" (reste copié d'un coup)" if rapport["bloc_final"] else ""),
+        f"Intégrité vérifiée en {rapport['verification']:.2f} s",
+    ]
+    if rapport["supprimes"]:
+        lignes.append(f"{len(rapport['supprimes'])} ancien(s) instantané(s) supprimé(s)")
+    return lignes
+
+
+def planifier(intervalle_minutes, **options):
+    """Prend un instantané toutes les intervalle_minutes minutes, jusqu'à Ctrl+C"""
+    try:
+        while True:
+            try:
+                print("\n".join(resume_sauvegarde(sauvegarder(**options))))
+            except (OSError, sqlite3.Error, SauvegardeInvalide) as e:
+                print(f"Erreur lors de la sauvegarde : {e}")
+            time.sleep(intervalle_minutes * 60)
+    except KeyboardInterrupt:
+        pass
+
+
+def restaurer(instantane, base=None, securite=True):
+    """
+    Remplace le contenu de la base par celui d'un instantané (.db ou .db.gz)
+
+    L'instantané est vérifié avant toute modification ; la copie passe par l'API de
+    sauvegarde (verrou d'écriture de SQLite, pas de fichier à moitié remplacé).
+    L'application doit être fermée : ses caches ne suivraient pas le changement.
+
+    Args:
+        securite: Prendre d'abord un instantané de la base actuelle
+
+    Returns:
+        Chemin de l'instantané de sécurité (ou None)
+    """
+    base = os.path.abspath(base or chemin_base())
+    source = base + ".restauration" if instantane.endswith(".gz") else instantane
+    try:
+        if source != instantane:
+            with gzip.open(instantane, "rb") as entree, open(source, "wb") as sortie:
+                shutil.copyfileobj(entree, sortie, 1 << 20)
+        verifier_integrite(source)
+        securite_chemin = None
+        if securite and os.path.exists(base):
+            securite_chemin = sauvegarder(base, dossier_sauvegardes(base), garder=None)["chemin"]
+        with closing(_lecture_seule(source)) as connexion_source, closing(sqlite3.connect(base)) as connexion:
+            connexion_source.backup(connexion)
+    finally:
+        if source != instantane and os.path.exists(source):
+            os.remove(source)
+    return securite_chemin
@@ -0,0 +1,376 @@
+# -*- coding: utf-8 -*-
+"""
+Synchronisation du catalogue entre deux fichiers de base (poste central -> postes satellites)
+
+Chaque université a une empreinte de contenu : sa ligne (code, nom, ville, année) et
+ses facultés triées par nom. Les identifiants et les compteurs n'en font pas partie :
+deux bases au même contenu ont la même empreinte, même si leurs identifiants diffèrent.
+
+Les universités sont réparties en 16**PROFONDEUR seaux selon le hachage de leur code.
+Un arbre de Merkle est construit sur ces seaux : chaque nœud est l'empreinte de ses 16
+enfants. Deux arbres se comparent en descendant seulement dans les sous-arbres qui diffèrent.
+
+Échange en un aller-retour de fichiers :
+    1. le satellite écrit ses empreintes de seaux (ecrire_empreintes, 32 Ko) ;
+    2. le poste central en déduit les seaux qui diffèrent et écrit un patch avec le
+       contenu des universités de ces seaux seulement (creer_patch) ;
+    3. le satellite applique le patch dans une seule transaction (appliquer_patch).
+       Chaque seau est vérifié avant (le satellite n'a pas changé depuis l'envoi de ses
+       empreintes) et après (son contenu est bien celui du poste central).
+"""
+
+import gzip
+import hashlib
+import json
+import os
+from collections import defaultdict
+from itertools import product
+
+from sqlalchemy import create_engine, select, insert, update, delete
+
+import database
+from database import Universite, Faculte, Ville, NomFaculte, CodeFaculte, identifiants_textes
+
+PROFONDEUR = 3
+_HEX = "0123456789abcdef"
+SEAUX = ["".join(chiffres) for chiffres in product(_HEX, repeat=PROFONDEUR)]
+
+# Empreintes échangées (seaux et nœuds) tronquées à 8 octets ; empreintes des universités à 16
+TAILLE_EMPREINTE = 8
+TAILLE_EMPREINTE_UNIVERSITE = 16
+
+MAGIC_EMPREINTES = b"BUSYNC1\n"
+FORMAT_PATCH = "banque-sync-1"
+TAILLE_LOT_CODES = 500
+# Préfixe des noms provisoires des universités renommées pendant l'application d'un patch
+NOM_PROVISOIRE = "~synchronisation~"
+
+
+class ConflitSynchronisation(Exception):
+    """La base a changé depuis l'envoi de ses empreintes, ou le patch ne donne pas le résultat attendu"""
+
+
+def ouvrir_base(chemin=None):
+    """Moteur d'un fichier de base (mis à jour au schéma actuel) ; database.engine par défaut"""
+    if chemin is None:
+        return database.engine
+    engine_fichier = create_engine(f"sqlite:///{chemin}")
+    database.preparer_schema(engine_fichier)
+    return engine_fichier
+
+
+def seau(code_universite):
+    """Seau d'une université : préfixe hexadécimal du hachage de son code"""
+    return hashlib.sha1(code_universite.encode("utf-8")).hexdigest()[:PROFONDEUR]
+
+
+def _hacher(octets, taille=TAILLE_EMPREINTE):
+    return hashlib.sha256(octets).digest()[:taille]
+
+
+def empreinte_universite(contenu):
+    """Empreinte du contenu [code, nom, ville, année, facultés] d'une université"""
+    texte = json.dumps(contenu, ensure_ascii=False, separators=(",", ":"))
+    return _hacher(texte.encode("utf-8"), TAILLE_EMPREINTE_UNIVERSITE)
+
+
+def empreinte_seau(empreintes):
+    """Empreinte d'un seau à partir de {code: empreinte de l'université}"""
+    return _hacher(b"".join(code.encode("utf-8") + b"\0" + empreinte
+                            for code, empreinte in sorted(empreintes.items())))
+
+
+REQUETE_CONTENUS = (
+    select(Universite.code_universite, Universite.nom, Ville.nom, Universite.annee_fondation,
+           NomFaculte.nom, CodeFaculte.code, Faculte.nombre_etudiants)
+    .select_from(Universite)
+    .join(Ville, Universite.ville_id == Ville.id)
+    .outerjoin(Faculte, Faculte.universite_id == Universite.id)
+    .outerjoin(NomFaculte, Faculte.nom_id == NomFaculte.id)
+    .outerjoin(CodeFaculte, Faculte.code_id == CodeFaculte.id)
+    .order_by(Universite.id)
+)
+
+
+def lire_contenus(connexion, codes=None):
+    """
+    Contenu des universités, lu en flux
+
+    Args:
+        codes: Codes des universités à lire (toutes par défaut)
+
+    Yields:
+        [code, nom, ville, année, [[faculté, code, étudiants], ...] triées par nom]
+    """
+    if codes is None:
+        requetes = [REQUETE_CONTENUS]
+    else:
+        codes = list(codes)
+        requetes = [REQUETE_CONTENUS.where(Universite.code_universite.in_(codes[debut:debut + TAILLE_LOT_CODES]))
+                    for debut in range(0, len(codes), TAILLE_LOT_CODES)]
+
+    for requete in requetes:
+        courant = None
+        for code, nom, ville, annee, nom_faculte, code_faculte, etudiants in connexion.execute(
+                requete.execution_options(yield_per=10000)):
+            if courant is None or courant[0] != code:
+                if courant is not None:
+                    courant[4].sort(key=lambda faculte: faculte[0])
+                    yield courant
+                courant = [code, nom, ville, annee, []]
+            if nom_faculte is not None:
+                courant[4].append([nom_faculte, code_faculte, etudiants])
+        if courant is not None:
+            courant[4].sort(key=lambda faculte: faculte[0])
+            yield courant
+
+
+class ArbreEmpreintes:
+    """
+    Arbre de Merkle des empreintes d'une base
+
+    Attributes:
+        seaux: Seau -> empreinte (les feuilles de l'arbre)
+        universites: Seau -> {code: empreinte de l'université} (base locale seulement)
+    """
+
+    def __init__(self, seaux, universites=None):
+        self.seaux = seaux
+        self.universites = universites or {}
+        self._noeuds = dict(seaux)
+        for longueur in range(PROFONDEUR - 1, -1, -1):
+            for prefixe in map("".join, product(_HEX, repeat=longueur)):
+                self._noeuds[prefixe] = _hacher(b"".join(self._noeuds[prefixe + chiffre] for chiffre in _HEX))
+
+    @classmethod
+    def depuis_base(cls, engine_cible=None):
+        """Calcule l'arbre d'une base (une lecture en flux de tout le catalogue)"""
+        universites = defaultdict(dict)
+        with (engine_cible or database.engine).connect() as connexion:
+            for contenu in lire_contenus(connexion):
+                universites[seau(contenu[0])][contenu[0]] = empreinte_universite(contenu)
+        return cls({prefixe: empreinte_seau(universites.get(prefixe, {})) for prefixe in SEAUX}, universites)
+
+    def noeud(self, prefixe):
+        return self._noeuds[prefixe]
+
+    @property
+    def racine(self):
+        return self._noeuds[""]
+
+
+def seaux_differents(local, distant):
+    """
+    Descend dans les deux arbres à partir de la racine, sans explorer les sous-arbres identiques
+
+    Returns:
+        (seaux qui diffèrent, nombre d'empreintes comparées)
+    """
+    differents = []
+    comparaisons = 0
+    a_explorer = [""]
+    while a_explorer:
+        prefixe = a_explorer.pop()
+        comparaisons += 1
+        if local.noeud(prefixe) == distant.noeud(prefixe):
+            continue
+        if len(prefixe) == PROFONDEUR:
+            differents.append(prefixe)
+        else:
+            a_explorer.extend(prefixe + chiffre for chiffre in _HEX)
+    return sorted(differents), comparaisons
+
+
+def ecrire_empreintes(chemin, engine_cible=None):
+    """
+    Écrit les empreintes des seaux d'une base (fichier à envoyer au poste central)
+
+    Returns:
+        L'arbre calculé
+    """
+    arbre = ArbreEmpreintes.depuis_base(engine_cible)
+    with open(chemin, "wb") as fichier:
+        fichier.write(MAGIC_EMPREINTES)
+        fichier.write(bytes([PROFONDEUR]))
+        fichier.write(b"".join(arbre.seaux[prefixe] for prefixe in SEAUX))
+    return arbre
+
+
+def lire_empreintes(chemin):
+    """Relit un fichier d'empreintes en arbre (sans le détail par université)"""
+    with open(chemin, "rb") as fichier:
+        if fichier.read(len(MAGIC_EMPREINTES)) != MAGIC_EMPREINTES:
+            raise ValueError(f"{chemin} n'est pas un fichier d'empreintes")
+        if fichier.read(1)[0] != PROFONDEUR:
+            raise ValueError(f"{chemin} : profondeur d'arbre incompatible")
+        donnees = fichier.read()
+
+    if len(donnees) != len(SEAUX) * TAILLE_EMPREINTE:
+        raise ValueError(f"{chemin} : fichier d'empreintes tronqué")
+    return ArbreEmpreintes({
+        prefixe: donnees[position * TAILLE_EMPREINTE:(position + 1) * TAILLE_EMPREINTE]
+        for position, prefixe in enumerate(SEAUX)
+    })
+
+
+def creer_patch(empreintes_cible, chemin, engine_source=None):
+    """
+    Écrit le patch qui amène la base cible au contenu de la base source
+
+    Args:
+        empreintes_cible: ArbreEmpreintes de la base cible (lire_empreintes)
+        chemin: Fichier du patch (JSON compressé en gzip)
+
+    Returns:
+        Résumé : seaux, universites, comparaisons, taille (octets)
+    """
+    engine_source = engine_source or database.engine
+    source = ArbreEmpreintes.depuis_base(engine_source)
+    differents, comparaisons = seaux_differents(source, empreintes_cible)
+
+    seaux = {prefixe: {"avant": empreintes_cible.seaux[prefixe].hex(),
+                       "apres": source.seaux[prefixe].hex(),
+                       "universites": []} for prefixe in differents}
+    codes = [code for prefixe in differents for code in source.universites.get(prefixe, {})]
+    with engine_source.connect() as connexion:
+        for contenu in lire_contenus(connexion, codes):
+            seaux[seau(contenu[0])]["universites"].append(contenu)
+
+    with gzip.open(chemin, "wt", encoding="utf-8") as fichier:
+        json.dump({"format": FORMAT_PATCH, "racine": source.racine.hex(), "seaux": seaux},
+                  fichier, ensure_ascii=False, separators=(",", ":"))
+
+    return {"seaux": len(differents), "universites": len(codes), "comparaisons": comparaisons,
+            "taille": os.path.getsize(chemin)}
+
+
+def _empreintes_seaux(connexion, prefixes):
+    """Codes locaux, contenus et empreintes des seaux donnés"""
+    codes = defaultdict(list)
+    for (code,) in connexion.execute(select(Universite.code_universite)):
+        prefixe = seau(code)
+        if prefixe in prefixes:
+            codes[prefixe].append(code)
+
+    contenus = {contenu[0]: contenu for contenu in lire_contenus(
+        connexion, [code for codes_seau in codes.values() for code in codes_seau])}
+    empreintes = {
+        prefixe: empreinte_seau({code: empreinte_universite(contenus[code]) for code in codes.get(prefixe, ())})
+        for prefixe in prefixes
+    }
+    return codes, contenus, empreintes
+
+
+def _supprimer_universite(connexion, code):
+    # Facultés d'abord : les triggers mettent à jour les compteurs et l'historique
+    universite_id = connexion.execute(
+        select(Universite.id).where(Universite.code_universite == code)).scalar_one()
+    connexion.execute(delete(Faculte).where(Faculte.universite_id == universite_id))
+    connexion.execute(delete(Universite).where(Universite.id == universite_id))
+
+
+def _ecrire_universite(connexion, contenu, existe, ids_villes, ids_noms, ids_codes):
+    """Crée ou met à jour une université et ses facultés (les facultés gardent leur identifiant)"""
+    code, nom, ville, annee, facultes = contenu
+    valeurs = {"nom": nom, "ville_id": ids_villes[ville], "annee_fondation": annee}
+
+    if existe:
+        universite_id = connexion.execute(
+            select(Universite.id).where(Universite.code_universite == code)).scalar_one()
+        connexion.execute(update(Universite).where(Universite.id == universite_id).values(valeurs))
+    else:
+        universite_id = connexion.execute(
+            insert(Universite).values(code_universite=code, **valeurs)).inserted_primary_key[0]
+
+    actuelles = {
+        nom_faculte: (faculte_id, code_id, etudiants)
+        for faculte_id, nom_faculte, code_id, etudiants in connexion.execute(
+            select(Faculte.id, NomFaculte.nom, Faculte.code_id, Faculte.nombre_etudiants)
+            .join(NomFaculte, Faculte.nom_id == NomFaculte.id)
+            .where(Faculte.universite_id == universite_id))
+    }
+    voulues = {nom_faculte: (ids_codes[code_faculte], etudiants) for nom_faculte, code_faculte, etudiants in facultes}
+
+    for nom_faculte, (faculte_id, _, _) in actuelles.items():
+        if nom_faculte not in voulues:
+            connexion.execute(delete(Faculte).where(Faculte.id == faculte_id))
+    for nom_faculte, (code_id, etudiants) in voulues.items():
+        if nom_faculte not in actuelles:
+            connexion.execute(insert(Faculte).values(
+                nom_id=ids_noms[nom_faculte], code_id=code_id, nombre_etudiants=etudiants, universite_id=universite_id))
+        elif actuelles[nom_faculte][1:] != (code_id, etudiants):
+            connexion.execute(update(Faculte).where(Faculte.id == actuelles[nom_faculte][0])
+                              .values(code_id=code_id, nombre_etudiants=etudiants))
+
+
+def appliquer_patch(chemin, engine_cible=None, forcer=False):
+    """
+    Applique un patch dans une seule transaction
+
+    Args:
+        forcer: Appliquer même si la base a changé depuis l'envoi de ses empreintes
+
+    Returns:
+        Résumé : seaux, creees, modifiees, supprimees
+
+    Raises:
+        ConflitSynchronisation: La base ne correspond pas au patch (rien n'est modifié)
+    """
+    with gzip.open(chemin, "rt", encoding="utf-8") as fichier:
+        patch = json.load(fichier)
+    if patch.get("format") != FORMAT_PATCH:
+        raise ValueError(f"{chemin} n'est pas un patch de synchronisation")
+
+    seaux = patch["seaux"]
+    resume = {"seaux": 0, "creees": 0, "modifiees": 0, "supprimees": 0}
+
+    with (engine_cible or database.engine).begin() as connexion:
+        codes, contenus, empreintes = _empreintes_seaux(connexion, set(seaux))
+        # Seaux déjà à jour (patch appliqué une seconde fois) : rien à faire
+        seaux = {prefixe: seau_patch for prefixe, seau_patch in seaux.items()
+                 if empreintes[prefixe].hex() != seau_patch["apres"]}
+        if not forcer:
+            modifies = [prefixe for prefixe, seau_patch in seaux.items() if empreintes[prefixe].hex() != seau_patch["avant"]]
+            if modifies:
+                raise ConflitSynchronisation(
+                    f"{len(modifies)} seau(x) modifié(s) depuis l'envoi des empreintes : en générer de nouvelles")
+
+        resume["seaux"] = len(seaux)
+        universites = [contenu for seau_patch in seaux.values() for contenu in seau_patch["universites"]]
+        ids_villes = identifiants_textes(connexion, Ville, Ville.nom, {contenu[2] for contenu in universites})
+        ids_noms = identifiants_textes(connexion, NomFaculte, NomFaculte.nom,
+                                       {faculte[0] for contenu in universites for faculte in contenu[4]})
+        ids_codes = identifiants_textes(connexion, CodeFaculte, CodeFaculte.code,
+                                        {faculte[1] for contenu in universites for faculte in contenu[4]})
+
+        # Suppressions de tous les seaux d'abord : une université qui change de code change
+        # souvent de seau, et son nouveau seau peut être traité avant l'ancien (nom unique)
+        voulues = {contenu[0]: contenu for contenu in universites}
+        for prefixe in seaux:
+            for code in codes.get(prefixe, ()):
+                if code not in voulues:
+                    _supprimer_universite(connexion, code)
+                    resume["supprimees"] += 1
+
+        # Noms échangés entre universités modifiées : noms provisoires d'abord
+        renommees = [code for code, contenu in voulues.items()
+                     if code in contenus and contenus[code][1] != contenu[1]]
+        for code in renommees:
+            connexion.execute(update(Universite).where(Universite.code_universite == code)
+                              .values(nom=f"{NOM_PROVISOIRE}{code}"))
+
+        for code, contenu in voulues.items():
+            if contenus.get(code) == contenu:
+                continue
+            _ecrire_universite(connexion, contenu, code in contenus, ids_villes, ids_noms, ids_codes)
+            resume["modifiees" if code in contenus else "creees"] += 1
+
+        # Vérification avant validation : une erreur annule toute la transaction
+        if not seaux:
+            return resume
+        _, _, empreintes = _empreintes_seaux(connexion, set(seaux))
+        differents = [prefixe for prefixe, seau_patch in seaux.items() if empreintes[prefixe].hex() != seau_patch["apres"]]
+        if differents:
+            raise ConflitSynchronisation(f"{len(differents)} seau(x) différent(s) de la source après application")
+
+    return resume
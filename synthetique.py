@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+"""
+Génération de données synthétiques pour les bancs d'essai
+
+Remplit une base avec un grand nombre d'universités et de facultés réalistes
+(noms de villes et de facultés répétés comme dans les vraies données).
+"""
+
+import random
+
+from database import Universite, Faculte, Ville, NomFaculte, CodeFaculte, identifiants_textes
+
+VILLES = [
+    "Montréal", "Québec", "Sherbrooke", "Trois-Rivières", "Gatineau", "Rimouski",
+    "Chicoutimi", "Laval", "Longueuil", "Lévis", "Rouyn-Noranda", "Drummondville",
+]
+
+FACULTES = [
+    ("Faculté de Médecine", "MED"), ("Faculté de Génie", "GENIE"), ("Faculté de Droit", "DROIT"),
+    ("Faculté des Arts", "ARTS"), ("Faculté des Sciences", "SCI"), ("École de Gestion", "ESG"),
+    ("Faculté d'Éducation", "EDU"), ("Faculté de Musique", "MUS"), ("Faculté de Pharmacie", "PHARM"),
+    ("Faculté des Sciences Infirmières", "INF"), ("Faculté de Théologie", "THEO"),
+    ("Faculté de Médecine Dentaire", "DENT"), ("Faculté de Médecine Vétérinaire", "VET"),
+    ("Faculté d'Aménagement", "AMEN"), ("Faculté de Philosophie", "PHILO"),
+    ("Faculté des Lettres", "LET"), ("Faculté de Kinésiologie", "KIN"), ("Faculté d'Agriculture", "AGRI"),
+]
+
+TAILLE_LOT = 20000
+
+
+def remplir_base(engine_cible, nb_universites, facultes_par_universite, graine=0):
+    """
+    Insère nb_universites universités ayant chacune facultes_par_universite facultés
+
+    Les insertions passent par le SQL Core (executemany) par lots : les triggers
+    de compteurs restent actifs, les données sont donc cohérentes.
+
+    Returns:
+        Nombre de facultés insérées
+    """
+    aleatoire = random.Random(graine)
+    table_universites = Universite.__table__
+    table_facultes = Faculte.__table__
+
+    with engine_cible.begin() as connexion:
+        ids_villes = identifiants_textes(connexion, Ville, Ville.nom, VILLES)
+        noms = [FACULTES[j % len(FACULTES)][0] + (f" {j // len(FACULTES) + 1}" if j >= len(FACULTES) else "")
+                for j in range(facultes_par_universite)]
+        ids_noms = identifiants_textes(connexion, NomFaculte, NomFaculte.nom, set(noms))
+        ids_codes = identifiants_textes(connexion, CodeFaculte, CodeFaculte.code, {code for _, code in FACULTES})
+
+        premier_id = connexion.execute(
+            table_universites.select().with_only_columns(table_universites.c.id)
+            .order_by(table_universites.c.id.desc()).limit(1)).scalar() or 0
+
+        universites = [{
+            "id": premier_id + i,
+            "nom": f"Université Synthétique {premier_id + i}",
+            "ville_id": ids_villes[aleatoire.choice(VILLES)],
+            "code_universite": f"S{premier_id + i}",
+            "annee_fondation": aleatoire.randint(1600, 2020),
+        } for i in range(1, nb_universites + 1)]
+        if universites:
+            connexion.execute(table_universites.insert(), universites)
+
+        lot = []
+        nb_facultes = 0
+        for universite in universites:
+            for j, nom in enumerate(noms):
+                lot.append({
+                    "nom_id": ids_noms[nom],
+                    "code_id": ids_codes[FACULTES[j % len(FACULTES)][1]],
+                    "nombre_etudiants": aleatoire.randint(50, 5000),
+                    "universite_id": universite["id"],
+                })
+                if len(lot) >= TAILLE_LOT:
+                    connexion.execute(table_facultes.insert(), lot)
+                    nb_facultes += len(lot)
+                    lot = []
+        if lot:
+            connexion.execute(table_facultes.insert(), lot)
+            nb_facultes += len(lot)
+
+    return nb_facultes
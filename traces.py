@@ -0,0 +1,453 @@
+# -*- coding: utf-8 -*-
+"""
+Enregistrement et rejeu de la charge de travail réelle de l'interface
+
+Les bancs d'essai synthétiques ne reproduisent pas l'usage du personnel (changements
+rapides d'université, rafales d'ajouts de facultés, statistiques fréquentes). Avec
+`python main.py --trace session.trace.gz`, chaque appel au dépôt (depot.Depot : la
+couche de données de Application et de la fenêtre des lots) est enregistré :
+instant depuis le début, méthode, arguments nommés, durée et résumé du résultat
+(identifiant d'un ajout, nombre de lignes d'une liste).
+
+Format : lignes JSON compressées (gzip) ; la première décrit la session, chacune des
+suivantes est un appel [instant_ms, méthode, {arguments}, durée_ms, résultat].
+Une fin tronquée (application arrêtée brutalement) est ignorée à la lecture.
+
+Rejeu (`python cli.py trace rejouer`) : sur une copie de n'importe quelle base, avec
+des PRAGMA, la réplique en mémoire ou un autre dépôt, à la vitesse d'origine, accélérée
+(--vitesse 10) ou au plus vite (--vitesse 0), par un ou plusieurs clients simultanés
+(un processus chacun, partant ensemble). Les identifiants créés par la trace sont
+remplacés par ceux du rejeu ; les clients au-delà du premier ajoutent un suffixe aux
+noms et codes créés pour que leurs ajouts ne soient pas refusés comme doublons.
+Rapport : latences par méthode (médiane, p95, p99, max), débit, retard sur le
+calendrier de la trace et écarts de résultats par rapport à l'enregistrement.
+"""
+
+import contextlib
+import functools
+import gzip
+import inspect
+import json
+import multiprocessing
+import os
+import re
+import shutil
+import statistics
+import tempfile
+import threading
+import time
+import traceback
+from collections import namedtuple
+from datetime import datetime
+
+from sqlalchemy import create_engine, event
+
+import database
+from depot import Depot, DepotMemoire, DepotSQLAlchemy
+from validation import LONGUEUR_MAX_CODE
+
+FORMAT_TRACE = 1
+# Vidage du fichier (gzip) tous les N appels : une session interrompue garde l'essentiel
+APPELS_PAR_VIDAGE = 100
+# Attente maximale des autres clients avant de commencer le rejeu
+DELAI_DEPART_S = 120
+
+# Méthodes de l'interface des dépôts enregistrées (toutes sauf fermer)
+METHODES = tuple(nom for nom, valeur in vars(Depot).items()
+                 if callable(valeur) and not nom.startswith("_") and nom != "fermer")
+# Méthodes qui rendent un objet : le rejeu ne compare que sa présence (identifiants différents)
+_METHODES_OBJET = {"universite", "faculte", "universite_existante", "ajouter_universite", "ajouter_faculte"}
+DEPOTS_REJEU = ("sqlite", "memoire", "differe")
+
+# Appel enregistré (instant et durée en millisecondes)
+Appel = namedtuple("Appel", "instant methode arguments duree resultat")
+# Appel rejoué (durée et retard sur le calendrier en millisecondes)
+Mesure = namedtuple("Mesure", "methode duree retard resultat attendu erreur")
+
+_PRAGMA = re.compile(r"^\s*\w+\s*(=\s*[-\w.]+\s*)?$")
+
+
+def resumer_resultat(resultat):
+    """Ce que la trace garde d'un résultat : identifiant d'un objet, nombre de lignes d'une liste"""
+    if resultat is None or isinstance(resultat, (bool, int)):
+        return resultat
+    if isinstance(resultat, list):
+        return len(resultat)
+    return getattr(resultat, "id", None)
+
+
+class EnregistreurTrace:
+    """Écrit les appels au dépôt dans un fichier de trace"""
+
+    def __init__(self, chemin, depot=None):
+        self.chemin = chemin
+        self.nb_appels = 0
+        self._fichier = gzip.open(chemin, "wt", encoding="utf-8")
+        self._verrou = threading.Lock()
+        # Appels en cours par thread : seul le plus externe est enregistré
+        self._local = threading.local()
+        self._debut = time.perf_counter()
+        self._ecrire({
+            "format": FORMAT_TRACE,
+            "debut": datetime.now().isoformat(timespec="seconds"),
+            "depot": type(depot).__name__ if depot is not None else None,
+            "base": os.path.abspath(database.engine.url.database or ":memory:"),
+        })
+
+    def _ecrire(self, valeur):
+        self._fichier.write(json.dumps(valeur, ensure_ascii=False, separators=(",", ":")) + "\n")
+
+    def enregistrer(self, methode, arguments, debut, duree, resultat):
+        ligne = [round((debut - self._debut) * 1000, 3), methode, arguments, round(duree * 1000, 3),
+                 resumer_resultat(resultat)]
+        with self._verrou:
+            if self._fichier.closed:
+                return
+            self._ecrire(ligne)
+            self.nb_appels += 1
+            if self.nb_appels % APPELS_PAR_VIDAGE == 0:
+                self._fichier.flush()
+
+    def fermer(self):
+        with self._verrou:
+            self._fichier.close()
+
+
+def enregistrer_appels(depot, enregistreur):
+    """
+    Enregistre chaque appel des méthodes de Depot sur ce dépôt
+
+    Les méthodes sont remplacées sur l'instance : le dépôt garde son type (les tests
+    isinstance de l'application continuent de fonctionner).
+    """
+    for nom in METHODES:
+        methode = getattr(depot, nom)
+        setattr(depot, nom, _enregistree(nom, methode, inspect.signature(methode), enregistreur))
+    return depot
+
+
+def _enregistree(nom, methode, signature, enregistreur):
+    @functools.wraps(methode)
+    def enveloppe(*args, **kwargs):
+        local = enregistreur._local
+        local.profondeur = getattr(local, "profondeur", 0) + 1
+        resultat = None
+        debut = time.perf_counter()
+        try:
+            resultat = methode(*args, **kwargs)
+            return resultat
+        finally:
+            duree = time.perf_counter() - debut
+            local.profondeur -= 1
+            # Appels du dépôt à ses propres méthodes : déjà comptés dans l'appel externe
+            if local.profondeur == 0:
+                enregistreur.enregistrer(nom, dict(signature.bind(*args, **kwargs).arguments),
+                                         debut, duree, resultat)
+    return enveloppe
+
+
+def lire_trace(chemin):
+    """
+    Returns:
+        (en-tête, liste d'Appel) ; une fin tronquée est ignorée
+    """
+    entete, appels = None, []
+    try:
+        with gzip.open(chemin, "rt", encoding="utf-8") as fichier:
+            for ligne in fichier:
+                try:
+                    valeur = json.loads(ligne)
+                except json.JSONDecodeError:
+                    break
+                if entete is None:
+                    entete = valeur
+                else:
+                    appels.append(Appel(*valeur))
+    except EOFError:
+        # Fichier compressé interrompu : les appels déjà lus sont gardés
+        pass
+    if not isinstance(entete, dict) or entete.get("format") != FORMAT_TRACE:
+        raise ValueError(f"{chemin} : ce n'est pas une trace (format {FORMAT_TRACE})")
+    return entete, appels
+
+
+def resume_trace(entete, appels):
+    """Lignes lisibles : session enregistrée et appels par méthode"""
+    duree = appels[-1].instant / 1000 if appels else 0.0
+    lignes = [f"Session du {entete['debut']} ({entete['depot']}, {entete['base']}) : "
+              f"{len(appels)} appel(s) en {duree:.1f} s"]
+    par_methode = {}
+    for appel in appels:
+        par_methode.setdefault(appel.methode, []).append(appel.duree)
+    for methode, durees in sorted(par_methode.items(), key=lambda element: -len(element[1])):
+        lignes.append(f"  {methode:<32} {len(durees):>6} appel(s)   {_quantiles(durees)}")
+    return lignes
+
+
+def _quantiles(durees):
+    durees = sorted(durees)
+    if not durees:
+        return "aucun appel"
+    p95 = durees[min(len(durees) - 1, int(len(durees) * 0.95))]
+    return f"médiane {statistics.median(durees):8.3f} ms   p95 {p95:8.3f} ms   max {durees[-1]:8.3f} ms"
+
+
+class _Correspondances:
+    """Identifiants et textes d'un client : ajouts de la trace -> ajouts du rejeu"""
+
+    def __init__(self, appels, client, identifiants=None):
+        self.client = client
+        # Identifiants de la base -> identifiants du dépôt rejoué (dépôt en mémoire renuméroté)
+        universites, facultes = identifiants or ({}, {})
+        self.universites = dict(universites)
+        self.facultes = dict(facultes)
+        # Noms et codes créés par la trace, variés pour chaque client au-delà du premier
+        self.crees = set()
+        if client:
+            for appel in appels:
+                if appel.methode == "ajouter_universite":
+                    self.crees.update((appel.arguments.get("nom"), appel.arguments.get("code_universite")))
+                elif appel.methode == "ajouter_faculte":
+                    self.crees.add(appel.arguments.get("nom_faculte"))
+
+    def _varier(self, texte, code=False):
+        if not self.client or texte not in self.crees:
+            return texte
+        suffixe = f"~{self.client}"
+        return texte[:LONGUEUR_MAX_CODE - len(suffixe)] + suffixe if code else texte + suffixe
+
+    def arguments(self, appel):
+        arguments = dict(appel.arguments)
+        for nom, valeur in arguments.items():
+            if nom == "universite_id":
+                arguments[nom] = self.universites.get(valeur, valeur)
+            elif nom == "universite_ids":
+                arguments[nom] = [self.universites.get(identifiant, identifiant) for identifiant in valeur]
+            elif nom == "faculte_id":
+                arguments[nom] = self.facultes.get(valeur, valeur)
+            elif nom == "faculte_ids":
+                arguments[nom] = [self.facultes.get(identifiant, identifiant) for identifiant in valeur]
+            elif nom in ("nom", "nom_faculte"):
+                arguments[nom] = self._varier(valeur)
+            elif nom == "code_universite":
+                arguments[nom] = self._varier(valeur, code=True)
+        return arguments
+
+    def noter(self, appel, resultat):
+        if resultat is None or appel.resultat is None:
+            return
+        if appel.methode == "ajouter_universite":
+            self.universites[appel.resultat] = resultat
+        elif appel.methode == "ajouter_faculte":
+            self.facultes[appel.resultat] = resultat
+
+
+def rejouer(appels, depot, vitesse=1.0, client=0, identifiants=None):
+    """
+    Rejoue des appels sur un dépôt, dans ce processus
+
+    Args:
+        vitesse: 1 à la vitesse d'origine, 10 dix fois plus vite, 0 au plus vite
+        client: Numéro du client (0 : noms et codes de la trace inchangés)
+        identifiants: ({id université de la base: id du dépôt}, {id faculté: id}) si le dépôt
+            ne garde pas les identifiants de la base (voir configurer)
+
+    Returns:
+        Liste de Mesure
+    """
+    correspondances = _Correspondances(appels, client, identifiants)
+    mesures = []
+    origine = time.perf_counter()
+    for appel in appels:
+        retard = 0.0
+        if vitesse:
+            retard = time.perf_counter() - origine - appel.instant / 1000 / vitesse
+            if retard < 0:
+                time.sleep(-retard)
+                retard = 0.0
+        erreur = None
+        debut = time.perf_counter()
+        try:
+            resultat = resumer_resultat(getattr(depot, appel.methode)(**correspondances.arguments(appel)))
+        except Exception as e:
+            resultat, erreur = None, f"{type(e).__name__} : {e}"
+            database.session.rollback()
+        duree = time.perf_counter() - debut
+        correspondances.noter(appel, resultat)
+        mesures.append(Mesure(appel.methode, duree * 1000, retard * 1000, resultat, appel.resultat, erreur))
+    return mesures
+
+
+def _ecart(mesure):
+    """Le résultat du rejeu diffère de celui de l'enregistrement"""
+    if mesure.methode in _METHODES_OBJET:
+        return (mesure.resultat is None) != (mesure.attendu is None)
+    return mesure.resultat != mesure.attendu
+
+
+def verifier_pragmas(pragmas):
+    """Lève ValueError pour un réglage qui n'a pas la forme nom ou nom=valeur"""
+    for pragma in pragmas:
+        if not _PRAGMA.match(pragma):
+            raise ValueError(f"Réglage invalide : {pragma!r} (attendu : nom=valeur, par exemple cache_size=-65536)")
+
+
+def configurer(base, pragmas=(), replique=False, depot="sqlite"):
+    """
+    Fait travailler ce processus sur une base avec ces réglages
+
+    Args:
+        pragmas: Réglages de chaque connexion (« cache_size=-65536 », « mmap_size=268435456 »...)
+        replique: Lectures sur une copie en mémoire (activer_replique_memoire)
+        depot: "sqlite", "memoire" (catalogue chargé au départ) ou "differe" (ecriture_differee)
+
+    Returns:
+        (dépôt à rejouer, identifiants pour rejouer ou None)
+    """
+    verifier_pragmas(pragmas)
+    engine = create_engine(f"sqlite:///{os.path.abspath(base)}",
+                           echo=os.environ.get("BANQUE_ECHO_SQL", "1") == "1", query_cache_size=1200)
+    if pragmas:
+        @event.listens_for(engine, "connect")
+        def appliquer_pragmas(connexion, _enregistrement):
+            for pragma in pragmas:
+                connexion.execute(f"PRAGMA {pragma.strip()}")
+
+    # Schéma déjà mis à jour par rejouer_trace, une fois pour tous les clients
+    database.utiliser_engine(engine, preparer=False)
+    if replique:
+        database.activer_replique_memoire()
+    if depot == "memoire":
+        catalogue = database.obtenir_catalogue(database.CHARGEMENT_LIGNES)
+        memoire = DepotMemoire.depuis_catalogue(catalogue)
+        # depuis_catalogue numérote à partir de 1 dans l'ordre du catalogue
+        universites = {universite.id: rang for rang, universite in enumerate(catalogue, 1)}
+        facultes = {faculte.id: rang for rang, faculte in
+                    enumerate((faculte for universite in catalogue for faculte in universite.facultes), 1)}
+        return memoire, (universites, facultes)
+    if depot == "differe":
+        from ecriture_differee import DepotDiffere
+        return DepotDiffere(), None
+    return DepotSQLAlchemy(), None
+
+
+def _client(configuration, appels, client, vitesse, barriere, resultats):
+    """Processus d'un client : configure, attend les autres, rejoue"""
+    try:
+        with open(os.devnull, "w") as nulle, contextlib.redirect_stdout(nulle):
+            depot, identifiants = configurer(**configuration)
+            barriere.wait(DELAI_DEPART_S)
+            debut = time.perf_counter()
+            mesures = rejouer(appels, depot, vitesse, client, identifiants)
+            depot.fermer()
+            duree = time.perf_counter() - debut
+        resultats.put((client, mesures, duree, None))
+    except BaseException:
+        barriere.abort()
+        resultats.put((client, [], 0.0, traceback.format_exc()))
+
+
+def rejouer_trace(chemin, base=None, clients=1, vitesse=1.0, pragmas=(), replique=False, depot="sqlite",
+                  copie=True):
+    """
+    Rejoue une trace par plusieurs clients simultanés (un processus chacun)
+
+    Args:
+        base: Base de rejeu (défaut : la base de l'application)
+        copie: Rejouer sur une copie de la base (les ajouts et suppressions ne la touchent pas)
+
+    Returns:
+        Rapport (voir rapport_rejeu)
+    """
+    _, appels = lire_trace(chemin)
+    verifier_pragmas(pragmas)
+    base = os.path.abspath(base or database.engine.url.database)
+    if not os.path.exists(base):
+        raise FileNotFoundError(f"Base introuvable : {base}")
+    dossier = tempfile.mkdtemp(prefix="banque_rejeu_") if copie else None
+    try:
+        if copie:
+            import sauvegarde
+            copie_base = os.path.join(dossier, os.path.basename(base))
+            sauvegarde.copier_a_chaud(base, copie_base)
+            base = copie_base
+        # Schéma mis à jour comme à l'ouverture par l'application (ancienne base rejouée)
+        engine = create_engine(f"sqlite:///{base}")
+        database.preparer_schema(engine)
+        engine.dispose()
+        configuration = {"base": base, "pragmas": tuple(pragmas), "replique": replique, "depot": depot}
+
+        # spawn : chaque client part d'un processus neuf (pas de connexion SQLite héritée)
+        contexte = multiprocessing.get_context("spawn")
+        barriere, resultats = contexte.Barrier(clients), contexte.Queue()
+        processus = [contexte.Process(target=_client, args=(configuration, appels, client, vitesse, barriere, resultats))
+                     for client in range(clients)]
+        for un_processus in processus:
+            un_processus.start()
+        par_client = sorted(resultats.get() for _ in processus)
+        for un_processus in processus:
+            un_processus.join()
+    finally:
+        if dossier is not None:
+            shutil.rmtree(dossier, ignore_errors=True)
+
+    # Les clients interrompus par l'échec d'un autre (barrière rompue) passent après lui
+    erreurs = sorted((erreur for _, _, _, erreur in par_client if erreur),
+                     key=lambda erreur: "BrokenBarrierError" in erreur)
+    if erreurs:
+        raise RuntimeError(f"Échec d'un client du rejeu :\n{erreurs[0]}")
+    return rapport_rejeu([mesures for _, mesures, _, _ in par_client], [duree for _, _, duree, _ in par_client],
+                         vitesse=vitesse, configuration=configuration)
+
+
+def rapport_rejeu(mesures_par_client, durees, vitesse=None, configuration=None):
+    """
+    Returns:
+        {"clients", "appels", "duree_s", "debit" (appels/s), "erreurs", "ecarts", "retard_max_ms",
+        "vitesse", "configuration", "methodes": {méthode: {"nombre", "moyenne_ms", "p50_ms",
+        "p95_ms", "p99_ms", "max_ms"}}}
+    """
+    par_methode = {}
+    for mesures in mesures_par_client:
+        for mesure in mesures:
+            par_methode.setdefault(mesure.methode, []).append(mesure.duree)
+    toutes = [mesure for mesures in mesures_par_client for mesure in mesures]
+    duree = max(durees) if durees else 0.0
+
+    def statistiques(valeurs):
+        valeurs = sorted(valeurs)
+        return {
+            "nombre": len(valeurs),
+            "moyenne_ms": round(statistics.mean(valeurs), 3),
+            "p50_ms": round(statistics.median(valeurs), 3),
+            "p95_ms": round(valeurs[min(len(valeurs) - 1, int(len(valeurs) * 0.95))], 3),
+            "p99_ms": round(valeurs[min(len(valeurs) - 1, int(len(valeurs) * 0.99))], 3),
+            "max_ms": round(valeurs[-1], 3),
+        }
+
+    return {
+        "clients": len(mesures_par_client),
+        "appels": len(toutes),
+        "duree_s": round(duree, 3),
+        "debit": round(len(toutes) / duree, 1) if duree else 0.0,
+        "erreurs": sum(1 for mesure in toutes if mesure.erreur),
+        "ecarts": sum(1 for mesure in toutes if not mesure.erreur and _ecart(mesure)),
+        "retard_max_ms": round(max((mesure.retard for mesure in toutes), default=0.0), 3),
+        "vitesse": vitesse,
+        "configuration": configuration,
+        "methodes": {methode: statistiques(valeurs)
+                     for methode, valeurs in sorted(par_methode.items(), key=lambda element: -len(element[1]))},
+    }
+
+
+def resume_rejeu(rapport):
+    """Lignes lisibles d'un rapport de rejeu"""
+    lignes = [f"{rapport['appels']} appel(s) par {rapport['clients']} client(s) en {rapport['duree_s']:.2f} s : "
+              f"{rapport['debit']:.0f} appels/s, {rapport['erreurs']} erreur(s), "
+              f"{rapport['ecarts']} résultat(s) différent(s) de l'enregistrement"
+              + (f", retard max {rapport['retard_max_ms']:.1f} ms" if rapport["vitesse"] else "")]
+    for methode, valeurs in rapport["methodes"].items():
+        lignes.append(f"  {methode:<32} {valeurs['nombre']:>6}   médiane {valeurs['p50_ms']:8.3f} ms   "
+                      f"p95 {valeurs['p95_ms']:8.3f} ms   p99 {valeurs['p99_ms']:8.3f} ms   "
+                      f"max {valeurs['max_ms']:8.3f} ms")
+    return lignes
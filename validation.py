@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+"""
+Règles de validation des universités et facultés
+
+Ces fonctions ne touchent pas à la base de données : elles peuvent être appelées
+depuis les fonctions d'ajout de database.py comme depuis les processus d'importation.
+"""
+
+LONGUEUR_MAX_CODE = 10
+ANNEE_FONDATION_MIN = 1000
+
+def valider_universite(nom, ville, code_universite, annee_fondation=None):
+    """
+    Vérifie les données d'une université
+    
+    Returns:
+        Message d'erreur, ou None si les données sont valides
+    """
+    if not nom or not ville or not code_universite:
+        return "Nom, ville et code sont obligatoires"
+    
+    if len(code_universite) > LONGUEUR_MAX_CODE:
+        return f"Le code université ne peut pas dépasser {LONGUEUR_MAX_CODE} caractères"
+    
+    if annee_fondation and annee_fondation < ANNEE_FONDATION_MIN:
+        return f"L'année de fondation doit être supérieure à {ANNEE_FONDATION_MIN}"
+    
+    return None
+
+def valider_faculte(nom_faculte, code_faculte, nombre_etudiants):
+    """
+    Vérifie les données d'une faculté
+    
+    Returns:
+        Message d'erreur, ou None si les données sont valides
+    """
+    if not nom_faculte or not code_faculte:
+        return "Nom et code de la faculté sont obligatoires"
+    
+    if len(code_faculte) > LONGUEUR_MAX_CODE:
+        return f"Le code faculté ne peut pas dépasser {LONGUEUR_MAX_CODE} caractères"
+    
+    return valider_nombre_etudiants(nombre_etudiants)
+
+def valider_nombre_etudiants(nombre_etudiants):
+    """
+    Vérifie un nombre d'étudiants (ajout ou modification par lot)
+    
+    Returns:
+        Message d'erreur, ou None s'il est valide
+    """
+    if nombre_etudiants < 0:
+        return "Le nombre d'étudiants doit être positif"
+    
+    return None